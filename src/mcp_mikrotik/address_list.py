@@ -0,0 +1,257 @@
+"""Bring a firewall address list in line with a desired set in one import.
+
+Adding a large blocklist with one ``/ip firewall address-list add`` per call
+costs a round trip per entry.  :func:`sync_address_list` instead reads the
+list once (streamed with :func:`~mcp_mikrotik.connector.consume_rows`),
+works out locally which entries to add and which to remove, and writes just
+that difference as a ``.rsc`` script: addresses are packed into
+``:foreach`` loops of :data:`CHUNK` at a time, so the script is a fraction
+of the size of one command per entry.  The script is uploaded over SFTP and
+run with ``/import``; the entry count is then checked against the plan and
+the script removed again — one upload and one batch of commands in all.
+
+Each add and remove in the script is wrapped in ``:do {} on-error={}``, so an
+entry the router refuses does not abort the rest of the import; it shows up
+as a count that does not match the plan instead.  Dynamic entries (added by
+firewall rules, with a timeout) are left alone and count as present; extra
+static copies of an entry are removed.
+
+The sync is refused while safe mode is active on the device: every change of
+the import would go into the safe-mode undo history, which RouterOS limits.
+"""
+
+import asyncio
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from mcp.server.mcpserver import Context
+
+from .connector import consume_rows, execute_batch, upload_file_sync
+from .parsing import looks_like_error, quote
+from .route_store import parse_prefix
+from .safe_mode import get_safe_mode_manager
+from .storage import safe_name
+
+MENU = "ip firewall address-list"
+
+# Addresses per :foreach loop in the generated script.
+CHUNK = 100
+
+_TRUE = ("true", "yes")
+_HOSTNAME = re.compile(r"^(?=.*[a-z])[a-z0-9]([a-z0-9-]*[a-z0-9])?(\.[a-z0-9]([a-z0-9-]*[a-z0-9])?)*\.?$")
+
+
+def _ipv4(text: str) -> Tuple[int, int]:
+    version, key, length = parse_prefix(text)
+    if version != 4:
+        raise ValueError(f"IPv6 entries belong in /ipv6 firewall address-list: {text!r}")
+    return key, length
+
+
+def _dotted(key: int) -> str:
+    return ".".join(str((key >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def normalise_entry(text: str) -> str:
+    """An address-list entry as RouterOS prints it.
+
+    ``"10.0.0.5"`` and ``"10.0.0.5/32"`` both become ``"10.0.0.5"``, host bits
+    of a prefix are cleared and DNS names are lower-cased.  Raises ValueError
+    for anything that is not an IPv4 address, prefix, range or DNS name.
+    """
+    entry = text.strip()
+    first, dash, last = entry.partition("-")
+    try:
+        if dash and "/" not in entry and first[:1].isdigit():
+            start, end = _ipv4(first)[0], _ipv4(last)[0]
+            if "/" in first or "/" in last or start > end:
+                raise ValueError
+            return f"{_dotted(start)}-{_dotted(end)}"
+        key, length = _ipv4(entry)
+        return _dotted(key) if length == 32 else f"{_dotted(key)}/{length}"
+    except ValueError as e:
+        if "IPv6" in str(e):
+            raise
+    name = entry.lower()
+    if len(name) <= 253 and _HOSTNAME.match(name) and not name.replace(".", "").isdigit():
+        return name
+    raise ValueError(f"not an IPv4 address, prefix, range or DNS name: {text!r}")
+
+
+class AddressListState:
+    """The entries of one address list, as read from the device.
+
+    Enabled static entries map to their ``.id`` (None when the device was
+    read over SSH, where rows carry no ID), and any further copies of one are
+    listed in ``duplicates``; disabled ones are kept apart, as the sync
+    replaces them.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.static: Dict[str, Optional[str]] = {}
+        self.duplicates: List[Tuple[str, Optional[str]]] = []
+        self.disabled: List[Tuple[str, Optional[str]]] = []
+        self.dynamic: Set[str] = set()
+
+    def add_row(self, row: Mapping[str, str]) -> None:
+        if row.get("list") != self.name or not row.get("address"):
+            return
+        try:
+            address = normalise_entry(row["address"])
+        except ValueError:
+            address = row["address"]
+        if row.get("dynamic") in _TRUE:
+            self.dynamic.add(address)
+        elif row.get("disabled") in _TRUE:
+            self.disabled.append((address, row.get(".id")))
+        elif address in self.static:
+            self.duplicates.append((address, row.get(".id")))
+        else:
+            self.static[address] = row.get(".id")
+
+
+class SyncPlan:
+    """What it takes to turn an :class:`AddressListState` into the desired set.
+
+    Duplicate entries are removed by ID.  Without IDs the copies of an
+    address can only be removed all together, so a desired one is then
+    added back once.
+    """
+
+    def __init__(self, state: AddressListState, desired: Set[str]) -> None:
+        self.name = state.name
+        add = desired - state.static.keys() - state.dynamic
+        self.remove = [(address, id) for address, id in state.static.items() if address not in desired]
+        kept = len(state.static) - len(self.remove)
+        for address, id in state.duplicates:
+            if id:
+                self.remove.append((address, id))
+            elif address in desired and address not in add:
+                self.remove.append((address, None))
+                add.add(address)
+                kept -= 1
+        self.add = sorted(add)
+        self.remove_disabled = list(state.disabled)
+        self.unchanged = kept
+
+    @property
+    def changes(self) -> int:
+        return len(self.add) + len(self.remove) + len(self.remove_disabled)
+
+    @property
+    def expected(self) -> int:
+        """Static entries the list should hold once the plan has run."""
+        return self.unchanged + len(self.add)
+
+
+def _loops(values: List[str], body: str) -> Iterable[str]:
+    """``:foreach`` lines running ``body`` (which refers to ``$v``) for each value."""
+    for start in range(0, len(values), CHUNK):
+        chunk = ";".join(quote(value) for value in values[start:start + CHUNK])
+        yield f":foreach v in={{{chunk}}} do={{:do {{{body}}} on-error={{}}}}"
+
+
+def render_script(plan: SyncPlan, comment: Optional[str] = None) -> str:
+    """The ``.rsc`` script that carries out ``plan``."""
+    name = quote(plan.name)
+    lines = [f"# address-list {plan.name}: +{len(plan.add)} -{len(plan.remove) + len(plan.remove_disabled)}"]
+    for entries, condition in ((plan.remove, ""), (plan.remove_disabled, " disabled=yes")):
+        ids = [id for _, id in entries if id]
+        lines.extend(_loops(ids, f"/{MENU} remove [:toid $v]"))
+        addresses = [address for address, id in entries if not id]
+        lines.extend(_loops(
+            addresses, f"/{MENU} remove [find list={name} address=$v dynamic=no{condition}]",
+        ))
+    extra = f" comment={quote(comment)}" if comment else ""
+    lines.extend(_loops(plan.add, f"/{MENU} add list={name} address=$v{extra}"))
+    return "\n".join(lines) + "\n"
+
+
+async def load_address_list(name: str, device: str) -> AddressListState:
+    state = AddressListState(name)
+    await consume_rows(MENU, state.add_row, device=device, where={"list": name})
+    return state
+
+
+async def sync_address_list(
+    ctx: Context,
+    name: str,
+    addresses: Iterable[str],
+    device: str,
+    comment: Optional[str] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Make the address list ``name`` hold exactly ``addresses``.
+
+    Returns what was (or, with ``dry_run``, would be) added and removed and,
+    after a sync, whether the device's entry count matches the plan.  Raises
+    ValueError for entries that are not addresses, while safe mode is active
+    on the device, and when the router rejects the import.
+    """
+    for label, text in (("list name", name), ("comment", comment or "")):
+        if any(ord(char) < 32 for char in text):
+            raise ValueError(f"{label} must not contain control characters")
+
+    desired: Set[str] = set()
+    invalid = []
+    for address in addresses:
+        try:
+            desired.add(normalise_entry(address))
+        except ValueError:
+            invalid.append(address)
+    if invalid:
+        shown = ", ".join(repr(address) for address in invalid[:10])
+        more = f" and {len(invalid) - 10} more" if len(invalid) > 10 else ""
+        raise ValueError(f"{len(invalid)} invalid address(es): {shown}{more}")
+
+    state = await load_address_list(name, device)
+    plan = SyncPlan(state, desired)
+    result = {
+        "device": device,
+        "list": name,
+        "desired": len(desired),
+        "before": {
+            "static": len(state.static) + len(state.duplicates) + len(state.disabled),
+            "dynamic": len(state.dynamic),
+        },
+        "added": len(plan.add),
+        "removed": len(plan.remove) + len(plan.remove_disabled),
+        "unchanged": plan.unchanged,
+    }
+    if dry_run or not plan.changes:
+        result["dry_run"] = dry_run
+        result["sample"] = {
+            "add": plan.add[:10],
+            "remove": [address for address, _ in plan.remove[:10]],
+        }
+        return result
+    if get_safe_mode_manager(device).is_active:
+        raise ValueError(
+            f"safe mode is active on '{device}'; commit or roll it back before syncing "
+            f"{plan.changes} change(s), or use dry_run=true"
+        )
+
+    script = render_script(plan, comment).encode("utf-8")
+    filename = f"mcp-address-list-{safe_name(name)}.rsc"
+    await ctx.info(f"Uploading {filename} ({len(script)} bytes) to '{device}'")
+    await asyncio.to_thread(upload_file_sync, filename, script, device)
+
+    count_cmd = f"/{MENU} print count-only where list={quote(name)} dynamic=no"
+    remove_cmd = f"/file remove {quote(filename)}"
+    outputs = await execute_batch(
+        [f"/import file-name={quote(filename)}", count_cmd, remove_cmd],
+        ctx, device=device, cached=False,
+    )
+    if outputs[0].startswith("Error") or any(looks_like_error(line) for line in outputs[0].splitlines()):
+        await execute_batch([remove_cmd], ctx, device=device, cached=False)
+        raise ValueError(f"import of {filename} failed: {outputs[0].strip()}")
+
+    count = outputs[1].strip()
+    result.update({
+        "script_bytes": len(script),
+        "expected": plan.expected,
+        "entries": int(count) if count.isdigit() else count,
+        "verified": count == str(plan.expected),
+    })
+    return result
@@ -3,6 +3,8 @@ from mcp.types import ToolAnnotations
 from starlette.requests import Request
 from starlette.responses import Response
 
+from mcp_mikrotik.connector import read_only_tool
+
 # Sent once, in the initialize response, instead of being repeated in all 173
 # tool descriptions — the same guidance costs ~60 tokens here rather than ~4k.
 INSTRUCTIONS = (
@@ -13,7 +15,22 @@ INSTRUCTIONS = (
     "unknown device returns an error naming the valid titles."
 )
 
-mcp = MCPServer("mcp-mikrotik", instructions=INSTRUCTIONS)
+class _Server(MCPServer):
+    """Registers tools annotated read-only so that what they run counts as reads.
+
+    The read cache is emptied for a device by anything that may change it;
+    a read-only tool's scripted reads (``:put``, ``:foreach``) would otherwise
+    look like writes.
+    """
+
+    def tool(self, *args, annotations=None, **kwargs):
+        register = super().tool(*args, annotations=annotations, **kwargs)
+        if annotations is None or not annotations.read_only_hint:
+            return register
+        return lambda fn: register(read_only_tool(fn))
+
+
+mcp = _Server("mcp-mikrotik", instructions=INSTRUCTIONS)
 
 # ── Behaviour presets ──────────────────────────────────────────────────────
 # These capture the *risk profile* of a tool (MCP spec §Tool Annotations).
@@ -56,6 +73,6 @@ async def health_check(request: Request) -> Response:
 
 # Import scope modules to trigger @mcp.tool() registration
 from mcp_mikrotik.scope import (  # noqa: F401, E402
-    backup, dhcp, dns, firewall_filter, firewall_nat,
-    interfaces, inventory, ip_address, ipv6_address, ip_pool, logs, poe, queue, safe_mode, routes, users, vlan, wireless, wireguard,
+    backup, cache, dhcp, dns, drift, firewall_filter, firewall_nat,
+    fleet, interfaces, inventory, ip_address, ipv6_address, ip_pool, logs, poe, query, queue, safe_mode, routes, users, vlan, wireless, wireguard,
 )
@@ -0,0 +1,171 @@
+"""asyncio-native SSH client for MikroTik devices, built on asyncssh.
+
+:class:`~mcp_mikrotik.mikrotik_ssh_client.MikroTikSSHClient` is blocking, so
+the connector runs it through ``asyncio.to_thread`` and every command in flight
+holds a thread of the default executor.  Fanning one command out to hundreds of
+routers then queues behind the executor's few dozen threads.  This client does
+the same work on the event loop itself — a command in flight costs a coroutine,
+not a thread — and is selected with ``ssh_engine: asyncssh``.
+
+asyncssh is an optional dependency (``pip install mcp-server-mikrotik[asyncssh]``);
+when it is missing the connector falls back to the paramiko client.
+"""
+
+import logging
+from typing import AsyncIterator, Optional, Tuple
+
+from .mikrotik_ssh_client import SFTP_CHUNK_SIZE, MikroTikSSHClient
+
+try:
+    import asyncssh
+except ImportError:  # optional dependency
+    asyncssh = None
+
+logger = logging.getLogger(__name__)
+
+
+def asyncssh_available() -> bool:
+    return asyncssh is not None
+
+
+class AsyncMikroTikSSHClient:
+    """Async SSH client for MikroTik devices.
+
+    Mirrors :class:`MikroTikSSHClient` method for method, with the I/O
+    methods as coroutines, so callers can switch engines without changing
+    how they drive a connection.
+    """
+
+    def __init__(self, host: str, username: str, password: str, key_filename: Optional[str], port: int = 22):
+        self.host = host
+        self.username = username
+        self.password = password
+        self.port = port
+        self.key_filename = key_filename
+        self.client = None
+
+    async def connect(self) -> bool:
+        """Establish the SSH connection; return False (and log) on failure."""
+        if asyncssh is None:
+            raise RuntimeError(
+                "The asyncssh engine needs the optional 'asyncssh' package "
+                "(pip install mcp-server-mikrotik[asyncssh])."
+            )
+        try:
+            # Same policy as the paramiko client: accept the router's host key,
+            # and authenticate only with what the inventory provides — never
+            # with the server's own ~/.ssh keys or a forwarded agent.
+            self.client = await asyncssh.connect(
+                self.host,
+                port=self.port,
+                username=self.username,
+                password=self.password,
+                client_keys=[self.key_filename] if self.key_filename else None,
+                agent_path=None,
+                known_hosts=None,
+                connect_timeout=10,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to MikroTik: {e}")
+            self.client = None
+            return False
+
+    async def execute_command(self, command: str) -> str:
+        """Run a command on its own session channel and return its output."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        try:
+            result = await self.client.run(command, check=False, encoding=None)
+        except Exception as e:
+            logger.error(f"Error executing command: {e}")
+            raise
+
+        output = MikroTikSSHClient._decode_output(result.stdout or b"")
+        error = MikroTikSSHClient._decode_output(result.stderr or b"")
+        if error and not output:
+            return error
+        return output
+
+    async def iter_command_lines(self, command: str) -> AsyncIterator[str]:
+        """Run a command and yield its output lines as they arrive."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        produced = False
+        async with self.client.create_process(command, encoding=None) as process:
+            async for line in process.stdout:
+                if not line:            # asyncssh ends the stream with b""
+                    break
+                produced = True
+                yield MikroTikSSHClient._decode_output(line).rstrip("\r\n")
+            if not produced:
+                error = MikroTikSSHClient._decode_output(await process.stderr.read())
+                for line in error.splitlines():
+                    yield line
+
+    async def download_file(self, remote_filename: str) -> bytes:
+        """Download a file from the device over SFTP and return its raw bytes."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        async with self.client.start_sftp_client() as sftp:
+            async with sftp.open(remote_filename, "rb") as fh:
+                return await fh.read()
+
+    async def iter_file(
+        self,
+        remote_filename: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = SFTP_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Stream a file from the device over SFTP (see ``MikroTikSSHClient.iter_file``).
+
+        asyncssh splits each chunk-sized read into parallel SFTP requests.
+        """
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        async with self.client.start_sftp_client() as sftp:
+            async with sftp.open(remote_filename, "rb") as fh:
+                size = (await fh.stat()).size
+                if offset > size:
+                    raise ValueError(f"Offset {offset} is past the end of the {size}-byte file")
+                end = size if length is None else min(size, offset + length)
+                position = offset
+                while position < end:
+                    data = await fh.read(min(chunk_size, end - position), position)
+                    if not data:
+                        break
+                    position += len(data)
+                    yield data
+
+    async def stat_file(self, remote_filename: str) -> Tuple[int, int]:
+        """Size and modification time (epoch seconds) of a file on the device."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        async with self.client.start_sftp_client() as sftp:
+            attrs = await sftp.stat(remote_filename)
+            return attrs.size, int(attrs.mtime or 0)
+
+    async def upload_file(self, remote_filename: str, data: bytes) -> None:
+        """Upload raw bytes to a file on the device over SFTP."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        async with self.client.start_sftp_client() as sftp:
+            async with sftp.open(remote_filename, "wb") as fh:
+                await fh.write(data)
+
+    def is_alive(self) -> bool:
+        return self.client is not None and not self.client.is_closed()
+
+    async def disconnect(self) -> None:
+        """Close the SSH connection."""
+        if self.client:
+            self.client.close()
+            await self.client.wait_closed()
+            self.client = None
@@ -0,0 +1,91 @@
+"""Content-addressed store for files fetched from devices.
+
+Every file is kept once, under its SHA-256, in ``<data dir>/store/objects`` —
+an export that did not change since the last run costs no new space, however
+many devices or days produced it.  ``catalog.jsonl`` beside it records what
+was stored when, for which device, under which remote name.
+
+Files that differ only where it does not matter (the timestamp line of an
+export) are recognised by a *canonical* hash of what does: ``canonical``
+maps each such hash to the object stored for it, so every object still
+hashes to its name.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .storage import data_dir
+
+
+class ContentStore:
+    """Files stored by SHA-256, with an append-only catalog of what went in."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.objects = root / "objects"
+        self.canonical = root / "canonical"
+        self.catalog = root / "catalog.jsonl"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path_for(self, sha256: str) -> Path:
+        return self.objects / sha256[:2] / sha256
+
+    def add(self, path: Path, sha256: str, canonical: Optional[str] = None) -> Tuple[Path, bool]:
+        """Move ``path`` (whose SHA-256 is ``sha256``) into the store.
+
+        Returns the stored path, named by its SHA-256, and whether it was
+        new; a file whose content is already stored is deleted instead of
+        kept twice.  So is one whose ``canonical`` hash already has an
+        object, which is returned instead.
+        """
+        alias = self.canonical / canonical[:2] / canonical if canonical else None
+        with self._lock:
+            if alias is not None and alias.exists():
+                known = self.path_for(alias.read_text(encoding="ascii").strip())
+                if known.exists():
+                    path.unlink(missing_ok=True)
+                    return known, False
+            target = self.path_for(sha256)
+            new = not target.exists()
+            if new:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(path, target)
+            else:
+                path.unlink(missing_ok=True)
+            if alias is not None:
+                alias.parent.mkdir(parents=True, exist_ok=True)
+                alias.write_text(sha256, encoding="ascii")
+            return target, new
+
+    def record(self, **entry) -> dict:
+        """Append an entry to the catalog, stamped with the current time."""
+        entry = {"stored_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **entry}
+        with self._lock, self.catalog.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    def entries(self, device: Optional[str] = None) -> Iterator[dict]:
+        """Catalog entries, oldest first, optionally for one device."""
+        if not self.catalog.exists():
+            return
+        with self.catalog.open(encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if device is None or entry.get("device", "").casefold() == device.casefold():
+                    yield entry
+
+    def latest(self, device: str, kind: str) -> Optional[dict]:
+        found: List[dict] = [e for e in self.entries(device) if e.get("kind") == kind]
+        return found[-1] if found else None
+
+
+def get_content_store() -> ContentStore:
+    """The store under the configured data directory."""
+    return ContentStore(data_dir() / "store")
@@ -0,0 +1,87 @@
+"""Classifying and normalising RouterOS console commands.
+
+Several layers need to know whether a command only reads — the fleet fan-out
+refuses anything else, and the read cache must drop a device's entries as
+soon as something that may change it runs.  The rules live here so they
+agree.
+"""
+
+import re
+
+READ_VERBS = frozenset({"print", "export", "monitor", "monitor-traffic"})
+# Verbs that act, for telling ``/system script run print`` (runs a script
+# named "print") apart from a menu path leading to ``print``.
+_ACTION_VERBS = frozenset({
+    "add", "set", "unset", "remove", "enable", "disable", "comment", "move",
+    "edit", "run", "execute", "import", "reset", "reset-counters",
+    "reset-counters-all", "reboot", "shutdown", "upgrade", "downgrade",
+    "install", "uninstall", "save", "load", "fetch", "send", "flush",
+    "make-static", "clear", "disconnect", "release", "renew", "start", "stop",
+})
+# Verbs that need ``once``/``duration=`` or they stream until cancelled.
+_STREAMING_VERBS = frozenset({"monitor", "monitor-traffic"})
+# ``print`` arguments that keep it printing until cancelled.
+_STREAMING_ARGUMENTS = frozenset({"follow", "follow-only", "follow-strict"})
+# Scripting, sub-commands and command separators could hide a second command
+# behind a harmless-looking one.
+_FORBIDDEN = (";", "[", "]", "{", "}", "\n", "\r", "file=")
+
+# A run of non-space characters and quoted strings, so that whitespace inside
+# ``comment="a  b"`` survives normalisation.
+_WORD = re.compile(r'(?:[^\s"]+|"(?:[^"\\]|\\.)*")+')
+
+
+def is_read_only_command(command: str) -> bool:
+    """True if ``command`` is a single console read.
+
+    The command must reach a read verb (``print``, ``export``, ``monitor``)
+    through its menu path — ``/ip route print where ...`` — and contain no
+    scripting, sub-command or ``file=`` argument, and it must end on its
+    own (no ``print follow`` or ``interval=``).  Anything this cannot vouch
+    for is refused.
+    """
+    command = command.strip()
+    if not command or command.startswith(":") or any(c in command for c in _FORBIDDEN):
+        return False
+
+    words = command.split()
+    for position, word in enumerate(words):
+        verb = word.lstrip("/")
+        if "=" in word or word == "where" or verb in _ACTION_VERBS:
+            return False            # arguments or an action came before any read verb
+        if verb in READ_VERBS:
+            if verb in _STREAMING_VERBS:
+                rest = words[position + 1:]
+                return "once" in rest or any(w.startswith("duration=") for w in rest)
+            return not _prints_until_cancelled(words[position + 1:])
+    return False
+
+
+def _prints_until_cancelled(arguments) -> bool:
+    return any(w in _STREAMING_ARGUMENTS or w.startswith("interval=") for w in arguments)
+
+
+def is_streaming_command(command: str) -> bool:
+    """True for live readings (``monitor``, ``print follow``) whose output changes every call."""
+    words = command.split()
+    return (
+        any(word.lstrip("/") in _STREAMING_VERBS for word in words)
+        or _prints_until_cancelled(words)
+    )
+
+
+def normalise_command(command: str) -> str:
+    """Collapse insignificant whitespace: ``/ip  route print`` → ``/ip route print``."""
+    return " ".join(_WORD.findall(command.strip()))
+
+
+# ``password=...``, ``wpa2-pre-shared-key=...``, ``secret=...`` and the like.
+_SECRET = re.compile(
+    r'\b([\w-]*(?:password|passphrase|pre-shared-key|secret))=("(?:[^"\\]|\\.)*"|[^\s;}]+)',
+    re.IGNORECASE,
+)
+
+
+def redact_command(command: str) -> str:
+    """``command`` with password and key values masked, for logs and progress messages."""
+    return _SECRET.sub(r"\1=***", command)
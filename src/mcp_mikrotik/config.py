@@ -2,7 +2,15 @@ import json
 from typing import Annotated, List, Literal, Optional
 
 import yaml
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    NonNegativeFloat,
+    NonNegativeInt,
+    PositiveFloat,
+    PositiveInt,
+    field_validator,
+)
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
@@ -41,6 +49,32 @@ class DeviceConfig(BaseModel):
     tags: List[str] = []
     region: Optional[str] = None
 
+    # Connection reuse for this device (see Inventory.session). ``None``
+    # inherits the server-wide MIKROTIK_POOL_SIZE / MIKROTIK_POOL_IDLE_TIMEOUT;
+    # a pool size of 0 keeps the connection-per-command model.
+    pool_size: Optional[NonNegativeInt] = None
+    pool_idle_timeout: Optional[NonNegativeFloat] = None
+    # Run concurrent commands as channels over one shared SSH transport, at
+    # most this many at once. ``None`` inherits MIKROTIK_MULTIPLEX_CHANNELS;
+    # 0 disables multiplexing. Takes precedence over pool_size.
+    multiplex_channels: Optional[NonNegativeInt] = None
+
+    # Structured reads (connector.fetch_rows) over the native RouterOS API
+    # instead of scraping console text over SSH: "api" (TCP, default port
+    # 8728) or "api-ssl" (TLS, default port 8729). Console commands still run
+    # over SSH with the same credentials, so "ssh" access is needed either way.
+    transport: Literal["ssh", "api", "api-ssl"] = "ssh"
+    api_port: Optional[int] = None
+
+    # SSH implementation for console commands. ``None`` inherits
+    # MIKROTIK_SSH_ENGINE.
+    ssh_engine: Optional[Literal["paramiko", "asyncssh"]] = None
+
+    # Attribute syslog messages from any source address whose syslog
+    # hostname is this device's title, for a device whose messages arrive
+    # NATed. Anyone who can reach the receiver can then log under its name.
+    syslog_hostname: bool = False
+
     @field_validator("title")
     @classmethod
     def _title_not_blank(cls, v: str) -> str:
@@ -88,6 +122,77 @@ class MikrotikConfig(BaseSettings):
     inventory: Annotated[List[DeviceConfig], NoDecode] = []
     inventory_file: Optional[str] = None
 
+    # ── Connection pooling (opt-in) ─────────────────────────────────────────
+    # Defaults for devices that do not set their own pool_size /
+    # pool_idle_timeout. With pool_size 0 every command opens and closes its
+    # own SSH connection; above 0, up to that many warm connections per device
+    # are kept and leased to one command at a time. Idle connections older
+    # than pool_idle_timeout seconds are closed instead of reused.
+    pool_size: NonNegativeInt = 0
+    pool_idle_timeout: NonNegativeFloat = 60.0
+
+    # ── Channel multiplexing (opt-in) ───────────────────────────────────────
+    # Above 0, each device keeps ONE authenticated SSH transport and every
+    # command opens its own session channel on it, up to this many in flight.
+    # Cheaper than pooling (one handshake per device, not per connection), but
+    # commands on a device share the transport's fate: if it drops, every
+    # command in flight on it fails, and the next one reconnects.
+    multiplex_channels: NonNegativeInt = 0
+
+    # ── SSH engine ──────────────────────────────────────────────────────────
+    # "paramiko" runs each command on a worker thread (asyncio.to_thread), so
+    # commands in flight are bounded by the default executor's thread count.
+    # "asyncssh" runs them on the event loop with no thread per connection —
+    # for large fleets — and needs the optional asyncssh package; without it
+    # the server logs a warning and stays on paramiko. Pooling and
+    # multiplexing apply to the paramiko engine.
+    ssh_engine: Literal["paramiko", "asyncssh"] = "paramiko"
+
+    # ── Fleet fan-out ───────────────────────────────────────────────────────
+    # fleet_execute runs one read on every selected device at once: at most
+    # fleet_concurrency devices in flight, each allowed fleet_timeout seconds
+    # before it is reported as failed. A call may ask for less, never more.
+    fleet_concurrency: PositiveInt = 16
+    fleet_timeout: PositiveFloat = 30.0
+    # fleet_backup saves and downloads files, which takes longer than a read;
+    # it shares fleet_concurrency but allows each device this many seconds.
+    fleet_backup_timeout: PositiveFloat = 300.0
+
+    # ── Read cache (opt-in) ─────────────────────────────────────────────────
+    # Above 0, the output of read commands (print/export) is reused for up to
+    # read_cache_ttl seconds — less for volatile menus such as /log or
+    # /interface — keeping at most read_cache_size entries across devices.
+    # Any other command sent to a device drops that device's entries.
+    read_cache_size: NonNegativeInt = 0
+    read_cache_ttl: NonNegativeFloat = 30.0
+
+    # ── Local data ──────────────────────────────────────────────────────────
+    # Where files fetched from devices (downloads, backups, snapshots) are
+    # kept. Empty means $XDG_DATA_HOME/mcp-mikrotik, or
+    # ~/.local/share/mcp-mikrotik when XDG_DATA_HOME is unset.
+    data_dir: Optional[str] = None
+
+    # ── Log archive ─────────────────────────────────────────────────────────
+    # archive_logs copies device logs into <data dir>/logs.sqlite3 for
+    # search_log_archive; entries older than this many days are dropped on
+    # each ingest (0 keeps everything).
+    log_archive_days: NonNegativeInt = 30
+
+    # ── Syslog receiver (opt-in) ────────────────────────────────────────────
+    # Above 0, the server listens on syslog_host:syslog_port (UDP and TCP) for
+    # RouterOS remote logging and keeps the newest syslog_buffer entries per
+    # device in memory, for get_logs/search_logs with source="syslog".
+    # Messages that match no inventory device are dropped.
+    syslog_port: NonNegativeInt = 0
+    syslog_host: str = "0.0.0.0"
+    syslog_buffer: PositiveInt = 1000
+
+    # ── Route snapshots ─────────────────────────────────────────────────────
+    # snapshot_routes saves each snapshot under <data dir>/routes/<device>/
+    # for lookup_routes and diff_routes; only the newest this many are kept
+    # per device (0 keeps every snapshot).
+    route_snapshot_keep: NonNegativeInt = 10
+
     @field_validator("inventory", mode="before")
     @classmethod
     def _parse_inventory(cls, v):
@@ -1,13 +1,74 @@
 import asyncio
+import functools
+import hashlib
+import json
 import logging
-from typing import Optional
+import os
+import re
+import weakref
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from mcp.server.mcpserver import Context
 
+from .commands import is_read_only_command, normalise_command, redact_command
+from .config import DeviceConfig
 from .inventory import DeviceNotFoundError, get_inventory
+from .parsing import RowParser, iter_rows, looks_like_error, quote
+from .read_cache import get_read_cache
+from .routeros_api import RouterOSApiClient
 
 logger = logging.getLogger(__name__)
 
+# RouterOS API connections are asyncio objects bound to the event loop that
+# opened them, so they are kept per loop (and dropped with it) and per device.
+# Unlike SSH, one API connection is meant to be shared: requests are tagged and
+# many can be in flight on the socket at once.
+_ApiSlot = Tuple[asyncio.Lock, Optional[RouterOSApiClient]]
+_api_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _ApiSlot]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Reads currently running, per loop, keyed by (device, normalised command).
+# A read arriving while an identical one is in flight awaits that task
+# instead of running the command again.
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Set while a tool annotated read-only runs (see :func:`read_only_tool`): the
+# commands it sends only read, even those is_read_only_command cannot vouch
+# for, so they must not empty the device's read cache.
+_in_read_only_tool: ContextVar[bool] = ContextVar("in_read_only_tool", default=False)
+
+# Printed after each command of a batch (see execute_batch); {} is the
+# command's position, so a missing sentinel shows where the batch stopped.
+_BATCH_EOC = "__MCP_BATCH_EOC_{}__"
+# Where RouterOS puts a script it could not parse: "... (line 1 column 57)".
+_PARSE_ERROR_POSITION = re.compile(r"\(line (\d+) column (\d+)\)")
+
+# Menu path segments and property names that may be spliced into a console
+# command; anything else could smuggle in a second command.
+_NAME = re.compile(r"[A-Za-z0-9.\-]+$")
+
+
+def read_only_tool(fn: Callable) -> Callable:
+    """Wrap a tool so the commands it runs count as reads.
+
+    Applied by the server to every tool annotated read-only; a command such
+    a tool sends is treated like ``read_only=True`` was passed for it.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        token = _in_read_only_tool.set(True)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            _in_read_only_tool.reset(token)
+
+    return wrapper
+
 
 def _execute_sync(command: str, device: Optional[str] = None) -> str:
     """Execute a MikroTik command over a fresh SSH connection (blocking).
@@ -17,7 +78,7 @@ def _execute_sync(command: str, device: Optional[str] = None) -> str:
     """
     inventory = get_inventory()
     target = inventory.resolve(device)
-    logger.info(f"Executing MikroTik command on '{target.title}': {command}")
+    logger.info(f"Executing MikroTik command on '{target.title}': {redact_command(command)}")
 
     with inventory.session(target.title) as client:
         result = client.execute_command(command)
@@ -26,6 +87,23 @@ def _execute_sync(command: str, device: Optional[str] = None) -> str:
     return result
 
 
+async def _execute_async(command: str, device: Optional[str] = None) -> str:
+    """Execute a MikroTik command on the asyncssh engine, on the event loop.
+
+    Same contract as :func:`_execute_sync` — a connection of its own per
+    command — without occupying a worker thread while the router answers.
+    """
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    logger.info(f"Executing MikroTik command on '{target.title}': {redact_command(command)}")
+
+    async with inventory.async_session(target.title) as client:
+        result = await client.execute_command(command)
+
+    logger.info(f"Command result: {repr(result)}")
+    return result
+
+
 def download_file_sync(filename: str, device: Optional[str] = None) -> bytes:
     """Download a file from the target device over SFTP and return its bytes."""
     inventory = get_inventory()
@@ -36,6 +114,202 @@ def download_file_sync(filename: str, device: Optional[str] = None) -> bytes:
         return client.download_file(filename)
 
 
+class Download:
+    """A file fetched to local disk by :func:`download_to_file`."""
+
+    __slots__ = ("path", "size", "sha256", "resumed_from")
+
+    def __init__(self, path: Path, size: int, sha256: str, resumed_from: int = 0) -> None:
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.resumed_from = resumed_from
+
+    def to_dict(self) -> dict:
+        return {
+            "path": str(self.path),
+            "size": self.size,
+            "sha256": self.sha256,
+            "resumed_from": self.resumed_from,
+        }
+
+
+# How often download_to_file reconnects after a transfer breaks off.
+DOWNLOAD_ATTEMPTS = 3
+
+
+class DownloadTooLarge(Exception):
+    """The remote file is bigger than the caller is prepared to take."""
+
+
+def _part_path(destination: Path) -> Path:
+    return destination.with_name(destination.name + ".part")
+
+
+def _source_path(part: Path) -> Path:
+    return part.with_name(part.name + ".json")
+
+
+def discard_partial_download(destination: Path) -> None:
+    """Remove what an unfinished download to ``destination`` left behind."""
+    part = _part_path(destination)
+    part.unlink(missing_ok=True)
+    _source_path(part).unlink(missing_ok=True)
+
+
+def _resume_state(part: Path, source: dict) -> Tuple[int, "hashlib._Hash"]:
+    """Bytes already in ``part`` and a SHA-256 already fed with them.
+
+    ``source`` names the remote file with its size and modification time, and
+    is kept next to ``part``.  Kept bytes of a file that has since changed —
+    an export regenerated under the same name — are thrown away, so they are
+    never spliced onto the new content.
+    """
+    digest = hashlib.sha256()
+    record = _source_path(part)
+    if part.exists():
+        try:
+            kept = json.loads(record.read_text())
+        except (OSError, ValueError):
+            kept = None
+        if kept == source:
+            with part.open("rb") as fh:
+                for block in iter(lambda: fh.read(1024 * 1024), b""):
+                    digest.update(block)
+            return part.stat().st_size, digest
+        part.unlink()
+    record.write_text(json.dumps(source))
+    return 0, digest
+
+
+def _source(filename: str, stat: Tuple[int, int], max_size: Optional[int]) -> dict:
+    size, mtime = stat
+    if max_size is not None and size > max_size:
+        raise DownloadTooLarge(f"'{filename}' is {size} bytes, more than the {max_size} allowed")
+    return {"file": filename, "size": size, "mtime": mtime}
+
+
+def _finish_download(part: Path, destination: Path, digest, resumed_from: int) -> Download:
+    size = part.stat().st_size
+    os.replace(part, destination)
+    _source_path(part).unlink(missing_ok=True)
+    return Download(destination, size, digest.hexdigest(), resumed_from)
+
+
+def _append(out, digest, chunk: bytes) -> None:
+    out.write(chunk)
+    digest.update(chunk)
+
+
+async def _write_chunks(chunks, part: Path, digest) -> None:
+    """Append ``chunks`` to ``part`` and hash them, in worker threads.
+
+    Each chunk is written while the next one is read from the network, and
+    the file is never touched on the event loop.
+    """
+    out = await asyncio.to_thread(part.open, "ab")
+    writing: Optional[asyncio.Future] = None
+    try:
+        async for chunk in chunks:
+            if writing is not None:
+                await writing
+            writing = asyncio.ensure_future(asyncio.to_thread(_append, out, digest, chunk))
+        if writing is not None:
+            await writing
+    finally:
+        if writing is not None and not writing.done():
+            # The file must not close under a write still running.
+            await asyncio.wait([writing])
+        if writing is not None and writing.done() and not writing.cancelled():
+            writing.exception()
+        await asyncio.to_thread(out.close)
+
+
+def _retry_download(error: Exception, attempt: int, part: Path) -> bool:
+    """Decide whether a broken download is tried again (raising if not)."""
+    if isinstance(error, (FileNotFoundError, DownloadTooLarge)) or getattr(error, "code", None) == 2:
+        return False    # no such file (paramiko / asyncssh SFTP status 2)
+    if isinstance(error, ValueError):
+        # The remote file is now shorter than what was kept: it changed, so
+        # the kept bytes are worthless.  Start over.
+        part.unlink(missing_ok=True)
+    return attempt < DOWNLOAD_ATTEMPTS
+
+
+def download_to_file_sync(
+    filename: str, destination: Path, device: Optional[str] = None, max_size: Optional[int] = None
+) -> Download:
+    """Stream a file from the device to ``destination`` (blocking).
+
+    Chunks are appended to ``<destination>.part`` and hashed as they arrive,
+    so memory use does not grow with the file.  A transfer that breaks off is
+    picked up where it stopped — on the next attempt here (up to
+    :data:`DOWNLOAD_ATTEMPTS`), or by a later call for the same destination
+    while the remote file's size and modification time are unchanged — and
+    the ``.part`` file becomes ``destination`` only once complete.  A file
+    larger than ``max_size`` raises :class:`DownloadTooLarge` before any of it
+    is read.
+    """
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    part = _part_path(destination)
+    resumed_from = None
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            with inventory.session(target.title) as client:
+                source = _source(filename, client.stat_file(filename), max_size)
+                offset, digest = _resume_state(part, source)
+                if resumed_from is None:
+                    resumed_from = offset
+                logger.info(f"Downloading '{filename}' from '{target.title}' to {destination} (from byte {offset})")
+                with part.open("ab") as out:
+                    for chunk in client.iter_file(filename, offset=offset):
+                        out.write(chunk)
+                        digest.update(chunk)
+            return _finish_download(part, destination, digest, resumed_from)
+        except Exception as e:
+            if not _retry_download(e, attempt, part):
+                raise
+            logger.warning(f"Download of '{filename}' from '{target.title}' broke off ({e}); resuming")
+
+
+async def download_to_file(
+    filename: str, destination: Path, device: Optional[str] = None, max_size: Optional[int] = None
+) -> Download:
+    """:func:`download_to_file_sync` for either SSH engine.
+
+    With asyncssh the transfer runs on the event loop, but every file write,
+    hash update and the final rename happen in worker threads.
+    """
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    if inventory.ssh_engine(target.title) != "asyncssh":
+        return await asyncio.to_thread(download_to_file_sync, filename, destination, target.title, max_size)
+
+    part = _part_path(destination)
+    resumed_from = None
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            async with inventory.async_session(target.title) as client:
+                source = _source(filename, await client.stat_file(filename), max_size)
+                offset, digest = await asyncio.to_thread(_resume_state, part, source)
+                if resumed_from is None:
+                    resumed_from = offset
+                logger.info(f"Downloading '{filename}' from '{target.title}' to {destination} (from byte {offset})")
+                await _write_chunks(client.iter_file(filename, offset=offset), part, digest)
+            return await asyncio.to_thread(_finish_download, part, destination, digest, resumed_from)
+        except Exception as e:
+            if not _retry_download(e, attempt, part):
+                raise
+            logger.warning(f"Download of '{filename}' from '{target.title}' broke off ({e}); resuming")
+
+
 def upload_file_sync(filename: str, data: bytes, device: Optional[str] = None) -> None:
     """Upload bytes to a file on the target device over SFTP."""
     inventory = get_inventory()
@@ -46,8 +320,233 @@ def upload_file_sync(filename: str, data: bytes, device: Optional[str] = None) -
         client.upload_file(filename, data)
 
 
+async def _api_client(target: DeviceConfig) -> RouterOSApiClient:
+    """Return this loop's API connection to ``target``, opening it if needed."""
+    clients = _api_clients.setdefault(asyncio.get_running_loop(), {})
+    key = target.title.casefold()
+    if key not in clients:
+        clients[key] = (asyncio.Lock(), None)
+    lock, _ = clients[key]
+
+    async with lock:
+        client = clients[key][1]
+        if client is None or client.closed:
+            client = RouterOSApiClient(
+                host=target.host,
+                username=target.username,
+                password=target.password,
+                port=target.api_port,
+                use_ssl=target.transport == "api-ssl",
+            )
+            await client.connect()
+            logger.debug(f"Opened RouterOS API connection to '{target.title}'")
+            clients[key] = (lock, client)
+        return client
+
+
+def _terse_print_command(
+    menu: str,
+    proplist: Optional[Sequence[str]] = None,
+    where: Optional[Mapping[str, str]] = None,
+) -> str:
+    """Build the ``print terse`` console command equivalent to an API print."""
+    parts = [p for p in menu.replace("/", " ").split() if p]
+    for name in [*parts, *(proplist or ()), *(where or {})]:
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid menu or property name: {name!r}")
+
+    command = "/" + " ".join(parts) + " print terse"
+    if proplist:
+        command += f" proplist={','.join(proplist)}"
+    if where:
+        command += " where " + " ".join(f"{key}={quote(value)}" for key, value in where.items())
+    return command
+
+
+def _check_line(line: str) -> str:
+    if looks_like_error(line):
+        raise ValueError(f"RouterOS rejected the command: {line.strip()}")
+    return line
+
+
+def _consume_rows_sync(
+    command: str, consumer: Callable[[Dict[str, str]], None], device: Optional[str] = None
+) -> int:
+    """Run a ``print terse`` over SSH and hand each row to ``consumer`` as it streams in (blocking)."""
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    logger.info(f"Fetching rows on '{target.title}' over SSH: {command}")
+
+    count = 0
+    with inventory.session(target.title) as client:
+        lines = map(_check_line, client.iter_command_lines(command))
+        for row in iter_rows(lines):
+            if row.attrs or row.flags:
+                consumer(row.to_dict())
+                count += 1
+    return count
+
+
+def _fetch_rows_sync(command: str, device: Optional[str] = None) -> List[Dict[str, str]]:
+    rows: List[Dict[str, str]] = []
+    _consume_rows_sync(command, rows.append, device)
+    return rows
+
+
+async def _consume_rows_async(
+    command: str, consumer: Callable[[Dict[str, str]], None], device: Optional[str] = None
+) -> int:
+    """:func:`_consume_rows_sync` on the asyncssh engine."""
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    logger.info(f"Fetching rows on '{target.title}' over SSH: {command}")
+
+    parser = RowParser()
+    count = 0
+
+    def emit(row) -> None:
+        nonlocal count
+        if row is not None and (row.attrs or row.flags):
+            consumer(row.to_dict())
+            count += 1
+
+    async with inventory.async_session(target.title) as client:
+        async for line in client.iter_command_lines(command):
+            emit(parser.feed(_check_line(line)))
+    emit(parser.close())
+    return count
+
+
+async def _fetch_rows_async(command: str, device: Optional[str] = None) -> List[Dict[str, str]]:
+    rows: List[Dict[str, str]] = []
+    await _consume_rows_async(command, rows.append, device)
+    return rows
+
+
+async def fetch_rows(
+    menu: str,
+    device: Optional[str] = None,
+    proplist: Optional[Sequence[str]] = None,
+    where: Optional[Mapping[str, str]] = None,
+) -> List[Dict[str, str]]:
+    """Return the rows of a RouterOS menu (e.g. ``"ip pool"``) as dicts.
+
+    ``proplist`` limits the properties returned and ``where`` keeps only rows
+    whose properties equal the given values.  Devices configured with
+    ``transport: api``/``api-ssl`` are read over the RouterOS API; the rest
+    run ``print terse`` over SSH, parsed line by line as it arrives.  Over
+    SSH, rows carry flags as ``<name>: "true"`` like the API does, but no
+    ``.id``.  Invalid names and commands the router rejects raise ValueError;
+    connection and protocol errors propagate to the caller.
+    """
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    if target.transport == "ssh":
+        command = _terse_print_command(menu, proplist, where)
+        if inventory.ssh_engine(target.title) == "asyncssh":
+            return await _fetch_rows_async(command, target.title)
+        return await asyncio.to_thread(_fetch_rows_sync, command, target.title)
+
+    queries = [f"?{key}={value}" for key, value in (where or {}).items()]
+    logger.info(f"Fetching rows on '{target.title}' over the API: /{menu}")
+    client = await _api_client(target)
+    return await client.print_rows(menu, proplist=proplist, queries=queries)
+
+
+async def consume_rows(
+    menu: str,
+    consumer: Callable[[Dict[str, str]], None],
+    device: Optional[str] = None,
+    proplist: Optional[Sequence[str]] = None,
+    where: Optional[Mapping[str, str]] = None,
+) -> int:
+    """:func:`fetch_rows`, handing each row to ``consumer`` instead of collecting them.
+
+    Each row is passed on as soon as it is parsed (over the API, as its
+    ``!re`` sentence arrives) and dropped afterwards, so a table of a million
+    routes is never held as text or as a list of dicts.  Returns the number
+    of rows.  On the blocking SSH engine ``consumer`` runs in a worker thread.
+    """
+    inventory = get_inventory()
+    target = inventory.resolve(device)
+    if target.transport == "ssh":
+        command = _terse_print_command(menu, proplist, where)
+        if inventory.ssh_engine(target.title) == "asyncssh":
+            return await _consume_rows_async(command, consumer, target.title)
+        return await asyncio.to_thread(_consume_rows_sync, command, consumer, target.title)
+
+    queries = [f"?{key}={value}" for key, value in (where or {}).items()]
+    logger.info(f"Streaming rows on '{target.title}' over the API: /{menu}")
+    client = await _api_client(target)
+    return await client.stream_rows(menu, consumer, proplist=proplist, queries=queries)
+
+
+async def _run_command(
+    command: str, title: str, ctx: Context, is_read: bool, cacheable: bool = True
+) -> str:
+    """Run ``command`` on the device outside safe mode and keep the cache in step.
+
+    A read's output is cached unless ``cacheable`` is False.
+    """
+    cache = get_read_cache()
+    generation = cache.generation(title) if cache is not None else 0
+
+    await ctx.info(f"Executing on '{title}': {redact_command(command)}")
+    try:
+        if get_inventory().ssh_engine(title) == "asyncssh":
+            result = await _execute_async(command, title)
+        else:
+            result = await asyncio.to_thread(_execute_sync, command, title)
+    except ConnectionError as e:
+        result = f"Error: {str(e)}"
+    except Exception as e:
+        result = f"Error executing command: {str(e)}"
+
+    if cache is not None:
+        if not is_read:
+            # Even a failed write may have changed something.
+            cache.invalidate(title)
+        elif cacheable and not result.startswith("Error"):
+            cache.put(title, command, result, generation)
+    return result
+
+
+async def _coalesced_read(command: str, title: str, ctx: Context, cacheable: bool = True) -> str:
+    """Run a read once for every caller that asks for it while it is in flight.
+
+    The first caller starts the command as a task of its own; identical reads
+    of the same device arriving before it finishes await that task and get
+    the same output.  The task is shielded, so a caller giving up (a fleet
+    timeout, a cancelled request) does not cancel it for the others.
+    """
+    flights = _inflight.setdefault(asyncio.get_running_loop(), {})
+    key = (title.casefold(), normalise_command(command))
+    task = flights.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_run_command(command, title, ctx, is_read=True, cacheable=cacheable))
+        flights[key] = task
+
+        def forget(done: asyncio.Task) -> None:
+            if flights.get(key) is done:
+                del flights[key]
+
+        task.add_done_callback(forget)
+    else:
+        await ctx.info(f"Joining in-flight read on '{title}': {redact_command(command)}")
+    return await asyncio.shield(task)
+
+
+def _drop_inflight(title: str) -> None:
+    """Stop later reads of ``title`` joining reads that started before a write."""
+    flights = _inflight.get(asyncio.get_running_loop())
+    if flights:
+        device = title.casefold()
+        for key in [key for key in flights if key[0] == device]:
+            del flights[key]
+
+
 async def execute_mikrotik_command(
-    command: str, ctx: Context, device: Optional[str] = None
+    command: str, ctx: Context, device: Optional[str] = None, read_only: bool = False
 ) -> str:
     """Execute a MikroTik command on the selected device and return the output.
 
@@ -56,7 +555,14 @@ async def execute_mikrotik_command(
 
     When Safe Mode is active *for that device* the command is routed through
     that device's persistent interactive shell so it runs inside the safe-mode
-    context.
+    context.  Otherwise identical reads of one device that overlap in time run
+    once and share the output (see :func:`_coalesced_read`).
+
+    ``read_only`` is for scripts the server generates that only read, which
+    :func:`is_read_only_command` refuses because they use scripting (the log
+    dump, for one).  They are coalesced and leave the read cache alone like
+    any read, but are not cached themselves.  Every command of a tool
+    annotated read-only is taken as such (see :func:`read_only_tool`).
     """
     from .safe_mode import get_safe_mode_manager
 
@@ -69,23 +575,191 @@ async def execute_mikrotik_command(
         await ctx.error(msg)
         return msg
 
+    cache = get_read_cache()
+    cacheable = is_read_only_command(command)
+    is_read = cacheable or read_only or _in_read_only_tool.get()
     safe_mgr = get_safe_mode_manager(target.title)
     if safe_mgr.is_active:
-        await ctx.info(f"Executing on '{target.title}' (safe mode): {command}")
+        # Uncommitted safe-mode changes can vanish without a command passing
+        # through here, so nothing read in safe mode is cached.
+        await ctx.info(f"Executing on '{target.title}' (safe mode): {redact_command(command)}")
         try:
             result = await asyncio.to_thread(safe_mgr.execute, command)
         except Exception as e:
             result = f"Error executing command in safe mode session: {str(e)}"
+        if cache is not None and not is_read:
+            cache.invalidate(target.title)
     else:
-        await ctx.info(f"Executing on '{target.title}': {command}")
-        try:
-            result = await asyncio.to_thread(_execute_sync, command, target.title)
-        except ConnectionError as e:
-            result = f"Error: {str(e)}"
-        except Exception as e:
-            result = f"Error executing command: {str(e)}"
+        if cache is not None and cacheable:
+            cached = cache.get(target.title, command)
+            if cached is not None:
+                await ctx.info(f"Executing on '{target.title}' (cached): {redact_command(command)}")
+                return cached
+        if is_read:
+            result = await _coalesced_read(command, target.title, ctx, cacheable)
+        else:
+            result = await _run_command(command, target.title, ctx, is_read=False)
+
+    if not is_read:
+        _drop_inflight(target.title)
 
     logger.info(f"Command result: {repr(result)}")
     if result.startswith("Error"):
         await ctx.error(result)
     return result
+
+
+def _batch_script(commands: Sequence[str]) -> str:
+    """Chain ``commands`` into one script, each followed by its sentinel."""
+    return "; ".join(
+        f'{command.strip().rstrip(";")}; :put "{_BATCH_EOC.format(i)}"'
+        for i, command in enumerate(commands)
+    )
+
+
+def _split_batch(output: str, count: int, script: Optional[str] = None) -> Tuple[List[str], int]:
+    """Split a batch's output back into one result per command.
+
+    Returns the results and how many commands completed.  RouterOS abandons
+    a script at the first command that fails, so when sentinels are missing
+    the text after the last one is that command's error and the commands
+    after it never ran.
+
+    A command that does not parse stops the script before any of it runs:
+    there is no sentinel at all and the error gives a column in the
+    ``script`` line, which is mapped back to the command it falls in.
+    """
+    results: List[str] = []
+    current: List[str] = []
+    for line in output.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if len(results) < count and line.strip() == _BATCH_EOC.format(len(results)):
+            results.append("\n".join(current).strip())
+            current = []
+        else:
+            current.append(line)
+
+    completed = len(results)
+    if completed < count:
+        failure = "\n".join(current).strip()
+        position = _PARSE_ERROR_POSITION.search(failure) if completed == 0 else None
+        if position is not None:
+            return _blame_parse_error(failure, count, script, position), 0
+        results.append(failure or "Error: the batch stopped before this command completed")
+        results.extend(
+            "Error: not run because an earlier command in the batch failed"
+            for _ in range(count - len(results))
+        )
+    return results, completed
+
+
+def _blame_parse_error(failure: str, count: int, script: Optional[str], position) -> List[str]:
+    """Results for a batch RouterOS refused to parse: the error goes to the command it points at."""
+    line, column = int(position.group(1)), int(position.group(2))
+    culprit = None
+    if script is not None and line == 1:
+        for i in range(count):
+            sentinel = f':put "{_BATCH_EOC.format(i)}"'
+            end = script.find(sentinel)
+            if end >= 0 and column <= end + len(sentinel):
+                culprit = i
+                break
+    if culprit is None:
+        return [f"Error: the batch could not be parsed, nothing ran: {failure}"] * count
+    return [
+        failure if i == culprit
+        else f"Error: not run because command {culprit + 1} of the batch could not be parsed"
+        for i in range(count)
+    ]
+
+
+async def execute_batch(
+    commands: Sequence[str], ctx: Context, device: Optional[str] = None, cached: bool = True
+) -> List[str]:
+    """Execute several commands on one device in a single round trip.
+
+    The commands are chained into one script with a ``:put`` sentinel after
+    each, sent over one connection, and the output is split back into one
+    result per command, in order — the same strings
+    :func:`execute_mikrotik_command` would have returned.  The script stops
+    at the first command RouterOS rejects: that command's result is the
+    router's message and the ones after it report that they did not run.
+    A command that does not even parse stops the script before any of it
+    runs; then every other command reports that it did not run.
+
+    Cached reads are answered without being sent (unless ``cached`` is False,
+    for callers that must see the device as it is now).  While the device is in
+    safe mode the batch runs in its shell, with the same stop-at-first-failure
+    behaviour (see :meth:`SafeModeManager.execute_batch`).
+    """
+    from .safe_mode import get_safe_mode_manager
+
+    commands = list(commands)
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as exc:
+        msg = f"Error: {exc}"
+        await ctx.error(msg)
+        return [msg] * len(commands)
+
+    cache = get_read_cache()
+    reads = [is_read_only_command(c) for c in commands]
+    only_reads = all(reads) or _in_read_only_tool.get()
+
+    safe_mgr = get_safe_mode_manager(target.title)
+    if safe_mgr.is_active:
+        await ctx.info(f"Executing batch of {len(commands)} on '{target.title}' (safe mode)")
+        try:
+            batch = await asyncio.to_thread(safe_mgr.execute_batch, commands, True)
+            results = [
+                "Error: not run because an earlier command in the batch failed"
+                if r.status == r.SKIPPED else r.output
+                for r in batch
+            ]
+        except Exception as e:
+            results = [f"Error executing command in safe mode session: {str(e)}"] * len(commands)
+        if not only_reads:
+            if cache is not None:
+                cache.invalidate(target.title)
+            _drop_inflight(target.title)
+        return results
+
+    results: List[Optional[str]] = [
+        cache.get(target.title, c) if cache is not None and cached and is_read else None
+        for c, is_read in zip(commands, reads)
+    ]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        await ctx.info(f"Executing batch of {len(commands)} on '{target.title}' (cached)")
+        return results
+
+    generation = cache.generation(target.title) if cache is not None else 0
+    script = _batch_script([commands[i] for i in pending])
+    await ctx.info(f"Executing batch of {len(pending)} on '{target.title}'")
+    try:
+        if get_inventory().ssh_engine(target.title) == "asyncssh":
+            output = await _execute_async(script, target.title)
+        else:
+            output = await asyncio.to_thread(_execute_sync, script, target.title)
+    except ConnectionError as e:
+        outputs, completed = [f"Error: {str(e)}"] * len(pending), 0
+    except Exception as e:
+        outputs, completed = [f"Error executing command: {str(e)}"] * len(pending), 0
+    else:
+        outputs, completed = _split_batch(output, len(pending), script)
+
+    for i, output in zip(pending, outputs):
+        results[i] = output
+
+    if not only_reads:
+        if cache is not None:
+            cache.invalidate(target.title)
+        _drop_inflight(target.title)
+    elif cache is not None:
+        for i, output in zip(pending[:completed], outputs):
+            if reads[i] and not output.startswith("Error"):
+                cache.put(target.title, commands[i], output, generation)
+
+    failed = next((r for r in results if r.startswith("Error")), None)
+    if failed is not None:
+        await ctx.error(failed)
+    return results
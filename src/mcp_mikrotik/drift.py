@@ -0,0 +1,216 @@
+"""Config drift: which sections of a device's configuration changed.
+
+A baseline records, per configuration section, the SHA-256 of that section's
+normalised ``export terse``; the text itself goes into the content store, so
+a section that is the same on many devices or in many snapshots is kept once.
+A check fetches every section in one batched round trip and hashes each
+locally.  Only sections whose hash moved are loaded back from the store and
+diffed, and the answer names just those — "what changed since the baseline"
+without reading or comparing the rest of the configuration.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from mcp.server.mcpserver import Context
+
+from .backup_store import ContentStore, get_content_store
+from .connector import execute_batch
+from .parsing import looks_like_error
+from .storage import device_dir
+
+# Checked when the caller names no sections and there is no baseline yet.
+DEFAULT_SECTIONS = (
+    "interface",
+    "ip address",
+    "ip route",
+    "ip firewall filter",
+    "ip firewall nat",
+    "ip firewall mangle",
+    "ip firewall address-list",
+    "ip dns",
+    "ip pool",
+    "ip dhcp-server",
+    "queue simple",
+    "system identity",
+)
+
+_SECTION_RE = re.compile(r"^[a-z][a-z0-9-]*(?: [a-z0-9-]+)*$")
+
+
+def parse_sections(sections: Optional[Sequence[str]]) -> List[str]:
+    """``["/ip/firewall/filter", "queue simple"]`` → ``["ip firewall filter", "queue simple"]``.
+
+    Raises ValueError for anything that is not a menu path.
+    """
+    parsed: List[str] = []
+    for section in sections or ():
+        name = " ".join(section.strip().lower().lstrip("/").replace("/", " ").split())
+        if not _SECTION_RE.match(name):
+            raise ValueError(
+                f"invalid section {section!r} — expected a RouterOS menu path like \"ip firewall filter\"."
+            )
+        if name not in parsed:
+            parsed.append(name)
+    return parsed
+
+
+def normalise_export(text: str) -> str:
+    """An export reduced to what the configuration is.
+
+    Drops the comment header (its first line carries the export time),
+    rejoins lines wrapped with a trailing ``\\`` and ignores blank lines and
+    trailing whitespace, so only a configuration change alters the hash.
+    """
+    lines: List[str] = []
+    pending = ""
+    for raw in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line = raw.rstrip()
+        if pending:
+            line = pending + line.lstrip()
+            pending = ""
+        if line.endswith("\\"):
+            pending = line[:-1]
+            continue
+        if not line or (not lines and line.startswith("#")):
+            continue
+        lines.append(line)
+    if pending:
+        lines.append(pending)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def section_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def fetch_sections(
+    sections: Sequence[str], ctx: Context, device: str
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Export every section in one round trip, bypassing the read cache.
+
+    Returns the normalised text per section and the error per section that
+    could not be exported (an unknown menu, missing permissions).
+    """
+    outputs = await execute_batch(
+        [f"/{section} export terse" for section in sections], ctx, device=device, cached=False
+    )
+    texts: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    for section, output in zip(sections, outputs):
+        stripped = output.strip()
+        if stripped.startswith("Error") or any(looks_like_error(line) for line in stripped.splitlines()[:3]):
+            errors[section] = stripped
+        else:
+            texts[section] = normalise_export(output)
+    return texts, errors
+
+
+def _baseline_file(device: str) -> Path:
+    return device_dir("drift", device) / "baseline.json"
+
+
+def load_baseline(device: str) -> Dict[str, dict]:
+    """``{section: {"sha256": ..., "taken_at": ...}}`` for ``device`` (empty if none)."""
+    path = _baseline_file(device)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("sections", {})
+
+
+def _save_baseline(device: str, sections: Dict[str, dict]) -> None:
+    path = _baseline_file(device)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"sections": sections}, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _store_text(store: ContentStore, text: str, sha256: str) -> None:
+    if store.path_for(sha256).exists():
+        return
+    fd, name = tempfile.mkstemp(dir=store.root, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as fh:
+        fh.write(text)
+    store.add(Path(name), sha256)
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+async def take_snapshot(device: str, ctx: Context, sections: Sequence[str] = ()) -> dict:
+    """Make the device's current sections its baseline.
+
+    Sections not named keep their earlier baseline.
+    """
+    sections = list(sections) or list(DEFAULT_SECTIONS)
+    texts, errors = await fetch_sections(sections, ctx, device)
+
+    store = get_content_store()
+    baseline = load_baseline(device)
+    taken_at = _now()
+    recorded: Dict[str, str] = {}
+    for section, text in texts.items():
+        sha256 = section_hash(text)
+        _store_text(store, text, sha256)
+        baseline[section] = {"sha256": sha256, "taken_at": taken_at}
+        recorded[section] = sha256
+    _save_baseline(device, baseline)
+    return {"device": device, "taken_at": taken_at, "sections": recorded, "errors": errors}
+
+
+async def check_drift(device: str, ctx: Context, sections: Sequence[str] = ()) -> dict:
+    """Compare the device's sections with its baseline.
+
+    Only sections whose hash differs are diffed; ``changed`` holds a
+    zero-context unified diff for each with its added and removed line counts.
+    """
+    baseline = load_baseline(device)
+    sections = list(sections) or list(baseline) or list(DEFAULT_SECTIONS)
+    texts, errors = await fetch_sections(sections, ctx, device)
+
+    store = get_content_store()
+    changed: Dict[str, dict] = {}
+    unchanged: List[str] = []
+    no_baseline: List[str] = []
+    for section, text in texts.items():
+        base = baseline.get(section)
+        if base is None:
+            no_baseline.append(section)
+            continue
+        if section_hash(text) == base["sha256"]:
+            unchanged.append(section)
+            continue
+        stored = store.path_for(base["sha256"])
+        old = stored.read_text(encoding="utf-8") if stored.exists() else ""
+        diff = list(difflib.unified_diff(
+            old.splitlines(), text.splitlines(),
+            f"{section} @ {base['taken_at']}", f"{section} @ now", n=0, lineterm="",
+        ))
+        body = [line for line in diff[2:] if not line.startswith("@@")]
+        changed[section] = {
+            "since": base["taken_at"],
+            "added": sum(1 for line in body if line.startswith("+")),
+            "removed": sum(1 for line in body if line.startswith("-")),
+            "diff": "\n".join(diff),
+        }
+
+    result = {
+        "device": device,
+        "checked_at": _now(),
+        "drifted": bool(changed),
+        "changed": changed,
+        "unchanged": unchanged,
+    }
+    if no_baseline:
+        result["no_baseline"] = no_baseline
+    if errors:
+        result["errors"] = errors
+    return result
@@ -0,0 +1,614 @@
+"""Shadowed, redundant and unreachable firewall rules, found offline.
+
+A rule that comes after another one matching everything it matches never
+sees a packet: if the earlier rule does something else it *shadows* the
+later one (usually a mistake), and if it does the same the later rule is
+*redundant* (harmless, but dead weight).  :func:`load_rules` reads
+``/ip firewall filter`` and ``/ip firewall nat`` once, rule by rule as they
+stream in, into :class:`RuleSet` objects; :func:`analyse` then checks every
+chain without touching the router.
+
+Each rule is reduced to a match predicate.  Source and destination
+addresses, protocol and ports become sets of integer intervals — ranges,
+prefixes and ``!`` negations all end up as sorted, disjoint intervals — so
+"does rule A match everything rule B matches" is a containment check per
+dimension.  Every other matcher (interfaces, address lists, marks...) is
+compared for equality, except ``connection-state`` and
+``connection-nat-state``, whose values are sets.  A rule is also reported
+when several earlier rules cover it only together, provided each differs
+from it only in protocol or in one port matcher.
+
+Rules with a ``limit``, ``dst-limit``, ``nth`` or ``random`` matcher never
+cover another: each keeps its own rate or count, so what one lets through
+falls to the next even when their values are the same.
+
+Chains of thousands of rules are checked without comparing every pair: the
+earlier terminating rules of a chain are filed by their other matchers and
+by the smallest prefix enclosing their source and destination addresses,
+so a rule only meets the rules filed under one of the at most 33 × 33
+prefixes enclosing its own addresses.  Within those, each of protocol and
+the ports has an index of the values rules match, and a rule is compared
+only with those matching one value of it in the most selective of the
+three.  Earlier rules alike but for that dimension are kept together with
+the running union of what they match in it, which is how several rules
+covering one together are found.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .connector import consume_rows
+from .route_store import parse_prefix
+
+_Intervals = Tuple[Tuple[int, int], ...]
+
+# The interval dimensions of a match, in this order in Rule.dims.
+DIMENSIONS = ("src-address", "dst-address", "protocol", "src-port", "dst-port")
+_TOPS = ((1 << 32) - 1, (1 << 32) - 1, 255, 65535, 65535)
+_FULL: Tuple[_Intervals, ...] = tuple(((0, top),) for top in _TOPS)
+
+# Matchers whose value is a comma-separated set of alternatives.
+_ANY_OF = ("connection-state", "connection-nat-state")
+
+# Properties that describe the rule rather than the packets it matches.
+_META = {
+    ".id", ".nextid", "chain", "action", "comment", "disabled", "dynamic", "invalid",
+    "log", "log-prefix", "bytes", "packets",
+}
+# Properties that parameterise the action; two rules with the same action
+# and the same values here do the same thing to a packet.
+_ACTION_PROPERTIES = {
+    "jump-target", "reject-with", "to-addresses", "to-ports", "address-list",
+    "address-list-timeout", "hw-offload", "new-connection-mark", "new-packet-mark",
+    "new-routing-mark", "passthrough", "randomise-ports",
+}
+
+# Matchers with per-rule state or chance: two rules with the same value
+# still match different packets, as each keeps its own rate, count or dice.
+_STATEFUL = frozenset({"limit", "dst-limit", "nth", "random"})
+
+_TRUE = ("true", "yes")
+
+# table: (menu, built-in chains, actions that end the chain for a packet)
+TABLES = {
+    "filter": (
+        "ip firewall filter",
+        frozenset({"input", "forward", "output"}),
+        frozenset({"accept", "drop", "reject", "tarpit", "return"}),
+    ),
+    "nat": (
+        "ip firewall nat",
+        frozenset({"srcnat", "dstnat"}),
+        frozenset({
+            "accept", "dst-nat", "src-nat", "masquerade", "netmap", "redirect", "same",
+            "endpoint-independent-nat", "return",
+        }),
+    ),
+}
+
+PROTOCOLS = {
+    "icmp": 1, "igmp": 2, "ggp": 3, "ip-encap": 4, "st": 5, "tcp": 6, "egp": 8,
+    "pup": 12, "udp": 17, "hmp": 20, "xns-idp": 22, "rdp": 27, "iso-tp4": 29,
+    "dccp": 33, "xtp": 36, "ddp": 37, "idpr-cmtp": 38, "ipv6-encap": 41,
+    "ipv6-route": 43, "ipv6-frag": 44, "idrp": 45, "rsvp": 46, "gre": 47,
+    "ipsec-esp": 50, "ipsec-ah": 51, "icmpv6": 58, "ipv6-nonxt": 59,
+    "ipv6-opts": 60, "rspf": 73, "vmtp": 81, "ospf": 89, "ipip": 94, "encap": 98,
+    "pim": 103, "vrrp": 112, "l2tp": 115, "sctp": 132, "udp-lite": 136,
+}
+
+
+def _merge(intervals) -> _Intervals:
+    """Sorted, disjoint intervals covering the same values; touching ones are joined."""
+    merged: List[List[int]] = []
+    for lo, hi in sorted(intervals):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return tuple((lo, hi) for lo, hi in merged)
+
+
+def _complement(intervals: _Intervals, top: int) -> _Intervals:
+    gaps = []
+    start = 0
+    for lo, hi in intervals:
+        if lo > start:
+            gaps.append((start, lo - 1))
+        start = hi + 1
+    if start <= top:
+        gaps.append((start, top))
+    return tuple(gaps)
+
+
+def _contains(outer: _Intervals, inner: _Intervals) -> bool:
+    """Whether every value in ``inner`` is in ``outer`` (both merged)."""
+    j = 0
+    for lo, hi in inner:
+        while j < len(outer) and outer[j][1] < lo:
+            j += 1
+        if j == len(outer) or outer[j][0] > lo or outer[j][1] < hi:
+            return False
+    return True
+
+
+def _intersects(a: _Intervals, b: _Intervals) -> bool:
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i][1] < b[j][0]:
+            i += 1
+        elif b[j][1] < a[i][0]:
+            j += 1
+        else:
+            return True
+    return False
+
+
+def _address_range(text: str) -> Tuple[int, int]:
+    first, dash, last = text.partition("-")
+    version, key, length = parse_prefix(first)
+    if version != 4:
+        raise ValueError(f"not an IPv4 address: {text!r}")
+    if not dash:
+        return key, key | ((1 << (32 - length)) - 1)
+    version, end, length = parse_prefix(last)
+    if version != 4 or length != 32:
+        raise ValueError(f"not an IPv4 address range: {text!r}")
+    return key, end
+
+
+def _port_range(text: str) -> Tuple[int, int]:
+    first, dash, last = text.partition("-")
+    lo, hi = int(first), int(last if dash else first)
+    if not 0 <= lo <= hi <= 65535:
+        raise ValueError(f"not a port: {text!r}")
+    return lo, hi
+
+
+def _protocol_range(text: str) -> Tuple[int, int]:
+    number = PROTOCOLS.get(text)
+    if number is None:
+        number = int(text)
+        if not 0 <= number <= 255:
+            raise ValueError(f"not a protocol: {text!r}")
+    return number, number
+
+
+_PARSERS: Tuple[Callable[[str], Tuple[int, int]], ...] = (
+    _address_range, _address_range, _protocol_range, _port_range, _port_range,
+)
+
+
+def parse_dimension(dimension: int, value: str) -> Optional[_Intervals]:
+    """The values one of :data:`DIMENSIONS` matches, as merged intervals.
+
+    ``None`` means every value.  Raises ValueError for a value the
+    analysis does not understand.
+    """
+    text = value.strip()
+    negated = text.startswith("!")
+    if negated:
+        text = text[1:]
+    if not text:
+        raise ValueError(f"empty {DIMENSIONS[dimension]}")
+    parse = _PARSERS[dimension]
+    intervals = _merge(parse(part.strip()) for part in text.split(","))
+    if negated:
+        intervals = _complement(intervals, _TOPS[dimension])
+    return None if intervals == _FULL[dimension] else intervals
+
+
+class Rule:
+    """One enabled rule of a chain, reduced to what it matches and what it does.
+
+    ``dims`` holds the intervals of each of :data:`DIMENSIONS` (``None`` for
+    any value), ``exact`` the other matchers as ``(name, value)`` pairs and
+    ``any_of`` the set-valued ones.  A ``stateful`` rule (see
+    :data:`_STATEFUL`) can be covered, but never covers another.
+    """
+
+    __slots__ = ("number", "id", "chain", "action", "effect", "terminal",
+                 "dims", "exact", "any_of", "matchers", "stateful")
+
+    def __init__(self, number: int, row: Mapping[str, str], terminal_actions: FrozenSet[str]) -> None:
+        self.number = number
+        self.id = row.get(".id")
+        self.chain = row.get("chain", "")
+        self.action = row.get("action") or "accept"
+        self.terminal = self.action in terminal_actions
+        self.effect = (self.action,) + tuple(
+            sorted((key, value) for key, value in row.items() if key in _ACTION_PROPERTIES)
+        )
+        dims: List[Optional[_Intervals]] = [None] * len(DIMENSIONS)
+        exact: List[Tuple[str, str]] = []
+        any_of: Dict[str, FrozenSet[str]] = {}
+        matchers: List[Tuple[str, str]] = []
+        for key, value in row.items():
+            if key in _META or key in _ACTION_PROPERTIES or value == "":
+                continue
+            matchers.append((key, value))
+            if key in DIMENSIONS:
+                try:
+                    dims[DIMENSIONS.index(key)] = parse_dimension(DIMENSIONS.index(key), value)
+                    continue
+                except ValueError:
+                    pass
+            elif key in _ANY_OF and not value.startswith("!"):
+                any_of[key] = frozenset(part.strip() for part in value.split(","))
+                continue
+            exact.append((key, value))
+        self.dims = tuple(dims)
+        self.exact = frozenset(exact)
+        self.any_of = any_of
+        self.matchers = tuple(matchers)
+        self.stateful = any(key in _STATEFUL for key, _ in matchers)
+
+    @property
+    def empty(self) -> bool:
+        """Whether the rule can match no packet at all."""
+        return any(intervals == () for intervals in self.dims)
+
+    def describe(self) -> dict:
+        entry = {"rule": self.number}
+        if self.id:
+            entry["id"] = self.id
+        entry["action"] = self.action
+        entry["match"] = " ".join(f"{key}={value}" for key, value in self.matchers)
+        return entry
+
+
+def _block(intervals: Optional[_Intervals]) -> Tuple[int, int]:
+    """``(start, length)`` of the smallest IPv4 prefix enclosing ``intervals``."""
+    if intervals is None:
+        return 0, 0
+    lo, hi = intervals[0][0], intervals[-1][1]
+    length = 32 - (lo ^ hi).bit_length()
+    return lo >> (32 - length) << (32 - length), length
+
+
+def _enclosing(block: Tuple[int, int], lengths: Set[int]) -> List[Tuple[int, int]]:
+    """The prefixes of the given lengths that enclose ``block``."""
+    start, length = block
+    return [(start >> (32 - n) << (32 - n), n) for n in lengths if n <= length]
+
+
+# The dimensions indexed within a bucket: protocol and the two ports.
+_PORTS = (2, 3, 4)
+
+
+def _probe(rule: Rule, dimension: int) -> int:
+    """A value ``rule`` matches in ``dimension``: any rule covering it must match it too."""
+    intervals = rule.dims[dimension]
+    return intervals[0][0] if intervals else 0
+
+
+class _Stab:
+    """The rules of a bucket by the values they match in one dimension.
+
+    Each interval is filed under its size class (the bit length of its
+    width) and its start shifted by that class, so the intervals holding a
+    value are among two bins per class in use.
+    """
+
+    __slots__ = ("any", "bins", "levels")
+
+    def __init__(self) -> None:
+        self.any: List[Rule] = []
+        self.bins: Dict[Tuple[int, int], List[Tuple[int, int, Rule]]] = {}
+        self.levels: Set[int] = set()
+
+    def add(self, intervals: Optional[_Intervals], rule: Rule) -> None:
+        if intervals is None:
+            self.any.append(rule)
+            return
+        for lo, hi in intervals:
+            level = (hi - lo).bit_length()
+            self.levels.add(level)
+            self.bins.setdefault((level, lo >> level), []).append((lo, hi, rule))
+
+    def _bins(self, value: int) -> Iterator[List[Tuple[int, int, Rule]]]:
+        for level in self.levels:
+            start = value >> level
+            for key in ((level, start), (level, start - 1)):
+                found = self.bins.get(key)
+                if found:
+                    yield found
+
+    def size(self, value: int) -> int:
+        """How many rules :meth:`holding` looks at for ``value``."""
+        return len(self.any) + sum(len(found) for found in self._bins(value))
+
+    def holding(self, value: int) -> Iterator[Rule]:
+        """The rules matching ``value`` in this dimension."""
+        yield from self.any
+        for found in self._bins(value):
+            for lo, hi, rule in found:
+                if lo <= value <= hi:
+                    yield rule
+
+
+class _Union:
+    """A growing union of intervals, kept sorted and disjoint."""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+
+    def add(self, intervals: _Intervals) -> None:
+        starts, ends = self.starts, self.ends
+        for lo, hi in intervals:
+            # Every kept interval from ``first`` to ``last`` touches [lo, hi].
+            first = bisect_left(ends, lo - 1)
+            last = bisect_right(starts, hi + 1)
+            if first < last:
+                lo, hi = min(lo, starts[first]), max(hi, ends[last - 1])
+            starts[first:last] = [lo]
+            ends[first:last] = [hi]
+
+    def contains(self, intervals: _Intervals) -> bool:
+        for lo, hi in intervals:
+            i = bisect_right(self.starts, lo) - 1
+            if i < 0 or self.ends[i] < hi:
+                return False
+        return True
+
+
+class _Group:
+    """Rules of a bucket alike in everything but one dimension, and the union they match in it."""
+
+    __slots__ = ("rules", "union")
+
+    def __init__(self) -> None:
+        self.rules: List[Rule] = []
+        self.union = _Union()
+
+
+class _Bucket:
+    """The rules filed under one signature and pair of address prefixes."""
+
+    __slots__ = ("stabs", "groups")
+
+    def __init__(self) -> None:
+        self.stabs = {dimension: _Stab() for dimension in _PORTS}
+        self.groups: Dict[int, Dict[tuple, _Group]] = {dimension: {} for dimension in _PORTS}
+
+    def add(self, rule: Rule) -> None:
+        any_of = frozenset(rule.any_of.items())
+        for dimension in _PORTS:
+            intervals = rule.dims[dimension]
+            self.stabs[dimension].add(intervals, rule)
+            rest = rule.dims[:dimension] + (None,) + rule.dims[dimension + 1:]
+            group = self.groups[dimension].get((any_of, rest))
+            if group is None:
+                group = self.groups[dimension][(any_of, rest)] = _Group()
+            group.rules.append(rule)
+            # A rule matching any value here covers on its own wherever its group does.
+            if intervals is not None:
+                group.union.add(intervals)
+
+
+class _CoverIndex:
+    """The terminating rules of a chain seen so far, filed so that the ones
+    that could match everything a later rule matches are found without a scan.
+
+    Rules are filed by their exact matchers, then by the prefixes enclosing
+    their source and destination addresses: a rule can only cover another if
+    its exact matchers are a subset of the other's and its address prefixes
+    enclose the other's.  Within such a bucket, protocol and ports are
+    indexed too: a rule is compared only with the rules matching one value
+    it matches in its most selective of those dimensions, and rules alike
+    in all but that dimension are summed up as the union they match there.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[FrozenSet, Dict[Tuple[int, int, int, int], _Bucket]] = {}
+        self._lengths: Dict[FrozenSet, Tuple[Set[int], Set[int]]] = {}
+        self._subsets: Dict[FrozenSet, List[FrozenSet]] = {}
+
+    def add(self, rule: Rule) -> None:
+        buckets = self._buckets.get(rule.exact)
+        if buckets is None:
+            buckets = self._buckets[rule.exact] = {}
+            self._lengths[rule.exact] = (set(), set())
+            self._subsets.clear()
+        src, dst = _block(rule.dims[0]), _block(rule.dims[1])
+        bucket = buckets.get(src + dst)
+        if bucket is None:
+            bucket = buckets[src + dst] = _Bucket()
+        bucket.add(rule)
+        src_lengths, dst_lengths = self._lengths[rule.exact]
+        src_lengths.add(src[1])
+        dst_lengths.add(dst[1])
+
+    def buckets(self, rule: Rule) -> Iterator[_Bucket]:
+        """The buckets holding every rule that could cover ``rule``."""
+        signatures = self._subsets.get(rule.exact)
+        if signatures is None:
+            signatures = self._subsets[rule.exact] = [s for s in self._buckets if s <= rule.exact]
+        src, dst = _block(rule.dims[0]), _block(rule.dims[1])
+        for signature in signatures:
+            buckets = self._buckets[signature]
+            src_lengths, dst_lengths = self._lengths[signature]
+            dst_blocks = _enclosing(dst, dst_lengths)
+            for src_block in _enclosing(src, src_lengths):
+                for dst_block in dst_blocks:
+                    bucket = buckets.get(src_block + dst_block)
+                    if bucket is not None:
+                        yield bucket
+
+
+def _gaps(cover: Rule, rule: Rule) -> Optional[List[int]]:
+    """The dimensions in which ``cover`` does not match all that ``rule`` matches.
+
+    None if ``cover`` cannot match all of ``rule`` whatever its intervals;
+    stops counting at two.
+    """
+    for key, values in cover.any_of.items():
+        theirs = rule.any_of.get(key)
+        if theirs is None or not theirs <= values:
+            return None
+    gaps = []
+    for dimension, outer in enumerate(cover.dims):
+        if outer is None:
+            continue
+        inner = rule.dims[dimension]
+        if inner is None or not _contains(outer, inner):
+            gaps.append(dimension)
+            if len(gaps) > 1:
+                break
+    return gaps
+
+
+def _covers(index: _CoverIndex, rule: Rule) -> List[Rule]:
+    """The first earlier rule covering ``rule``, or earlier rules covering it together."""
+    full: Optional[Rule] = None
+    partial: Dict[int, List[Rule]] = {}
+    grouped: Dict[int, List[_Group]] = {}
+    for bucket in index.buckets(rule):
+        pivot = min(_PORTS, key=lambda dimension: bucket.stabs[dimension].size(_probe(rule, dimension)))
+        # A rule covering this one, or all of it but in one other dimension,
+        # matches what it matches in the pivot dimension.
+        for cover in bucket.stabs[pivot].holding(_probe(rule, pivot)):
+            gaps = _gaps(cover, rule)
+            if gaps is None or len(gaps) > 1:
+                continue
+            if not gaps:
+                if full is None or cover.number < full.number:
+                    full = cover
+            elif gaps[0] != pivot:
+                partial.setdefault(gaps[0], []).append(cover)
+        # Those covering all of it but in the pivot dimension, a group at a time.
+        for group in bucket.groups[pivot].values():
+            if _gaps(group.rules[0], rule) in ([], [pivot]):
+                grouped.setdefault(pivot, []).append(group)
+    if full is not None:
+        return [full]
+
+    for dimension in sorted(partial.keys() | grouped.keys()):
+        inner = rule.dims[dimension] or _FULL[dimension]
+        rules = partial.get(dimension, [])
+        groups = grouped.get(dimension, [])
+        if len(groups) == 1 and not rules:
+            covered = groups[0].union.contains(inner)
+        else:
+            union = _merge(
+                [interval for cover in rules for interval in cover.dims[dimension]]
+                + [interval for group in groups for interval in zip(group.union.starts, group.union.ends)]
+            )
+            covered = _contains(union, inner)
+        if covered:
+            together = {cover.number: cover for cover in rules}
+            together.update((cover.number, cover) for group in groups for cover in group.rules)
+            return sorted(
+                (cover for cover in together.values() if _intersects(cover.dims[dimension], inner)),
+                key=lambda cover: cover.number,
+            )
+    return []
+
+
+def analyse_chain(rules: Sequence[Rule]) -> Iterator[Tuple[Rule, str, List[Rule]]]:
+    """``(rule, kind, covering rules)`` for each rule of one chain that can never match.
+
+    ``kind`` is ``"shadowed"`` if an earlier rule covering it does something
+    else, ``"redundant"`` if they all do the same, and ``"unreachable"`` if
+    the rule matches no packet at all.  ``rules`` are in evaluation order.
+    """
+    index = _CoverIndex()
+    for rule in rules:
+        if rule.empty:
+            yield rule, "unreachable", []
+            continue
+        covers = _covers(index, rule)
+        if covers:
+            same = rule.terminal and all(cover.effect == rule.effect for cover in covers)
+            yield rule, "redundant" if same else "shadowed", covers
+        elif rule.terminal and not rule.stateful:
+            # Rules that never match are left out, so a rule is only ever
+            # reported against rules that do; and a rule with a stateful
+            # matcher lets through some of the packets it matches.
+            index.add(rule)
+
+
+class RuleSet:
+    """The enabled rules of one firewall table (``filter`` or ``nat``), per chain.
+
+    Feed it rows in print order with :meth:`add_row`; rule numbers count
+    every row, disabled ones included, as ``print`` numbers them.
+    """
+
+    def __init__(self, table: str) -> None:
+        self.table = table
+        self.menu, self.builtin_chains, self.terminal_actions = TABLES[table]
+        self.chains: Dict[str, List[Rule]] = {}
+        self.rows = 0
+
+    def add_row(self, row: Mapping[str, str]) -> None:
+        number = self.rows
+        self.rows += 1
+        if row.get("disabled") in _TRUE or row.get("invalid") in _TRUE:
+            return
+        rule = Rule(number, row, self.terminal_actions)
+        self.chains.setdefault(rule.chain, []).append(rule)
+
+    def reachable_chains(self) -> Set[str]:
+        """Built-in chains and the chains an enabled rule jumps to from them."""
+        reached = set(self.builtin_chains)
+        pending = [chain for chain in reached if chain in self.chains]
+        while pending:
+            for rule in self.chains[pending.pop()]:
+                target = dict(rule.effect[1:]).get("jump-target") if rule.action == "jump" else None
+                if target and target not in reached:
+                    reached.add(target)
+                    if target in self.chains:
+                        pending.append(target)
+        return reached
+
+
+async def load_rules(device: str, tables: Sequence[str] = ("filter", "nat")) -> List[RuleSet]:
+    """Read the given firewall tables of the device, one :class:`RuleSet` each."""
+    rulesets = []
+    for table in tables:
+        ruleset = RuleSet(table)
+        await consume_rows(ruleset.menu, ruleset.add_row, device=device)
+        rulesets.append(ruleset)
+    return rulesets
+
+
+def analyse(rulesets: Sequence[RuleSet], chain: Optional[str] = None, limit: int = 100) -> dict:
+    """Shadowed, redundant and unreachable rules of every chain (or only ``chain``).
+
+    ``findings`` holds at most ``limit`` entries, in table, chain and rule
+    order; ``counts`` and ``truncated`` tell whether there were more.
+    Chains nothing jumps to are listed with ``reachable: false``.
+    """
+    limit = max(limit, 0)
+    counts = {"shadowed": 0, "redundant": 0, "unreachable": 0}
+    findings: List[dict] = []
+    chains: List[dict] = []
+    for ruleset in rulesets:
+        reachable = ruleset.reachable_chains()
+        for name, rules in ruleset.chains.items():
+            if chain is not None and name != chain:
+                continue
+            chains.append({
+                "table": ruleset.table, "chain": name, "rules": len(rules),
+                "reachable": name in reachable,
+            })
+            for rule, kind, covers in analyse_chain(rules):
+                # Findings past the limit are only counted, never built.
+                counts[kind] += 1
+                if len(findings) < limit:
+                    findings.append({
+                        "table": ruleset.table, "chain": name, "kind": kind,
+                        **rule.describe(),
+                        "by": [cover.describe() for cover in covers],
+                    })
+
+    return {
+        "rules": sum(entry["rules"] for entry in chains),
+        "counts": counts,
+        "truncated": sum(counts.values()) > len(findings),
+        "chains": chains,
+        "findings": findings,
+    }
@@ -0,0 +1,140 @@
+"""Run one read on many devices at once.
+
+Without this, reading something from every router in the inventory takes one
+tool call per device, each paying a model turn and a round trip in series.
+:func:`run_on_fleet` fans an action out over the selected devices with a bound
+on how many are in flight, a deadline per device, and a result per device —
+one device failing or timing out never hides the others' answers.
+
+Commands given by the caller must be reads:
+:func:`~mcp_mikrotik.commands.is_read_only_command` admits a single
+``print``/``export``/``monitor ... once`` command and nothing that could
+change a device or write a file.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+from mcp.server.mcpserver import Context
+
+from . import config
+from .config import DeviceConfig
+from .commands import is_read_only_command
+from .connector import execute_mikrotik_command
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceResult:
+    """Outcome of a fleet action on one device."""
+
+    __slots__ = ("title", "ok", "output", "error", "elapsed")
+
+    def __init__(
+        self,
+        title: str,
+        ok: bool,
+        output: Any = None,
+        error: Optional[str] = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.title = title
+        self.ok = ok
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+
+    def to_dict(self) -> dict:
+        result = {"ok": self.ok, "elapsed": round(self.elapsed, 3)}
+        if self.ok:
+            result["output"] = self.output
+        else:
+            result["error"] = self.error
+        return result
+
+
+def fleet_limits(
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_timeout: Optional[float] = None,
+) -> Tuple[int, float]:
+    """Per-call limits: a caller may ask for less than MIKROTIK_FLEET_*, never more.
+
+    ``max_timeout`` replaces ``MIKROTIK_FLEET_TIMEOUT`` as the ceiling for
+    actions that are slower than a read by nature, such as a backup.
+    """
+    cfg = config.mikrotik_config
+    limit = cfg.fleet_concurrency
+    if concurrency and concurrency > 0:
+        limit = min(concurrency, limit)
+    deadline = max_timeout or cfg.fleet_timeout
+    if timeout and timeout > 0:
+        deadline = min(timeout, deadline)
+    return limit, deadline
+
+
+async def run_on_fleet(
+    devices: Sequence[DeviceConfig],
+    action: Callable[[DeviceConfig], Awaitable[Any]],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_timeout: Optional[float] = None,
+) -> Dict[str, DeviceResult]:
+    """Run ``action`` on every device, at most ``concurrency`` at a time.
+
+    Returns one :class:`DeviceResult` per device, keyed by title in the order
+    the devices were given.  An exception — including the per-device
+    ``timeout`` expiring — fails that device only.  A timed-out command on
+    the blocking SSH engine is abandoned rather than interrupted; its worker
+    thread finishes in the background.
+    """
+    limit, deadline = fleet_limits(concurrency, timeout, max_timeout)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def one(device: DeviceConfig) -> DeviceResult:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                output = await asyncio.wait_for(action(device), timeout=deadline)
+            except asyncio.TimeoutError:
+                error = f"Timed out after {deadline:g}s"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            else:
+                return DeviceResult(device.title, True, output=output,
+                                    elapsed=time.monotonic() - started)
+            logger.info(f"Fleet action failed on '{device.title}': {error}")
+            return DeviceResult(device.title, False, error=error,
+                                elapsed=time.monotonic() - started)
+
+    results = await asyncio.gather(*(one(device) for device in devices))
+    return {result.title: result for result in results}
+
+
+async def run_command_on_fleet(
+    devices: Sequence[DeviceConfig],
+    command: str,
+    ctx: Context,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, DeviceResult]:
+    """Run one read-only console command on every device.
+
+    Raises ValueError if the command is not a read (see
+    :func:`is_read_only_command`).
+    """
+    if not is_read_only_command(command):
+        raise ValueError(
+            "Only a single read command (print, export, or monitor ... once) can be "
+            f"run across the fleet; refusing {command!r}."
+        )
+
+    async def action(device: DeviceConfig) -> str:
+        output = await execute_mikrotik_command(command, ctx, device=device.title)
+        if output.startswith("Error"):
+            raise RuntimeError(output)
+        return output
+
+    return await run_on_fleet(devices, action, concurrency, timeout)
@@ -0,0 +1,160 @@
+"""Back up many devices at once into the local content store.
+
+For each selected device the job saves a binary backup and an ``/export``
+in one round trip, streams both files back over SFTP, and files them in the
+:class:`~mcp_mikrotik.backup_store.ContentStore` — so an export that did not
+change since the last run is recognised by its canonical hash and not stored
+again.
+Devices run concurrently under the fleet limits; each reports how long it
+took and how many bytes it moved, and the job as a whole its throughput.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from mcp.server.mcpserver import Context
+
+from . import config
+from .backup_store import ContentStore, get_content_store
+from .config import DeviceConfig
+from .connector import download_to_file, execute_batch
+from .fleet import DeviceResult, run_on_fleet
+from .parsing import looks_like_error, quote
+from .storage import device_dir
+
+logger = logging.getLogger(__name__)
+
+# ``# 2024-01-15 10:23:45 by RouterOS 7.13.2`` (or ``# jan/15/2024 ...`` on
+# v6): the only line of an export that changes when the configuration does not.
+_EXPORT_HEADER = re.compile(rb"^# .*? (by RouterOS .*)$")
+
+
+def canonical_export(path: Path) -> str:
+    """SHA-256 of an export with the timestamp dropped from its header line.
+
+    Two exports of the same configuration then hash the same.  The file is
+    read a block at a time and left exactly as the device wrote it; it is
+    stored under its own SHA-256, with this one as its canonical hash.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        first = fh.readline()
+        body = first.rstrip(b"\r\n")
+        header = _EXPORT_HEADER.match(body)
+        digest.update(b"# " + header.group(1) + first[len(body):] if header else first)
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Clean-up batches still running after their device ran out of time.
+_cleanups: Set[asyncio.Task] = set()
+
+
+def _finish_cleanup(task: asyncio.Task) -> None:
+    _cleanups.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Removing fleet backup files failed: {task.exception()}")
+
+
+def _remote_files(name: str, binary: bool, export: bool, password: Optional[str]):
+    """The commands that write the files, and ``(kind, remote name)`` of each."""
+    commands: List[str] = []
+    files: List[Tuple[str, str]] = []
+    if binary:
+        secret = f"password={quote(password)}" if password else "dont-encrypt=yes"
+        commands.append(f"/system backup save name={name} {secret}")
+        files.append(("backup", f"{name}.backup"))
+    if export:
+        commands.append(f"/export file={name}")
+        files.append(("export", f"{name}.rsc"))
+    return commands, files
+
+
+async def backup_device(
+    device: DeviceConfig,
+    ctx: Context,
+    store: ContentStore,
+    name: str,
+    binary: bool = True,
+    export: bool = True,
+    password: Optional[str] = None,
+    keep_on_device: bool = False,
+) -> dict:
+    """Back up one device into ``store``; raises RuntimeError on failure."""
+    commands, files = _remote_files(name, binary, export, password)
+    spool = device_dir("spool", device.title)
+    stored: List[dict] = []
+    cancelled = False
+    try:
+        for output in await execute_batch(commands, ctx, device=device.title):
+            lines = output.strip().splitlines()
+            if output.startswith("Error") or any(looks_like_error(line) for line in lines):
+                raise RuntimeError(output.strip())
+
+        for kind, remote in files:
+            download = await download_to_file(remote, spool / remote, device=device.title)
+            canonical = None
+            if kind == "export":
+                canonical = await asyncio.to_thread(canonical_export, download.path)
+            path, new = await asyncio.to_thread(store.add, download.path, download.sha256, canonical)
+            # An unchanged export is filed as the copy stored first.
+            sha256, size = path.name, download.size
+            entry = {"kind": kind, "remote": remote, "sha256": sha256, "size": size}
+            if canonical is not None:
+                entry["canonical"] = canonical
+            store.record(device=device.title, **entry)
+            stored.append({**entry, "new": new, "path": str(path)})
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        if not keep_on_device:
+            # Shielded, so a device that runs out of time reports at its
+            # deadline while the files are still removed behind it.
+            cleanup = asyncio.ensure_future(execute_batch(
+                [f"/file remove {quote(remote)}" for _, remote in files], ctx, device=device.title
+            ))
+            _cleanups.add(cleanup)
+            cleanup.add_done_callback(_finish_cleanup)
+            if not cancelled:
+                await asyncio.shield(cleanup)
+
+    return {"files": stored, "bytes": sum(f["size"] for f in stored)}
+
+
+async def run_fleet_backup(
+    devices: Sequence[DeviceConfig],
+    ctx: Context,
+    binary: bool = True,
+    export: bool = True,
+    password: Optional[str] = None,
+    keep_on_device: bool = False,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, DeviceResult]:
+    """Back up every device, at most ``concurrency`` at a time.
+
+    Each device gets up to ``MIKROTIK_FLEET_BACKUP_TIMEOUT`` seconds (a call
+    may ask for less), removing the files from the device included.  All devices of one run use the same remote file name,
+    ``mcp-fleet-<UTC timestamp>``.
+    """
+    if not (binary or export):
+        raise ValueError("Nothing to back up: enable `binary`, `export` or both.")
+    store = get_content_store()
+    name = time.strftime("mcp-fleet-%Y%m%d-%H%M%S", time.gmtime())
+
+    async def action(device: DeviceConfig) -> dict:
+        return await backup_device(
+            device, ctx, store, name, binary, export, password, keep_on_device
+        )
+
+    return await run_on_fleet(
+        devices, action, concurrency, timeout,
+        max_timeout=config.mikrotik_config.fleet_backup_timeout,
+    )
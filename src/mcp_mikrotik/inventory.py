@@ -5,26 +5,52 @@ each one.  Tools pass a device ``title`` down to the connector, which asks the
 inventory to open a connection to the matching device and runs the command over
 it.
 
-Connections are **never pooled or shared**.  Every call gets a brand-new
-``MikroTikSSHClient`` that is closed as soon as the command finishes, so
-concurrent MCP sessions are fully isolated from one another: one session
+By default connections are **never pooled or shared**.  Every call gets a
+brand-new ``MikroTikSSHClient`` that is closed as soon as the command finishes,
+so concurrent MCP sessions are fully isolated from one another: one session
 disconnecting, timing out or failing to authenticate cannot disturb a command
 another session is running against the same device.
+
+Devices with a ``pool_size`` above zero keep up to that many warm connections
+in a :class:`ConnectionPool` instead.  A pooled connection is still leased to
+exactly one command at a time and is only handed out again after it came back
+cleanly, so the isolation guarantee holds; what is saved is the TCP + SSH
+handshake and authentication on every call.
+
+Devices with ``multiplex_channels`` above zero go one step further and run
+every command as its own session channel on a single :class:`SharedTransport`.
+That trades isolation for cost — commands on one device then share the
+transport's fate — so it is a separate, explicit opt-in.
 """
 
+import fnmatch
 import json
 import logging
 import os
 import threading
-from contextlib import contextmanager
-from typing import Dict, Iterator, List, Optional
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 import yaml
 from pydantic import ValidationError
 
 from . import config
 from .config import DeviceConfig
+from .async_ssh_client import AsyncMikroTikSSHClient, asyncssh_available
 from .mikrotik_ssh_client import MikroTikSSHClient
+from .selector import evaluate, parse_selector
 
 logger = logging.getLogger(__name__)
 
@@ -33,15 +59,259 @@ class DeviceNotFoundError(LookupError):
     """Raised when a requested device title cannot be resolved."""
 
 
+def _close_quietly(client: MikroTikSSHClient) -> None:
+    try:
+        client.disconnect()
+    except Exception:
+        logger.debug("Error closing SSH connection", exc_info=True)
+
+
+class ConnectionPool:
+    """Warm SSH connections to one device, leased to one command at a time.
+
+    A lease is exclusive: a connection is never handed to a second caller
+    while the first still holds it, and it only returns to the pool when the
+    command finished without raising.  Anything that went wrong mid-command
+    discards the connection, so a broken transport cannot leak into the next
+    caller's command.
+
+    On checkout the most recently used idle connection is health-checked
+    (:meth:`MikroTikSSHClient.is_alive`, outside the pool's lock, as it is a
+    round trip); dead ones and ones idle for longer
+    than ``idle_timeout`` are closed rather than reused.  At most ``max_size``
+    connections exist per device — leased plus idle — and a caller finding
+    them all busy waits for one to come back.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MikroTikSSHClient],
+        max_size: int,
+        idle_timeout: float,
+    ) -> None:
+        self._factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        # LIFO: the most recently returned connection is the likeliest to be
+        # alive, and the oldest ones age out through the idle timeout.
+        self._idle: List[Tuple[MikroTikSSHClient, float]] = []
+        self._leased = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    @property
+    def leased_count(self) -> int:
+        return self._leased
+
+    def acquire(self, timeout: float = 30.0) -> MikroTikSSHClient:
+        """Lease a connection, opening a new one when none is idle.
+
+        Raises :class:`ConnectionError` when every connection stays busy for
+        ``timeout`` seconds, or when a new connection cannot be opened.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            stale: List[MikroTikSSHClient] = []
+            candidate: Optional[MikroTikSSHClient] = None
+            try:
+                with self._cond:
+                    while True:
+                        if self._closed:
+                            raise ConnectionError("Connection pool is closed")
+                        stale.extend(self._evict_expired_locked())
+                        if self._idle:
+                            candidate, _ = self._idle.pop()
+                        # Reserve the slot now; the health check or handshake
+                        # runs unlocked.
+                        if candidate is not None or self._leased < self.max_size:
+                            self._leased += 1
+                            break
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise ConnectionError(
+                                f"All {self.max_size} pooled connections are busy"
+                            )
+                        self._cond.wait(remaining)
+            finally:
+                for dead in stale:
+                    _close_quietly(dead)
+            if candidate is None:
+                break
+            # The health check is a round trip: a stalled transport must not
+            # hold up the callers leasing and returning other connections.
+            try:
+                if candidate.is_alive():
+                    return candidate
+            except BaseException:
+                self._unreserve()
+                _close_quietly(candidate)
+                raise
+            self._unreserve()
+            _close_quietly(candidate)
+
+        try:
+            return self._factory()
+        except BaseException:
+            self._unreserve()
+            raise
+
+    def _unreserve(self) -> None:
+        with self._cond:
+            self._leased -= 1
+            self._cond.notify()
+
+    def release(self, client: MikroTikSSHClient, reusable: bool = True) -> None:
+        """Return a leased connection; close it unless it is ``reusable``."""
+        with self._cond:
+            self._leased -= 1
+            keep = reusable and not self._closed
+            if keep:
+                self._idle.append((client, time.monotonic()))
+            self._cond.notify()
+        if not keep:
+            _close_quietly(client)
+
+    def close(self) -> None:
+        """Close every idle connection; leased ones close when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for client, _ in idle:
+            _close_quietly(client)
+
+    def _evict_expired_locked(self) -> List[MikroTikSSHClient]:
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [c for c, used in self._idle if used < cutoff]
+        if expired:
+            self._idle = [(c, used) for c, used in self._idle if used >= cutoff]
+        return expired
+
+
+class SharedTransport:
+    """One SSH transport per device, with each command on its own channel.
+
+    RouterOS accepts several session channels on one authenticated transport,
+    and paramiko opens channels thread-safely, so concurrent commands only pay
+    for a channel open.  ``max_channels`` bounds how many run at once; further
+    callers wait for a free slot.
+
+    The transport is checked on every checkout and replaced when it is dead.
+    A command that fails reports the transport generation it ran on, and the
+    transport is only torn down if that generation is still current and the
+    transport is really gone — so a burst of failures from one drop causes one
+    reconnect, not one per failed command.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], MikroTikSSHClient],
+        max_channels: int,
+    ) -> None:
+        self._factory = factory
+        self.max_channels = max_channels
+        self._slots = threading.BoundedSemaphore(max_channels)
+        self._lock = threading.Lock()
+        self._client: Optional[MikroTikSSHClient] = None
+        self._generation = 0
+        self._closed = False
+
+    @property
+    def generation(self) -> int:
+        """How many transports have been opened so far."""
+        return self._generation
+
+    def acquire(self, timeout: float = 30.0) -> Tuple[MikroTikSSHClient, int]:
+        """Claim a channel slot; return the live client and its generation."""
+        if not self._slots.acquire(timeout=timeout):
+            raise ConnectionError(
+                f"All {self.max_channels} multiplexed channels are busy"
+            )
+        try:
+            return self._current()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, generation: int, failed: bool = False) -> None:
+        """Free the channel slot; after a failure, drop a dead transport."""
+        try:
+            if failed:
+                self._discard_if_dead(generation)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            client, self._client = self._client, None
+        if client is not None:
+            _close_quietly(client)
+
+    def _current(self) -> Tuple[MikroTikSSHClient, int]:
+        # The reconnect runs under the lock on purpose: callers arriving while
+        # the transport is down wait for the one handshake in progress instead
+        # of each opening a transport of their own.
+        with self._lock:
+            if self._closed:
+                raise ConnectionError("Shared transport is closed")
+            if self._client is not None and self._client.is_alive():
+                return self._client, self._generation
+            stale, self._client = self._client, None
+            if stale is not None:
+                _close_quietly(stale)
+            self._client = self._factory()
+            self._generation += 1
+            return self._client, self._generation
+
+    def _discard_if_dead(self, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation or self._client is None:
+                return
+            if self._client.is_alive():
+                # The command failed, not the transport.
+                return
+            stale, self._client = self._client, None
+        _close_quietly(stale)
+
+
+class _FrozenDict(dict):
+    """A dict that refuses changes: cached ``describe()`` rows are shared."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("device descriptions are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
 class Inventory:
     """Holds the device definitions, keyed by title.
 
-    The inventory is immutable after construction and holds no connection
-    state, so a single instance is safe to share across sessions and threads.
+    Tag, region and host indexes — and the :meth:`describe` rows — are built
+    once at construction, so selecting devices costs a dictionary lookup per
+    criterion instead of a scan of the whole fleet.
+
+    The device definitions are immutable after construction.  The only
+    connection state is the per-device :class:`ConnectionPool` or
+    :class:`SharedTransport` of devices that opted into one — both are
+    thread-safe, so a single instance is still safe to share across sessions
+    and threads.
     """
 
     def __init__(self, devices: List[DeviceConfig]) -> None:
         self._devices: Dict[str, DeviceConfig] = {}
+        self._pools: Dict[str, ConnectionPool] = {}
+        self._shared: Dict[str, SharedTransport] = {}
 
         for device in devices:
             key = device.title.casefold()
@@ -52,6 +322,62 @@ class Inventory:
                 )
             self._devices[key] = device
 
+        self._order: Dict[str, int] = {key: i for i, key in enumerate(self._devices)}
+        self._universe: FrozenSet[str] = frozenset(self._devices)
+        self._index: Dict[str, Dict[str, FrozenSet[str]]] = self._build_index()
+        self._described: Tuple[Mapping[str, Any], ...] = tuple(
+            _FrozenDict(
+                title=d.title,
+                host=d.host,
+                port=d.port,
+                username=d.username,
+                tags=tuple(d.tags),
+                region=d.region,
+            )
+            for d in self._devices.values()
+        )
+
+        defaults = config.mikrotik_config
+        for key, device in self._devices.items():
+            channels = device.multiplex_channels
+            if channels is None:
+                channels = defaults.multiplex_channels
+            if channels:
+                self._shared[key] = SharedTransport(
+                    factory=lambda device=device: self._open(device),
+                    max_channels=channels,
+                )
+                continue
+
+            size = device.pool_size
+            if size is None:
+                size = defaults.pool_size
+            if not size:
+                continue
+            idle_timeout = device.pool_idle_timeout
+            if idle_timeout is None:
+                idle_timeout = defaults.pool_idle_timeout
+            self._pools[key] = ConnectionPool(
+                factory=lambda device=device: self._open(device),
+                max_size=size,
+                idle_timeout=idle_timeout,
+            )
+
+    def _build_index(self) -> Dict[str, Dict[str, FrozenSet[str]]]:
+        index: Dict[str, Dict[str, set]] = {"tag": {}, "region": {}, "host": {}}
+        for key, device in self._devices.items():
+            for tag in device.tags:
+                index["tag"].setdefault(tag.casefold(), set()).add(key)
+            if device.region:
+                index["region"].setdefault(device.region.casefold(), set()).add(key)
+            index["host"].setdefault(device.host.casefold(), set()).add(key)
+        frozen = {
+            field: {value: frozenset(keys) for value, keys in values.items()}
+            for field, values in index.items()
+        }
+        frozen["title"] = {key: frozenset((key,)) for key in self._devices}
+        return frozen
+
     # ── Introspection ──────────────────────────────────────────────────────
 
     def __len__(self) -> int:
@@ -64,19 +390,19 @@ class Inventory:
     def all_devices(self) -> List[DeviceConfig]:
         return list(self._devices.values())
 
-    def describe(self) -> List[dict]:
-        """Device metadata for the LLM. Never includes credentials."""
-        return [
-            {
-                "title": d.title,
-                "host": d.host,
-                "port": d.port,
-                "username": d.username,
-                "tags": d.tags,
-                "region": d.region,
-            }
-            for d in self._devices.values()
-        ]
+    def describe(self, expression: Optional[str] = None) -> Tuple[Mapping[str, Any], ...]:
+        """Device metadata for the LLM. Never includes credentials.
+
+        Built once at construction and returned as-is: the rows are read-only
+        and ``tags`` is a tuple, so callers cannot alter what others see.
+        ``expression`` limits the rows to a selector (see :meth:`select`).
+        """
+        if not expression:
+            return self._described
+        return tuple(
+            self._described[self._order[d.title.casefold()]]
+            for d in self.select(expression=expression)
+        )
 
     # ── Resolution ─────────────────────────────────────────────────────────
 
@@ -110,21 +436,88 @@ class Inventory:
             )
         return device
 
+    def by_host(self, host: str) -> List[DeviceConfig]:
+        """Devices configured with this ``host`` (several, if ports differ)."""
+        keys = self._index["host"].get(host.strip().casefold(), frozenset())
+        return self._in_order(keys)
+
+    def select(
+        self,
+        titles: Optional[List[str]] = None,
+        tags: Optional[List[str]] = None,
+        region: Optional[str] = None,
+        expression: Optional[str] = None,
+    ) -> List[DeviceConfig]:
+        """Return the devices matching every given criterion.
+
+        ``titles`` names devices explicitly (an unknown one raises
+        :class:`DeviceNotFoundError`, as with :meth:`resolve`); ``tags`` keeps
+        devices carrying *all* of the tags; ``region`` keeps devices in that
+        region; ``expression`` is a selector such as ``tag:core and
+        region:NL`` (see :mod:`mcp_mikrotik.selector`; a malformed one raises
+        :class:`~mcp_mikrotik.selector.SelectorError`).  Matching is
+        case-insensitive.  With no criteria, every device is selected.
+        """
+        wanted: Optional[FrozenSet[str]] = None
+
+        def narrow(keys: FrozenSet[str]) -> None:
+            nonlocal wanted
+            wanted = keys if wanted is None else wanted & keys
+
+        for tag in tags or ():
+            narrow(self._index["tag"].get(tag.casefold(), frozenset()))
+        if region:
+            narrow(self._index["region"].get(region.casefold(), frozenset()))
+        if expression:
+            narrow(evaluate(parse_selector(expression), self._lookup, self._universe))
+
+        if titles:
+            selected = list({id(d): d for d in map(self.resolve, titles)}.values())
+            if wanted is None:
+                return selected
+            return [d for d in selected if d.title.casefold() in wanted]
+        if wanted is None:
+            return self.all_devices()
+        return self._in_order(wanted)
+
+    def _lookup(self, field: str, value: str) -> FrozenSet[str]:
+        values = self._index[field]
+        if not any(c in value for c in "*?["):
+            return values.get(value, frozenset())
+        matched: FrozenSet[str] = frozenset()
+        for candidate, keys in values.items():
+            if fnmatch.fnmatchcase(candidate, value):
+                matched = matched | keys
+        return matched
+
+    def _in_order(self, keys: FrozenSet[str]) -> List[DeviceConfig]:
+        return [self._devices[key] for key in sorted(keys, key=self._order.__getitem__)]
+
     # ── SSH clients ────────────────────────────────────────────────────────
 
     def connect(self, title: Optional[str] = None) -> MikroTikSSHClient:
         """Open and return a **new** SSH connection to the resolved device.
 
-        Connections are deliberately not pooled.  Sharing one client between
+        This never draws from the connection pool.  Sharing one client between
         concurrent MCP sessions would make them share a fate — a disconnect,
         timeout or dropped transport in one session would break a command
         another session was running — so every caller gets its own.
 
         The caller owns the returned client and must close it.  Prefer
-        :meth:`session`, which closes it automatically.
+        :meth:`session`, which closes it automatically (or returns it to the
+        device's pool).
         """
-        device = self.resolve(title)
+        return self._open(self.resolve(title))
+
+    def pool(self, title: Optional[str] = None) -> Optional[ConnectionPool]:
+        """Return the connection pool of the device, or None if it has none."""
+        return self._pools.get(self.resolve(title).title.casefold())
 
+    def shared_transport(self, title: Optional[str] = None) -> Optional[SharedTransport]:
+        """Return the multiplexed transport of the device, or None."""
+        return self._shared.get(self.resolve(title).title.casefold())
+
+    def _open(self, device: DeviceConfig) -> MikroTikSSHClient:
         client = MikroTikSSHClient(
             host=device.host,
             username=device.username,
@@ -142,20 +535,104 @@ class Inventory:
 
     @contextmanager
     def session(self, title: Optional[str] = None) -> Iterator[MikroTikSSHClient]:
-        """Yield a fresh SSH connection to the device, closed on exit.
+        """Yield an SSH connection to the device for the duration of one command.
+
+        Without a pool this is a fresh connection, closed on exit.  With one,
+        the connection is leased from the device's pool and handed back on
+        exit — unless the command raised, in which case it is closed, so a
+        failing command can neither leak a session on the router nor pass a
+        half-broken connection to the next caller.
+
+        A multiplexed device yields its shared client instead; the command's
+        ``exec_command`` / SFTP session then runs on a channel of its own.
+        """
+        device = self.resolve(title)
+        key = device.title.casefold()
+
+        shared = self._shared.get(key)
+        if shared is not None:
+            client, generation = shared.acquire()
+            failed = True
+            try:
+                yield client
+                failed = False
+            finally:
+                shared.release(generation, failed=failed)
+            return
+
+        pool = self._pools.get(key)
+
+        if pool is None:
+            client = self._open(device)
+            try:
+                yield client
+            finally:
+                _close_quietly(client)
+            return
+
+        client = pool.acquire()
+        reusable = False
+        try:
+            yield client
+            reusable = True
+        finally:
+            pool.release(client, reusable=reusable)
+
+    def ssh_engine(self, title: Optional[str] = None) -> str:
+        """The SSH engine commands for the device run on.
+
+        ``"asyncssh"`` only when it is configured *and* installed — a missing
+        optional dependency degrades to the paramiko engine with a warning
+        rather than failing every command.
+        """
+        device = self.resolve(title)
+        engine = device.ssh_engine or config.mikrotik_config.ssh_engine
+        if engine == "asyncssh" and not asyncssh_available():
+            global _warned_no_asyncssh
+            if not _warned_no_asyncssh:
+                logger.warning(
+                    "ssh_engine 'asyncssh' is configured but the asyncssh package "
+                    "is not installed; falling back to paramiko."
+                )
+                _warned_no_asyncssh = True
+            return "paramiko"
+        return engine
+
+    @asynccontextmanager
+    async def async_session(self, title: Optional[str] = None) -> AsyncIterator[AsyncMikroTikSSHClient]:
+        """Yield a fresh asyncssh connection to the device, closed on exit.
 
-        The connection is closed even if the command raises, so a failing
-        command cannot leak a session on the router.
+        The async counterpart of :meth:`session` for the asyncssh engine: a
+        connection per command, nothing shared, no worker thread held.
         """
-        client = self.connect(title)
+        device = self.resolve(title)
+        client = AsyncMikroTikSSHClient(
+            host=device.host,
+            username=device.username,
+            password=device.password,
+            key_filename=device.key_filename,
+            port=device.port,
+        )
+        if not await client.connect():
+            raise ConnectionError(
+                f"Failed to connect to MikroTik device '{device.title}' "
+                f"({device.host}:{device.port})"
+            )
         try:
             yield client
         finally:
             try:
-                client.disconnect()
+                await client.disconnect()
             except Exception:
                 logger.debug("Error closing SSH connection", exc_info=True)
 
+    def close(self) -> None:
+        """Close the idle and shared connections held for every device."""
+        for pool in self._pools.values():
+            pool.close()
+        for shared in self._shared.values():
+            shared.close()
+
 
 # ---------------------------------------------------------------------------
 # Module-level inventory
@@ -163,6 +640,7 @@ class Inventory:
 
 _inventory: Optional[Inventory] = None
 _inventory_lock = threading.Lock()
+_warned_no_asyncssh = False
 
 
 def _validate_entries(raw, source: str) -> List[DeviceConfig]:
@@ -251,6 +729,10 @@ def _load_devices() -> List[DeviceConfig]:
             username=cfg.username,
             password=cfg.password,
             key_filename=cfg.key_filename,
+            pool_size=cfg.pool_size,
+            pool_idle_timeout=cfg.pool_idle_timeout,
+            multiplex_channels=cfg.multiplex_channels,
+            ssh_engine=cfg.ssh_engine,
         )
     ]
 
@@ -268,4 +750,6 @@ def reset_inventory() -> None:
     """Drop the cached inventory (used by tests and after config reloads)."""
     global _inventory
     with _inventory_lock:
-        _inventory = None
+        previous, _inventory = _inventory, None
+    if previous is not None:
+        previous.close()
@@ -0,0 +1,249 @@
+"""A local, searchable archive of device logs.
+
+A router keeps only its last thousand or so log lines in memory, and
+searching them means pushing a regex to it (case-insensitivity emulated with
+character classes).  :class:`LogArchive` copies entries into an SQLite
+database on the server — ``<data dir>/logs.sqlite3`` — and indexes messages
+and topics with FTS5, so searches run locally, ignore case, span every
+device and reach back as far as the archive does.
+
+Entries are keyed and indexed by (device, day): a search for a device or a
+time range reads only those partitions, and retention drops whole days.
+Each device's ingest continues from the last ``.id`` archived (see
+:mod:`~mcp_mikrotik.log_cursor`), so only new entries cross the network.
+"""
+
+import asyncio
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from mcp.server.mcpserver import Context
+
+from . import config
+from .log_cursor import fetch_since, newest_id
+from .log_entries import LogEntry
+from .storage import data_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id      INTEGER PRIMARY KEY,
+    device  TEXT NOT NULL,
+    day     TEXT NOT NULL,          -- YYYY-MM-DD (device clock); '' if unknown
+    time    TEXT NOT NULL,          -- YYYY-MM-DD HH:MM:SS; '' if unknown
+    log_id  TEXT NOT NULL,
+    topics  TEXT NOT NULL,
+    message TEXT NOT NULL,
+    UNIQUE (device, log_id, time)
+);
+CREATE INDEX IF NOT EXISTS entries_partition ON entries (device, day, time);
+CREATE INDEX IF NOT EXISTS entries_day ON entries (day, time);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    message, topics, content='entries', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, message, topics) VALUES (new.id, new.message, new.topics);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, message, topics)
+    VALUES ('delete', old.id, old.message, old.topics);
+END;
+CREATE TABLE IF NOT EXISTS cursors (
+    device TEXT PRIMARY KEY,
+    log_id TEXT NOT NULL
+);
+"""
+
+_DURATION = re.compile(r"^(\d+)([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+_TOKEN = re.compile(r'"[^"]*"|\S+')
+
+
+def fts_query(text: str) -> str:
+    """Words as an FTS5 query: every word must match, ``word*`` matches a prefix.
+
+    ``"two words"`` is a phrase and ``OR`` between words matches either;
+    anything else is quoted, so punctuation in a term is never FTS syntax.
+    """
+    parts = []
+    for token in _TOKEN.findall(text):
+        if token == "OR":
+            parts.append(token)
+            continue
+        prefix = token.endswith("*") and not token.startswith('"')
+        word = token.strip('"').rstrip("*") if prefix else token.strip('"')
+        if word:
+            parts.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    while parts and parts[0] == "OR":
+        parts.pop(0)
+    while parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts)
+
+
+def parse_bound(value: str, now: Optional[datetime] = None) -> str:
+    """A search bound as ``YYYY-MM-DD HH:MM:SS``.
+
+    Accepts a date, a date and time, or a duration before ``now`` such as
+    ``"30m"``, ``"6h"`` or ``"7d"``.  Raises ValueError otherwise.
+    """
+    value = value.strip()
+    match = _DURATION.match(value)
+    if match:
+        stamp = (now or datetime.now()) - timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+        return f"{stamp:%Y-%m-%d %H:%M:%S}"
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return f"{datetime.strptime(value, fmt):%Y-%m-%d %H:%M:%S}"
+        except ValueError:
+            continue
+    raise ValueError(
+        f"Invalid time {value!r}: use YYYY-MM-DD, YYYY-MM-DD HH:MM or a duration like \"6h\" or \"7d\"."
+    )
+
+
+class LogArchive:
+    """SQLite + FTS5 store of log entries from many devices."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def add(self, device: str, entries: Iterable[LogEntry]) -> int:
+        """Archive ``entries``; returns how many were new."""
+        rows = [
+            (
+                device,
+                f"{e.time:%Y-%m-%d}" if e.time else "",
+                f"{e.time:%Y-%m-%d %H:%M:%S}" if e.time else "",
+                e.id,
+                ",".join(e.topics),
+                e.message,
+            )
+            for e in entries
+        ]
+        with self._lock, self._db:
+            cur = self._db.executemany(
+                "INSERT OR IGNORE INTO entries (device, day, time, log_id, topics, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            return max(cur.rowcount, 0)
+
+    def cursor(self, device: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT log_id FROM cursors WHERE device = ?", (device,)).fetchone()
+        return row["log_id"] if row else None
+
+    def set_cursor(self, device: str, log_id: Optional[str]) -> None:
+        with self._lock, self._db:
+            if log_id is None:
+                self._db.execute("DELETE FROM cursors WHERE device = ?", (device,))
+            else:
+                self._db.execute(
+                    "INSERT INTO cursors (device, log_id) VALUES (?, ?) "
+                    "ON CONFLICT(device) DO UPDATE SET log_id = excluded.log_id",
+                    (device, log_id),
+                )
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        devices: Optional[Sequence[str]] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        topics: Optional[Sequence[str]] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """The newest ``limit`` entries matching everything given, oldest first.
+
+        ``query`` is matched with :func:`fts_query` against message and
+        topics, ignoring case; ``since``/``until`` are ``YYYY-MM-DD HH:MM:SS``
+        bounds on the device's clock; ``topics`` keeps entries carrying any
+        of them.
+        """
+        clauses, params = [], []
+        match = fts_query(query) if query else ""
+        if match:
+            clauses.append("e.id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+            params.append(match)
+        if devices:
+            clauses.append(f"e.device IN ({', '.join('?' * len(devices))})")
+            params.extend(devices)
+        if since:
+            clauses.append("e.day >= ? AND e.time >= ?")
+            params.extend([since[:10], since])
+        if until:
+            clauses.append("e.day <= ? AND e.time <= ?")
+            params.extend([until[:10], until])
+        if topics:
+            clauses.append(
+                "(" + " OR ".join("(',' || e.topics || ',') LIKE ?" for _ in topics) + ")"
+            )
+            params.extend(f"%,{topic},%" for topic in topics)
+
+        sql = "SELECT e.device, e.time, e.log_id, e.topics, e.message FROM entries e"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.time DESC, e.id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def prune(self, keep_days: int, today: Optional[datetime] = None) -> int:
+        """Drop the day partitions older than ``keep_days``; returns entries removed."""
+        cutoff = f"{(today or datetime.now()) - timedelta(days=keep_days):%Y-%m-%d}"
+        with self._lock, self._db:
+            cur = self._db.execute("DELETE FROM entries WHERE day != '' AND day < ?", (cutoff,))
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT device, COUNT(*) AS entries, MIN(NULLIF(time, '')) AS oldest, "
+                "MAX(time) AS newest, COUNT(DISTINCT day) AS days FROM entries GROUP BY device"
+            ).fetchall()
+        return {row["device"]: {k: row[k] for k in ("entries", "oldest", "newest", "days")} for row in rows}
+
+
+_archive: Optional[LogArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_log_archive() -> LogArchive:
+    """The archive in the configured data directory, opened on first use."""
+    global _archive
+    path = data_dir() / "logs.sqlite3"
+    with _archive_lock:
+        if _archive is None or _archive.path != path:
+            if _archive is not None:
+                _archive.close()
+            _archive = LogArchive(path)
+        return _archive
+
+
+async def ingest_device(device: str, ctx: Context, archive: LogArchive) -> dict:
+    """Copy the entries ``device`` logged since its last ingest into ``archive``."""
+    after = archive.cursor(device)
+    dump, restarted = await fetch_since(ctx, device, after)
+    added = await asyncio.to_thread(archive.add, device, dump.entries)
+    archive.set_cursor(device, newest_id(dump, None if restarted else after))
+
+    keep = config.mikrotik_config.log_archive_days
+    if keep:
+        await asyncio.to_thread(archive.prune, keep)
+    return {"fetched": len(dump.entries), "added": added, "restarted": restarted}
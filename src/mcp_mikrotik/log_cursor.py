@@ -0,0 +1,88 @@
+"""Read a device's log incrementally, from the last ``.id`` seen.
+
+RouterOS numbers log entries with increasing internal ids, so "what is new"
+is ``/log find where .id > <last id>`` — the router sends only the entries
+added since, however long its log buffer is.  :class:`LogCursors` remembers
+the last id handed out per device; :func:`fetch_since` does the fetch and
+notices when the log started over (cleared, or the device rebooted), in
+which case the whole new log is returned once.
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+from mcp.server.mcpserver import Context
+
+from .connector import execute_mikrotik_command
+from .log_entries import LogDump, id_value, log_dump_script, parse_log_dump
+
+
+async def fetch_log(
+    ctx: Context,
+    device: Optional[str] = None,
+    after: Optional[str] = None,
+    where: Optional[str] = None,
+    header_only: bool = False,
+) -> LogDump:
+    """Run :func:`log_dump_script` on the device and parse it.
+
+    Raises ValueError when the command fails or the router refuses it.
+    """
+    output = await execute_mikrotik_command(
+        log_dump_script(after, where, header_only), ctx, device=device, read_only=True
+    )
+    if output.startswith("Error"):
+        raise ValueError(output.partition("Error: ")[2] or output)
+    return parse_log_dump(output)
+
+
+def newest_id(dump: LogDump, after: Optional[str] = None) -> Optional[str]:
+    """The position to continue from after ``dump``."""
+    ids = [i for i in (after, dump.last_id, *(e.id for e in dump.entries)) if i]
+    return max(ids, key=id_value) if ids else None
+
+
+async def fetch_since(
+    ctx: Context,
+    device: Optional[str],
+    after: Optional[str],
+    where: Optional[str] = None,
+) -> Tuple[LogDump, bool]:
+    """Entries after ``after`` (all of them when None), and whether the log restarted.
+
+    A log whose newest id is below ``after`` was cleared or the device
+    rebooted; its entries are fetched again from the start.
+    """
+    dump = await fetch_log(ctx, device, after, where)
+    if after is None or (dump.last_id is not None and id_value(dump.last_id) >= id_value(after)):
+        return dump, False
+    return await fetch_log(ctx, device, None, where), True
+
+
+class LogCursors:
+    """The last log ``.id`` handed out, per device."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: str) -> Optional[str]:
+        with self._lock:
+            return self._ids.get(device.casefold())
+
+    def set(self, device: str, log_id: Optional[str]) -> None:
+        with self._lock:
+            if log_id is None:
+                self._ids.pop(device.casefold(), None)
+            else:
+                self._ids[device.casefold()] = log_id
+
+    def reset(self, device: str) -> None:
+        self.set(device, None)
+
+
+_cursors = LogCursors()
+
+
+def get_log_cursors() -> LogCursors:
+    return _cursors
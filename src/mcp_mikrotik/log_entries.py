@@ -0,0 +1,234 @@
+"""RouterOS log entries as data.
+
+``/log print`` renders for a terminal: its time column changes format with the
+entry's age and RouterOS version, and topics and message run together.
+:func:`log_dump_script` instead prints the device clock and the newest entry's
+``.id`` once, then each entry as ``id<TAB>time<TAB>topics<TAB>message``;
+:func:`parse_log_dump` turns that into :class:`LogEntry` objects with absolute
+timestamps, so counts, windows and histograms are computed locally from a
+single fetch — and a caller that remembers the last ``.id`` it saw can ask
+for only the entries after it.
+"""
+
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+_ID_RE = re.compile(r"^\*[0-9A-Fa-f]+$")
+
+
+def is_log_id(value: str) -> bool:
+    """True for a RouterOS internal id such as ``*1A2B``."""
+    return bool(_ID_RE.match(value or ""))
+
+
+def id_value(log_id: str) -> int:
+    """``*1A2B`` → ``0x1A2B``, for ordering ids."""
+    return int(log_id[1:], 16)
+
+
+def log_dump_script(
+    after: Optional[str] = None, where: Optional[str] = None, header_only: bool = False
+) -> str:
+    """The console script that dumps the log (see the module docstring).
+
+    ``after`` (an ``.id``) keeps only newer entries and ``where`` adds a
+    ``/log find`` condition such as ``topics~"dhcp"``; the header always
+    reports the newest entry of the whole log.  ``header_only`` prints just
+    the header — where the log ends now.
+    """
+    conditions = []
+    if after is not None:
+        if not is_log_id(after):
+            raise ValueError(f"Invalid log id {after!r}")
+        conditions.append(f".id > {after}")
+    if where:
+        conditions.append(where)
+    find = "/log find" + (" where " + " and ".join(conditions) if conditions else "")
+    header = (
+        ':local ids [/log find]; '
+        ':put ("now\\t" . [/system clock get date] . " " . [/system clock get time] '
+        '. "\\t" . [:pick $ids ([:len $ids] - 1)])'
+    )
+    if header_only:
+        return header
+    return header + (
+        f'; :foreach i in=[{find}] do={{:put ($i . "\\t" . [/log get $i time] . "\\t" . '
+        '[:tostr [/log get $i topics]] . "\\t" . [/log get $i message])}'
+    )
+
+
+LOG_DUMP_SCRIPT = log_dump_script()
+
+SEVERITIES = ("debug", "info", "warning", "error", "critical")
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), 1
+)}
+_ISO = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+_OLD = re.compile(r"^([a-z]{3})/(\d{1,2})(?:/(\d{4}))?$")
+_DIGITS = re.compile(r"\d+")
+
+
+class LogEntry:
+    """One log line: its ``.id``, when (None if unparseable), under which topics, what."""
+
+    __slots__ = ("id", "time", "topics", "message")
+
+    def __init__(
+        self, id: str, time: Optional[datetime], topics: Tuple[str, ...], message: str
+    ) -> None:
+        self.id = id
+        self.time = time
+        self.topics = topics
+        self.message = message
+
+    @property
+    def severity(self) -> str:
+        return next((t for t in self.topics if t in SEVERITIES), "info")
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "time": self.time.isoformat(sep=" ") if self.time else None,
+            "topics": ",".join(self.topics),
+            "message": self.message,
+        }
+
+    def format(self) -> str:
+        stamp = f"{self.time:%Y-%m-%d %H:%M:%S}" if self.time else "?"
+        return f"{stamp} {','.join(self.topics)} {self.message}"
+
+
+class LogDump:
+    """A parsed dump: the device clock, the newest ``.id`` in its log, the entries."""
+
+    __slots__ = ("now", "last_id", "entries")
+
+    def __init__(self, now: Optional[datetime], last_id: Optional[str], entries: List[LogEntry]) -> None:
+        self.now = now
+        self.last_id = last_id
+        self.entries = entries
+
+
+def _parse_date(value: str, now: Optional[datetime]) -> Optional[Tuple[int, int, int]]:
+    value = value.lower()
+    match = _ISO.match(value)
+    if match:
+        return int(match.group(1)), int(match.group(2)), int(match.group(3))
+    match = _OLD.match(value)
+    if match and match.group(1) in _MONTHS:
+        year = int(match.group(3)) if match.group(3) else (now.year if now else 1970)
+        return year, _MONTHS[match.group(1)], int(match.group(2))
+    return None
+
+
+def parse_log_time(value: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """An entry's time column as a datetime, resolved against the device clock.
+
+    Accepts ``2026-10-18 09:15:02`` (RouterOS 7.10+), ``oct/18/2026 09:15:02``,
+    ``oct/18 09:15:02`` (this year) and ``09:15:02`` (today).  A date without
+    a year that would lie in the future belongs to last year.
+    """
+    parts = value.strip().split()
+    if not parts:
+        return None
+    try:
+        clock = datetime.strptime(parts[-1], "%H:%M:%S").time()
+    except ValueError:
+        return None
+    if len(parts) == 1:
+        return datetime.combine(now.date(), clock) if now else None
+    date = _parse_date(parts[0], now)
+    if date is None:
+        return None
+    try:
+        stamp = datetime(*date, clock.hour, clock.minute, clock.second)
+    except ValueError:
+        return None
+    if now and parts[0].count("/") == 1 and stamp - now > timedelta(days=1):
+        stamp = stamp.replace(year=stamp.year - 1)
+    return stamp
+
+
+def parse_log_dump(output: str) -> LogDump:
+    """Parse :func:`log_dump_script` output.
+
+    Raises ValueError if the output is not a dump (the router refused it).
+    """
+    lines = output.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    while lines and not lines[0].strip():
+        lines.pop(0)
+    if not lines or not lines[0].startswith("now\t"):
+        raise ValueError(f"unexpected log output: {output.strip()[:200]!r}")
+
+    _, clock, last_id = (lines[0].split("\t", 2) + [""])[:3]
+    now = parse_log_time(clock)
+    entries: List[LogEntry] = []
+    for line in lines[1:]:
+        fields = line.split("\t", 3)
+        if len(fields) < 4 or not is_log_id(fields[0]):
+            # A message with a line break continues the previous entry.
+            if entries and line.strip():
+                entries[-1].message += "\n" + line
+            continue
+        topics = tuple(t for t in re.split(r"[;,]", fields[2].strip()) if t)
+        entries.append(LogEntry(fields[0], parse_log_time(fields[1], now), topics, fields[3]))
+    return LogDump(now, last_id.strip() if is_log_id(last_id.strip()) else None, entries)
+
+
+def message_prefix(message: str, words: int = 3) -> str:
+    """The first ``words`` words of a message, with digit runs as ``#``.
+
+    Groups messages that differ only in addresses, ports or counters.
+    """
+    return _DIGITS.sub("#", " ".join(message.split()[:words]))
+
+
+def log_statistics(
+    entries: Sequence[LogEntry],
+    now: Optional[datetime],
+    hours: int = 24,
+    top: int = 10,
+) -> dict:
+    """Counts by topic and severity, recent windows, per-hour buckets and top prefixes."""
+    topics: Counter = Counter()
+    severities: Counter = Counter()
+    prefixes: Counter = Counter()
+    buckets: Counter = Counter()
+    last_hour = last_day = 0
+    times: List[datetime] = []
+
+    start = (now.replace(minute=0, second=0) - timedelta(hours=hours - 1)) if now else None
+    for entry in entries:
+        topics.update(entry.topics)
+        severities[entry.severity] += 1
+        prefixes[message_prefix(entry.message)] += 1
+        if entry.time is None:
+            continue
+        times.append(entry.time)
+        if now is not None:
+            age = now - entry.time
+            last_hour += age <= timedelta(hours=1)
+            last_day += age <= timedelta(days=1)
+            if entry.time >= start:
+                buckets[entry.time.replace(minute=0, second=0)] += 1
+
+    per_hour = []
+    if start is not None:
+        per_hour = [
+            (start + timedelta(hours=i), buckets[start + timedelta(hours=i)]) for i in range(hours)
+        ]
+    return {
+        "total": len(entries),
+        "oldest": min(times) if times else None,
+        "newest": max(times) if times else None,
+        "topics": topics.most_common(),
+        "severities": [(s, severities[s]) for s in SEVERITIES if severities[s]],
+        "last_hour": last_hour,
+        "last_day": last_day,
+        "per_hour": per_hour,
+        "top_prefixes": prefixes.most_common(top),
+    }
+
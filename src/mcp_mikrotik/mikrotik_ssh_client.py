@@ -1,11 +1,15 @@
 import io
 import logging
-from typing import Optional
+from typing import Iterator, Optional, Tuple
 
 import paramiko
 
 logger = logging.getLogger(__name__)
 
+# Size of each piece iter_file() yields.  SFTP prefetch keeps several
+# requests of the protocol's own size in flight underneath it.
+SFTP_CHUNK_SIZE = 256 * 1024
+
 class MikroTikSSHClient:
     """SSH client for MikroTik devices."""
 
@@ -91,6 +95,42 @@ class MikroTikSSHClient:
             logger.error(f"Error executing command: {e}")
             raise
 
+    def iter_command_lines(self, command: str, chunk_size: int = 32768) -> Iterator[str]:
+        """Execute a command and yield its output one line at a time.
+
+        Lines are yielded as they arrive, so a large ``print`` can be parsed
+        while it is still being received instead of after it has been
+        buffered whole.  Output on stderr with nothing on stdout is yielded
+        after the channel closes, the way :meth:`execute_command` returns it.
+        """
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        _, stdout, stderr = self.client.exec_command(command)
+        channel = stdout.channel
+        # A consumer that stops early (an error row, a cancelled read) closes
+        # the generator; the channel must be closed too, or a shared
+        # transport runs out of channels one aborted read at a time.
+        try:
+            pending = b""
+            produced = False
+            while True:
+                chunk = channel.recv(chunk_size)
+                if not chunk:
+                    break
+                *lines, pending = (pending + chunk).split(b"\n")
+                for line in lines:
+                    produced = True
+                    yield self._decode_output(line).rstrip("\r")
+            if pending:
+                produced = True
+                yield self._decode_output(pending).rstrip("\r")
+
+            if not produced:
+                yield from self._decode_output(stderr.read()).splitlines()
+        finally:
+            channel.close()
+
     def download_file(self, remote_filename: str) -> bytes:
         """Download a file from the device over SFTP and return its raw bytes.
 
@@ -108,6 +148,57 @@ class MikroTikSSHClient:
         finally:
             sftp.close()
 
+    def iter_file(
+        self,
+        remote_filename: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+        chunk_size: int = SFTP_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """Stream a file from the device over SFTP, ``chunk_size`` bytes at a time.
+
+        Only the bytes from ``offset`` on (``length`` of them, or up to the end)
+        are read, with SFTP prefetch keeping reads in flight so a slow link is
+        not paid one round trip per chunk.  Nothing beyond the current chunk is
+        held in memory.  An ``offset`` past the end of the file raises
+        ValueError.
+        """
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        sftp = self.client.open_sftp()
+        try:
+            with sftp.open(remote_filename, "rb") as fh:
+                size = fh.stat().st_size
+                if offset > size:
+                    raise ValueError(f"Offset {offset} is past the end of the {size}-byte file")
+                end = size if length is None else min(size, offset + length)
+                if end <= offset:
+                    return
+                fh.seek(offset)
+                fh.prefetch(end)
+                position = offset
+                while position < end:
+                    data = fh.read(min(chunk_size, end - position))
+                    if not data:
+                        break
+                    position += len(data)
+                    yield data
+        finally:
+            sftp.close()
+
+    def stat_file(self, remote_filename: str) -> Tuple[int, int]:
+        """Size and modification time (epoch seconds) of a file on the device."""
+        if not self.client:
+            raise Exception("Not connected to MikroTik device")
+
+        sftp = self.client.open_sftp()
+        try:
+            attrs = sftp.stat(remote_filename)
+            return attrs.st_size, int(attrs.st_mtime or 0)
+        finally:
+            sftp.close()
+
     def upload_file(self, remote_filename: str, data: bytes) -> None:
         """Upload raw bytes to a file on the device over SFTP."""
         if not self.client:
@@ -119,6 +210,25 @@ class MikroTikSSHClient:
         finally:
             sftp.close()
 
+    def is_alive(self) -> bool:
+        """Return True if the SSH transport is still usable.
+
+        ``is_active()`` alone only reflects what paramiko has noticed so far; a
+        router that dropped the TCP session silently still looks active.  An
+        SSH_MSG_IGNORE costs one small packet and fails fast on a dead socket,
+        so it is the cheap health check a pooled connection gets on checkout.
+        """
+        if not self.client:
+            return False
+        transport = self.client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
     def disconnect(self):
         """Close SSH connection."""
         if self.client:
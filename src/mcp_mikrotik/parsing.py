@@ -0,0 +1,279 @@
+"""Parse RouterOS ``print`` output into row records.
+
+Most tools hand the router's console text straight back, and the few that need
+a value out of it used to regex it on the spot.  This module is the one place
+that reads that text.  It understands:
+
+* ``print terse`` — one entry per line: ``0 X  chain=forward action=drop``;
+* ``print detail`` — the same, with an entry's attributes continued on
+  indented lines and its comment on a ``;;;`` line;
+* ``print as-value`` — ``key=value`` pairs separated by ``;``.
+
+:func:`iter_rows` consumes any iterable of lines and yields each row as soon as
+the next one starts, so a large table can be parsed straight off the SSH
+channel without ever holding the whole output as one string.  The column
+layout of a plain ``print`` is meant for eyes, not parsers, and is not
+supported.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+# Flag letters whose meaning is the same in every menu.  The legend printed by
+# ``print``/``print detail`` (``Flags: X - disabled, ...``) takes precedence;
+# ``print terse`` prints no legend, so these are what it is decoded with.
+DEFAULT_FLAGS: Mapping[str, str] = {
+    "X": "disabled",
+    "I": "invalid",
+    "D": "dynamic",
+    "A": "active",
+    "R": "running",
+}
+
+# First line of an entry: its console number, then flags and/or attributes.
+_ENTRY = re.compile(r"\s*(\d+)(?:\s+(.*))?$")
+# One ``key=value`` word; a quoted value may contain spaces and escapes.
+_ATTRIBUTE = re.compile(r'([^\s=;"]+)=("(?:[^"\\]|\\.)*"|\S*)')
+_FLAG_WORD = re.compile(r"[A-Za-z*+]+$")
+_LEGEND_ITEM = re.compile(r"([A-Za-z*+])\s+-\s+([^,;]+)")
+_ESCAPE = re.compile(r"\\([0-9A-Fa-f]{2}|.)")
+_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "a": "\a", "b": "\b", "f": "\f", "v": "\v", "_": " "}
+
+# Console replies that mean the command itself was rejected.
+_ERROR_PREFIXES = (
+    "bad command name",
+    "syntax error",
+    "expected ",
+    "failure:",
+    "input does not match",
+    "invalid value",
+)
+
+
+class Row:
+    """One entry of a RouterOS menu.
+
+    ``attrs`` holds the ``key=value`` properties (the comment, if any, under
+    ``"comment"``), ``flags`` the raw flag letters and ``index`` the console
+    number (``None`` for ``as-value`` rows, which carry ``.id`` instead).
+    """
+
+    __slots__ = ("index", "flags", "attrs", "legend")
+
+    def __init__(
+        self,
+        attrs: Dict[str, str],
+        flags: str = "",
+        index: Optional[int] = None,
+        legend: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.attrs = attrs
+        self.flags = flags
+        self.index = index
+        self.legend = legend
+
+    def __getitem__(self, key: str) -> str:
+        return self.attrs[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.attrs
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Row):
+            return NotImplemented
+        return (self.index, self.flags, self.attrs) == (other.index, other.flags, other.attrs)
+
+    def __repr__(self) -> str:
+        return f"Row(index={self.index!r}, flags={self.flags!r}, attrs={self.attrs!r})"
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(key, default)
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.attrs.get(".id")
+
+    @property
+    def flag_names(self) -> Tuple[str, ...]:
+        """The flags spelled out, e.g. ``("disabled", "dynamic")``."""
+        legend = self.legend or {}
+        return tuple(legend.get(c) or DEFAULT_FLAGS.get(c, c) for c in self.flags)
+
+    def has_flag(self, name: str) -> bool:
+        name = name.lower()
+        if name in self.flag_names:
+            return True
+        # as-value rows and the API report flags as properties instead.
+        return self.attrs.get(name) in ("true", "yes")
+
+    @property
+    def disabled(self) -> bool:
+        return self.has_flag("disabled")
+
+    @property
+    def dynamic(self) -> bool:
+        return self.has_flag("dynamic")
+
+    def to_dict(self) -> Dict[str, str]:
+        """Properties as a plain dict, shaped like a RouterOS API reply.
+
+        Each flag is added as ``<name>: "true"``, the way the API reports
+        them, so rows read over SSH and over the API look the same.
+        """
+        row = dict(self.attrs)
+        for name in self.flag_names:
+            row.setdefault(name, "true")
+        return row
+
+
+def unquote(value: str) -> str:
+    """Undo RouterOS console quoting: ``"a \\"b\\""`` → ``a "b"``."""
+    if len(value) < 2 or not (value[0] == value[-1] == '"'):
+        return value
+
+    def replace(match: "re.Match[str]") -> str:
+        esc = match.group(1)
+        if len(esc) == 2:
+            return chr(int(esc, 16))
+        return _ESCAPES.get(esc, esc)
+
+    return _ESCAPE.sub(replace, value[1:-1])
+
+
+def split_attributes(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield the ``(key, value)`` pairs of a line; words without ``=`` are skipped."""
+    for match in _ATTRIBUTE.finditer(text):
+        yield match.group(1), unquote(match.group(2))
+
+
+def parse_legend(line: str) -> Dict[str, str]:
+    """``Flags: X - disabled, I - invalid; D - DYNAMIC`` → ``{"X": "disabled", ...}``."""
+    _, _, body = line.partition(":")
+    return {
+        letter: name.strip().lower().replace(" ", "-")
+        for letter, name in _LEGEND_ITEM.findall(body)
+    }
+
+
+def looks_like_error(line: str) -> bool:
+    """True if a line of output is RouterOS rejecting the command."""
+    return line.strip().lower().startswith(_ERROR_PREFIXES)
+
+
+def _split_flags(rest: str) -> Tuple[str, str]:
+    """Split the flag letters off the start of an entry line."""
+    flags = ""
+    while rest:
+        word, _, tail = rest.partition(" ")
+        if "=" in word or word.startswith(";;;") or not _FLAG_WORD.match(word):
+            break
+        flags += word
+        rest = tail.lstrip()
+    return flags, rest
+
+
+def _absorb(text: str, attrs: Dict[str, str]) -> None:
+    text = text.strip()
+    if text.startswith(";;;"):
+        attrs["comment"] = text[3:].strip()
+    else:
+        attrs.update(split_attributes(text))
+
+
+class RowParser:
+    """Incremental ``print terse``/``print detail`` parser.
+
+    Feed it one line at a time; :meth:`feed` returns the previous row once a
+    line starts the next one, and :meth:`close` returns the last.  This is
+    the push-style core of :func:`iter_rows`, for callers that receive lines
+    from an async source.
+    """
+
+    def __init__(self) -> None:
+        self.legend: Dict[str, str] = {}
+        self._attrs: Optional[Dict[str, str]] = None
+        self._flags = ""
+        self._index: Optional[int] = None
+
+    def feed(self, line: str) -> Optional[Row]:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#") or stripped.startswith("Columns:"):
+            return None
+        if stripped.startswith("Flags:"):
+            # A fresh dict: rows already parsed keep the legend they came with.
+            self.legend = parse_legend(stripped)
+            return None
+
+        match = _ENTRY.match(line)
+        if match:
+            finished = self.close()
+            self._index = int(match.group(1))
+            self._flags, rest = _split_flags(match.group(2) or "")
+            self._attrs = {}
+            _absorb(rest, self._attrs)
+            return finished
+
+        if self._attrs is None:
+            self._attrs, self._flags, self._index = {}, "", None
+        _absorb(stripped, self._attrs)
+        return None
+
+    def close(self) -> Optional[Row]:
+        if self._attrs is None:
+            return None
+        row = Row(self._attrs, self._flags, self._index, self.legend)
+        self._attrs = None
+        return row
+
+
+def iter_rows(lines: Iterable[str]) -> Iterator[Row]:
+    """Parse ``print terse`` or ``print detail`` output, one row at a time.
+
+    ``lines`` can be any iterable — a list, a file, or a generator reading a
+    channel — and each row is yielded as soon as the line after it arrives.
+    Text before the first numbered entry (``print detail`` of a single item
+    prints no number) becomes a row of its own.
+    """
+    parser = RowParser()
+    for line in lines:
+        row = parser.feed(line)
+        if row is not None:
+            yield row
+    row = parser.close()
+    if row is not None:
+        yield row
+
+
+def parse_rows(text: str) -> List[Row]:
+    """Parse ``print terse``/``print detail`` text into a list of rows."""
+    return list(iter_rows(text.splitlines()))
+
+
+def iter_as_value(text: str) -> Iterator[Row]:
+    """Parse ``print as-value`` output (``.id=*1;name=a;.id=*2;name=b``).
+
+    A row ends where a key it already holds appears again.  Values that
+    themselves contain ``;`` cannot be told apart from the separator; ask for
+    such properties with ``print terse`` instead.
+    """
+    attrs: Dict[str, str] = {}
+    for item in text.replace("\r", "").replace("\n", ";").split(";"):
+        key, sep, value = item.strip().partition("=")
+        if not sep or not key:
+            continue
+        if key in attrs:
+            yield Row(attrs)
+            attrs = {}
+        attrs[key] = value
+    if attrs:
+        yield Row(attrs)
+
+
+def parse_as_value(text: str) -> List[Row]:
+    return list(iter_as_value(text))
+
+
+def quote(value: str) -> str:
+    """Quote a value for use in a console command."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$")
+    return f'"{escaped}"'
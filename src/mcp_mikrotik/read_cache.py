@@ -0,0 +1,172 @@
+"""TTL + LRU cache for read command output, per device.
+
+An agent often asks the same question more than once in a conversation —
+``/ip dns print``, ``/interface print`` — and every time the router renders
+the answer again over a fresh connection.  :class:`ReadCache` keeps recent
+read output keyed by (device, normalised command):
+
+* an entry lives for the server's ``read_cache_ttl``, or less for volatile
+  menus (:data:`FAMILY_TTLS`); live readings such as ``monitor`` are never
+  cached;
+* at most ``read_cache_size`` entries are kept, least recently used first out;
+* any command that is not a read drops every entry of its device, and a read
+  that was already running when that happened does not store its (possibly
+  stale) answer.
+
+The cache is off unless ``MIKROTIK_READ_CACHE_SIZE`` is above zero.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from . import config
+from .commands import is_streaming_command, normalise_command
+
+# Menus whose contents change on their own, with the longest an answer from
+# them may be reused (seconds).  The configured TTL still caps them; 0 means
+# never cached.  Matched on the command's menu path, longest prefix first.
+FAMILY_TTLS: Dict[str, float] = {
+    "/log": 5.0,
+    "/system resource": 5.0,
+    "/system health": 5.0,
+    "/system clock": 0.0,
+    "/interface": 10.0,
+    "/queue": 10.0,
+    "/ip firewall connection": 0.0,
+    "/ip dhcp-server lease": 15.0,
+    "/ip arp": 15.0,
+    "/ip neighbor": 15.0,
+    "/ipv6 neighbor": 15.0,
+    "/tool": 0.0,
+}
+_FAMILIES = sorted(FAMILY_TTLS, key=len, reverse=True)
+
+_Key = Tuple[str, str]
+
+
+class ReadCache:
+    """Thread-safe TTL/LRU cache of read output, invalidated per device."""
+
+    def __init__(self, max_entries: int, default_ttl: float) -> None:
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[_Key, Tuple[float, str]]" = OrderedDict()
+        self._by_device: Dict[str, Set[_Key]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def ttl_for(self, command: str) -> float:
+        """How long the output of ``command`` may be reused (0 = never)."""
+        if is_streaming_command(command):
+            return 0.0
+        path = normalise_command(command).lower()
+        if not path.startswith("/"):
+            path = "/" + path
+        for family in _FAMILIES:
+            if path == family or path.startswith(family + " "):
+                return min(FAMILY_TTLS[family], self.default_ttl)
+        return self.default_ttl
+
+    def generation(self, device: str) -> int:
+        """Bumped by every :meth:`invalidate`; pass it back to :meth:`put`."""
+        return self._generations.get(device.casefold(), 0)
+
+    def get(self, device: str, command: str) -> Optional[str]:
+        key = (device.casefold(), normalise_command(command))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._drop_locked(key)
+            self.misses += 1
+            return None
+
+    def put(self, device: str, command: str, output: str, generation: int) -> bool:
+        """Store ``output`` unless the device was invalidated since ``generation``."""
+        ttl = self.ttl_for(command)
+        if ttl <= 0:
+            return False
+        key = (device.casefold(), normalise_command(command))
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return False
+            self._entries[key] = (time.monotonic() + ttl, output)
+            self._entries.move_to_end(key)
+            self._by_device.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, device: str) -> int:
+        """Drop every entry of ``device``; returns how many were dropped."""
+        device = device.casefold()
+        with self._lock:
+            self._generations[device] = self._generations.get(device, 0) + 1
+            keys = self._by_device.pop(device, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += 1
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            for device in self._by_device:
+                self._generations[device] = self._generations.get(device, 0) + 1
+            self._entries.clear()
+            self._by_device.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop_locked(self, key: _Key) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_device.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_device[key[0]]
+
+
+_cache: Optional[ReadCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_read_cache() -> Optional[ReadCache]:
+    """The process-wide cache, or None when it is disabled."""
+    global _cache
+    cfg = config.mikrotik_config
+    if not cfg.read_cache_size:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ReadCache(cfg.read_cache_size, cfg.read_cache_ttl)
+    return _cache
+
+
+def reset_read_cache() -> None:
+    """Drop the cache so the next call rebuilds it from config (tests, reloads)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
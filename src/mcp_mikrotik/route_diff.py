@@ -0,0 +1,118 @@
+"""What changed between two route snapshots.
+
+Reading two ``/ip route print`` dumps side by side does not scale past a few
+hundred routes.  :func:`diff_stores` compares two
+:class:`~mcp_mikrotik.route_store.RouteStore` snapshots — one device at two
+moments, or two devices such as an HA pair — per routing table, by a sorted
+merge: each side's routes are ordered by prefix once, then both are walked
+together in a single pass.  Only the differences are listed, up to a limit;
+the counts cover everything.
+
+A prefix is *changed* when it is on both sides with a different set of
+routes (gateway, distance or active flag).
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .route_store import RouteStore, format_prefix
+
+_Routes = Tuple[Tuple[str, int, bool], ...]
+
+_KEY_MASK = (1 << 128) - 1
+
+
+def _identity(store: RouteStore, index: int) -> int:
+    """Family, prefix and length of a route packed into one int that sorts by address."""
+    return (
+        (store.family[index] << 136)
+        | (store.hi[index] << 72)
+        | (store.lo[index] << 8)
+        | store.length[index]
+    )
+
+
+def _prefix(identity: int) -> str:
+    return format_prefix(identity >> 136, (identity >> 8) & _KEY_MASK, identity & 0xFF)
+
+
+def prefix_groups(store: RouteStore, table: str) -> Iterator[Tuple[int, _Routes]]:
+    """``(identity, routes)`` for each prefix of ``table``, in address order.
+
+    ``routes`` is the sorted tuple of ``(gateway, distance, active)`` of the
+    prefix's routes, so two groups are equal exactly when the routes are.
+    """
+    table_id = store.table_id(table)
+    if table_id is None:
+        return
+    indexes = [i for i, t in enumerate(store.table) if t == table_id]
+    indexes.sort(key=lambda i: _identity(store, i))
+
+    current: Optional[int] = None
+    routes: List[Tuple[str, int, bool]] = []
+    for index in indexes:
+        identity = _identity(store, index)
+        if identity != current:
+            if current is not None:
+                yield current, tuple(sorted(routes))
+            current, routes = identity, []
+        routes.append((store.gateways[store.gateway[index]], store.distance[index],
+                       bool(store.active[index])))
+    if current is not None:
+        yield current, tuple(sorted(routes))
+
+
+def _routes(routes: _Routes) -> List[dict]:
+    return [
+        {"gateway": gateway, "distance": distance, "active": active}
+        for gateway, distance, active in routes
+    ]
+
+
+def diff_stores(
+    old: RouteStore,
+    new: RouteStore,
+    table: Optional[str] = None,
+    limit: int = 100,
+) -> dict:
+    """Prefixes added, removed and changed from ``old`` to ``new``.
+
+    Compares every routing table of either side, or only ``table``.  Each
+    list holds at most ``limit`` entries, in table and address order;
+    ``counts`` and ``truncated`` tell whether there were more.
+    """
+    tables = [table] if table else sorted(set(old.tables) | set(new.tables))
+    limit = max(limit, 0)
+    counts = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+    delta: Dict[str, List[dict]] = {"added": [], "removed": [], "changed": []}
+
+    def record(kind: str, entry: Callable[[], dict]) -> None:
+        # Entries past the limit are only counted, never built.
+        counts[kind] += 1
+        if len(delta[kind]) < limit:
+            delta[kind].append(entry())
+
+    for name in tables:
+        before, after = prefix_groups(old, name), prefix_groups(new, name)
+        a, b = next(before, None), next(after, None)
+        while a is not None or b is not None:
+            if b is None or (a is not None and a[0] < b[0]):
+                record("removed", lambda: {"dst-address": _prefix(a[0]), "routing-table": name,
+                                           "routes": _routes(a[1])})
+                a = next(before, None)
+            elif a is None or b[0] < a[0]:
+                record("added", lambda: {"dst-address": _prefix(b[0]), "routing-table": name,
+                                         "routes": _routes(b[1])})
+                b = next(after, None)
+            else:
+                if a[1] == b[1]:
+                    counts["unchanged"] += 1
+                else:
+                    record("changed", lambda: {"dst-address": _prefix(a[0]), "routing-table": name,
+                                               "before": _routes(a[1]), "after": _routes(b[1])})
+                a, b = next(before, None), next(after, None)
+
+    return {
+        "counts": counts,
+        "truncated": any(counts[kind] > len(entries) for kind, entries in delta.items()),
+        **delta,
+    }
@@ -0,0 +1,284 @@
+"""Routes held column by column, for tables of a million routes.
+
+A full BGP table printed as console text is hundreds of megabytes, and as a
+list of row dicts larger still.  :class:`RouteStore` keeps each route as one
+slot in a handful of typed arrays — the prefix packed into two 64-bit
+halves, its length, an index into the list of distinct gateways, the
+distance, the routing table and the active flag — 26 bytes a route.
+
+:func:`load_routes` fills a store straight off the wire with
+:func:`~mcp_mikrotik.connector.consume_rows`: each row is parsed, packed and
+dropped as it arrives.  :func:`summarise` answers per-gateway, per-length
+and per-table questions from the columns without building a row again.
+"""
+
+import ipaddress
+import json
+import socket
+import sys
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import BinaryIO, Dict, List, Mapping, Optional, Tuple
+
+from .connector import consume_rows
+from .routeros_api import RouterOSApiError
+
+ROUTE_MENUS = ("ip route", "ipv6 route")
+
+_TRUE = ("true", "yes")
+_MASK64 = (1 << 64) - 1
+
+# Column order on disk (see RouteStore.save); arrays are written little-endian.
+_COLUMNS = ("family", "hi", "lo", "length", "gateway", "distance", "table", "active")
+_FORMAT = 1
+
+
+def parse_prefix(text: str) -> Tuple[int, int, int]:
+    """``"10.1.0.0/16"`` → ``(4, <network as int>, 16)``; a bare address is a host prefix.
+
+    Host bits are ignored.  Raises ValueError for anything else.
+    """
+    address, slash, length = text.strip().partition("/")
+    # inet_pton is an order of magnitude faster than ipaddress, which
+    # matters for a million routes, and as strict about the address.
+    family, width, version = (
+        (socket.AF_INET6, 128, 6) if ":" in address else (socket.AF_INET, 32, 4)
+    )
+    try:
+        key = int.from_bytes(socket.inet_pton(family, address), "big")
+    except OSError:
+        raise ValueError(f"not an address or prefix: {text!r}") from None
+    bits = int(length) if length.isdigit() else width
+    if (slash and not length.isdigit()) or bits > width:
+        raise ValueError(f"not an address or prefix: {text!r}")
+    return version, key >> (width - bits) << (width - bits), bits
+
+
+def format_prefix(version: int, key: int, length: int) -> str:
+    network = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+    return str(network((key, length)))
+
+
+class Route:
+    """One route, as read back from a store."""
+
+    __slots__ = ("dst", "gateway", "distance", "table", "active")
+
+    def __init__(self, dst: str, gateway: str, distance: int, table: str, active: bool) -> None:
+        self.dst = dst
+        self.gateway = gateway
+        self.distance = distance
+        self.table = table
+        self.active = active
+
+    def to_dict(self) -> dict:
+        return {
+            "dst-address": self.dst,
+            "gateway": self.gateway,
+            "distance": self.distance,
+            "routing-table": self.table,
+            "active": self.active,
+        }
+
+
+class RouteStore:
+    """Routes in typed arrays, one slot per route.
+
+    Gateways and routing tables are interned: the columns hold an index into
+    :attr:`gateways` / :attr:`tables`.  With ``active_only`` inactive routes
+    are not stored at all.
+    """
+
+    def __init__(self, active_only: bool = True) -> None:
+        self.active_only = active_only
+        self.family = array("B")
+        self.hi = array("Q")
+        self.lo = array("Q")
+        self.length = array("B")
+        self.gateway = array("I")
+        self.distance = array("B")
+        self.table = array("H")
+        self.active = array("B")
+        self.gateways: List[str] = []
+        self.tables: List[str] = []
+        self._gateway_ids: Dict[str, int] = {}
+        self._table_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.family)
+
+    @staticmethod
+    def _intern(names: List[str], ids: Dict[str, int], name: str) -> int:
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(names)
+            names.append(name)
+        return index
+
+    def table_id(self, table: str) -> Optional[int]:
+        return self._table_ids.get(table)
+
+    def add(self, dst: str, gateway: str, distance: int, table: str, active: bool) -> bool:
+        """Append a route; False if it is skipped (inactive, or not a prefix)."""
+        if self.active_only and not active:
+            return False
+        try:
+            version, key, length = parse_prefix(dst)
+        except ValueError:
+            return False
+        self.family.append(version)
+        self.hi.append(key >> 64)
+        self.lo.append(key & _MASK64)
+        self.length.append(length)
+        self.gateway.append(self._intern(self.gateways, self._gateway_ids, gateway))
+        self.distance.append(min(max(distance, 0), 255))
+        self.table.append(self._intern(self.tables, self._table_ids, table))
+        self.active.append(1 if active else 0)
+        return True
+
+    def add_row(self, row: Mapping[str, str]) -> bool:
+        """Append the route a row of ``/ip route`` or ``/ipv6 route`` describes.
+
+        Rows are shaped as :func:`~mcp_mikrotik.connector.fetch_rows` returns
+        them.  Disabled routes and rows without a destination are skipped.
+        """
+        dst = row.get("dst-address")
+        if not dst or row.get("disabled") in _TRUE:
+            return False
+        gateway = row.get("gateway") or row.get("immediate-gw") or ""
+        if not gateway and (row.get("blackhole") in _TRUE or row.get("type") == "blackhole"):
+            gateway = "blackhole"
+        try:
+            distance = int(row.get("distance") or 0)
+        except ValueError:
+            distance = 0
+        table = row.get("routing-table") or row.get("routing-mark") or "main"
+        return self.add(dst, gateway, distance, table, row.get("active") in _TRUE)
+
+    def key(self, index: int) -> int:
+        return (self.hi[index] << 64) | self.lo[index]
+
+    def prefix(self, index: int) -> str:
+        return format_prefix(self.family[index], self.key(index), self.length[index])
+
+    def route(self, index: int) -> Route:
+        return Route(
+            self.prefix(index),
+            self.gateways[self.gateway[index]],
+            self.distance[index],
+            self.tables[self.table[index]],
+            bool(self.active[index]),
+        )
+
+    def _columns(self) -> Tuple[array, ...]:
+        return tuple(getattr(self, name) for name in _COLUMNS)
+
+    def nbytes(self) -> int:
+        """Memory held by the columns (not counting the interned names)."""
+        return sum(column.itemsize * len(column) for column in self._columns())
+
+    def save(self, fh: BinaryIO, meta: Optional[dict] = None) -> None:
+        """Write the store to a binary file: a JSON header line, then each column.
+
+        ``meta`` is stored in the header alongside the store's own fields.
+        """
+        header = {
+            **(meta or {}),
+            "format": _FORMAT,
+            "count": len(self),
+            "active_only": self.active_only,
+            "gateways": self.gateways,
+            "tables": self.tables,
+        }
+        fh.write(json.dumps(header, ensure_ascii=False).encode("utf-8") + b"\n")
+        for column in self._columns():
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            fh.write(column.tobytes())
+
+    @classmethod
+    def load(cls, fh: BinaryIO) -> Tuple["RouteStore", dict]:
+        """Read a store written by :meth:`save`; returns it with its header.
+
+        Raises ValueError if the file is not a route store or is cut short.
+        """
+        header = read_header(fh)
+        store = cls(header["active_only"])
+        store.gateways = list(header["gateways"])
+        store.tables = list(header["tables"])
+        store._gateway_ids = {name: i for i, name in enumerate(store.gateways)}
+        store._table_ids = {name: i for i, name in enumerate(store.tables)}
+        count = header["count"]
+        for column in store._columns():
+            data = fh.read(column.itemsize * count)
+            if len(data) != column.itemsize * count:
+                raise ValueError("route store file is truncated")
+            column.frombytes(data)
+            if sys.byteorder == "big":
+                column.byteswap()
+        return store, header
+
+
+def read_header(fh: BinaryIO) -> dict:
+    """The JSON header of a file written by :meth:`RouteStore.save`."""
+    try:
+        header = json.loads(fh.readline().decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        header = None
+    if not isinstance(header, dict) or header.get("format") != _FORMAT:
+        raise ValueError("not a route store file")
+    return header
+
+
+async def load_routes(device: str, active_only: bool = True) -> RouteStore:
+    """Stream the device's IPv4 and IPv6 routes into a new store.
+
+    A device without IPv6 just has no IPv6 routes.  Raises ValueError (or
+    RouterOSApiError over the API) if the IPv4 routes cannot be read.
+    """
+    store = RouteStore(active_only)
+    await consume_rows(ROUTE_MENUS[0], store.add_row, device=device)
+    try:
+        await consume_rows(ROUTE_MENUS[1], store.add_row, device=device)
+    except (ValueError, RouterOSApiError):
+        pass
+    return store
+
+
+def summarise(store: RouteStore, top: int = 10, table: Optional[str] = None) -> dict:
+    """Route counts by table, family and prefix length, and the ``top`` gateways.
+
+    ``table`` limits everything to one routing table.
+    """
+    if table is None:
+        selected = None
+    else:
+        table_id = store.table_id(table)
+        selected = [t == table_id for t in store.table] if table_id is not None else []
+
+    def column(values: array):
+        return values if selected is None else compress(values, selected)
+
+    families = Counter(column(store.family))
+    lengths = Counter(zip(column(store.family), column(store.length)))
+    gateways = Counter(column(store.gateway))
+    tables = Counter(column(store.table))
+
+    histogram: Dict[str, Dict[str, int]] = {}
+    for (version, length), count in sorted(lengths.items()):
+        histogram.setdefault(f"ipv{version}", {})[f"/{length}"] = count
+
+    return {
+        "routes": sum(families.values()),
+        "active": sum(column(store.active)),
+        "families": {f"ipv{version}": count for version, count in sorted(families.items())},
+        "tables": {store.tables[index]: count for index, count in tables.most_common()},
+        "prefix_lengths": histogram,
+        "gateways": len(gateways),
+        "top_gateways": [
+            {"gateway": store.gateways[index], "routes": count}
+            for index, count in gateways.most_common(max(top, 0))
+        ],
+    }
@@ -0,0 +1,270 @@
+"""Offline longest-prefix match against a snapshot of a device's routes.
+
+``/ip route check`` answers one destination per command, so checking which
+route serves each of thousands of customer prefixes costs thousands of round
+trips.  A :class:`RouteSnapshot` reads the device's IPv4 and IPv6 routes once
+into a :class:`~mcp_mikrotik.route_store.RouteStore` and, on the first lookup
+in a routing table, indexes that table's prefixes in sorted arrays per prefix
+length (:class:`PrefixIndex`).  A lookup is a binary search per length in
+use, without touching the router.  Snapshots are saved to
+the data directory (:class:`RouteSnapshots`), so earlier ones can be
+compared with later ones (:mod:`~mcp_mikrotik.route_diff`).
+
+Like the router's forwarding table, a snapshot holds only active routes
+unless asked for all of them; when a prefix has several routes the active
+one with the lowest distance is preferred.  In a snapshot of all routes a
+prefix none of whose routes is active is passed over for the next shorter
+one, as the router would forward by that.
+"""
+
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import config
+from .route_store import Route, RouteStore, load_routes, parse_prefix, read_header
+from .storage import device_dir, safe_name
+
+
+class PrefixIndex:
+    """Prefixes ``width`` bits wide, for longest-prefix match.
+
+    Per prefix length, the network bits of each prefix (its key shifted past
+    the host bits) are kept in a sorted array, beside the value — a row
+    index — stored for it.  A lookup bisects the lengths in use from the
+    longest down, at most 33 binary searches for IPv4, and a prefix costs
+    about 12 bytes with no object of its own.  Add every prefix, then
+    :meth:`freeze` before looking up.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self._pending: Dict[int, List[int]] = {}
+        self._keys: Dict[int, Sequence[int]] = {}
+        self._values: Dict[int, array] = {}
+        self._lengths: List[int] = []
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self._values.values())
+
+    def add(self, key: int, length: int, value: int) -> None:
+        """Add ``value`` (below 2**32) for the prefix ``key/length``; a prefix may have several."""
+        bits = key >> (self.width - length)
+        self._pending.setdefault(length, []).append(bits << 32 | value)
+
+    def freeze(self) -> None:
+        """Sort what was added into the lookup arrays."""
+        for length, packed in self._pending.items():
+            packed.sort()
+            keys = [entry >> 32 for entry in packed]
+            # Network bits of prefixes up to /64 fit an unsigned 64-bit array.
+            self._keys[length] = array("Q", keys) if length <= 64 else keys
+            self._values[length] = array("I", [entry & 0xFFFFFFFF for entry in packed])
+        self._pending = {}
+        self._lengths = sorted(self._keys, reverse=True)
+
+    def lookup(
+        self,
+        key: int,
+        length: Optional[int] = None,
+        usable: Optional[Callable[[List[int]], bool]] = None,
+    ) -> Optional[Tuple[int, int, List[int]]]:
+        """``(prefix key, prefix length, values)`` of the longest prefix covering ``key/length``.
+
+        ``length`` defaults to a host address.  Values come in the order they
+        were added.  A prefix whose values ``usable`` rejects is skipped for
+        the next shorter one.  Returns None if no prefix covers it.
+        """
+        if length is None:
+            length = self.width
+        for prefix_length in self._lengths:
+            if prefix_length > length:
+                continue
+            shift = self.width - prefix_length
+            bits = key >> shift
+            keys = self._keys[prefix_length]
+            start = bisect_left(keys, bits)
+            if start < len(keys) and keys[start] == bits:
+                end = bisect_right(keys, bits, start)
+                values = list(self._values[prefix_length][start:end])
+                if usable is None or usable(values):
+                    return bits << shift, prefix_length, values
+        return None
+
+
+class RouteSnapshot:
+    """A device's routes at one moment, indexed per routing table and address family."""
+
+    def __init__(
+        self,
+        device: str,
+        store: RouteStore,
+        taken_at: Optional[str] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> None:
+        self.device = device
+        self.store = store
+        self.taken_at = taken_at or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        # Set once saved: the file name stem, the time stamp without separators.
+        self.id = snapshot_id
+        self._indexes: Dict[Tuple[int, int], PrefixIndex] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active_only(self) -> bool:
+        return self.store.active_only
+
+    def _index(self, table: str, version: int) -> Optional[PrefixIndex]:
+        table_id = self.store.table_id(table)
+        if table_id is None:
+            return None
+        with self._lock:
+            index = self._indexes.get((table_id, version))
+            if index is None:
+                index = self._indexes[(table_id, version)] = self._build(table_id, version)
+        return index
+
+    def _build(self, table_id: int, version: int) -> PrefixIndex:
+        """Index the routes of one table and family by row."""
+        store = self.store
+        index = PrefixIndex(32 if version == 4 else 128)
+        hi, lo, lengths = store.hi, store.lo, store.length
+        for row, (table, family) in enumerate(zip(store.table, store.family)):
+            if table == table_id and family == version:
+                index.add(hi[row] << 64 | lo[row], lengths[row], row)
+        index.freeze()
+        return index
+
+    def lookup(self, destination: str, table: str = "main") -> Optional[List[Route]]:
+        """The routes of the longest prefix covering ``destination``, preferred first.
+
+        ``destination`` is an address or a prefix.  Raises ValueError if it
+        is neither.  Prefixes with no active route are skipped, as the
+        router forwards by the next shorter one.
+        """
+        version, key, length = parse_prefix(destination)
+        index = self._index(table, version)
+        if index is None:
+            return None
+        store = self.store
+        usable = None if store.active_only else (lambda rows: any(store.active[row] for row in rows))
+        found = index.lookup(key, length, usable)
+        if found is None:
+            return None
+        rows = sorted(found[2], key=lambda row: (not store.active[row], store.distance[row]))
+        return [store.route(row) for row in rows]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Routes per table and family: ``{"main": {"ipv4": 12, "ipv6": 3}}``."""
+        counts: Dict[str, Dict[str, int]] = {}
+        store = self.store
+        for (table_id, version), count in sorted(Counter(zip(store.table, store.family)).items()):
+            counts.setdefault(store.tables[table_id], {})[f"ipv{version}"] = count
+        return dict(sorted(counts.items()))
+
+
+async def take_route_snapshot(device: str, active_only: bool = True) -> RouteSnapshot:
+    """Stream the device's routes into a new snapshot (see :func:`load_routes`)."""
+    return RouteSnapshot(device, await load_routes(device, active_only))
+
+
+def _snapshot_dir(device: str) -> Path:
+    return device_dir("routes", device)
+
+
+class RouteSnapshots:
+    """Route snapshots per device.
+
+    Every snapshot is saved as ``<data dir>/routes/<device>/<id>.routes``,
+    the newest ``MIKROTIK_ROUTE_SNAPSHOT_KEEP`` of them kept; the latest is
+    also held in memory for lookups.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, RouteSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get(self, device: str) -> Optional[RouteSnapshot]:
+        """The device's latest snapshot, read from disk after a restart."""
+        with self._lock:
+            snapshot = self._snapshots.get(device.casefold())
+        if snapshot is None:
+            ids = self.ids(device)
+            if ids:
+                snapshot = self.load(device, ids[-1])
+                with self._lock:
+                    self._snapshots.setdefault(device.casefold(), snapshot)
+        return snapshot
+
+    def put(self, snapshot: RouteSnapshot, protect: Optional[str] = None) -> None:
+        """Save ``snapshot`` and make it the device's latest.
+
+        Snapshots beyond the newest ``MIKROTIK_ROUTE_SNAPSHOT_KEEP`` are
+        removed, except ``protect`` (the id of one about to be compared with).
+        """
+        directory = _snapshot_dir(snapshot.device)
+        stem = snapshot.taken_at.replace("-", "").replace(":", "")
+        snapshot_id, n = stem, 1
+        while (directory / f"{snapshot_id}.routes").exists():
+            n += 1
+            snapshot_id = f"{stem}-{n}"
+        tmp = directory / f"{snapshot_id}.tmp"
+        with open(tmp, "wb") as fh:
+            snapshot.store.save(fh, {"device": snapshot.device, "taken_at": snapshot.taken_at})
+        os.replace(tmp, directory / f"{snapshot_id}.routes")
+        snapshot.id = snapshot_id
+
+        keep = config.mikrotik_config.route_snapshot_keep
+        if keep:
+            for old in self.ids(snapshot.device)[:-keep]:
+                if old != protect:
+                    (directory / f"{old}.routes").unlink(missing_ok=True)
+        with self._lock:
+            self._snapshots[snapshot.device.casefold()] = snapshot
+
+    def ids(self, device: str) -> List[str]:
+        """Ids of the device's saved snapshots, oldest first."""
+        def order(path: Path):
+            stem, _, n = path.stem.partition("-")
+            return stem, int(n or 1)
+        return [path.stem for path in sorted(_snapshot_dir(device).glob("*.routes"), key=order)]
+
+    def load(self, device: str, snapshot_id: str) -> RouteSnapshot:
+        """A saved snapshot.  Raises ValueError if there is no such snapshot."""
+        path = _snapshot_dir(device) / f"{safe_name(snapshot_id)}.routes"
+        if not path.is_file():
+            raise ValueError(f"no route snapshot '{snapshot_id}' of '{device}'")
+        with open(path, "rb") as fh:
+            store, header = RouteStore.load(fh)
+        return RouteSnapshot(header.get("device", device), store, header.get("taken_at"), path.stem)
+
+    def describe(self, device: str) -> List[dict]:
+        """``{"id", "taken_at", "active_only", "routes"}`` of each saved snapshot, oldest first."""
+        described = []
+        for snapshot_id in self.ids(device):
+            with open(_snapshot_dir(device) / f"{snapshot_id}.routes", "rb") as fh:
+                header = read_header(fh)
+            described.append({
+                "id": snapshot_id,
+                "taken_at": header.get("taken_at"),
+                "active_only": header["active_only"],
+                "routes": header["count"],
+            })
+        return described
+
+    def clear(self) -> None:
+        """Forget the snapshots held in memory (the saved ones stay)."""
+        with self._lock:
+            self._snapshots.clear()
+
+
+_snapshots = RouteSnapshots()
+
+
+def get_route_snapshots() -> RouteSnapshots:
+    return _snapshots
@@ -0,0 +1,335 @@
+"""Native RouterOS API client (TCP 8728, TLS 8729).
+
+The SSH path asks the router to render human-formatted console text and then
+scrapes it; the API returns the same data as attribute words, which is cheaper
+for the router to produce and needs no parsing heuristics.  This module speaks
+the wire protocol directly:
+
+* a **word** is a length-prefixed byte string (1–5 byte length encoding);
+* a **sentence** is a run of words closed by an empty word;
+* every request carries a ``.tag`` so replies can be matched to it, which lets
+  many requests be in flight on one socket at the same time.
+
+Replies are ``!re`` (one row), ``!done`` (end of reply), ``!trap`` (error,
+followed by ``!done``), ``!empty`` (no rows, RouterOS 7.18+) and ``!fatal``
+(the router is closing the connection).
+"""
+
+import asyncio
+import itertools
+import logging
+import ssl
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+API_PORT = 8728
+API_SSL_PORT = 8729
+
+
+class RouterOSApiError(Exception):
+    """Raised when the router answers a request with ``!trap`` or ``!fatal``."""
+
+
+# ---------------------------------------------------------------------------
+# Wire encoding
+# ---------------------------------------------------------------------------
+
+def encode_length(length: int) -> bytes:
+    """Encode a word length with the API's variable-length prefix."""
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, "big")
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, "big")
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, "big")
+    return b"\xf0" + length.to_bytes(4, "big")
+
+
+def encode_sentence(words: Sequence[str]) -> bytes:
+    out = bytearray()
+    for word in words:
+        data = word.encode("utf-8")
+        out += encode_length(len(data))
+        out += data
+    out += b"\x00"
+    return bytes(out)
+
+
+async def read_length(reader: asyncio.StreamReader) -> int:
+    first = (await reader.readexactly(1))[0]
+    if first < 0x80:
+        return first
+    if first < 0xC0:
+        rest = await reader.readexactly(1)
+        return ((first & 0x3F) << 8) | rest[0]
+    if first < 0xE0:
+        rest = await reader.readexactly(2)
+        return ((first & 0x1F) << 16) | int.from_bytes(rest, "big")
+    if first < 0xF0:
+        rest = await reader.readexactly(3)
+        return ((first & 0x0F) << 24) | int.from_bytes(rest, "big")
+    return int.from_bytes(await reader.readexactly(4), "big")
+
+
+def _decode_word(data: bytes) -> str:
+    # Same fallback chain as the SSH client: RouterOS stores text in the
+    # device's locale, not necessarily UTF-8.
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+async def read_sentence(reader: asyncio.StreamReader) -> List[str]:
+    words: List[str] = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        words.append(_decode_word(await reader.readexactly(length)))
+
+
+def parse_attributes(words: Sequence[str]) -> Dict[str, str]:
+    """Turn ``=key=value`` words into a dict; other words are ignored."""
+    attrs: Dict[str, str] = {}
+    for word in words:
+        if word.startswith("="):
+            key, _, value = word[1:].partition("=")
+            attrs[key] = value
+    return attrs
+
+
+def command_path(menu: str, verb: str = "print") -> str:
+    """``"ip firewall filter"`` / ``"/ip/firewall/filter"`` → ``/ip/firewall/filter/print``."""
+    parts = [p for p in menu.replace("/", " ").split() if p]
+    return "/" + "/".join(parts + [verb])
+
+
+def _print_words(
+    menu: str,
+    proplist: Optional[Sequence[str]] = None,
+    queries: Optional[Sequence[str]] = None,
+) -> List[str]:
+    words = [command_path(menu)]
+    if proplist:
+        words.append(f"=.proplist={','.join(proplist)}")
+    for query in queries or ():
+        words.append(query if query.startswith("?") else f"?{query}")
+    return words
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class _Pending:
+    __slots__ = ("future", "rows", "trap", "on_row", "error")
+
+    def __init__(
+        self, future: asyncio.Future, on_row: Optional[Callable[[Dict[str, str]], None]] = None
+    ) -> None:
+        self.future = future
+        self.rows: List[Dict[str, str]] = []
+        self.trap: Optional[str] = None
+        self.on_row = on_row
+        self.error: Optional[Exception] = None
+
+
+class RouterOSApiClient:
+    """Asyncio RouterOS API connection with tagged, concurrent requests.
+
+    One background task reads every reply sentence and routes it by its
+    ``.tag`` to the request that is waiting for it, so callers can ``await``
+    any number of :meth:`talk` calls concurrently over the same socket.
+
+    TLS (``use_ssl``) does not verify the router's certificate, matching the
+    SSH client's acceptance of unknown host keys: RouterOS ships api-ssl with
+    a self-signed certificate, or with none at all.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        port: Optional[int] = None,
+        use_ssl: bool = False,
+        timeout: float = 10.0,
+    ) -> None:
+        self.host = host
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.port = port or (API_SSL_PORT if use_ssl else API_PORT)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, _Pending] = {}
+        self._tags = itertools.count(1)
+        self._closed = True
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def connect(self) -> None:
+        """Open the socket, start the reply reader and log in."""
+        ssl_context = None
+        if self.use_ssl:
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            # Certificate-less api-ssl services only offer anonymous DH.
+            ssl_context.set_ciphers("ALL:@SECLEVEL=0")
+
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl_context),
+            timeout=self.timeout,
+        )
+        self._closed = False
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_replies())
+        try:
+            await self.talk(
+                ["/login", f"=name={self.username}", f"=password={self.password}"]
+            )
+        except BaseException:
+            await self.close()
+            raise
+
+    async def talk(
+        self,
+        words: Sequence[str],
+        on_row: Optional[Callable[[Dict[str, str]], None]] = None,
+    ) -> List[Dict[str, str]]:
+        """Send one command sentence and return its ``!re`` rows.
+
+        With ``on_row``, each row is handed to it as it arrives instead of
+        being collected, and the list returned is empty; an exception from
+        ``on_row`` fails the request once the reply is complete.  Raises :class:`RouterOSApiError` on ``!trap``/``!fatal`` and
+        :class:`ConnectionError` if the connection is (or becomes) closed.
+        """
+        if self._closed or self._writer is None:
+            raise ConnectionError(f"RouterOS API connection to {self.host} is closed")
+
+        tag = str(next(self._tags))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tag] = _Pending(future, on_row)
+        try:
+            self._writer.write(encode_sentence([*words, f".tag={tag}"]))
+            await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(tag, None)
+
+    async def print_rows(
+        self,
+        menu: str,
+        proplist: Optional[Sequence[str]] = None,
+        queries: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, str]]:
+        """Run ``print`` on a menu and return its rows as dicts.
+
+        ``proplist`` limits the returned attributes (``.proplist``), which
+        also limits the work the router does; ``queries`` are raw API query
+        words such as ``?name=pool1`` or ``?disabled=false``.
+        """
+        return await self.talk(_print_words(menu, proplist, queries))
+
+    async def stream_rows(
+        self,
+        menu: str,
+        consumer: Callable[[Dict[str, str]], None],
+        proplist: Optional[Sequence[str]] = None,
+        queries: Optional[Sequence[str]] = None,
+    ) -> int:
+        """:meth:`print_rows`, handing each row to ``consumer`` as it arrives.
+
+        Returns the number of rows.
+        """
+        count = 0
+
+        def on_row(row: Dict[str, str]) -> None:
+            nonlocal count
+            count += 1
+            consumer(row)
+
+        await self.talk(_print_words(menu, proplist, queries), on_row=on_row)
+        return count
+
+    async def close(self) -> None:
+        if self._closed and self._writer is None:
+            return
+        self._closed = True
+        if self._reader_task is not None and not self._reader_task.done():
+            self._reader_task.cancel()
+        if self._writer is not None:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except Exception:
+                logger.debug("Error closing RouterOS API socket", exc_info=True)
+            self._writer = None
+        self._fail_pending(ConnectionError(f"RouterOS API connection to {self.host} closed"))
+
+    # ------------------------------------------------------------------
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                sentence = await read_sentence(self._reader)
+                if sentence:
+                    self._dispatch(sentence)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._closed = True
+            self._fail_pending(ConnectionError(f"RouterOS API connection lost: {exc}"))
+
+    def _dispatch(self, sentence: List[str]) -> None:
+        reply, words = sentence[0], sentence[1:]
+        tag = next((w[5:] for w in words if w.startswith(".tag=")), None)
+
+        if reply == "!fatal":
+            message = words[0] if words else "fatal error"
+            self._closed = True
+            self._fail_pending(RouterOSApiError(message))
+            return
+
+        pending = self._pending.get(tag) if tag is not None else None
+        if pending is None or pending.future.done():
+            logger.debug(f"Dropping unmatched RouterOS API reply {reply} (tag={tag})")
+            return
+
+        if reply == "!re":
+            row = parse_attributes(words)
+            if pending.on_row is None:
+                pending.rows.append(row)
+            elif pending.error is None:
+                try:
+                    pending.on_row(row)
+                except Exception as exc:
+                    pending.error = exc
+        elif reply == "!trap":
+            pending.trap = parse_attributes(words).get("message", "trap")
+        elif reply == "!done":
+            if pending.trap is not None:
+                pending.future.set_exception(RouterOSApiError(pending.trap))
+            elif pending.error is not None:
+                pending.future.set_exception(pending.error)
+            else:
+                # Replies to commands like /login carry their result on !done.
+                done_attrs = parse_attributes(words)
+                if done_attrs and not pending.rows:
+                    pending.rows.append(done_attrs)
+                pending.future.set_result(pending.rows)
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for pending in list(self._pending.values()):
+            if not pending.future.done():
+                pending.future.set_exception(exc)
@@ -2,9 +2,11 @@ import logging
 import re
 import threading
 import time
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Sequence
 
 from .mikrotik_ssh_client import MikroTikSSHClient
+from .shell_reactor import get_shell_reactor
+from .terminal import TerminalDecoder, strip_ansi
 
 logger = logging.getLogger(__name__)
 
@@ -13,41 +15,95 @@ logger = logging.getLogger(__name__)
 #   [admin@MikroTik] <SAFE> >
 _PROMPT_RE = re.compile(r'\[.+?@.+?\] (?:<SAFE> )?> ?$', re.MULTILINE)
 
-# Strip ANSI/VT escape sequences that MikroTik emits on interactive shells
-_ANSI_RE = re.compile(
-    r'\x1b(?:'
-    r'\[[0-9;]*[mABCDEFGHJKLMSTfhilmnprsu]'
-    r'|[()][0-9A-Za-z]'
-    r'|\[?\?[0-9]+[hl]'
-    r'|\[\d*[ABCDEFGHJKLMST]'
-    r'|\[c'
-    r'|Z'
-    r')'
-)
-
-# The RouterOS console treats the session as a real terminal: it measures the
-# screen by moving the cursor to the extremes and asking where it ended up, and
-# probes the terminal type. If nothing answers, the console stays
-# half-initialised — slow to render, and RouterOS closes the channel outright
-# when Ctrl-X asks it to redraw for safe mode. Answer as a healthy 220x50 VT.
-_TERMINAL_QUERIES = (
-    ('\x1b[6n', '\x1b[50;220R'),   # DSR: report cursor position
-    ('\x1bZ', '\x1b[?6c'),         # DECID: identify terminal
-    ('\x1b[c', '\x1b[?6c'),        # DA: device attributes
-)
-
 # End-of-command sentinel for the safe-mode shell (see execute()).  The echoed
 # command line contains it inside quotes; the output occurrence stands alone.
 _EOC = "__MCP_SAFE_MODE_EOC__"
-_EOC_LINE_RE = re.compile(rf'^{_EOC}\s*$', re.MULTILINE)
+
+# Sentinels for execute_batch(), numbered per command: OK is chained after the
+# command and only prints if it succeeded; END is sent on a line of its own
+# and always prints, closing that command's output.  The console global keeps
+# the commands after a failure from running when the batch stops on errors.
+_BATCH_OK = "__MCP_SAFE_MODE_OK_{}__"
+_BATCH_END = "__MCP_SAFE_MODE_END_{}__"
+_BATCH_FLAG = "mcpBatchOk"
+_BATCH_RUN = "mcpBatchRun"
+_BATCH_TIMEOUT_PER_COMMAND = 1.0
+
+# Console lines that start with a prompt are echoes of what was typed.
+_PROMPT_PREFIX_RE = re.compile(r'^\[[^\]\s]+@[^\]]+\] ')
 
 # A redraw can leave a prompt fragment without its trailing "> " on its own
 # line; treat those as prompt noise too when cleaning command output.
 _PROMPT_NOISE_RE = re.compile(r'^\[.+?@.+?\] (?:<SAFE> ?)?>? ?$')
 
 
-def _strip_ansi(text: str) -> str:
-    return _ANSI_RE.sub('', text)
+class BatchResult:
+    """Outcome of one command of :meth:`SafeModeManager.execute_batch`."""
+
+    __slots__ = ("command", "status", "output")
+
+    OK = "ok"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __init__(self, command: str, status: str, output: str = "") -> None:
+        self.command = command
+        self.status = status
+        self.output = output
+
+    @property
+    def ok(self) -> bool:
+        return self.status == self.OK
+
+    def to_dict(self) -> dict:
+        return {"command": self.command, "status": self.status, "output": self.output}
+
+
+def _is_batch_noise(line: str) -> bool:
+    """True for echoes, prompts and sentinel fragments in batch output.
+
+    Every line of a batch carries a quoted sentinel or the console globals,
+    so an echo is told by those (or by the prompt before it), never by the
+    command's text: real output may quote a command too.
+    """
+    if not line:
+        return False
+    if _PROMPT_PREFIX_RE.match(line) or _PROMPT_RE.match(line) or _PROMPT_NOISE_RE.match(line):
+        return True
+    return '"__MCP_SAFE_MODE_' in line or _BATCH_FLAG in line or _BATCH_RUN in line
+
+
+def _split_batch_output(raw: str, commands: Sequence[str], stop_on_error: bool) -> List[BatchResult]:
+    """Split the shell output of a batch back into one result per command."""
+    results: List[BatchResult] = []
+    current: List[str] = []
+    succeeded = False
+    for line in strip_ansi(raw).replace('\r\n', '\n').replace('\r', '\n').split('\n'):
+        stripped = line.strip()
+        i = len(results)
+        if i >= len(commands):
+            break
+        if stripped == _BATCH_OK.format(i):
+            succeeded = True
+        elif stripped == _BATCH_END.format(i):
+            output = '\n'.join(current).strip()
+            if succeeded:
+                status = BatchResult.OK
+            elif stop_on_error and any(r.status != BatchResult.OK for r in results):
+                status = BatchResult.SKIPPED
+            else:
+                status = BatchResult.FAILED
+            results.append(BatchResult(commands[i], status, output))
+            current, succeeded = [], False
+        elif not _is_batch_noise(stripped):
+            current.append(line)
+
+    # The read timed out or the session died before every END arrived.
+    for command in commands[len(results):]:
+        results.append(BatchResult(
+            command, BatchResult.FAILED, "Error: no result before the batch timed out"
+        ))
+    return results
 
 
 class SafeModeManager:
@@ -110,6 +166,7 @@ class SafeModeManager:
             channel.settimeout(1.0)
             self._ssh = ssh
             self._channel = channel
+            get_shell_reactor().register(channel)
 
             # Wait for the initial shell prompt, answering RouterOS's
             # first-login dialogs on the way.
@@ -163,6 +220,59 @@ class SafeModeManager:
             raw = self._read_until_marker()
             return self._extract_output(raw, command)
 
+    def execute_batch(
+        self, commands: Sequence[str], stop_on_error: bool = False
+    ) -> List[BatchResult]:
+        """Run many commands in the safe-mode shell with a single write.
+
+        Each command goes out on its own line chained with ``:put`` of a
+        numbered OK sentinel, followed by a line that puts a numbered END
+        sentinel.  All lines are sent at once and the outputs are split back
+        apart by their sentinels, so the batch costs one round trip rather
+        than one per command.  A command whose OK sentinel is missing failed,
+        and its output is the router's message.
+
+        With ``stop_on_error`` each command is guarded by a console global
+        that is cleared on the line before it and set again only once it
+        succeeded, so after a failure — even a command that does not parse —
+        the commands after it do not run and are reported as skipped.  The read allows 30s plus one second per
+        command.
+        """
+        if not self._active or not self._channel:
+            raise RuntimeError("Safe mode session is not active.")
+        commands = [command.strip() for command in commands]
+        if not commands:
+            return []
+
+        lines = []
+        if stop_on_error:
+            lines.append(f':global {_BATCH_FLAG} true')
+        for i, command in enumerate(commands):
+            run = f'{command}; :put "{_BATCH_OK.format(i)}"'
+            if stop_on_error:
+                # The flag is cleared on a line of its own: a command that
+                # does not parse aborts its whole line, so clearing it there
+                # would never happen and the next commands would still run.
+                lines.append(
+                    f':global {_BATCH_FLAG}; :global {_BATCH_RUN} ${_BATCH_FLAG}; '
+                    f':set {_BATCH_FLAG} false'
+                )
+                run = (
+                    f':global {_BATCH_FLAG}; :global {_BATCH_RUN}; :if (${_BATCH_RUN}) do={{ '
+                    f'{command}; :set {_BATCH_FLAG} true; :put "{_BATCH_OK.format(i)}" }}'
+                )
+            lines.append(run)
+            lines.append(f':put "{_BATCH_END.format(i)}"')
+        if stop_on_error:
+            lines.append(f':set {_BATCH_FLAG}; :set {_BATCH_RUN}')
+
+        last = _BATCH_END.format(len(commands) - 1)
+        timeout = 30.0 + _BATCH_TIMEOUT_PER_COMMAND * len(commands)
+        with self._lock:
+            self._channel.send("\n".join(lines) + "\n")
+            raw = self._read(lambda new: any(line.strip() == last for line in new), timeout)
+        return _split_batch_output(raw, commands, stop_on_error)
+
     def commit(self) -> str:
         """Send Ctrl+X again to exit Safe Mode and persist all changes."""
         with self._lock:
@@ -209,19 +319,37 @@ class SafeModeManager:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _answer_terminal_queries(self, buf: str, answered: Dict[str, int]) -> None:
-        """Reply to VT terminal probes, remembering what was already answered.
+    def _read(self, done: Callable[[List[str]], bool], timeout: float) -> str:
+        """Read the shell until ``done`` accepts what arrived, or ``timeout``.
 
-        Counting against the accumulated buffer rather than the last chunk
-        means a probe split across two network reads is still answered once
-        its tail arrives — a missed probe can stall the console (the DA query
-        after each prompt is sent exactly once and gates the final "> ").
+        Each read is decoded once, as it arrives (see
+        :class:`~mcp_mikrotik.terminal.TerminalDecoder`), terminal probes in
+        it are answered, and ``done`` is shown only the lines that read
+        completed plus the line still open — so a long output costs linear
+        time, not a rescan of everything received so far per chunk.  The
+        shared reactor wakes the read as soon as data arrives.  Returns the
+        cleaned text received.
         """
-        for query, reply in _TERMINAL_QUERIES:
-            seen = buf.count(query)
-            for _ in range(seen - answered.get(query, 0)):
-                self._channel.send(reply)
-            answered[query] = seen
+        decoder = TerminalDecoder()
+        reactor = get_shell_reactor()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._channel is None:
+                break
+            data = reactor.recv(self._channel, remaining)
+            if data is None:
+                break
+            lines = decoder.feed(data)
+            try:
+                for reply in decoder.take_replies():
+                    self._channel.send(reply)
+                lines.append(decoder.line)
+                if done(lines):
+                    break
+            except Exception:
+                break
+        return decoder.text
 
     def _login_until_prompt(self, timeout: float = 45.0) -> str:
         """Read the login stream until the shell prompt, answering dialogs.
@@ -236,30 +364,21 @@ class SafeModeManager:
         containers also needs ~20s just to render the login banner, hence the
         generous default timeout.
         """
-        buf = ""
-        answered: Dict[str, int] = {}
-        answered_license = False
-        skipped_password = False
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            try:
-                if self._channel.recv_ready():
-                    chunk = self._channel.recv(4096).decode('utf-8', errors='replace')
-                    buf += chunk
-                    self._answer_terminal_queries(buf, answered)
-                    cleaned = _strip_ansi(buf)
-                    if _PROMPT_RE.search(cleaned):
-                        return cleaned
-                    if not answered_license and "[Y/n]" in cleaned:
-                        self._channel.send('n')
-                        answered_license = True
-                    if not skipped_password and "new password>" in cleaned:
-                        self._channel.send('\x03')
-                        skipped_password = True
-            except Exception:
-                break
-            time.sleep(0.05)
-        return _strip_ansi(buf)
+        answered = {"license": False, "password": False}
+
+        def done(lines: List[str]) -> bool:
+            for line in lines:
+                if _PROMPT_RE.search(line):
+                    return True
+                if not answered["license"] and "[Y/n]" in line:
+                    self._channel.send('n')
+                    answered["license"] = True
+                if not answered["password"] and "new password>" in line:
+                    self._channel.send('\x03')
+                    answered["password"] = True
+            return False
+
+        return self._read(done, timeout)
 
     def _read_until_safe_mode_ack(self, timeout: float = 30.0) -> str:
         """Read until safe-mode activation is acknowledged.
@@ -270,66 +389,29 @@ class SafeModeManager:
         pattern — so without the early exit every enable would sit out the
         whole timeout before the fallback check rescued it.
         """
-        buf = ""
-        answered: Dict[str, int] = {}
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            try:
-                if self._channel.recv_ready():
-                    chunk = self._channel.recv(4096).decode('utf-8', errors='replace')
-                    buf += chunk
-                    self._answer_terminal_queries(buf, answered)
-                    cleaned = _strip_ansi(buf)
-                    if '<SAFE>' in cleaned or (
-                        'Safe Mode session' in cleaned and 'Success' in cleaned
-                    ):
-                        return cleaned
-            except Exception:
-                break
-            time.sleep(0.05)
-        return _strip_ansi(buf)
+        seen = {"session": False, "success": False}
+
+        def done(lines: List[str]) -> bool:
+            for line in lines:
+                if '<SAFE>' in line:
+                    return True
+                seen["session"] = seen["session"] or 'Safe Mode session' in line
+                seen["success"] = seen["success"] or 'Success' in line
+            return seen["session"] and seen["success"]
+
+        return self._read(done, timeout)
 
     def _read_until_marker(self, timeout: float = 30.0) -> str:
         """Read until the end-of-command sentinel appears on its own line."""
-        buf = ""
-        answered: Dict[str, int] = {}
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            try:
-                if self._channel.recv_ready():
-                    chunk = self._channel.recv(4096).decode('utf-8', errors='replace')
-                    buf += chunk
-                    self._answer_terminal_queries(buf, answered)
-                    cleaned = _strip_ansi(buf).replace('\r\n', '\n').replace('\r', '\n')
-                    if _EOC_LINE_RE.search(cleaned):
-                        return cleaned
-            except Exception:
-                break
-            time.sleep(0.05)
-        return _strip_ansi(buf)
+        return self._read(lambda lines: any(line.strip() == _EOC for line in lines), timeout)
 
     def _read_until_prompt(self, timeout: float = 15.0) -> str:
         """Read from the channel until a RouterOS prompt is detected."""
-        buf = ""
-        answered: Dict[str, int] = {}
-        deadline = time.monotonic() + timeout
-        while time.monotonic() < deadline:
-            try:
-                if self._channel.recv_ready():
-                    chunk = self._channel.recv(4096).decode('utf-8', errors='replace')
-                    buf += chunk
-                    self._answer_terminal_queries(buf, answered)
-                    cleaned = _strip_ansi(buf)
-                    if _PROMPT_RE.search(cleaned):
-                        return cleaned
-            except Exception:
-                break
-            time.sleep(0.05)
-        return _strip_ansi(buf)
+        return self._read(lambda lines: any(_PROMPT_RE.search(line) for line in lines), timeout)
 
     def _extract_output(self, raw: str, command: str) -> str:
         """Return the lines between the command's echo and the sentinel."""
-        text = _strip_ansi(raw).replace('\r\n', '\n').replace('\r', '\n')
+        text = strip_ansi(raw).replace('\r\n', '\n').replace('\r', '\n')
 
         result_lines: list[str] = []
         past_echo = False
@@ -355,6 +437,7 @@ class SafeModeManager:
     def _cleanup(self) -> None:
         self._active = False
         if self._channel:
+            get_shell_reactor().unregister(self._channel)
             try:
                 self._channel.close()
             except Exception:
@@ -1,12 +1,17 @@
 from typing import Literal, Optional, List
 from ..app import mcp, READ, WRITE, DANGEROUS, annotate
-from ..connector import execute_mikrotik_command, download_file_sync, upload_file_sync
+from ..connector import (
+    DownloadTooLarge, discard_partial_download, download_to_file, execute_mikrotik_command, upload_file_sync,
+)
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..storage import data_dir, device_dir, safe_name
 from mcp.server.mcpserver import Context
 import asyncio
 import base64
 import re
 import time
 import os
+import uuid
 
 @mcp.tool(name="create_backup", annotations=annotate(WRITE, "Create Backup"))
 async def mikrotik_create_backup(
@@ -193,16 +198,42 @@ async def mikrotik_export_section(
 
     return f"CONFIGURATION EXPORT of /{section}:\n\n{result}"
 
+# Largest file returned inline as base64; the tool's answer is one string, so
+# anything bigger has to go through save_to_disk instead.
+INLINE_DOWNLOAD_LIMIT = 8 * 1024 * 1024
+
+
+def _base64_file(path) -> str:
+    """Base64 of a file, encoded a block at a time (blocks are multiples of 3 bytes)."""
+    pieces = []
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(3 * 256 * 1024), b""):
+            pieces.append(base64.b64encode(block).decode('ascii'))
+    return "".join(pieces)
+
+
 @mcp.tool(name="download_file", annotations=annotate(READ, "Download File"))
 async def mikrotik_download_file(
     ctx: Context,
     filename: str,
     file_type: Literal["backup", "export"] = "backup",
+    save_to_disk: bool = False,
     device: Optional[str] = None
 ) -> str:
-    """Downloads a backup or export file from the MikroTik device as base64-encoded content."""
+    """Downloads a backup or export file from the MikroTik device as base64-encoded content.
+
+    With `save_to_disk` the file is kept in the server's data directory
+    instead, and the path, size and SHA-256 are returned — use this for large
+    files; inline base64 is refused above 8 MiB. An interrupted save resumes
+    where it stopped when called again, unless the file changed meanwhile.
+    """
     await ctx.info(f"Downloading file: filename={filename}, type={file_type}")
 
+    try:
+        title = get_inventory().resolve(device).title
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+
     # First, check if the file exists.
     check_cmd = f'/file print count-only where name="{filename}"'
     count = await execute_mikrotik_command(check_cmd, ctx, device=device)
@@ -210,14 +241,38 @@ async def mikrotik_download_file(
     if count.strip() == "0":
         return f"File '{filename}' not found."
 
-    # Transfer the raw bytes over SFTP, then base64-encode for safe transport.
-    # This preserves binary backups (.backup) as well as text exports (.rsc).
+    # The raw bytes stream over SFTP to a local file, hashed on the way, so
+    # binary backups (.backup) and text exports (.rsc) arrive intact and a
+    # large file is never held in memory whole.
+    if save_to_disk:
+        destination = device_dir("downloads", title) / safe_name(filename)
+        try:
+            download = await download_to_file(filename, destination, device)
+        except Exception as e:
+            return f"Failed to download file '{filename}': {str(e)}"
+        lines = [
+            f"File '{filename}' saved to {download.path}",
+            f"Size: {download.size} bytes",
+            f"SHA-256: {download.sha256}",
+        ]
+        if download.resumed_from:
+            lines.append(f"Resumed from byte {download.resumed_from}")
+        return "\n".join(lines)
+
+    spool = data_dir() / "spool"
+    spool.mkdir(exist_ok=True)
+    destination = spool / f"{uuid.uuid4().hex}.download"
     try:
-        content = await asyncio.to_thread(download_file_sync, filename, device)
+        await download_to_file(filename, destination, device, max_size=INLINE_DOWNLOAD_LIMIT)
+        encoded = await asyncio.to_thread(_base64_file, destination)
+    except DownloadTooLarge as e:
+        return f"Failed to download file '{filename}': {str(e)}; use save_to_disk=true for large files"
     except Exception as e:
         return f"Failed to download file '{filename}': {str(e)}"
+    finally:
+        destination.unlink(missing_ok=True)
+        discard_partial_download(destination)
 
-    encoded = base64.b64encode(content).decode('ascii')
     return f"FILE_CONTENT_BASE64:{encoded}"
 
 @mcp.tool(name="upload_file", annotations=annotate(WRITE, "Upload File"))
@@ -0,0 +1,44 @@
+import json
+from typing import Optional
+
+from mcp.server.mcpserver import Context
+
+from ..app import mcp, READ, WRITE_IDEMPOTENT, annotate
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..read_cache import get_read_cache
+
+
+@mcp.tool(name="read_cache_stats", annotations=annotate(READ, "Read Cache Stats"))
+async def mikrotik_read_cache_stats(ctx: Context) -> str:
+    """Returns the read cache's hit/miss counters and size, across all devices."""
+    await ctx.info("Reading read cache statistics")
+
+    cache = get_read_cache()
+    if cache is None:
+        return "The read cache is disabled (set MIKROTIK_READ_CACHE_SIZE above 0 to enable it)."
+    return json.dumps(cache.stats(), indent=2)
+
+
+@mcp.tool(name="clear_read_cache", annotations=annotate(WRITE_IDEMPOTENT, "Clear Read Cache"))
+async def mikrotik_clear_read_cache(ctx: Context, device: Optional[str] = None) -> str:
+    """Drops cached read results so the next reads go to the router.
+
+    Notes:
+        device: clear only this device; omit to clear every device
+    """
+    await ctx.info(f"Clearing read cache (device={device})")
+
+    cache = get_read_cache()
+    if cache is None:
+        return "The read cache is disabled; nothing to clear."
+
+    if device is None:
+        cache.clear()
+        return "Read cache cleared for all devices."
+
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+    dropped = cache.invalidate(target.title)
+    return f"Read cache cleared for '{target.title}' ({dropped} entries)."
@@ -0,0 +1,65 @@
+import json
+from typing import List, Optional
+
+from mcp.server.mcpserver import Context
+
+from ..app import mcp, READ, WRITE_IDEMPOTENT, annotate
+from ..drift import check_drift, parse_sections, take_snapshot
+from ..inventory import DeviceNotFoundError, get_inventory
+
+
+@mcp.tool(name="snapshot_config", annotations=annotate(WRITE_IDEMPOTENT, "Snapshot Config"))
+async def mikrotik_snapshot_config(
+    ctx: Context,
+    sections: Optional[List[str]] = None,
+    device: Optional[str] = None
+) -> str:
+    """Records the device's current configuration as the baseline for check_config_drift.
+
+    Each section's export is hashed and kept in the server's local store;
+    nothing is written to the device.
+
+    Notes:
+        sections: menu paths such as "ip firewall filter" or "queue simple";
+            omit for the default set (interfaces, addresses, routes, firewall,
+            DNS, DHCP, queues, identity). Other sections keep their baseline.
+    """
+    try:
+        target = get_inventory().resolve(device)
+        names = parse_sections(sections)
+    except (DeviceNotFoundError, ValueError) as e:
+        return f"Error: {str(e)}"
+
+    await ctx.info(f"Snapshotting configuration of '{target.title}'")
+
+    snapshot = await take_snapshot(target.title, ctx, names)
+    if not snapshot["sections"]:
+        return f"Error: no section could be exported: {json.dumps(snapshot['errors'])}"
+    return json.dumps(snapshot, ensure_ascii=False, indent=2)
+
+
+@mcp.tool(name="check_config_drift", annotations=annotate(READ, "Check Config Drift"))
+async def mikrotik_check_config_drift(
+    ctx: Context,
+    sections: Optional[List[str]] = None,
+    device: Optional[str] = None
+) -> str:
+    """Reports which configuration sections changed since the last snapshot_config, with a diff of each.
+
+    Sections whose export hashes the same as the baseline are only listed as
+    unchanged. Run it on many devices with fleet_execute(tool="check_config_drift").
+
+    Notes:
+        sections: limit the check to these menu paths; omit for every section
+            in the baseline
+    """
+    try:
+        target = get_inventory().resolve(device)
+        names = parse_sections(sections)
+    except (DeviceNotFoundError, ValueError) as e:
+        return f"Error: {str(e)}"
+
+    await ctx.info(f"Checking configuration drift of '{target.title}'")
+
+    report = await check_drift(target.title, ctx, names)
+    return json.dumps(report, ensure_ascii=False, indent=2)
@@ -1,7 +1,12 @@
+import asyncio
+import json
 from typing import Literal, Optional, List
 from mcp.server.mcpserver import Context
 from ..app import mcp, READ, WRITE, WRITE_IDEMPOTENT, DESTRUCTIVE, DANGEROUS, annotate
-from ..connector import execute_mikrotik_command
+from ..address_list import sync_address_list
+from ..connector import execute_batch, execute_mikrotik_command
+from ..firewall_analysis import TABLES, analyse, load_rules
+from ..inventory import DeviceNotFoundError, get_inventory
 
 @mcp.tool(name="create_filter_rule", annotations=annotate(WRITE, "Create Firewall Filter Rule"))
 async def mikrotik_create_filter_rule(
@@ -408,31 +413,111 @@ async def mikrotik_create_basic_firewall_setup(ctx: Context, device: Optional[st
     """Creates a basic firewall setup with common security rules on the MikroTik device."""
     await ctx.info("Creating basic firewall setup")
 
-    results = []
+    rules = [
+        # Allow established and related connections
+        ("Rule 1 (established/related)",
+         "/ip firewall filter add chain=input action=accept connection-state=established,related comment=\"Accept established,related\""),
+        # Drop invalid connections
+        ("Rule 2 (drop invalid)",
+         "/ip firewall filter add chain=input action=drop connection-state=invalid comment=\"Drop invalid\""),
+        # Allow ICMP
+        ("Rule 3 (ICMP)",
+         "/ip firewall filter add chain=input action=accept protocol=icmp comment=\"Accept ICMP\""),
+        # Allow management from specific network
+        ("Rule 4 (management network)",
+         "/ip firewall filter add chain=input action=accept src-address=192.168.88.0/24 comment=\"Accept management network\""),
+        # Drop everything else
+        ("Rule 5 (drop all)",
+         "/ip firewall filter add chain=input action=drop comment=\"Drop everything else\""),
+    ]
 
-    # Allow established and related connections
-    cmd1 = "/ip firewall filter add chain=input action=accept connection-state=established,related comment=\"Accept established,related\""
-    result1 = await execute_mikrotik_command(cmd1, ctx, device=device)
-    results.append("Rule 1 (established/related): " + ("Created" if not result1 or "*" in result1 else result1))
+    # One script: if a rule is rejected the ones after it are not added, so
+    # the final drop never lands without the accepts before it.
+    outputs = await execute_batch([cmd for _, cmd in rules], ctx, device=device)
+    results = [
+        f"{label}: " + ("Created" if not output or "*" in output else output)
+        for (label, _), output in zip(rules, outputs)
+    ]
 
-    # Drop invalid connections
-    cmd2 = "/ip firewall filter add chain=input action=drop connection-state=invalid comment=\"Drop invalid\""
-    result2 = await execute_mikrotik_command(cmd2, ctx, device=device)
-    results.append("Rule 2 (drop invalid): " + ("Created" if not result2 or "*" in result2 else result2))
+    return "BASIC FIREWALL SETUP RESULTS:\n\n" + "\n".join(results)
 
-    # Allow ICMP
-    cmd3 = "/ip firewall filter add chain=input action=accept protocol=icmp comment=\"Accept ICMP\""
-    result3 = await execute_mikrotik_command(cmd3, ctx, device=device)
-    results.append("Rule 3 (ICMP): " + ("Created" if not result3 or "*" in result3 else result3))
+@mcp.tool(name="analyze_firewall_rules", annotations=annotate(READ, "Analyze Firewall Rules"))
+async def mikrotik_analyze_firewall_rules(
+    ctx: Context,
+    tables: Optional[List[Literal["filter", "nat"]]] = None,
+    chain: Optional[str] = None,
+    limit: int = 100,
+    device: Optional[str] = None
+) -> str:
+    """Finds firewall filter and NAT rules that can never match: shadowed by an earlier rule with
+    a different action, redundant with an earlier rule doing the same, or matching no packet.
 
-    # Allow management from specific network
-    cmd4 = "/ip firewall filter add chain=input action=accept src-address=192.168.88.0/24 comment=\"Accept management network\""
-    result4 = await execute_mikrotik_command(cmd4, ctx, device=device)
-    results.append("Rule 4 (management network): " + ("Created" if not result4 or "*" in result4 else result4))
+    The rules are read once and analysed offline, comparing addresses, ports
+    and protocol as ranges, so chains of thousands of rules are fine. Also
+    lists chains that no rule jumps to. Nothing is written to the device.
 
-    # Drop everything else
-    cmd5 = "/ip firewall filter add chain=input action=drop comment=\"Drop everything else\""
-    result5 = await execute_mikrotik_command(cmd5, ctx, device=device)
-    results.append("Rule 5 (drop all): " + ("Created" if not result5 or "*" in result5 else result5))
+    Notes:
+        tables: "filter" and/or "nat" (default both)
+        chain: analyse only this chain
+        limit: how many findings to list; counts cover all of them
+    """
+    tables = list(dict.fromkeys(tables or TABLES))
+    unknown = [table for table in tables if table not in TABLES]
+    if unknown:
+        return f"Error: unknown firewall table(s): {', '.join(unknown)}"
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+
+    await ctx.info(f"Analysing {', '.join(tables)} rules of '{target.title}'")
+    try:
+        rulesets = await load_rules(target.title, tables)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error reading firewall rules: {str(e)}"
+
+    result = await asyncio.to_thread(analyse, rulesets, chain, limit)
+    return json.dumps({
+        "device": target.title,
+        "tables": tables,
+        **result,
+    }, ensure_ascii=False, indent=2)
+
+@mcp.tool(name="sync_address_list", annotations=annotate(DESTRUCTIVE, "Sync Address List"))
+async def mikrotik_sync_address_list(
+    ctx: Context,
+    list_name: str,
+    addresses: List[str],
+    comment: Optional[str] = None,
+    dry_run: bool = False,
+    device: Optional[str] = None
+) -> str:
+    """Makes a firewall address list hold exactly the given addresses, adding the missing entries
+    and removing the others, for lists of up to hundreds of thousands of entries.
 
-    return "BASIC FIREWALL SETUP RESULTS:\n\n" + "\n".join(results)
+    The list is read once and only the difference is written, as one .rsc
+    script that is uploaded and imported; the entry count is verified
+    afterwards. Dynamic entries are left alone.
+
+    Notes:
+        addresses: the whole desired list - IPv4 addresses, prefixes
+            (e.g. "203.0.113.0/24"), ranges ("10.0.0.1-10.0.0.9") or DNS names
+        comment: set on the entries that are added
+        dry_run: only report what would be added and removed
+    """
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+
+    await ctx.info(f"Syncing address list '{list_name}' on '{target.title}' to {len(addresses)} entries")
+    try:
+        result = await sync_address_list(ctx, list_name, addresses, target.title, comment, dry_run)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error syncing address list: {str(e)}"
+
+    return json.dumps(result, ensure_ascii=False, indent=2)
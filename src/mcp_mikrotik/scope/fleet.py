@@ -0,0 +1,156 @@
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp.server.mcpserver import Context
+
+from ..app import mcp, READ, WRITE, annotate
+from ..config import DeviceConfig
+from ..fleet import run_command_on_fleet, run_on_fleet
+from ..fleet_backup import run_fleet_backup
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..selector import SelectorError
+
+
+async def _read_only_tool(name: str):
+    """Return the registered tool ``name`` if it is a per-device read."""
+    for tool in await mcp.list_tools():
+        if tool.name != name:
+            continue
+        if name == "fleet_execute" or not (tool.annotations and tool.annotations.read_only_hint):
+            raise ValueError(f"Tool '{name}' is not a read-only tool and cannot be run across the fleet.")
+        if "device" not in (tool.input_schema.get("properties") or {}):
+            raise ValueError(f"Tool '{name}' does not target a device.")
+        return tool
+    raise ValueError(f"Unknown tool '{name}'.")
+
+
+@mcp.tool(name="fleet_execute", annotations=annotate(READ, "Fleet Execute"))
+async def mikrotik_fleet_execute(
+    ctx: Context,
+    command: Optional[str] = None,
+    tool: Optional[str] = None,
+    arguments: Optional[Dict[str, Any]] = None,
+    devices: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    region: Optional[str] = None,
+    selector: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> str:
+    """Runs one read on many devices at once and returns the results keyed by device title.
+
+    Pass either `command` (a single read such as "/system resource print") or
+    `tool` with its `arguments` (any read-only tool, e.g. "list_ip_pools"),
+    never both. Devices are selected by `devices` (titles), `tags` (devices
+    carrying all of them), `region` and `selector` (an expression such as
+    "tag:core and not region:US"); criteria combine, and none selects every
+    device. A device that fails or times out is reported without
+    affecting the others.
+
+    Notes:
+        concurrency / timeout: lower the server's fleet limits for this call
+    """
+    if bool(command) == bool(tool):
+        return "Error: pass exactly one of `command` or `tool`."
+
+    try:
+        selected: List[DeviceConfig] = get_inventory().select(devices, tags, region, selector)
+    except (DeviceNotFoundError, SelectorError) as e:
+        return f"Error: {str(e)}"
+    if not selected:
+        return "No devices match the selection."
+
+    await ctx.info(f"Fleet execute on {len(selected)} device(s): {command or tool}")
+
+    try:
+        if command:
+            results = await run_command_on_fleet(selected, command, ctx, concurrency, timeout)
+        else:
+            await _read_only_tool(tool)
+            arguments = dict(arguments or {})
+
+            async def call(device: DeviceConfig) -> str:
+                result = await mcp.call_tool(tool, {**arguments, "device": device.title}, context=ctx)
+                text = "\n".join(
+                    block.text for block in getattr(result, "content", []) if hasattr(block, "text")
+                )
+                if getattr(result, "is_error", False) or text.startswith("Error"):
+                    raise RuntimeError(text or "tool failed")
+                return text
+
+            results = await run_on_fleet(selected, call, concurrency, timeout)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+
+    failed = sum(1 for r in results.values() if not r.ok)
+    summary = {
+        "selected": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "results": {title: r.to_dict() for title, r in results.items()},
+    }
+    return json.dumps(summary, ensure_ascii=False, indent=2)
+
+
+@mcp.tool(name="fleet_backup", annotations=annotate(WRITE, "Fleet Backup"))
+async def mikrotik_fleet_backup(
+    ctx: Context,
+    devices: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    region: Optional[str] = None,
+    selector: Optional[str] = None,
+    binary: bool = True,
+    export: bool = True,
+    password: Optional[str] = None,
+    keep_on_device: bool = False,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> str:
+    """Backs up many devices at once into the server's local backup store.
+
+    On every selected device (same selection as fleet_execute) this saves a
+    binary backup (`binary`) and a configuration export (`export`), downloads
+    both and stores them by content hash, so an unchanged export is not
+    stored twice. The files are removed from the devices afterwards unless
+    `keep_on_device` is set. A device that fails or times out is reported
+    without affecting the others.
+
+    Notes:
+        password: encrypt the binary backups with it (unencrypted otherwise)
+        concurrency / timeout: lower the server's fleet limits for this call
+    """
+    try:
+        selected: List[DeviceConfig] = get_inventory().select(devices, tags, region, selector)
+    except (DeviceNotFoundError, SelectorError) as e:
+        return f"Error: {str(e)}"
+    if not selected:
+        return "No devices match the selection."
+
+    await ctx.info(f"Fleet backup of {len(selected)} device(s)")
+
+    started = time.monotonic()
+    try:
+        results = await run_fleet_backup(
+            selected, ctx, binary, export, password, keep_on_device, concurrency, timeout
+        )
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    elapsed = time.monotonic() - started
+
+    stored = [f for r in results.values() if r.ok for f in r.output["files"]]
+    total = sum(f["size"] for f in stored)
+    failed = sum(1 for r in results.values() if not r.ok)
+    summary = {
+        "selected": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "files": len(stored),
+        "stored": sum(1 for f in stored if f["new"]),
+        "deduplicated": sum(1 for f in stored if not f["new"]),
+        "bytes": total,
+        "elapsed": round(elapsed, 3),
+        "throughput_bytes_per_s": round(total / elapsed) if elapsed > 0 else total,
+        "results": {title: r.to_dict() for title, r in results.items()},
+    }
+    return json.dumps(summary, ensure_ascii=False, indent=2)
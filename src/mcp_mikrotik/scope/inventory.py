@@ -1,11 +1,14 @@
+from typing import Optional
+
 from mcp.server.mcpserver import Context
 
 from ..app import mcp, READ, annotate
 from ..inventory import get_inventory
+from ..selector import SelectorError
 
 
 @mcp.tool(name="list_devices", annotations=annotate(READ, "List Devices"))
-async def mikrotik_list_devices(ctx: Context) -> str:
+async def mikrotik_list_devices(ctx: Context, selector: Optional[str] = None) -> str:
     """Lists the MikroTik devices this server manages.
 
     Use this to discover which devices are available and what their titles are.
@@ -14,13 +17,23 @@ async def mikrotik_list_devices(ctx: Context) -> str:
     omitted and that device is used automatically.
 
     Credentials are never returned.
+
+    Notes:
+        selector: only list matching devices, e.g. "tag:core and region:NL",
+            "(region:NL or region:BE) and not tag:lab", "title:edge-*".
+            Fields: tag, region, title, host.
     """
-    await ctx.info("Listing inventory devices")
+    await ctx.info(f"Listing inventory devices: selector={selector}")
 
     inventory = get_inventory()
-    devices = inventory.describe()
+    try:
+        devices = inventory.describe(selector)
+    except SelectorError as e:
+        return f"Error: {str(e)}"
 
     if not devices:
+        if selector and len(inventory):
+            return f"No devices match the selector {selector!r}."
         return "No MikroTik devices are configured."
 
     lines = [f"MIKROTIK DEVICES ({len(devices)}):", ""]
@@ -3,6 +3,7 @@ from typing import Optional, List
 from mcp.server.mcpserver import Context
 
 from ..connector import execute_mikrotik_command
+from ..parsing import parse_rows, split_attributes
 from ..app import mcp, READ, WRITE, WRITE_IDEMPOTENT, DESTRUCTIVE, annotate
 
 @mcp.tool(name="create_ip_pool", annotations=annotate(WRITE, "Add IP Pool"))
@@ -99,17 +100,14 @@ async def mikrotik_list_ip_pools(
 
         for line in result_lines:
             output_lines.append(line)
-            if "name=" in line:
-                # Extract pool name from the line
-                name_start = line.find('name="') + 6
-                name_end = line.find('"', name_start)
-                if name_start > 5 and name_end > name_start:
-                    pool_name = line[name_start:name_end]
-                    # Get used addresses for this pool
-                    used_cmd = f'/ip pool used print count-only where pool="{pool_name}"'
-                    used_count = await execute_mikrotik_command(used_cmd, ctx, device=device)
-                    if used_count.strip().isdigit():
-                        output_lines.append(f"      used-addresses={used_count.strip()}")
+            # Extract pool name from the line
+            pool_name = dict(split_attributes(line)).get("name")
+            if pool_name:
+                # Get used addresses for this pool
+                used_cmd = f'/ip pool used print count-only where pool="{pool_name}"'
+                used_count = await execute_mikrotik_command(used_cmd, ctx, device=device)
+                if used_count.strip().isdigit():
+                    output_lines.append(f"      used-addresses={used_count.strip()}")
 
         return f"IP POOLS:\n\n" + "\n".join(output_lines)
 
@@ -277,13 +275,11 @@ async def mikrotik_expand_ip_pool(ctx: Context, name: str, additional_ranges: st
         return f"IP pool '{name}' not found."
 
     # Extract current ranges
-    import re
-    ranges_match = re.search(r'ranges=([^\s]+)', current)
-    if not ranges_match:
+    rows = parse_rows(current)
+    current_ranges = rows[0].get("ranges") if rows else None
+    if not current_ranges:
         return "Unable to determine current ranges."
 
-    current_ranges = ranges_match.group(1)
-
     # Combine ranges
     new_ranges = f"{current_ranges},{additional_ranges}"
 
@@ -1,10 +1,20 @@
 import asyncio
+import json
 import re
 import time
-from typing import Literal, Optional
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
 from mcp.server.mcpserver import Context
 from ..connector import execute_mikrotik_command
-from ..app import mcp, READ, annotate
+from ..app import mcp, READ, WRITE_IDEMPOTENT, annotate
+from ..config import DeviceConfig
+from ..fleet import run_on_fleet
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..log_archive import get_log_archive, ingest_device, parse_bound
+from ..log_cursor import fetch_log, fetch_since, get_log_cursors, newest_id
+from ..log_entries import LOG_DUMP_SCRIPT, LogEntry, log_statistics, parse_log_dump
+from ..selector import SelectorError
+from ..syslog_receiver import get_syslog_buffer
 
 # RouterOS durations like 5m, 1h, 2d — validated before being spliced into a
 # where clause so a malformed value fails here with a clear message instead of
@@ -36,11 +46,74 @@ def _time_clause(time_filter: str) -> str:
 
 
 def _tail(result: str, limit: Optional[int]) -> str:
-    """Keep the newest entries: /log print has no limit parameter."""
+    """Keep the newest entries: /log print has no limit parameter.
+
+    Scans back from the end, so only the lines kept are looked at.
+    """
     if not limit:
         return result
-    lines = [line for line in result.splitlines() if line.strip()]
-    return "\n".join(lines[-limit:])
+    kept = []
+    end = len(result)
+    while end > 0 and len(kept) < limit:
+        start = result.rfind("\n", 0, end)
+        line = result[start + 1:end].rstrip("\r")
+        if line.strip():
+            kept.append(line)
+        end = start
+    return "\n".join(reversed(kept))
+
+
+def _topic_list(topics: Optional[str]) -> List[str]:
+    """``"system,dhcp"`` → ``["system", "dhcp"]``; raises ValueError for anything but topic names."""
+    topic_list = [t.strip() for t in (topics or "").split(",") if t.strip()]
+    for topic in topic_list:
+        if not re.match(r"^[A-Za-z0-9_-]+$", topic):
+            raise ValueError(f"Invalid topic {topic!r}")
+    return topic_list
+
+
+def _topics_clause(topics: Optional[str]) -> Optional[str]:
+    """``"system,dhcp"`` → ``topics~"(system|dhcp)"`` (None for no topics)."""
+    topic_list = _topic_list(topics)
+    if not topic_list:
+        return None
+    return f'topics~"({"|".join(topic_list)})"'
+
+
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def _syslog_entries(
+    device: Optional[str],
+    topics: Optional[str],
+    time_filter: Optional[str],
+    message_filter: Optional[str],
+    prefix_filter: Optional[str],
+) -> List[LogEntry]:
+    """The syslog receiver's entries for ``device`` that pass the get_logs filters."""
+    buffer = get_syslog_buffer()
+    if buffer is None:
+        raise ValueError(
+            "the syslog receiver is not running (set MIKROTIK_SYSLOG_PORT to enable it)."
+        )
+    entries = buffer.entries(get_inventory().resolve(device).title)
+
+    wanted = set(_topic_list(topics))
+    if wanted:
+        entries = [e for e in entries if wanted.intersection(e.topics)]
+    if time_filter:
+        _time_clause(time_filter)
+        seconds = sum(
+            int(n) * _DURATION_UNITS[unit] for n, unit in re.findall(r"(\d+)([smhdw])", time_filter)
+        )
+        since = datetime.now() - timedelta(seconds=seconds)
+        entries = [e for e in entries if e.time and e.time > since]
+    if message_filter:
+        pattern = re.compile(message_filter)
+        entries = [e for e in entries if pattern.search(e.message)]
+    if prefix_filter:
+        entries = [e for e in entries if e.message.startswith(prefix_filter)]
+    return entries
 
 
 @mcp.tool(name="get_logs", annotations=annotate(READ, "Get Logs"))
@@ -52,6 +125,7 @@ async def mikrotik_get_logs(
     prefix_filter: Optional[str] = None,
     limit: Optional[int] = None,
     print_as: Literal["plain", "detail", "terse"] = "plain",
+    source: Literal["device", "syslog"] = "device",
     device: Optional[str] = None
 ) -> str:
     """Gets logs from the MikroTik device with optional topic, time, and message filters.
@@ -61,9 +135,22 @@ async def mikrotik_get_logs(
         time_filter: RouterOS duration e.g. "30s", "5m", "1h", "2d"
         message_filter: RouterOS regex matched against the message (case-sensitive)
         limit: keep only the newest N entries
+        source: "syslog" answers from the entries the server's syslog
+            receiver has buffered, without contacting the router
     """
     await ctx.info(f"Getting logs with filters: topics={topics}, time={time_filter}")
 
+    if source == "syslog":
+        try:
+            entries = _syslog_entries(device, topics, time_filter, message_filter, prefix_filter)
+        except (DeviceNotFoundError, ValueError, re.error) as exc:
+            return f"Error: {exc}"
+        if not entries:
+            return "No log entries found matching the criteria."
+        if limit:
+            entries = entries[-limit:]
+        return "LOG ENTRIES:\n\n" + "\n".join(entry.format() for entry in entries)
+
     style = "" if print_as == "plain" else f" {print_as}"
     cmd = f"/log print{style}"
 
@@ -154,6 +241,7 @@ async def mikrotik_search_logs(
     time_filter: Optional[str] = None,
     case_sensitive: bool = False,
     limit: Optional[int] = None,
+    source: Literal["device", "syslog"] = "device",
     device: Optional[str] = None
 ) -> str:
     """Searches log messages for a literal term.
@@ -162,6 +250,7 @@ async def mikrotik_search_logs(
         search_term: treated literally (regex specials are escaped)
         case_sensitive: RouterOS matching is case-sensitive; by default the
             search emulates case-insensitivity with character classes
+        source: "syslog" searches the syslog receiver's buffer instead of the router
     """
     await ctx.info(f"Searching logs for: term={search_term}")
 
@@ -173,6 +262,7 @@ async def mikrotik_search_logs(
         message_filter=pattern,
         time_filter=time_filter,
         limit=limit,
+        source=source,
         ctx=ctx,
         device=device
     )
@@ -263,31 +353,61 @@ async def mikrotik_clear_logs(ctx: Context, device: Optional[str] = None) -> str
 
 
 @mcp.tool(name="get_log_statistics", annotations=annotate(READ, "Log Statistics"))
-async def mikrotik_get_log_statistics(ctx: Context, device: Optional[str] = None) -> str:
-    """Gets log entry counts by topic and severity from the MikroTik device."""
-    await ctx.info("Getting log statistics")
-
-    total_cmd = "/log print count-only"
-    total_count = await execute_mikrotik_command(total_cmd, ctx, device=device)
-
-    stats = [f"Total log entries: {total_count.strip()}"]
+async def mikrotik_get_log_statistics(
+    ctx: Context,
+    hours: int = 24,
+    top_prefixes: int = 10,
+    device: Optional[str] = None
+) -> str:
+    """Gets log entry counts by topic and severity, hourly activity and the most frequent messages.
 
-    topics = ["info", "warning", "error", "system", "dhcp", "firewall", "interface"]
-    for topic in topics:
-        count_cmd = f'/log print count-only where topics~"{topic}"'
-        count = await execute_mikrotik_command(count_cmd, ctx, device=device)
-        if count.strip().isdigit() and int(count.strip()) > 0:
-            stats.append(f"{topic.capitalize()}: {count.strip()}")
+    The log is fetched once and counted locally.
 
-    recent_cmd = "/log print count-only where time > ([:timestamp] - 1h)"
-    recent_count = await execute_mikrotik_command(recent_cmd, ctx, device=device)
-    stats.append(f"\nEntries in last hour: {recent_count.strip()}")
+    Notes:
+        hours: hourly buckets to show, ending now (1-168)
+        top_prefixes: how many of the most frequent message prefixes to list
+            (first words, with numbers as #)
+    """
+    hours = max(1, min(hours, 168))
+    top_prefixes = max(0, min(top_prefixes, 50))
+    await ctx.info("Getting log statistics")
 
-    today_cmd = "/log print count-only where time > ([:timestamp] - 1d)"
-    today_count = await execute_mikrotik_command(today_cmd, ctx, device=device)
-    stats.append(f"Entries in last 24 hours: {today_count.strip()}")
+    output = await execute_mikrotik_command(LOG_DUMP_SCRIPT, ctx, device=device, read_only=True)
+    if output.startswith("Error"):
+        return output
+    try:
+        dump = parse_log_dump(output)
+    except ValueError as exc:
+        return f"Error: {exc}"
+    stats = log_statistics(dump.entries, dump.now, hours, top_prefixes)
+
+    span = ""
+    if stats["oldest"] and stats["newest"]:
+        span = f" ({stats['oldest']:%Y-%m-%d %H:%M:%S} to {stats['newest']:%Y-%m-%d %H:%M:%S})"
+    lines = [f"Total log entries: {stats['total']}{span}"]
+
+    if stats["severities"]:
+        lines.append("\nBy severity:")
+        lines.extend(f"  {name}: {count}" for name, count in stats["severities"])
+    if stats["topics"]:
+        lines.append("\nBy topic:")
+        lines.extend(f"  {name}: {count}" for name, count in stats["topics"])
+
+    lines.append(f"\nEntries in last hour: {stats['last_hour']}")
+    lines.append(f"Entries in last 24 hours: {stats['last_day']}")
+
+    if stats["per_hour"]:
+        peak = max(count for _, count in stats["per_hour"]) or 1
+        lines.append(f"\nPer hour (last {hours}h, device time):")
+        lines.extend(
+            f"  {hour:%Y-%m-%d %H:00}  {count:>5}  {'#' * round(20 * count / peak)}"
+            for hour, count in stats["per_hour"]
+        )
+    if stats["top_prefixes"]:
+        lines.append("\nTop message prefixes:")
+        lines.extend(f"  {count:>5}  {prefix}" for prefix, count in stats["top_prefixes"])
 
-    return "LOG STATISTICS:\n\n" + "\n".join(stats)
+    return "LOG STATISTICS:\n\n" + "\n".join(lines)
 
 
 @mcp.tool(name="export_logs", annotations=annotate(READ, "Export Logs"))
@@ -343,28 +463,185 @@ async def mikrotik_monitor_logs(
     duration = max(1, min(duration, 60))
     await ctx.info(f"Monitoring logs for {duration} seconds")
 
-    # A non-interactive channel cannot stream "/log print follow", so take a
-    # count snapshot, wait, and return whatever arrived in between.
-    before = await execute_mikrotik_command("/log print count-only", ctx, device=device)
-    await asyncio.sleep(duration)
-    after = await execute_mikrotik_command("/log print count-only", ctx, device=device)
+    # A non-interactive channel cannot stream "/log print follow", so note
+    # where the log ends, wait, and fetch only the entries after that point.
+    try:
+        where = _topics_clause(topics)
+        start = await fetch_log(ctx, device, header_only=True)
+        await asyncio.sleep(duration)
+        dump, restarted = await fetch_since(ctx, device, start.last_id, where)
+    except ValueError as exc:
+        return f"Error: {exc}"
+
+    if not dump.entries:
+        return f"LOG MONITOR: no new log entries in the last {duration} seconds."
+
+    note = " (the log was cleared or the device restarted)" if restarted else ""
+    return (
+        f"LOG MONITOR ({len(dump.entries)} new entries in {duration}s){note}:\n\n"
+        + "\n".join(entry.format() for entry in dump.entries)
+    )
+
+
+@mcp.tool(name="tail_logs", annotations=annotate(READ, "Tail Logs"))
+async def mikrotik_tail_logs(
+    ctx: Context,
+    topics: Optional[str] = None,
+    limit: int = 100,
+    reset: bool = False,
+    device: Optional[str] = None
+) -> str:
+    """Returns the log entries added since the previous tail_logs call for this device.
+
+    The first call (or one with reset=True) returns the newest entries and
+    starts a cursor at the end of the log; each later call fetches only the
+    entries after it, so tailing repeatedly costs only what is new.
 
+    Notes:
+        topics: comma-separated, entry matches any of them e.g. "system,dhcp"
+        limit: most entries returned per call (the newest are kept), max 1000
+    """
+    limit = max(1, min(limit, 1000))
     try:
-        new_entries = int(after.strip()) - int(before.strip())
-    except ValueError:
-        return f"Error reading log counts: before={before.strip()!r} after={after.strip()!r}"
+        title = get_inventory().resolve(device).title
+        where = _topics_clause(topics)
+    except (DeviceNotFoundError, ValueError) as exc:
+        return f"Error: {exc}"
 
-    if new_entries <= 0:
-        return f"LOG MONITOR: no new log entries in the last {duration} seconds."
+    cursors = get_log_cursors()
+    if reset:
+        cursors.reset(title)
+    after = cursors.get(title)
+    await ctx.info(f"Tailing logs on '{title}' after {after or 'the start'}")
 
-    cmd = "/log print"
-    if topics:
-        topic_list = [t.strip() for t in topics.split(',') if t.strip()]
-        if topic_list:
-            cmd += f' where topics~"({"|".join(topic_list)})"'
+    try:
+        dump, restarted = await fetch_since(ctx, title, after, where)
+    except ValueError as exc:
+        return f"Error: {exc}"
+    cursors.set(title, newest_id(dump, None if restarted else after))
+
+    entries = dump.entries[-limit:]
+    skipped = len(dump.entries) - len(entries)
+    notes = []
+    if restarted:
+        notes.append("the log was cleared or the device restarted")
+    if skipped:
+        notes.append(f"{skipped} older entries skipped")
+    note = f" ({'; '.join(notes)})" if notes else ""
+
+    if not entries:
+        return f"No new log entries{note}."
+    return f"NEW LOG ENTRIES ({len(entries)}){note}:\n\n" + "\n".join(e.format() for e in entries)
+
+
+@mcp.tool(name="archive_logs", annotations=annotate(WRITE_IDEMPOTENT, "Archive Logs"))
+async def mikrotik_archive_logs(
+    ctx: Context,
+    devices: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    region: Optional[str] = None,
+    selector: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> str:
+    """Copies new log entries from the selected devices into the server's local log archive.
 
-    result = await execute_mikrotik_command(cmd, ctx, device=device)
-    return (
-        f"LOG MONITOR ({new_entries} new entries in {duration}s):\n\n"
-        f"{_tail(result, new_entries)}"
+    Each device continues from the last entry archived, so only new entries
+    are fetched. Devices are selected like fleet_execute (none selects every
+    device). Search the archive with search_log_archive.
+
+    Notes:
+        concurrency / timeout: lower the server's fleet limits for this call
+    """
+    try:
+        selected: List[DeviceConfig] = get_inventory().select(devices, tags, region, selector)
+    except (DeviceNotFoundError, SelectorError) as e:
+        return f"Error: {str(e)}"
+    if not selected:
+        return "No devices match the selection."
+
+    await ctx.info(f"Archiving logs of {len(selected)} device(s)")
+
+    archive = get_log_archive()
+
+    async def ingest(device: DeviceConfig) -> dict:
+        return await ingest_device(device.title, ctx, archive)
+
+    results = await run_on_fleet(selected, ingest, concurrency, timeout)
+    failed = sum(1 for r in results.values() if not r.ok)
+    summary = {
+        "selected": len(results),
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "added": sum(r.output["added"] for r in results.values() if r.ok),
+        "results": {title: r.to_dict() for title, r in results.items()},
+    }
+    return json.dumps(summary, ensure_ascii=False, indent=2)
+
+
+@mcp.tool(name="search_log_archive", annotations=annotate(READ, "Search Log Archive"))
+async def mikrotik_search_log_archive(
+    ctx: Context,
+    query: Optional[str] = None,
+    devices: Optional[List[str]] = None,
+    tags: Optional[List[str]] = None,
+    region: Optional[str] = None,
+    selector: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    topics: Optional[str] = None,
+    limit: int = 100
+) -> str:
+    """Searches the server's local log archive (filled by archive_logs) without contacting any router.
+
+    Matching ignores case and covers every archived device unless a
+    selection is given.
+
+    Notes:
+        query: words that must all appear, e.g. "login failure"; "word*"
+            matches a prefix, "a phrase" in quotes matches words in order,
+            OR between words matches either
+        since / until: "YYYY-MM-DD", "YYYY-MM-DD HH:MM" (device clock) or a
+            duration back from now such as "6h" or "7d"
+        topics: comma-separated, entry matches any of them e.g. "system,dhcp"
+        limit: newest matches returned, max 1000
+    """
+    limit = max(1, min(limit, 1000))
+    try:
+        titles = None
+        if devices or tags or region or selector:
+            titles = [d.title for d in get_inventory().select(devices, tags, region, selector)]
+            if not titles:
+                return "No devices match the selection."
+        start = parse_bound(since) if since else None
+        end = parse_bound(until) if until else None
+    except (DeviceNotFoundError, SelectorError, ValueError) as e:
+        return f"Error: {str(e)}"
+    topic_list = [t.strip() for t in (topics or "").split(",") if t.strip()]
+
+    await ctx.info(f"Searching log archive: query={query}, since={start}, until={end}")
+
+    try:
+        rows = await asyncio.to_thread(
+            get_log_archive().search, query, titles, start, end, topic_list, limit
+        )
+    except Exception as e:
+        return f"Error searching the log archive: {str(e)}"
+
+    if not rows:
+        return "No archived log entries match the criteria."
+    lines = [f"[{r['device']}] {r['time'] or '?'} {r['topics']} {r['message']}" for r in rows]
+    return f"LOG ARCHIVE MATCHES ({len(rows)}):\n\n" + "\n".join(lines)
+
+
+@mcp.tool(name="syslog_status", annotations=annotate(READ, "Syslog Status"))
+async def mikrotik_syslog_status(ctx: Context) -> str:
+    """Returns what the server's syslog receiver has buffered per device, and how many messages from unknown sources it dropped."""
+    await ctx.info("Reading syslog receiver status")
+
+    buffer = get_syslog_buffer()
+    if buffer is None:
+        return "The syslog receiver is not running (set MIKROTIK_SYSLOG_PORT to enable it)."
+    return json.dumps(
+        {"buffer_size": buffer.size, "sources": buffer.stats(), "dropped": buffer.dropped}, indent=2
     )
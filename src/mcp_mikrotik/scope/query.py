@@ -0,0 +1,46 @@
+import json
+from typing import Dict, List, Optional
+
+from mcp.server.mcpserver import Context
+
+from ..connector import fetch_rows
+from ..app import mcp, READ, annotate
+
+
+@mcp.tool(name="query_rows", annotations=annotate(READ, "Query Rows"))
+async def mikrotik_query_rows(
+    ctx: Context,
+    menu: str,
+    properties: Optional[List[str]] = None,
+    where: Optional[Dict[str, str]] = None,
+    limit: int = 500,
+    device: Optional[str] = None
+) -> str:
+    """Returns the entries of any RouterOS menu as JSON rows instead of console text.
+
+    Use this when values are needed rather than a listing to read, e.g. every
+    disabled firewall rule's comment, or which pools have a next-pool.
+
+    Notes:
+        menu: menu path, e.g. "ip firewall filter", "/ip/route", "interface"
+        properties: only return these properties, e.g. ["name", "ranges"]
+        where: only rows whose properties equal these values, e.g. {"disabled": "true"}
+        Flags are returned as properties set to "true" (e.g. "dynamic": "true").
+    """
+    await ctx.info(f"Querying rows: menu={menu}, properties={properties}, where={where}")
+
+    try:
+        rows = await fetch_rows(menu, device=device, proplist=properties, where=where)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error querying rows: {str(e)}"
+
+    limit = max(limit, 0)
+    result = {
+        "menu": menu,
+        "count": len(rows),
+        "truncated": len(rows) > limit,
+        "rows": rows[:limit],
+    }
+    return json.dumps(result, ensure_ascii=False, indent=2)
@@ -1,7 +1,13 @@
+import asyncio
+import json
 from typing import Optional, List
-from ..connector import execute_mikrotik_command
+from ..connector import execute_batch, execute_mikrotik_command
 from mcp.server.mcpserver import Context
 from ..app import mcp, READ, WRITE, WRITE_IDEMPOTENT, DESTRUCTIVE, annotate
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..route_diff import diff_stores
+from ..route_store import summarise
+from ..route_table import RouteSnapshot, get_route_snapshots, take_route_snapshot
 
 @mcp.tool(name="add_route", annotations=annotate(WRITE, "Add Route"))
 async def mikrotik_add_route(
@@ -392,27 +398,253 @@ async def mikrotik_get_route_statistics(ctx: Context, device: Optional[str] = No
     """Gets routing table statistics."""
     await ctx.info("Getting route statistics")
 
-    total_cmd = "/ip route print count-only"
-    total_count = await execute_mikrotik_command(total_cmd, ctx, device=device)
+    labels = ["Total", "Active", "Dynamic", "Static", "Disabled"]
+    commands = [
+        "/ip route print count-only",
+        "/ip route print count-only where active=yes",
+        "/ip route print count-only where dynamic=yes",
+        "/ip route print count-only where static=yes",
+        "/ip route print count-only where disabled=yes",
+    ]
+    counts = await execute_batch(commands, ctx, device=device)
 
-    active_cmd = "/ip route print count-only where active=yes"
-    active_count = await execute_mikrotik_command(active_cmd, ctx, device=device)
+    stats = [f"{label} routes: {count.strip()}" for label, count in zip(labels, counts)]
 
-    dynamic_cmd = "/ip route print count-only where dynamic=yes"
-    dynamic_count = await execute_mikrotik_command(dynamic_cmd, ctx, device=device)
+    return "ROUTE STATISTICS:\n\n" + "\n".join(stats)
 
-    static_cmd = "/ip route print count-only where static=yes"
-    static_count = await execute_mikrotik_command(static_cmd, ctx, device=device)
+async def _route_snapshot(
+    ctx: Context, device: str, refresh: bool = False, active_only: bool = True, protect: Optional[str] = None
+) -> RouteSnapshot:
+    """The device's current route snapshot, taking one if there is none or ``refresh``.
 
-    disabled_cmd = "/ip route print count-only where disabled=yes"
-    disabled_count = await execute_mikrotik_command(disabled_cmd, ctx, device=device)
+    A snapshot taken here never prunes the saved one with the id ``protect``.
+    """
+    snapshots = get_route_snapshots()
+    # Saved snapshots of a full table run to tens of MB: read and write them off the loop.
+    snapshot = None if refresh else await asyncio.to_thread(snapshots.get, device)
+    if snapshot is None:
+        await ctx.info(f"Snapshotting routes of '{device}'")
+        snapshot = await take_route_snapshot(device, active_only)
+        await asyncio.to_thread(snapshots.put, snapshot, protect)
+    return snapshot
+
+@mcp.tool(name="snapshot_routes", annotations=annotate(WRITE_IDEMPOTENT, "Snapshot Routes"))
+async def mikrotik_snapshot_routes(
+    ctx: Context,
+    active_only: bool = True,
+    device: Optional[str] = None
+) -> str:
+    """Reads the device's IPv4 and IPv6 routes once into a local snapshot for lookup_routes and summarize_routes.
 
-    stats = [
-        f"Total routes: {total_count.strip()}",
-        f"Active routes: {active_count.strip()}",
-        f"Dynamic routes: {dynamic_count.strip()}",
-        f"Static routes: {static_count.strip()}",
-        f"Disabled routes: {disabled_count.strip()}"
-    ]
+    Rows are packed into a compact store as they stream in, so full BGP
+    tables can be read. Nothing is written to the device. The snapshot
+    becomes the device's latest and is saved on the server, for diff_routes
+    to compare with later ones.
 
-    return "ROUTE STATISTICS:\n\n" + "\n".join(stats)
+    Notes:
+        active_only: keep only active routes, as the router forwards by;
+            False keeps inactive ones too (disabled routes never)
+    """
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+
+    try:
+        snapshot = await _route_snapshot(ctx, target.title, refresh=True, active_only=active_only)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error reading routes: {str(e)}"
+
+    return json.dumps({
+        "device": snapshot.device,
+        "id": snapshot.id,
+        "taken_at": snapshot.taken_at,
+        "active_only": snapshot.active_only,
+        "routes": snapshot.counts(),
+    }, ensure_ascii=False, indent=2)
+
+def _lookup_all(snapshot: RouteSnapshot, destinations: List[str], routing_table: str) -> List[dict]:
+    results = []
+    for destination in destinations:
+        try:
+            routes = snapshot.lookup(destination, routing_table)
+        except ValueError:
+            results.append({"destination": destination, "error": "not an address or prefix"})
+            continue
+        if routes is None:
+            results.append({"destination": destination, "route": None})
+            continue
+        result = {"destination": destination, "route": routes[0].to_dict()}
+        if len(routes) > 1:
+            result["alternatives"] = len(routes) - 1
+        results.append(result)
+    return results
+
+@mcp.tool(name="lookup_routes", annotations=annotate(READ, "Lookup Routes"))
+async def mikrotik_lookup_routes(
+    ctx: Context,
+    destinations: List[str],
+    routing_table: str = "main",
+    refresh: bool = False,
+    device: Optional[str] = None
+) -> str:
+    """Finds the route serving each destination by longest-prefix match, without asking the router.
+
+    The answers come from the device's last snapshot_routes (one is taken
+    first if there is none, or with `refresh`), so thousands of
+    destinations cost no round trips. Use check_route_path for the router's
+    own live answer about one destination.
+
+    Notes:
+        destinations: addresses or prefixes, IPv4 or IPv6 e.g. ["8.8.8.8", "10.20.0.0/16"]
+        routing_table: "main" or a VRF/policy table name
+    """
+    try:
+        target = get_inventory().resolve(device)
+        snapshot = await _route_snapshot(ctx, target.title, refresh)
+    except (DeviceNotFoundError, ValueError) as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error reading routes: {str(e)}"
+
+    await ctx.info(f"Looking up {len(destinations)} destination(s) in '{routing_table}'")
+
+    # The first lookup in a table indexes it, seconds for a full BGP table.
+    results = await asyncio.to_thread(_lookup_all, snapshot, destinations, routing_table)
+    matched = sum(1 for result in results if result.get("route"))
+
+    return json.dumps({
+        "device": snapshot.device,
+        "taken_at": snapshot.taken_at,
+        "routing_table": routing_table,
+        "matched": matched,
+        "unmatched": len(destinations) - matched,
+        "results": results,
+    }, ensure_ascii=False, indent=2)
+
+@mcp.tool(name="summarize_routes", annotations=annotate(READ, "Summarize Routes"))
+async def mikrotik_summarize_routes(
+    ctx: Context,
+    top: int = 10,
+    routing_table: Optional[str] = None,
+    refresh: bool = False,
+    device: Optional[str] = None
+) -> str:
+    """Summarises the device's routing table instead of listing it: routes per table and address
+    family, a prefix-length histogram and the gateways carrying the most routes.
+
+    Computed from the device's last snapshot_routes (one is taken first if
+    there is none, or with `refresh`), so it stays small and fast for full
+    BGP tables.
+
+    Notes:
+        top: how many gateways to list, busiest first
+        routing_table: limit the summary to one table; omit for all
+    """
+    try:
+        target = get_inventory().resolve(device)
+        snapshot = await _route_snapshot(ctx, target.title, refresh)
+    except (DeviceNotFoundError, ValueError) as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error reading routes: {str(e)}"
+
+    summary = {
+        "device": snapshot.device,
+        "taken_at": snapshot.taken_at,
+        "active_only": snapshot.active_only,
+        **summarise(snapshot.store, top, routing_table),
+    }
+    return json.dumps(summary, ensure_ascii=False, indent=2)
+
+@mcp.tool(name="list_route_snapshots", annotations=annotate(READ, "List Route Snapshots"))
+async def mikrotik_list_route_snapshots(ctx: Context, device: Optional[str] = None) -> str:
+    """Lists the route snapshots saved for the device, oldest first, for diff_routes' `baseline`."""
+    try:
+        target = get_inventory().resolve(device)
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+
+    snapshots = get_route_snapshots().describe(target.title)
+    return json.dumps({"device": target.title, "snapshots": snapshots}, ensure_ascii=False, indent=2)
+
+@mcp.tool(name="diff_routes", annotations=annotate(READ, "Diff Routes"))
+async def mikrotik_diff_routes(
+    ctx: Context,
+    other_device: Optional[str] = None,
+    baseline: Optional[str] = None,
+    routing_table: Optional[str] = None,
+    refresh: bool = False,
+    limit: int = 100,
+    device: Optional[str] = None
+) -> str:
+    """Compares routing state and returns only the difference: prefixes added, removed and changed.
+
+    Without `other_device`, compares the device's routes now with an earlier
+    snapshot: `baseline`, or the one before the latest. With `other_device`,
+    compares the device with that one (e.g. the two routers of an HA pair):
+    "added" are routes only the other device has. By default the latest
+    saved snapshots are compared; with `refresh` fresh ones are taken first
+    (then, without `baseline`, the previous latest is the baseline). Only
+    snapshots taken with the same `active_only` can be compared.
+
+    Notes:
+        baseline: a snapshot id from list_route_snapshots
+        routing_table: compare one table only; omit for all
+        limit: most entries listed per kind; counts cover everything
+    """
+    inventory = get_inventory()
+    try:
+        target = inventory.resolve(device)
+        other = inventory.resolve(other_device) if other_device else None
+    except DeviceNotFoundError as e:
+        return f"Error: {str(e)}"
+    if other is not None and baseline:
+        return "Error: pass `other_device` or `baseline`, not both."
+
+    snapshots = get_route_snapshots()
+    try:
+        if other is None:
+            missing = (f"Error: no earlier route snapshot of '{target.title}' to compare with; "
+                       "take one with snapshot_routes first.")
+            earlier = await asyncio.to_thread(snapshots.load, target.title, baseline) if baseline else None
+            if refresh:
+                if earlier is None:
+                    earlier = await asyncio.to_thread(snapshots.get, target.title)
+                    if earlier is None:
+                        return missing
+                current = await _route_snapshot(ctx, target.title, True, earlier.active_only, earlier.id)
+            else:
+                current = await asyncio.to_thread(snapshots.get, target.title)
+                if earlier is None:
+                    ids = [i for i in snapshots.ids(target.title) if current is None or i != current.id]
+                    if current is None or not ids:
+                        return missing
+                    earlier = await asyncio.to_thread(snapshots.load, target.title, ids[-1])
+            left, right = earlier, current
+        else:
+            left = await _route_snapshot(ctx, target.title, refresh)
+            right = await _route_snapshot(ctx, other.title, refresh, left.active_only)
+    except ValueError as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Error reading routes: {str(e)}"
+
+    if left.active_only != right.active_only:
+        kinds = {True: "active routes only", False: "all routes"}
+        return (f"Error: '{left.device}' snapshot {left.id} holds {kinds[left.active_only]} but "
+                f"'{right.device}' snapshot {right.id} holds {kinds[right.active_only]}; "
+                "compare snapshots taken with the same active_only.")
+
+    await ctx.info(f"Comparing routes of '{left.device}' ({left.id}) and '{right.device}' ({right.id})")
+
+    # A sort of each side: seconds for full tables, so off the event loop.
+    delta = await asyncio.to_thread(diff_stores, left.store, right.store, routing_table, limit)
+    result = {
+        "from": {"device": left.device, "id": left.id, "taken_at": left.taken_at},
+        "to": {"device": right.device, "id": right.id, "taken_at": right.taken_at},
+        **delta,
+    }
+    return json.dumps(result, ensure_ascii=False, indent=2)
@@ -1,11 +1,14 @@
 import asyncio
-from typing import Optional
+import json
+from typing import List, Optional
 
 from mcp.server.mcpserver import Context
 
 from ..app import mcp, READ, WRITE, annotate
-from ..inventory import DeviceNotFoundError
-from ..safe_mode import get_safe_mode_manager
+from ..commands import is_read_only_command
+from ..inventory import DeviceNotFoundError, get_inventory
+from ..read_cache import get_read_cache
+from ..safe_mode import BatchResult, get_safe_mode_manager
 
 
 @mcp.tool(name="safe_mode_status", annotations=annotate(READ, "Safe Mode Status"))
@@ -50,3 +53,51 @@ async def mikrotik_rollback_safe_mode(ctx: Context, device: Optional[str] = None
     except DeviceNotFoundError as exc:
         return f"Error: {exc}"
     return await asyncio.to_thread(manager.rollback)
+
+
+@mcp.tool(name="safe_mode_batch", annotations=annotate(WRITE, "Safe Mode Batch"))
+async def mikrotik_safe_mode_batch(
+    ctx: Context,
+    commands: List[str],
+    stop_on_error: bool = True,
+    device: Optional[str] = None
+) -> str:
+    """Runs a list of commands inside the active safe-mode session in one round trip.
+
+    Returns JSON with a status per command: "ok", "failed" (with the router's
+    message) or "skipped" (not run because an earlier command failed while
+    `stop_on_error` is set). Changes stay pending until commit_safe_mode.
+
+    Notes:
+        stop_on_error: skip the remaining commands after the first failure (default true)
+    """
+    await ctx.info(f"Running {len(commands)} command(s) in safe mode (device={device})")
+    try:
+        title = get_inventory().resolve(device).title
+        manager = get_safe_mode_manager(title)
+    except DeviceNotFoundError as exc:
+        return f"Error: {exc}"
+    if not manager.is_active:
+        return "Error: Safe mode is not active. Call enable_safe_mode first."
+    if not commands:
+        return "Error: no commands given."
+
+    try:
+        results = await asyncio.to_thread(manager.execute_batch, commands, stop_on_error)
+    except Exception as e:
+        return f"Error executing batch in safe mode session: {str(e)}"
+    finally:
+        cache = get_read_cache()
+        if cache is not None and not all(is_read_only_command(c) for c in commands):
+            cache.invalidate(title)
+
+    counts = {status: sum(1 for r in results if r.status == status)
+              for status in (BatchResult.OK, BatchResult.FAILED, BatchResult.SKIPPED)}
+    summary = {
+        "commands": len(results),
+        "succeeded": counts[BatchResult.OK],
+        "failed": counts[BatchResult.FAILED],
+        "skipped": counts[BatchResult.SKIPPED],
+        "results": [r.to_dict() for r in results],
+    }
+    return json.dumps(summary, ensure_ascii=False, indent=2)
@@ -0,0 +1,132 @@
+"""Device selector expressions: ``tag:core and region:NL``.
+
+A selector names a set of inventory devices.  Terms are ``field:value`` with
+``field`` one of ``tag``, ``region``, ``title`` or ``host``; values match
+case-insensitively and may use ``*``/``?`` wildcards.  Terms combine with
+``and``, ``or``, ``not`` and parentheses, ``and`` binding tighter than
+``or``; ``*`` alone selects every device::
+
+    tag:core and region:NL
+    (region:NL or region:BE) and not tag:lab
+    title:edge-* or host:10.1.*
+
+:func:`parse_selector` turns the text into a tree once; :func:`evaluate` walks
+it against the inventory's indexes, so each term is a dictionary lookup rather
+than a scan of every device.
+"""
+
+import re
+from typing import Callable, FrozenSet, List
+
+FIELDS = ("tag", "region", "title", "host")
+
+_TOKEN = re.compile(r'\s*(\(|\)|[A-Za-z]+:"[^"]*"|[^\s()]+)')
+
+# A parsed selector: ("all",) | ("term", field, value) | ("not", node)
+# | ("and", left, right) | ("or", left, right)
+Node = tuple
+Lookup = Callable[[str, str], FrozenSet[str]]
+
+
+class SelectorError(ValueError):
+    """Raised for a selector expression that cannot be parsed."""
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise SelectorError(f"Cannot parse selector near {text[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> str:
+        return self.tokens[self.position] if self.position < len(self.tokens) else ""
+
+    def take(self) -> str:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise SelectorError("Selector is empty.")
+        node = self.parse_or()
+        if self.position < len(self.tokens):
+            raise SelectorError(f"Unexpected {self.peek()!r} in selector {self.text!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        node = self.parse_and()
+        while self.peek().lower() == "or":
+            self.take()
+            node = ("or", node, self.parse_and())
+        return node
+
+    def parse_and(self) -> Node:
+        node = self.parse_not()
+        while self.peek().lower() == "and":
+            self.take()
+            node = ("and", node, self.parse_not())
+        return node
+
+    def parse_not(self) -> Node:
+        if self.peek().lower() == "not":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node:
+        token = self.take()
+        if token == "(":
+            node = self.parse_or()
+            if self.take() != ")":
+                raise SelectorError(f"Missing ')' in selector {self.text!r}")
+            return node
+        if token == "*":
+            return ("all",)
+        field, sep, value = token.partition(":")
+        field = field.lower()
+        if not sep or field not in FIELDS or not value:
+            raise SelectorError(
+                f"Expected a term like 'tag:core' in selector {self.text!r}, got {token!r}. "
+                f"Fields: {', '.join(FIELDS)}."
+            )
+        if len(value) >= 2 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        return ("term", field, value.casefold())
+
+
+def parse_selector(text: str) -> Node:
+    """Parse a selector expression, raising :class:`SelectorError` if malformed."""
+    return _Parser(text).parse()
+
+
+def evaluate(node: Node, lookup: Lookup, universe: FrozenSet[str]) -> FrozenSet[str]:
+    """Return the device keys ``node`` selects.
+
+    ``lookup(field, value)`` returns the keys of devices whose ``field``
+    matches ``value``; ``universe`` is every key, for ``*`` and ``not``.
+    """
+    kind = node[0]
+    if kind == "all":
+        return universe
+    if kind == "term":
+        return lookup(node[1], node[2])
+    if kind == "not":
+        return universe - evaluate(node[1], lookup, universe)
+    left = evaluate(node[1], lookup, universe)
+    if kind == "and":
+        return left & evaluate(node[2], lookup, universe) if left else left
+    return left | evaluate(node[2], lookup, universe)
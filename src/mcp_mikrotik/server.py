@@ -133,6 +133,16 @@ def main():
 
     _warn_if_plaintext_password_in_container(config.mikrotik_config, logger)
 
+    if config.mikrotik_config.syslog_port:
+        from mcp_mikrotik.syslog_receiver import start_syslog_receiver
+
+        cfg = config.mikrotik_config
+        try:
+            start_syslog_receiver(cfg.syslog_host, cfg.syslog_port, cfg.syslog_buffer, inventory.all_devices())
+        except OSError as e:
+            logger.error(f"Cannot start the syslog receiver on {cfg.syslog_host}:{cfg.syslog_port}: {e}")
+            sys.exit(1)
+
     try:
         transport = config.mikrotik_config.mcp.transport
         # stdio takes no transport options.
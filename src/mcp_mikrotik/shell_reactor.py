@@ -0,0 +1,183 @@
+"""One thread that waits on every safe-mode shell at once.
+
+A safe-mode session keeps an interactive channel open for as long as safe mode
+is on, and every read from it used to poll ``recv_ready()`` every 50 ms — up
+to 50 ms of added latency per chunk, and a spinning thread per session while a
+command runs.  :class:`ShellReactor` registers the channels with one selector
+instead: its thread wakes when a channel's socket has data, moves the bytes
+into that channel's buffer, and wakes the reader waiting on it.
+
+paramiko channels expose a readiness ``fileno()``.  Anything that does not
+(test doubles, exotic transports) is still served, by polling, from the
+caller's thread.
+"""
+
+import logging
+import selectors
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 32768
+
+
+class _Slot:
+    """Bytes received for one channel and the condition its reader waits on."""
+
+    __slots__ = ("buffer", "closed", "ready")
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self.buffer = bytearray()
+        self.closed = False
+        self.ready = threading.Condition(lock)
+
+
+class ShellReactor:
+    """Selector loop that services many interactive channels from one thread."""
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._slots: Dict[int, _Slot] = {}
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, channel) -> bool:
+        """Start watching ``channel``; False if it cannot be selected on."""
+        try:
+            channel.fileno()
+        except (AttributeError, OSError, NotImplementedError):
+            return False
+        with self._lock:
+            if id(channel) in self._slots:
+                return True
+            self._slots[id(channel)] = _Slot(self._lock)
+            self._selector.register(channel, selectors.EVENT_READ, channel)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="mikrotik-shell-reactor", daemon=True
+                )
+                self._thread.start()
+        self._wake()
+        return True
+
+    def unregister(self, channel) -> None:
+        with self._lock:
+            slot = self._slots.pop(id(channel), None)
+            if slot is None:
+                return
+            try:
+                self._selector.unregister(channel)
+            except (KeyError, ValueError):
+                pass
+            slot.closed = True
+            slot.ready.notify_all()
+        self._wake()
+
+    def recv(self, channel, timeout: float) -> Optional[bytes]:
+        """Return the bytes that arrived on ``channel``, waiting up to ``timeout``.
+
+        Returns None when nothing arrived in time or the channel is closed.
+        """
+        with self._lock:
+            slot = self._slots.get(id(channel))
+            if slot is not None:
+                deadline = time.monotonic() + timeout
+                while not slot.buffer and not slot.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    slot.ready.wait(remaining)
+                if not slot.buffer:
+                    return None
+                data = bytes(slot.buffer)
+                slot.buffer.clear()
+                return data
+        return _poll(channel, timeout)
+
+    # ------------------------------------------------------------------
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            for key, _ in self._selector.select(timeout=5.0):
+                if key.data is None:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+                self._drain(key.data)
+
+    def _drain(self, channel) -> None:
+        data = bytearray()
+        closed = False
+        try:
+            while channel.recv_ready():
+                chunk = channel.recv(_CHUNK)
+                if not chunk:
+                    closed = True
+                    break
+                data += chunk
+            if not data and (channel.closed or channel.eof_received):
+                closed = True
+        except Exception as e:
+            logger.debug(f"Shell channel read failed: {e}")
+            closed = True
+
+        with self._lock:
+            slot = self._slots.get(id(channel))
+            if slot is None:
+                return
+            slot.buffer += data
+            if closed:
+                # The slot stays until unregister() so its last bytes are
+                # still delivered; only the selector stops watching.
+                slot.closed = True
+                try:
+                    self._selector.unregister(channel)
+                except (KeyError, ValueError):
+                    pass
+            slot.ready.notify_all()
+
+
+def _poll(channel, timeout: float) -> Optional[bytes]:
+    """Read from a channel the reactor cannot select on."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if channel.recv_ready():
+                return channel.recv(_CHUNK) or None
+            if getattr(channel, "closed", False):
+                return None
+        except Exception:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        time.sleep(min(0.01, remaining))
+
+
+_reactor: Optional[ShellReactor] = None
+_reactor_lock = threading.Lock()
+
+
+def get_shell_reactor() -> ShellReactor:
+    """The process-wide reactor, created on first use."""
+    global _reactor
+    if _reactor is None:
+        with _reactor_lock:
+            if _reactor is None:
+                _reactor = ShellReactor()
+    return _reactor
@@ -0,0 +1,40 @@
+"""Where the server keeps files on its own disk.
+
+Downloads, backups and snapshots fetched from devices live under one data
+directory — ``MIKROTIK_DATA_DIR``, or ``$XDG_DATA_HOME/mcp-mikrotik``
+(``~/.local/share/mcp-mikrotik``) by default — in a subdirectory per kind of
+data and, below that, per device.
+"""
+
+import os
+import re
+from pathlib import Path
+
+from . import config
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def data_dir() -> Path:
+    """The server's data directory, created if missing."""
+    configured = config.mikrotik_config.data_dir
+    if configured:
+        root = Path(configured).expanduser()
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share"
+        root = Path(base) / "mcp-mikrotik"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def safe_name(name: str) -> str:
+    """``name`` reduced to characters that are safe in a file name."""
+    cleaned = _UNSAFE.sub("_", name).strip("._")
+    return cleaned or "_"
+
+
+def device_dir(kind: str, device: str) -> Path:
+    """``<data dir>/<kind>/<device>``, created if missing."""
+    path = data_dir() / kind / safe_name(device.casefold())
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,274 @@
+"""Receive RouterOS remote logging instead of polling ``/log print``.
+
+Point a ``/system logging action`` of ``target=remote`` at the server and
+enable :class:`SyslogReceiver` (``MIKROTIK_SYSLOG_PORT``): it listens on UDP
+and TCP from its own thread and event loop, parses each message into a
+:class:`~mcp_mikrotik.log_entries.LogEntry` and keeps the newest
+``MIKROTIK_SYSLOG_BUFFER`` of them per device in a ring.  Log reads can then
+be answered from memory without a round trip to the router.
+
+A message is attributed to the inventory device whose host matches its
+source address; a message from any other address is dropped, so only the
+inventory can fill the buffer.  Syslog is unauthenticated, so the hostname
+in a message is trusted only for devices that opt in (``syslog_hostname``).
+Entry times are when the server received them.
+"""
+
+import asyncio
+import logging
+import re
+import socket
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .log_entries import SEVERITIES, LogEntry
+
+logger = logging.getLogger(__name__)
+
+# Syslog severities 0-7 in RouterOS topic names.
+_SEVERITY_TOPICS = ("critical", "critical", "critical", "error", "warning", "info", "info", "debug")
+
+_PRI = re.compile(r"^<(\d{1,3})>")
+_RFC5424 = re.compile(r"^1 \S+ (\S+) \S+ \S+ \S+ (?:-|(?:\[.*?\])+) ?(.*)$", re.S)
+_RFC3164 = re.compile(r"^[A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d (\S+) (.*)$", re.S)
+_TOPICS = re.compile(r"^[a-z0-9-]+(?:,[a-z0-9-]+)*$")
+
+# Longest TCP frame accepted (RFC 6587 octet count or line); a peer sending
+# more is disconnected rather than buffered.
+MAX_FRAME = 64 * 1024
+
+
+def parse_syslog(text: str) -> Tuple[Optional[str], Tuple[str, ...], str]:
+    """Split a syslog message into (hostname, topics, message).
+
+    Understands RFC 3164 (RouterOS ``bsd-syslog``), RFC 5424 and RouterOS'
+    default bare form.  RouterOS starts the message with its topics
+    (``system,info,account user admin logged in``); when it does not, the
+    severity from the priority stands in.
+    """
+    text = text.strip("\r\n\0 ")
+    severity = "info"
+    match = _PRI.match(text)
+    if match:
+        severity = _SEVERITY_TOPICS[int(match.group(1)) & 7]
+        text = text[match.end():]
+
+    hostname = None
+    for header in (_RFC5424, _RFC3164):
+        match = header.match(text)
+        if match:
+            hostname, text = match.group(1), match.group(2)
+            break
+    if hostname == "-":
+        hostname = None
+
+    first, _, rest = text.partition(" ")
+    if _TOPICS.match(first) and ("," in first or first in SEVERITIES):
+        topics = tuple(first.split(","))
+        text = rest
+    else:
+        topics = ()
+    if not any(t in SEVERITIES for t in topics):
+        topics += (severity,)
+    return hostname, topics, text.strip()
+
+
+class SyslogBuffer:
+    """The newest entries received per device, in arrival order."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._rings: Dict[str, Deque[LogEntry]] = {}
+        self._counts: Dict[str, int] = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, device: str, topics: Tuple[str, ...], message: str,
+            received: Optional[datetime] = None) -> LogEntry:
+        with self._lock:
+            count = self._counts.get(device, 0) + 1
+            self._counts[device] = count
+            entry = LogEntry(f"*{count:X}", received or datetime.now(), topics, message)
+            self._rings.setdefault(device, deque(maxlen=self.size)).append(entry)
+        return entry
+
+    def drop(self) -> None:
+        """Count a message that belonged to no device."""
+        with self._lock:
+            self.dropped += 1
+
+    def entries(self, device: str) -> List[LogEntry]:
+        with self._lock:
+            return list(self._rings.get(device, ()))
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                device: {
+                    "buffered": len(ring),
+                    "received": self._counts[device],
+                    "newest": f"{ring[-1].time:%Y-%m-%d %H:%M:%S}" if ring else None,
+                }
+                for device, ring in self._rings.items()
+            }
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def __init__(self, receiver: "SyslogReceiver") -> None:
+        self.receiver = receiver
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.receiver.handle(data, addr[0])
+
+
+class SyslogReceiver:
+    """UDP + TCP syslog listener feeding a :class:`SyslogBuffer`.
+
+    ``device_for(source_ip, hostname)`` names the device a message belongs to,
+    or returns None to drop it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        buffer: SyslogBuffer,
+        device_for: Callable[[str, Optional[str]], Optional[str]],
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.buffer = buffer
+        self.device_for = device_for
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._closers: List[Callable[[], None]] = []
+
+    def handle(self, data: bytes, source: str) -> None:
+        text = data.decode("utf-8", errors="replace")
+        if not text.strip():
+            return
+        hostname, topics, message = parse_syslog(text)
+        device = self.device_for(source, hostname)
+        if device is None:
+            self.buffer.drop()
+        else:
+            self.buffer.add(device, topics, message)
+
+    async def _serve_tcp(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        source = writer.get_extra_info("peername")[0]
+        try:
+            while True:
+                # RFC 6587: a frame starting with a digit is octet-counted
+                # ("<length> <message>"); anything else is one message per line.
+                # Lines are bounded by the stream's limit (MAX_FRAME).
+                first = await reader.readexactly(1)
+                if first.isdigit():
+                    digits = first + (await reader.readuntil(b" "))[:-1]
+                    if len(digits) > 6 or int(digits) > MAX_FRAME:
+                        logger.warning(f"Syslog frame of {digits[:12]!r} bytes from {source} refused; disconnecting")
+                        return
+                    self.handle(await reader.readexactly(int(digits)), source)
+                else:
+                    self.handle(first + await reader.readline(), source)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UDPProtocol(self), local_addr=(self.host, self.port)
+        )
+        self._closers.append(transport.close)
+        if self.port == 0:
+            self.port = transport.get_extra_info("sockname")[1]
+        server = await asyncio.start_server(self._serve_tcp, self.host, self.port, limit=MAX_FRAME)
+        self._closers.append(server.close)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._start())
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        self._loop.run_forever()
+        for close in self._closers:
+            close()
+        self._loop.run_until_complete(asyncio.sleep(0))
+        self._loop.close()
+
+    def start(self) -> None:
+        """Bind the sockets and serve from a background thread; raises OSError on failure."""
+        self._thread = threading.Thread(target=self._run, name="mikrotik-syslog", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        logger.info(f"Syslog receiver listening on {self.host}:{self.port} (UDP and TCP)")
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+def inventory_resolver(devices) -> Callable[[str, Optional[str]], Optional[str]]:
+    """``device_for`` for :class:`SyslogReceiver` from inventory devices.
+
+    Host names are resolved once, here.  Only devices with
+    ``syslog_hostname`` set are also matched by the hostname in the message,
+    from any address.
+    """
+    by_address: Dict[str, str] = {}
+    by_title: Dict[str, str] = {}
+    for device in devices:
+        if device.syslog_hostname:
+            by_title[device.title.casefold()] = device.title
+        by_address[device.host] = device.title
+        try:
+            for info in socket.getaddrinfo(device.host, None):
+                by_address.setdefault(info[4][0], device.title)
+        except OSError:
+            pass
+
+    def device_for(source: str, hostname: Optional[str]) -> Optional[str]:
+        if source in by_address:
+            return by_address[source]
+        if hostname and hostname.casefold() in by_title:
+            return by_title[hostname.casefold()]
+        return None
+
+    return device_for
+
+
+_receiver: Optional[SyslogReceiver] = None
+
+
+def start_syslog_receiver(host: str, port: int, size: int, devices) -> SyslogReceiver:
+    """Start the process-wide receiver (once); see :func:`get_syslog_buffer`."""
+    global _receiver
+    if _receiver is None:
+        receiver = SyslogReceiver(host, port, SyslogBuffer(size), inventory_resolver(devices))
+        receiver.start()
+        _receiver = receiver
+    return _receiver
+
+
+def stop_syslog_receiver() -> None:
+    global _receiver
+    if _receiver is not None:
+        _receiver.stop()
+        _receiver = None
+
+
+def get_syslog_buffer() -> Optional[SyslogBuffer]:
+    """The running receiver's buffer, or None when it is not enabled."""
+    return _receiver.buffer if _receiver is not None else None
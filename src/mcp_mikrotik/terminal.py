@@ -0,0 +1,100 @@
+"""Incremental decoding of an interactive RouterOS console stream.
+
+The safe-mode shell is a real terminal session: its output is interleaved
+with VT escape sequences, the console probes the terminal and waits for
+answers, and line ends arrive as ``\\r\\n`` or bare ``\\r``.  Cleaning the whole
+accumulated buffer again on every network read is quadratic in the output
+size, which shows on an ``export`` or a large ``print`` in safe mode.
+
+:class:`TerminalDecoder` looks at each byte once.  A UTF-8 character, escape
+sequence or ``\\r\\n`` split across two reads is held back until its end
+arrives, so probes are answered exactly once and nothing is cut in half.
+"""
+
+import codecs
+import re
+from typing import List
+
+# Strip ANSI/VT escape sequences that MikroTik emits on interactive shells
+ANSI_RE = re.compile(
+    r'\x1b(?:'
+    r'\[[0-9;]*[mABCDEFGHJKLMSTfhilmnprsu]'
+    r'|[()][0-9A-Za-z]'
+    r'|\[?\?[0-9]+[hl]'
+    r'|\[\d*[ABCDEFGHJKLMST]'
+    r'|\[c'
+    r'|Z'
+    r')'
+)
+
+# The start of an escape sequence that may still be completed by the next
+# read.  Real sequences are short; anything longer is released as text.
+_PARTIAL_RE = re.compile(r'\x1b(?:\[[?0-9;]*|[()]|\?[0-9]*)?')
+_PARTIAL_MAX = 16
+
+# The RouterOS console treats the session as a real terminal: it measures the
+# screen by moving the cursor to the extremes and asking where it ended up, and
+# probes the terminal type. If nothing answers, the console stays
+# half-initialised — slow to render, and RouterOS closes the channel outright
+# when Ctrl-X asks it to redraw for safe mode. Answer as a healthy 220x50 VT.
+TERMINAL_QUERIES = (
+    ('\x1b[6n', '\x1b[50;220R'),   # DSR: report cursor position
+    ('\x1bZ', '\x1b[?6c'),         # DECID: identify terminal
+    ('\x1b[c', '\x1b[?6c'),        # DA: device attributes
+)
+
+
+def strip_ansi(text: str) -> str:
+    return ANSI_RE.sub('', text)
+
+
+def _held_back(text: str) -> int:
+    """Index from which ``text`` may be the unfinished start of something."""
+    start = text.rfind('\x1b', max(0, len(text) - _PARTIAL_MAX))
+    if start != -1 and _PARTIAL_RE.fullmatch(text, start) and not ANSI_RE.match(text, start):
+        return start
+    if text.endswith('\r'):
+        return len(text) - 1
+    return len(text)
+
+
+class TerminalDecoder:
+    """Turns console bytes into clean text, one read at a time.
+
+    :meth:`feed` returns the lines each read completed; :attr:`line` is the
+    line still being written (a prompt, usually).  Replies owed to terminal
+    probes collect in :attr:`replies` for the caller to send.
+    """
+
+    def __init__(self) -> None:
+        self._decode = codecs.getincrementaldecoder('utf-8')(errors='replace').decode
+        self._carry = ""
+        self._parts: List[str] = []
+        self.line = ""
+        self.replies: List[str] = []
+
+    def feed(self, data: bytes) -> List[str]:
+        """Take the next bytes from the console; return the lines they complete."""
+        text = self._carry + self._decode(data)
+        cut = _held_back(text)
+        text, self._carry = text[:cut], text[cut:]
+
+        for query, reply in TERMINAL_QUERIES:
+            self.replies.extend([reply] * text.count(query))
+
+        clean = strip_ansi(text).replace('\r\n', '\n').replace('\r', '\n')
+        self._parts.append(clean)
+        lines = (self.line + clean).split('\n')
+        self.line = lines.pop()
+        return lines
+
+    def take_replies(self) -> List[str]:
+        replies, self.replies = self.replies, []
+        return replies
+
+    @property
+    def text(self) -> str:
+        """Everything cleaned so far (without a held-back partial sequence)."""
+        if len(self._parts) > 1:
+            self._parts = ["".join(self._parts)]
+        return self._parts[0] if self._parts else ""
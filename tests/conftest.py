@@ -15,6 +15,15 @@ if _SRC_ROOT.exists():
     sys.path.insert(0, str(_SRC_ROOT))
 
 
+@pytest.fixture(autouse=True)
+def _isolated_data_dir(tmp_path, monkeypatch):
+    """Keep files the server writes (downloads, snapshots) out of $HOME."""
+    from mcp_mikrotik import config
+
+    monkeypatch.setattr(config.mikrotik_config, "data_dir", str(tmp_path / "mikrotik-data"),
+                        raising=False)
+
+
 @pytest.fixture()
 def ctx():
     c = MagicMock()
@@ -38,7 +47,7 @@ class FakeExecutor:
         self.commands: list[str] = []
         self.devices: list[Any] = []
 
-    async def __call__(self, command: str, _ctx: Any, device: Any = None) -> str:
+    async def __call__(self, command: str, _ctx: Any, device: Any = None, read_only: bool = False) -> str:
         self.commands.append(command)
         self.devices.append(device)
 
@@ -49,6 +58,17 @@ class FakeExecutor:
             return "some mikrotik output"
         return ""
 
+    async def batch(self, commands: list, ctx: Any, device: Any = None, cached: bool = True) -> list:
+        """Stand-in for execute_batch: each command through ``__call__``."""
+        return [await self(command, ctx, device) for command in commands]
+
+    async def rows(self, menu: str, consumer: Any, device: Any = None,
+                   proplist: Any = None, where: Any = None) -> int:
+        """Stand-in for consume_rows: records the menu, streams no rows."""
+        self.commands.append(f"/{menu} print terse")
+        self.devices.append(device)
+        return 0
+
 
 @pytest.fixture()
 def fake_exec():
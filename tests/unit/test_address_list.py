@@ -0,0 +1,192 @@
+"""Tests for syncing a firewall address list through one uploaded script."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_mikrotik import address_list
+from mcp_mikrotik.address_list import AddressListState, SyncPlan, normalise_entry, render_script
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+
+ROWS = [
+    {".id": "*1", "list": "block", "address": "192.0.2.1"},
+    {".id": "*2", "list": "block", "address": "198.51.100.0/24"},
+    {".id": "*3", "list": "block", "address": "203.0.113.7", "disabled": "true"},
+    {".id": "*4", "list": "block", "address": "192.0.2.99", "dynamic": "true", "timeout": "1h"},
+    {".id": "*5", "list": "other", "address": "192.0.2.2"},
+]
+
+
+def test_entries_are_normalised_as_routeros_prints_them():
+    assert normalise_entry(" 192.0.2.1/32 ") == "192.0.2.1"
+    assert normalise_entry("10.1.2.3/8") == "10.0.0.0/8"
+    assert normalise_entry("10.0.0.1-10.0.0.9") == "10.0.0.1-10.0.0.9"
+    assert normalise_entry("Example.COM") == "example.com"
+    for bad in ("10.0.0.9-10.0.0.1", "10.0.0.300", "not an address", "2001:db8::1", ""):
+        with pytest.raises(ValueError):
+            normalise_entry(bad)
+
+
+def test_plan_and_script_carry_only_the_difference(monkeypatch):
+    monkeypatch.setattr(address_list, "CHUNK", 2)
+    state = AddressListState("block")
+    for row in ROWS:
+        state.add_row(row)
+    state.add_row({"list": "block", "address": "192.0.2.50"})       # read over SSH: no .id
+
+    plan = SyncPlan(state, {"192.0.2.1", "203.0.113.7", "192.0.2.99", "10.0.0.1", "10.0.0.2", "10.0.0.3"})
+
+    assert plan.add == ["10.0.0.1", "10.0.0.2", "10.0.0.3", "203.0.113.7"]
+    assert plan.remove == [("198.51.100.0/24", "*2"), ("192.0.2.50", None)]
+    assert plan.remove_disabled == [("203.0.113.7", "*3")]
+    assert plan.unchanged == 1 and plan.expected == 5
+
+    script = render_script(plan, comment='feed "A"').splitlines()
+    assert script[1:] == [
+        ':foreach v in={"*2"} do={:do {/ip firewall address-list remove [:toid $v]} on-error={}}',
+        ':foreach v in={"192.0.2.50"} do={:do {/ip firewall address-list remove '
+        '[find list="block" address=$v dynamic=no]} on-error={}}',
+        ':foreach v in={"*3"} do={:do {/ip firewall address-list remove [:toid $v]} on-error={}}',
+        ':foreach v in={"10.0.0.1";"10.0.0.2"} do={:do {/ip firewall address-list add '
+        'list="block" address=$v comment="feed \\"A\\""} on-error={}}',
+        ':foreach v in={"10.0.0.3";"203.0.113.7"} do={:do {/ip firewall address-list add '
+        'list="block" address=$v comment="feed \\"A\\""} on-error={}}',
+    ]
+
+
+def test_duplicate_entries_are_removed():
+    state = AddressListState("block")
+    for id, address in (("*1", "192.0.2.1"), ("*2", "192.0.2.1/32"), ("*3", "192.0.2.2"), ("*4", "192.0.2.2")):
+        state.add_row({".id": id, "list": "block", "address": address})
+    plan = SyncPlan(state, {"192.0.2.1"})
+    assert plan.remove == [("192.0.2.2", "*3"), ("192.0.2.1", "*2"), ("192.0.2.2", "*4")]
+    assert plan.add == [] and plan.unchanged == 1 and plan.expected == 1
+
+    # Read over SSH: the copies go together and a desired address comes back once.
+    state = AddressListState("block")
+    for address in ("192.0.2.1", "192.0.2.1", "192.0.2.1", "192.0.2.2", "192.0.2.2"):
+        state.add_row({"list": "block", "address": address})
+    plan = SyncPlan(state, {"192.0.2.1"})
+    assert plan.remove == [("192.0.2.2", None), ("192.0.2.1", None)]
+    assert plan.add == ["192.0.2.1"] and plan.unchanged == 0 and plan.expected == 1
+
+
+def test_large_lists_make_a_compact_script():
+    state = AddressListState("block")
+    for n in range(90_000):
+        state.add_row({"list": "block", "address": f"10.{n >> 16}.{(n >> 8) & 255}.{n & 255}"})
+    desired = {f"10.{n >> 16}.{(n >> 8) & 255}.{n & 255}" for n in range(10_000, 110_000)}
+
+    plan = SyncPlan(state, desired)
+    script = render_script(plan)
+
+    assert len(plan.add) == 20_000 and len(plan.remove) == 10_000
+    assert len(script.splitlines()) == 1 + 300
+    assert len(script) < 20 * plan.changes
+
+
+@pytest.fixture()
+def router(monkeypatch):
+    """A device whose address list streams from ROWS; records uploads and batches."""
+    seen = {"uploads": [], "batches": [], "where": []}
+    outputs = {"import": "Script file loaded and executed successfully", "count": "4"}
+
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        seen["where"].append((menu, where, device))
+        for row in ROWS:
+            consumer(row)
+        return len(ROWS)
+
+    async def fake_batch(commands, ctx, device=None, cached=True):
+        seen["batches"].append(commands)
+        results = []
+        for command in commands:
+            if command.startswith("/import"):
+                results.append(outputs["import"])
+            elif "count-only" in command:
+                results.append(outputs["count"])
+            else:
+                results.append("")
+        return results
+
+    monkeypatch.setattr(address_list, "consume_rows", fake_consume)
+    monkeypatch.setattr(address_list, "execute_batch", fake_batch)
+    monkeypatch.setattr(address_list, "upload_file_sync",
+                        lambda filename, data, device=None: seen["uploads"].append((filename, data, device)))
+    safe_mode = SimpleNamespace(is_active=False)
+    monkeypatch.setattr(address_list, "get_safe_mode_manager", lambda device=None: safe_mode)
+    from mcp_mikrotik.scope import firewall_filter
+    monkeypatch.setattr(firewall_filter, "get_inventory",
+                        lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+    seen["outputs"] = outputs
+    seen["safe_mode"] = safe_mode
+    return seen
+
+
+def test_sync_uploads_imports_and_verifies(ctx, router):
+    from mcp_mikrotik.scope.firewall_filter import mikrotik_sync_address_list
+
+    out = json.loads(asyncio.run(mikrotik_sync_address_list(
+        ctx, "block", ["192.0.2.1", "192.0.2.99", "10.0.0.1/32", "10.0.0.2", "10.0.0.3"],
+    )))
+
+    assert router["where"] == [("ip firewall address-list", {"list": "block"}, "R1")]
+    assert out["added"] == 3 and out["removed"] == 2 and out["unchanged"] == 1
+    assert out["before"] == {"static": 3, "dynamic": 1}
+    assert out["expected"] == 4 and out["entries"] == 4 and out["verified"] is True
+
+    (filename, data, device), = router["uploads"]
+    assert filename == "mcp-address-list-block.rsc" and device == "R1"
+    assert out["script_bytes"] == len(data)
+    batch, = router["batches"]
+    assert batch == [
+        '/import file-name="mcp-address-list-block.rsc"',
+        '/ip firewall address-list print count-only where list="block" dynamic=no',
+        '/file remove "mcp-address-list-block.rsc"',
+    ]
+
+    router["outputs"]["count"] = "3"
+    again = json.loads(asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1"])))
+    assert again["verified"] is False and again["entries"] == 3
+
+
+def test_dry_run_reports_without_uploading(ctx, router):
+    from mcp_mikrotik.scope.firewall_filter import mikrotik_sync_address_list
+
+    dry = json.loads(asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1"], dry_run=True)))
+
+    assert dry["dry_run"] is True and dry["sample"]["add"] == ["10.0.0.1"]
+    assert dry["sample"]["remove"] == ["192.0.2.1", "198.51.100.0/24"]
+    assert router["uploads"] == [] and router["batches"] == []
+
+    same = json.loads(asyncio.run(mikrotik_sync_address_list(ctx, "block", ["192.0.2.1", "198.51.100.0/24"])))
+    assert same["added"] == 0 and same["removed"] == 1               # the disabled entry is replaced
+
+
+def test_sync_errors(ctx, router):
+    from mcp_mikrotik.scope.firewall_filter import mikrotik_sync_address_list
+
+    bad = asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1", "nope!", "2001:db8::1"]))
+    assert bad.startswith("Error: 2 invalid address(es): 'nope!', '2001:db8::1'")
+    assert asyncio.run(mikrotik_sync_address_list(ctx, "a\nb", [])).startswith("Error: list name")
+
+    router["outputs"]["import"] = "failure: not enough memory"
+    failed = asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1"]))
+    assert failed.startswith("Error: import of mcp-address-list-block.rsc failed: failure")
+    assert router["batches"][-1] == ['/file remove "mcp-address-list-block.rsc"']
+    assert len(router["uploads"]) == 1
+
+
+def test_sync_is_refused_in_safe_mode(ctx, router):
+    from mcp_mikrotik.scope.firewall_filter import mikrotik_sync_address_list
+
+    router["safe_mode"].is_active = True
+    refused = asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1"]))
+    assert refused.startswith("Error: safe mode is active on 'R1'")
+    assert router["uploads"] == [] and router["batches"] == []
+
+    dry = json.loads(asyncio.run(mikrotik_sync_address_list(ctx, "block", ["10.0.0.1"], dry_run=True)))
+    assert dry["added"] == 1
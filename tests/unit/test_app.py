@@ -32,13 +32,20 @@ def test_device_guidance_lives_in_server_instructions_not_every_tool():
 
 
 def test_every_tool_still_accepts_a_device_argument():
-    """Dropping the prose must not drop the parameter."""
+    """Dropping the prose must not drop the parameter.
+
+    Only tools that work across the inventory as a whole are exempt.
+    """
     from mcp_mikrotik.app import mcp
 
+    fleet_wide = {
+        "list_devices", "fleet_execute", "fleet_backup", "read_cache_stats",
+        "archive_logs", "search_log_archive", "syslog_status",
+    }
     tools = asyncio.run(mcp.list_tools())
     missing = [
         t.name for t in tools
-        if t.name != "list_devices"
+        if t.name not in fleet_wide
         and "device" not in (t.input_schema.get("properties") or {})
     ]
     assert missing == []
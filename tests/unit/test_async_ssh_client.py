@@ -0,0 +1,161 @@
+"""Tests for the asyncssh-based engine and its paramiko fallback."""
+
+import asyncio
+
+import pytest
+
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+
+
+def test_engine_falls_back_to_paramiko_without_asyncssh(monkeypatch):
+    import mcp_mikrotik.inventory as inv_mod
+
+    monkeypatch.setattr(inv_mod, "asyncssh_available", lambda: False)
+    inv = Inventory([DeviceConfig(title="RouterA", host="10.0.0.1", ssh_engine="asyncssh")])
+    assert inv.ssh_engine("RouterA") == "paramiko"
+
+
+def test_engine_is_selected_per_device(monkeypatch):
+    import mcp_mikrotik.inventory as inv_mod
+
+    monkeypatch.setattr(inv_mod, "asyncssh_available", lambda: True)
+    inv = Inventory([
+        DeviceConfig(title="RouterA", host="10.0.0.1", ssh_engine="asyncssh"),
+        DeviceConfig(title="RouterB", host="10.0.0.2"),
+    ])
+    assert inv.ssh_engine("RouterA") == "asyncssh"
+    assert inv.ssh_engine("RouterB") == "paramiko"      # server default
+
+
+def test_connector_runs_asyncssh_commands_on_the_loop(ctx, monkeypatch):
+    """The async engine must not take a worker thread per command."""
+    from contextlib import asynccontextmanager
+
+    from mcp_mikrotik import connector
+    from mcp_mikrotik import inventory as inv_mod
+
+    device = DeviceConfig(title="RouterA", host="10.0.0.1")
+    ran = []
+
+    class FakeAsyncClient:
+        async def execute_command(self, command):
+            ran.append(command)
+            return "identity: RouterA"
+
+    class FakeInventory:
+        def resolve(self, title=None):
+            return device
+
+        def ssh_engine(self, title=None):
+            return "asyncssh"
+
+        @asynccontextmanager
+        async def async_session(self, title=None):
+            yield FakeAsyncClient()
+
+    async def no_threads(*args, **kwargs):
+        raise AssertionError("asyncssh commands must not use asyncio.to_thread")
+
+    monkeypatch.setattr(connector, "get_inventory", lambda: FakeInventory())
+    monkeypatch.setattr(inv_mod, "get_inventory", lambda: FakeInventory())
+    monkeypatch.setattr(asyncio, "to_thread", no_threads)
+
+    result = asyncio.run(connector.execute_mikrotik_command("/system identity print", ctx))
+    assert result == "identity: RouterA"
+    assert ran == ["/system identity print"]
+
+
+def test_async_client_requires_connect():
+    from mcp_mikrotik.async_ssh_client import AsyncMikroTikSSHClient
+
+    client = AsyncMikroTikSSHClient(host="h", username="u", password="p", key_filename=None)
+    with pytest.raises(Exception, match="Not connected"):
+        asyncio.run(client.execute_command("/system identity print"))
+
+
+def test_async_client_against_a_local_ssh_server():
+    asyncssh = pytest.importorskip("asyncssh")
+    from mcp_mikrotik.async_ssh_client import AsyncMikroTikSSHClient
+
+    class Server(asyncssh.SSHServer):
+        def begin_auth(self, username):
+            return True
+
+        def password_auth_supported(self):
+            return True
+
+        def validate_password(self, username, password):
+            return username == "admin" and password == "secret"
+
+    async def handle(process):
+        if process.command == "/system identity print":
+            process.stdout.write("name: RouterA\n")
+        elif process.command == "/ip pool print terse":
+            process.stdout.write(" 0 name=pool1\r\n 1 name=pool2\r\n")
+        else:
+            process.stderr.write("bad command name\n")
+        process.exit(0)
+
+    async def scenario():
+        key = asyncssh.generate_private_key("ssh-ed25519")
+        server = await asyncssh.create_server(
+            Server, "127.0.0.1", 0, server_host_keys=[key], process_factory=handle,
+        )
+        port = server.sockets[0].getsockname()[1]
+        try:
+            client = AsyncMikroTikSSHClient("127.0.0.1", "admin", "secret", None, port=port)
+            assert await client.connect() is True
+            outputs = await asyncio.gather(
+                client.execute_command("/system identity print"),
+                client.execute_command("/nope"),
+            )
+            lines = [line async for line in client.iter_command_lines("/ip pool print terse")]
+            assert lines == [" 0 name=pool1", " 1 name=pool2"]
+            await client.disconnect()
+
+            rejected = AsyncMikroTikSSHClient("127.0.0.1", "admin", "wrong", None, port=port)
+            assert await rejected.connect() is False
+            return outputs
+        finally:
+            server.close()
+
+    identity, error = asyncio.run(scenario())
+    assert identity == "name: RouterA\n"
+    assert error == "bad command name\n"
+
+
+def test_async_client_streams_files_over_sftp(tmp_path):
+    asyncssh = pytest.importorskip("asyncssh")
+    from mcp_mikrotik.async_ssh_client import AsyncMikroTikSSHClient
+
+    payload = bytes(range(256)) * 1000
+    remote = tmp_path / "export.rsc"
+    remote.write_bytes(payload)
+
+    class Server(asyncssh.SSHServer):
+        def begin_auth(self, username):
+            return False
+
+    async def scenario():
+        key = asyncssh.generate_private_key("ssh-ed25519")
+        server = await asyncssh.create_server(
+            Server, "127.0.0.1", 0, server_host_keys=[key], sftp_factory=True,
+        )
+        port = server.sockets[0].getsockname()[1]
+        try:
+            client = AsyncMikroTikSSHClient("127.0.0.1", "admin", "", None, port=port)
+            assert await client.connect() is True
+            whole = [c async for c in client.iter_file(str(remote), chunk_size=100_000)]
+            tail = [c async for c in client.iter_file(str(remote), offset=255_000, length=5000)]
+            stat = await client.stat_file(str(remote))
+            await client.disconnect()
+            return whole, tail, stat
+        finally:
+            server.close()
+
+    whole, tail, stat = asyncio.run(scenario())
+    assert stat == (len(payload), int(remote.stat().st_mtime))
+    assert [len(c) for c in whole] == [100_000, 100_000, 56_000]
+    assert b"".join(whole) == payload
+    assert b"".join(tail) == payload[255_000:256_000]
@@ -1,7 +1,8 @@
 """Connector tests for the inventory-backed (multi-device) execution path."""
 
 import asyncio
-from contextlib import contextmanager
+import json
+from contextlib import asynccontextmanager, contextmanager
 
 import pytest
 
@@ -25,6 +26,10 @@ class DummyClient:
             raise self.raises
         return self.output
 
+    def iter_command_lines(self, command: str):
+        self.commands.append(command)
+        return iter(self.output.splitlines())
+
     def download_file(self, filename: str) -> bytes:
         self.downloaded = filename
         return b"\x00binary"
@@ -60,6 +65,9 @@ class FakeInventory:
             raise DeviceNotFoundError(f"Unknown device {title!r}.")
         return dev
 
+    def ssh_engine(self, title=None):
+        return "paramiko"
+
     def connect(self, title=None):
         client = self._clients[self.resolve(title).title]
         self.opened.append(client)
@@ -213,3 +221,419 @@ def test_execute_mikrotik_command_passes_resolved_device(ctx, monkeypatch):
     result = asyncio.run(connector.execute_mikrotik_command("/y", ctx, device="RouterB"))
     assert result == "B-out"
     assert b.commands == ["/y"] and a.commands == []
+
+
+def _gated_to_thread(monkeypatch):
+    """Make asyncio.to_thread wait for the returned event before running."""
+    gate = asyncio.Event()
+
+    async def fake_to_thread(fn, *args, **kwargs):
+        await gate.wait()
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "to_thread", fake_to_thread)
+    return gate
+
+
+def test_identical_concurrent_reads_run_once(ctx, monkeypatch):
+    a, b = DummyClient("A-out"), DummyClient("B-out")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": a, "RouterB": b}))
+
+    async def scenario():
+        gate = _gated_to_thread(monkeypatch)
+        calls = [
+            connector.execute_mikrotik_command("/interface print", ctx, device="RouterA"),
+            connector.execute_mikrotik_command("/interface  print", ctx, device="routera"),
+            connector.execute_mikrotik_command("/interface print", ctx, device="RouterB"),
+            connector.execute_mikrotik_command("/ip address print", ctx, device="RouterA"),
+        ]
+        tasks = [asyncio.ensure_future(c) for c in calls]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == ["A-out", "A-out", "B-out", "A-out"]
+    assert a.commands == ["/interface print", "/ip address print"]
+    assert b.commands == ["/interface print"]
+
+    # once finished, the same read runs again
+    monkeypatch.undo()
+    _patch_inventory(monkeypatch, FakeInventory({"RouterA": a}))
+    asyncio.run(connector.execute_mikrotik_command("/interface print", ctx))
+    assert a.commands.count("/interface print") == 2
+
+
+def test_joined_reads_are_logged_redacted(ctx, monkeypatch):
+    client = DummyClient("out")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+    cmd = "/interface wireless security-profiles print where wpa2-pre-shared-key=s3cret"
+
+    async def scenario():
+        gate = _gated_to_thread(monkeypatch)
+        tasks = [asyncio.ensure_future(connector.execute_mikrotik_command(cmd, ctx)) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == ["out", "out"]
+    messages = [str(call) for call in ctx.info.call_args_list]
+    assert any("Joining in-flight read" in m for m in messages)
+    assert not any("s3cret" in m for m in messages)
+
+
+def test_writes_are_never_coalesced(ctx, monkeypatch):
+    client = DummyClient("done")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    async def scenario():
+        gate = _gated_to_thread(monkeypatch)
+        cmd = "/ip dns cache flush"
+        tasks = [asyncio.ensure_future(connector.execute_mikrotik_command(cmd, ctx))
+                 for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert client.commands == ["/ip dns cache flush"] * 2
+
+
+def test_vouched_read_scripts_are_coalesced(ctx, monkeypatch):
+    from mcp_mikrotik.log_entries import LOG_DUMP_SCRIPT
+
+    client = DummyClient("now")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    async def scenario():
+        gate = _gated_to_thread(monkeypatch)
+        tasks = [asyncio.ensure_future(connector.execute_mikrotik_command(LOG_DUMP_SCRIPT, ctx, read_only=True))
+                 for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == ["now", "now"]
+    assert client.commands == [LOG_DUMP_SCRIPT]
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_read(ctx, monkeypatch):
+    client = DummyClient("out")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    async def scenario():
+        gate = _gated_to_thread(monkeypatch)
+        first = asyncio.ensure_future(connector.execute_mikrotik_command("/x print", ctx))
+        second = asyncio.ensure_future(connector.execute_mikrotik_command("/x print", ctx))
+        await asyncio.sleep(0)
+        first.cancel()
+        gate.set()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ("out", True)
+    assert client.commands == ["/x print"]
+
+
+# ---------------------------------------------------------------------------
+# download_to_file — streamed, hashed, resumable SFTP downloads
+# ---------------------------------------------------------------------------
+
+class StreamingClient(DummyClient):
+    """Serves ``payload`` in 4-byte chunks; can break after a number of chunks."""
+
+    def __init__(self, payload, break_after=None, mtime=1000):
+        super().__init__()
+        self.payload = payload
+        self.break_after = break_after
+        self.mtime = mtime
+        self.offsets = []
+
+    def stat_file(self, filename):
+        return len(self.payload), self.mtime
+
+    def iter_file(self, filename, offset=0, length=None, chunk_size=4):
+        self.offsets.append(offset)
+        if offset > len(self.payload):
+            raise ValueError("past the end")
+        for n, i in enumerate(range(offset, len(self.payload), 4)):
+            if self.break_after is not None and n == self.break_after:
+                self.break_after = None
+                raise EOFError("connection dropped")
+            yield self.payload[i:i + 4]
+
+
+def test_download_to_file_resumes_after_a_dropped_transfer(monkeypatch, tmp_path):
+    import hashlib
+
+    payload = b"0123456789abcdefghij" * 3
+    client = StreamingClient(payload, break_after=2)
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    result = connector.download_to_file_sync("big.rsc", tmp_path / "big.rsc")
+
+    assert (tmp_path / "big.rsc").read_bytes() == payload
+    assert not (tmp_path / "big.rsc.part").exists()
+    assert client.offsets == [0, 8]                 # second attempt picked up at byte 8
+    assert result.size == len(payload)
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+
+
+def _partial(path, data, source):
+    path.with_name(path.name + ".part").write_bytes(data)
+    path.with_name(path.name + ".part.json").write_text(json.dumps(source))
+
+
+def test_download_to_file_continues_a_previous_partial_file(monkeypatch, tmp_path):
+    import hashlib
+
+    payload = b"x" * 10 + b"y" * 10
+    _partial(tmp_path / "f.backup", payload[:12], {"file": "f.backup", "size": 20, "mtime": 1000})
+    client = StreamingClient(payload)
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    result = connector.download_to_file_sync("f.backup", tmp_path / "f.backup")
+
+    assert client.offsets == [12]
+    assert result.resumed_from == 12
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["f.backup"]
+
+
+def test_download_to_file_restarts_when_the_remote_file_changed(monkeypatch, tmp_path):
+    import hashlib
+
+    # Regenerated under the same name and size: only the mtime tells.
+    payload = b"new export, same size"
+    _partial(tmp_path / "f.rsc", b"old export", {"file": "f.rsc", "size": len(payload), "mtime": 1000})
+    client = StreamingClient(payload, mtime=2000)
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    result = connector.download_to_file_sync("f.rsc", tmp_path / "f.rsc")
+
+    assert client.offsets == [0] and result.resumed_from == 0
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+
+    # A .part with no record of where it came from is not trusted either.
+    (tmp_path / "g.rsc.part").write_bytes(b"unknown")
+    connector.download_to_file_sync("g.rsc", tmp_path / "g.rsc")
+    assert (tmp_path / "g.rsc").read_bytes() == payload
+
+
+def test_download_to_file_refuses_a_file_over_max_size(monkeypatch, tmp_path):
+    client = StreamingClient(b"0123456789")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    with pytest.raises(connector.DownloadTooLarge):
+        connector.download_to_file_sync("f.rsc", tmp_path / "f.rsc", max_size=9)
+    assert client.offsets == [] and list(tmp_path.iterdir()) == []
+
+
+class AsyncStreamingClient(StreamingClient):
+    """:class:`StreamingClient` as the asyncssh client serves it."""
+
+    async def stat_file(self, filename):
+        return super().stat_file(filename)
+
+    async def iter_file(self, filename, offset=0, length=None, chunk_size=4):
+        for chunk in super().iter_file(filename, offset, length, chunk_size):
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class AsyncFakeInventory(FakeInventory):
+    def ssh_engine(self, title=None):
+        return "asyncssh"
+
+    @asynccontextmanager
+    async def async_session(self, title=None):
+        with self.session(title) as client:
+            yield client
+
+
+def test_async_download_writes_off_the_event_loop(monkeypatch, tmp_path):
+    import hashlib
+    import threading
+
+    payload = b"0123456789abcdefghij" * 3
+    client = AsyncStreamingClient(payload, break_after=2)
+    connector = _patch_inventory(monkeypatch, AsyncFakeInventory({"RouterA": client}))
+    writers = []
+    real_append = connector._append
+    monkeypatch.setattr(connector, "_append",
+                        lambda out, digest, chunk: writers.append(threading.get_ident())
+                        or real_append(out, digest, chunk))
+
+    result = asyncio.run(connector.download_to_file("big.rsc", tmp_path / "big.rsc"))
+
+    assert (tmp_path / "big.rsc").read_bytes() == payload
+    assert client.offsets == [0, 8]
+    assert result.sha256 == hashlib.sha256(payload).hexdigest()
+    assert len(writers) == 15 and threading.get_ident() not in writers
+
+
+# ---------------------------------------------------------------------------
+# execute_batch — several commands, one connection
+# ---------------------------------------------------------------------------
+
+class ScriptClient(DummyClient):
+    """Plays a batch script: answers each command, stops at one that fails."""
+
+    def __init__(self, answers):
+        super().__init__()
+        self.answers = answers
+
+    def execute_command(self, command: str) -> str:
+        self.commands.append(command)
+        out = []
+        for part in command.split("; "):
+            if part.startswith(":put "):
+                out.append(part[len(':put "'):-1])
+                continue
+            answer = self.answers[part]
+            if answer.startswith("failure"):
+                out.append(answer)
+                break
+            if answer:
+                out.append(answer)
+        return "\r\n".join(out) + "\r\n"
+
+
+def test_execute_batch_sends_one_script_and_splits_the_output(ctx, monkeypatch):
+    client = ScriptClient({"/a print count-only": "3", "/b print": "one\ntwo", "/c add x=1": ""})
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    results = asyncio.run(connector.execute_batch(
+        ["/a print count-only", "/b print", "/c add x=1"], ctx))
+
+    assert results == ["3", "one\ntwo", ""]
+    assert len(client.commands) == 1
+    assert client.commands[0].startswith('/a print count-only; :put "__MCP_BATCH_EOC_0__"; /b print')
+
+
+def test_execute_batch_reports_where_the_script_stopped(ctx, monkeypatch):
+    client = ScriptClient({"/a add": "*1", "/b add": "failure: already have such entry", "/c add": ""})
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    results = asyncio.run(connector.execute_batch(["/a add", "/b add", "/c add"], ctx))
+
+    assert results[0] == "*1"
+    assert results[1] == "failure: already have such entry"
+    assert results[2].startswith("Error: not run")
+    assert ctx.error.await_count == 1
+
+
+def test_execute_batch_blames_a_parse_error_on_its_command(ctx, monkeypatch):
+    commands = ["/a add", "/b add x=(", "/c add"]
+    client = DummyClient()
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+    column = connector._batch_script(commands).index("x=(") + 3
+    client.output = f"expected end of command (line 1 column {column})\r\n"
+
+    results = asyncio.run(connector.execute_batch(commands, ctx))
+
+    assert results[1] == f"expected end of command (line 1 column {column})"
+    assert results[0] == results[2] == "Error: not run because command 2 of the batch could not be parsed"
+
+    client.output = "syntax error (line 3 column 1)\r\n"
+    results = asyncio.run(connector.execute_batch(commands, ctx))
+    assert all(r.startswith("Error: the batch could not be parsed, nothing ran") for r in results)
+
+
+def test_execute_batch_connection_failure_fails_every_command(ctx, monkeypatch):
+    client = DummyClient(raises=ConnectionError("refused"))
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    results = asyncio.run(connector.execute_batch(["/a print", "/b print"], ctx))
+    assert results == ["Error: refused", "Error: refused"]
+
+
+# ---------------------------------------------------------------------------
+# fetch_rows — structured reads over the RouterOS API, or print terse over SSH
+# ---------------------------------------------------------------------------
+
+def test_fetch_rows_parses_print_terse_on_ssh_devices(monkeypatch):
+    client = DummyClient(output=(
+        " 0   name=pool1 ranges=10.0.0.1-10.0.0.10\n"
+        " 1 X name=pool2 ranges=10.0.1.1-10.0.1.10 comment=\"old range\"\n"
+    ))
+    inv = FakeInventory({"RouterA": client})
+    connector = _patch_inventory(monkeypatch, inv)
+
+    rows = asyncio.run(connector.fetch_rows(
+        "/ip/pool", device="RouterA", proplist=["name", "ranges", "comment"],
+        where={"disabled": "yes"},
+    ))
+
+    assert client.commands == [
+        '/ip pool print terse proplist=name,ranges,comment where disabled="yes"'
+    ]
+    assert rows == [
+        {"name": "pool1", "ranges": "10.0.0.1-10.0.0.10"},
+        {"name": "pool2", "ranges": "10.0.1.1-10.0.1.10", "comment": "old range",
+         "disabled": "true"},
+    ]
+    assert inv.closed == [client]
+
+
+def test_fetch_rows_over_ssh_rejects_injection_and_router_errors(monkeypatch):
+    client = DummyClient(output="bad command name pool (line 1 column 5)")
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+
+    with pytest.raises(ValueError, match="Invalid menu"):
+        asyncio.run(connector.fetch_rows("ip pool; /system reboot", device="RouterA"))
+    assert client.commands == []
+
+    with pytest.raises(ValueError, match="rejected"):
+        asyncio.run(connector.fetch_rows("ip pol", device="RouterA"))
+
+
+def test_consume_rows_hands_each_ssh_row_to_the_consumer(monkeypatch):
+    client = DummyClient(output=(
+        " 0 As dst-address=0.0.0.0/0 gateway=192.0.2.1\n"
+        " 1  b dst-address=10.0.0.0/8 gateway=192.0.2.2\n"
+    ))
+    connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+    seen = []
+
+    count = asyncio.run(connector.consume_rows("ip route", seen.append, device="RouterA"))
+
+    assert count == 2
+    assert client.commands == ["/ip route print terse"]
+    assert seen == [
+        {"dst-address": "0.0.0.0/0", "gateway": "192.0.2.1", "active": "true", "s": "true"},
+        {"dst-address": "10.0.0.0/8", "gateway": "192.0.2.2", "b": "true"},
+    ]
+
+
+def test_fetch_rows_reuses_one_api_connection_per_device(monkeypatch):
+    inv = FakeInventory({"RouterA": DummyClient()})
+    inv._devices["routera"] = DeviceConfig(title="RouterA", host="10.0.0.1", transport="api")
+    connector = _patch_inventory(monkeypatch, inv)
+    opened = []
+
+    class FakeApi:
+        def __init__(self, **kw):
+            self.kw = kw
+            self.closed = True
+            self.calls = []
+            opened.append(self)
+
+        async def connect(self):
+            self.closed = False
+
+        async def print_rows(self, menu, proplist=None, queries=None):
+            self.calls.append((menu, proplist, queries))
+            return [{"name": "pool1"}]
+
+    monkeypatch.setattr(connector, "RouterOSApiClient", FakeApi)
+
+    async def scenario():
+        first = await connector.fetch_rows("ip pool", device="RouterA",
+                                           proplist=["name"], where={"name": "pool1"})
+        second = await connector.fetch_rows("ip pool", device="routera")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == [{"name": "pool1"}]
+    assert len(opened) == 1
+    assert opened[0].kw["use_ssl"] is False
+    assert opened[0].calls[0] == ("ip pool", ["name"], ["?name=pool1"])
@@ -0,0 +1,123 @@
+"""Tests for config drift: export normalisation, baselines and section diffs."""
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_mikrotik import drift
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+
+
+def test_normalise_export_ignores_header_wrapping_and_blank_lines():
+    a = (
+        "# 2026-10-17 09:00:00 by RouterOS 7.16\n"
+        "# software id = ABCD-1234\n"
+        "/ip firewall filter\n"
+        "add action=accept chain=input \\\r\n"
+        "    protocol=icmp\n"
+        "\n"
+        "add action=drop chain=input   \n"
+    )
+    b = (
+        "# 2026-10-18 09:00:00 by RouterOS 7.16\n"
+        "# software id = ABCD-1234\n"
+        "/ip firewall filter\n"
+        "add action=accept chain=input protocol=icmp\n"
+        "add action=drop chain=input\n"
+    )
+
+    assert drift.normalise_export(a) == drift.normalise_export(b)
+    assert drift.normalise_export(b).splitlines()[0] == "/ip firewall filter"
+    assert drift.normalise_export("# only a header\n") == ""
+
+
+def test_parse_sections_accepts_menu_paths_only():
+    assert drift.parse_sections(["/ip/firewall/filter", "queue  simple", "ip firewall filter"]) == [
+        "ip firewall filter", "queue simple",
+    ]
+    with pytest.raises(ValueError, match="invalid section"):
+        drift.parse_sections(["ip route; /system reboot"])
+
+
+@pytest.fixture()
+def router(monkeypatch):
+    """A device whose section exports come from a dict the test can edit."""
+    config = {
+        "ip firewall filter": "/ip firewall filter add action=accept chain=input protocol=icmp\n",
+        "ip route": "/ip route add gateway=10.0.0.1\n",
+        "queue simple": "",
+        "ip dns": "/ip dns set servers=1.1.1.1\n",
+    }
+    sent = []
+
+    async def fake_batch(commands, _ctx, device=None, cached=True):
+        sent.append((device, list(commands), cached))
+        outputs = []
+        for command in commands:
+            section = command[1:].rsplit(" export terse", 1)[0]
+            if section in config:
+                outputs.append(f"# 2026-10-18 by RouterOS 7.16\n{config[section]}")
+            else:
+                outputs.append("bad command name nosuch (line 1 column 2)")
+        return outputs
+
+    monkeypatch.setattr(drift, "execute_batch", fake_batch)
+    return config, sent
+
+
+def test_check_reports_only_the_sections_that_changed(ctx, router):
+    config, sent = router
+    sections = ["ip firewall filter", "ip route", "queue simple"]
+
+    snapshot = asyncio.run(drift.take_snapshot("R1", ctx, sections))
+    assert sorted(snapshot["sections"]) == sorted(sections)
+    assert asyncio.run(drift.check_drift("R1", ctx))["drifted"] is False
+
+    config["ip firewall filter"] += "/ip firewall filter add action=drop chain=input\n"
+    report = asyncio.run(drift.check_drift("R1", ctx, sections + ["ip dns", "nosuch"]))
+
+    assert report["drifted"] is True
+    assert list(report["changed"]) == ["ip firewall filter"]
+    change = report["changed"]["ip firewall filter"]
+    assert (change["added"], change["removed"]) == (1, 0)
+    assert "+/ip firewall filter add action=drop chain=input" in change["diff"]
+    assert sorted(report["unchanged"]) == ["ip route", "queue simple"]
+    assert report["no_baseline"] == ["ip dns"]
+    assert report["errors"] == {"nosuch": "bad command name nosuch (line 1 column 2)"}
+
+    # Every check reads the device itself, never the read cache.
+    assert all(cached is False for _, _, cached in sent)
+    assert sent[-1][1][0] == "/ip firewall filter export terse"
+
+
+def test_snapshot_of_some_sections_keeps_the_others(ctx, router):
+    config, _ = router
+    asyncio.run(drift.take_snapshot("R1", ctx, ["ip firewall filter", "ip route"]))
+    first = drift.load_baseline("R1")
+
+    config["ip route"] = "/ip route add gateway=10.0.0.254\n"
+    asyncio.run(drift.take_snapshot("R1", ctx, ["ip route"]))
+    second = drift.load_baseline("R1")
+
+    assert second["ip firewall filter"] == first["ip firewall filter"]
+    assert second["ip route"]["sha256"] != first["ip route"]["sha256"]
+
+
+def test_drift_tools_resolve_the_device_and_validate_sections(ctx, router, monkeypatch):
+    from mcp_mikrotik.scope import drift as scope
+
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+
+    out = json.loads(asyncio.run(scope.mikrotik_snapshot_config(ctx, sections=["ip route"])))
+    assert out["device"] == "R1" and list(out["sections"]) == ["ip route"]
+
+    out = json.loads(asyncio.run(scope.mikrotik_check_config_drift(ctx)))
+    assert out["unchanged"] == ["ip route"]
+
+    assert asyncio.run(scope.mikrotik_check_config_drift(ctx, device="R9")).startswith("Error:")
+    assert asyncio.run(scope.mikrotik_snapshot_config(ctx, sections=["a;b"])).startswith("Error: invalid section")
+    assert asyncio.run(scope.mikrotik_snapshot_config(ctx, sections=["nosuch"])).startswith(
+        "Error: no section could be exported"
+    )
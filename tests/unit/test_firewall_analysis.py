@@ -0,0 +1,197 @@
+"""Tests for the offline shadowed/redundant firewall rule analysis."""
+
+import asyncio
+import json
+import random
+
+from mcp_mikrotik import firewall_analysis
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.firewall_analysis import RuleSet, analyse, analyse_chain, parse_dimension
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.parsing import parse_rows
+
+FILTER = """\
+ 0    chain=forward action=accept connection-state=established,related
+ 1    chain=forward action=drop connection-state=invalid
+ 2    chain=forward action=accept protocol=tcp src-address=10.0.0.0/8 dst-port=80,443
+ 3    chain=forward action=accept protocol=tcp src-address=10.1.0.0/16 dst-port=443
+ 4    chain=forward action=drop protocol=tcp src-address=10.1.2.3 dst-port=80
+ 5 X  chain=forward action=drop protocol=udp
+ 6    chain=forward action=accept connection-state=established
+ 7    chain=forward action=drop protocol=udp dst-port=0-1023
+ 8    chain=forward action=reject protocol=udp dst-port=1024-65535 reject-with=icmp-port-unreachable
+ 9    chain=forward action=drop protocol=udp src-address=192.0.2.0/24
+10    chain=forward action=accept src-address=!0.0.0.0/0
+11    chain=forward action=jump jump-target=customers in-interface=ether2
+12    chain=customers action=accept dst-address=203.0.113.0/24
+13    chain=customers action=accept dst-address=203.0.113.10-203.0.113.20 protocol=tcp
+14    chain=orphan action=drop
+15    chain=forward action=drop
+"""
+
+
+def _ruleset(text, table="filter"):
+    ruleset = RuleSet(table)
+    for row in parse_rows(text):
+        ruleset.add_row(row.to_dict())
+    return ruleset
+
+
+def test_dimensions_become_merged_intervals():
+    assert parse_dimension(1, "10.0.0.0/8") == ((0x0A000000, 0x0AFFFFFF),)
+    assert parse_dimension(1, "10.0.0.5-10.0.0.9") == ((0x0A000005, 0x0A000009),)
+    assert parse_dimension(0, "!10.0.0.0/8") == ((0, 0x09FFFFFF), (0x0B000000, 0xFFFFFFFF))
+    assert parse_dimension(0, "0.0.0.0/0") is None
+    assert parse_dimension(0, "!0.0.0.0/0") == ()
+    assert parse_dimension(4, "443,80,81-90,1000") == ((80, 90), (443, 443), (1000, 1000))
+    assert parse_dimension(2, "!tcp") == ((0, 5), (7, 255))
+    assert parse_dimension(2, "47") == ((47, 47),)
+
+
+def test_chain_findings():
+    result = analyse([_ruleset(FILTER)])
+
+    found = {(f["rule"], f["kind"]): [b["rule"] for b in f["by"]] for f in result["findings"]}
+    assert found == {
+        (3, "redundant"): [2],          # 443 from 10.1/16 is already accepted by rule 2
+        (4, "shadowed"): [2],           # the drop never sees what rule 2 accepts
+        (6, "redundant"): [0],          # a subset of established,related
+        (9, "shadowed"): [7, 8],        # udp is taken by rules 7 and 8 together
+        (10, "unreachable"): [],        # matches no address
+        (13, "redundant"): [12],
+    }
+    assert result["counts"] == {"shadowed": 2, "redundant": 3, "unreachable": 1}
+    assert result["rules"] == 15                            # the disabled rule is not counted
+    assert {c["chain"]: c["reachable"] for c in result["chains"]} == {
+        "forward": True, "customers": True, "orphan": False,
+    }
+    assert result["findings"][1]["match"] == "protocol=tcp src-address=10.1.2.3 dst-port=80"
+
+    only = analyse([_ruleset(FILTER)], chain="customers", limit=0)
+    assert only["counts"]["redundant"] == 1 and only["findings"] == [] and only["truncated"] is True
+
+
+def test_other_matchers_and_action_parameters():
+    rules = _ruleset("""\
+ 0    chain=dstnat action=dst-nat protocol=tcp dst-port=80 in-interface=ether1 to-addresses=192.168.1.10
+ 1    chain=dstnat action=dst-nat protocol=tcp dst-port=80 in-interface=ether2 to-addresses=192.168.1.10
+ 2    chain=dstnat action=dst-nat protocol=tcp dst-port=80 in-interface=ether1 to-addresses=192.168.1.11
+ 3    chain=dstnat action=dst-nat protocol=tcp dst-port=80 in-interface=ether1 dst-address=198.51.100.1 to-addresses=192.168.1.10
+ 4    chain=srcnat action=masquerade out-interface=ether1
+ 5    chain=srcnat action=log out-interface=ether1
+""", table="nat")
+
+    found = {f["rule"]: f["kind"] for f in analyse([rules])["findings"]}
+    # 1 differs in interface; 2 translates elsewhere; 3 is the same as 0 for fewer packets.
+    assert found == {2: "shadowed", 3: "redundant", 5: "shadowed"}
+
+
+def _random_rule(rng, number):
+    parts = [f"chain=forward action={rng.choice(['accept', 'drop', 'log'])}"]
+    if rng.random() < 0.7:
+        parts.append(f"src-address=10.{rng.randint(0, 3)}.{rng.randint(0, 3)}.0/{rng.choice([16, 24])}")
+    if rng.random() < 0.5:
+        parts.append(f"dst-address=192.0.{rng.randint(0, 3)}.{rng.randint(0, 255)}")
+    if rng.random() < 0.5:
+        parts.append(f"protocol={rng.choice(['tcp', 'udp'])}")
+        if rng.random() < 0.5:
+            parts.append(f"dst-port={rng.choice([22, 80, 443])}")
+    if rng.random() < 0.3:
+        parts.append(f"in-interface=ether{rng.randint(1, 2)}")
+    if rng.random() < 0.05:
+        parts.append("limit=10,5:packet")
+    return f"{number:2d}    " + " ".join(parts)
+
+
+def _brute_force(rules):
+    """The first earlier terminating rule that covers each rule, by comparing every pair."""
+    found, live = {}, []
+    for rule in rules:
+        cover = next((earlier for earlier in live if firewall_analysis._gaps(earlier, rule) == []
+                      and earlier.exact <= rule.exact), None)
+        if cover is not None:
+            found[rule.number] = cover.number
+        elif rule.terminal and not rule.stateful:
+            live.append(rule)
+    return found
+
+
+def test_index_agrees_with_comparing_every_pair():
+    rng = random.Random(5)
+    rules = _ruleset("\n".join(_random_rule(rng, n) for n in range(800))).chains["forward"]
+
+    found = {rule.number: covers[0].number for rule, _, covers in analyse_chain(rules)}
+
+    assert found == _brute_force(rules)
+    assert len(found) > 100
+
+
+def test_large_chains_are_not_compared_pairwise(monkeypatch):
+    # Per-customer rules, as an aggregation router carries them.
+    lines = [
+        f"{n} chain=forward action=accept src-address=10.{n // 256}.{n % 256}.0/24 protocol=tcp dst-port=443"
+        for n in range(6000)
+    ]
+    lines.append("6000 chain=forward action=accept src-address=10.3.7.0/24 protocol=tcp dst-port=443")
+    rules = _ruleset("\n".join(lines)).chains["forward"]
+
+    compared = []
+    real_gaps = firewall_analysis._gaps
+    monkeypatch.setattr(firewall_analysis, "_gaps", lambda cover, rule: compared.append(1) or real_gaps(cover, rule))
+
+    assert [(rule.number, covers[0].number) for rule, _, covers in analyse_chain(rules)] == [(6000, 3 * 256 + 7)]
+    assert len(compared) < 10
+
+
+def test_port_only_chains_are_not_compared_pairwise(monkeypatch):
+    # No addresses to tell the rules apart: they all share one bucket.
+    lines = [f"{n} chain=forward protocol=tcp dst-port={2 * n} action=accept" for n in range(6000)]
+    lines.append("6000 chain=forward protocol=tcp dst-port=0-11998 action=accept")
+    lines.append("6001 chain=forward protocol=tcp dst-port=4000 action=drop")
+    rules = _ruleset("\n".join(lines)).chains["forward"]
+
+    compared = []
+    real_gaps = firewall_analysis._gaps
+    monkeypatch.setattr(firewall_analysis, "_gaps", lambda cover, rule: compared.append(1) or real_gaps(cover, rule))
+
+    found = [(rule.number, kind, covers[0].number) for rule, kind, covers in analyse_chain(rules)]
+    assert found == [(6001, "shadowed", 2000)]
+    assert len(compared) < 4 * len(rules)
+
+
+def test_stateful_matchers_never_cover():
+    rules = _ruleset("""\
+ 0    chain=input action=accept protocol=icmp limit=10,5:packet
+ 1    chain=input action=drop protocol=icmp limit=10,5:packet
+ 2    chain=input action=accept protocol=tcp dst-port=22 nth=2,1
+ 3    chain=input action=accept protocol=tcp dst-port=22 nth=2,1
+ 4    chain=input action=drop protocol=udp
+ 5    chain=input action=drop protocol=udp random=50
+""")
+
+    found = {f["rule"]: (f["kind"], [b["rule"] for b in f["by"]]) for f in analyse([rules])["findings"]}
+    assert found == {5: ("redundant", [4])}
+
+
+def test_analyze_firewall_rules_tool(ctx, monkeypatch):
+    from mcp_mikrotik.scope import firewall_filter as scope
+
+    menus = []
+
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        menus.append((menu, device))
+        rows = parse_rows(FILTER) if menu == "ip firewall filter" else []
+        for row in rows:
+            consumer(row.to_dict())
+        return len(rows)
+
+    monkeypatch.setattr(firewall_analysis, "consume_rows", fake_consume)
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+
+    out = json.loads(asyncio.run(scope.mikrotik_analyze_firewall_rules(ctx, limit=2)))
+    assert menus == [("ip firewall filter", "R1"), ("ip firewall nat", "R1")]
+    assert out["device"] == "R1" and out["tables"] == ["filter", "nat"]
+    assert sum(out["counts"].values()) == 6 and len(out["findings"]) == 2 and out["truncated"] is True
+
+    assert asyncio.run(scope.mikrotik_analyze_firewall_rules(ctx, tables=["mangle"])).startswith("Error:")
+    assert asyncio.run(scope.mikrotik_analyze_firewall_rules(ctx, device="R9")).startswith("Error:")
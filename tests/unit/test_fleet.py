@@ -0,0 +1,182 @@
+"""Tests for fleet fan-out: read-only checks, bounded concurrency, partial failure."""
+
+import asyncio
+import json
+
+import pytest
+
+from mcp_mikrotik import config
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.fleet import is_read_only_command, run_on_fleet
+from mcp_mikrotik.inventory import Inventory
+
+
+def _devices(n):
+    return [DeviceConfig(title=f"R{i}", host=f"10.0.0.{i + 1}") for i in range(n)]
+
+
+@pytest.mark.parametrize("command", [
+    "/system resource print",
+    "/ip route print detail where dst-address=0.0.0.0/0",
+    "/export hide-sensitive",
+    "/interface monitor-traffic ether1 once",
+    "/interface ethernet monitor ether1 duration=1",
+])
+def test_reads_are_accepted(command):
+    assert is_read_only_command(command)
+
+
+@pytest.mark.parametrize("command", [
+    "/ip address add address=10.0.0.1/24 interface=ether1",
+    "/system reboot",
+    "/ip route print; /system reboot",
+    "/ip firewall filter remove [find]",
+    ":foreach i in=[/ip route find] do={/ip route remove $i}",
+    "/export file=backup",
+    "/ip route print file=routes",
+    "/interface monitor-traffic ether1",
+    "/log print follow",
+    "/log print follow-only where topics~\"firewall\"",
+    "/interface print stats interval=1",
+    "/system script run print",
+    "/ip address set comment=print 0",
+    "",
+])
+def test_writes_and_scripts_are_refused(command):
+    assert not is_read_only_command(command)
+
+
+def test_fan_out_is_bounded_and_keyed_by_title():
+    in_flight = 0
+    peak = 0
+
+    async def action(device):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"out-{device.title}"
+
+    results = asyncio.run(run_on_fleet(_devices(10), action, concurrency=3))
+
+    assert peak == 3
+    assert list(results) == [f"R{i}" for i in range(10)]
+    assert all(r.ok for r in results.values())
+    assert results["R4"].output == "out-R4"
+
+
+def test_failures_and_timeouts_stay_per_device(monkeypatch):
+    monkeypatch.setattr(config.mikrotik_config, "fleet_timeout", 0.05)
+
+    async def action(device):
+        if device.title == "R1":
+            raise ConnectionError("connection refused")
+        if device.title == "R2":
+            await asyncio.sleep(1)
+        return "ok"
+
+    # A caller cannot raise the server's timeout, only lower it.
+    results = asyncio.run(run_on_fleet(_devices(4), action, timeout=60))
+
+    assert [r.ok for r in results.values()] == [True, False, False, True]
+    assert results["R1"].error == "connection refused"
+    assert results["R2"].error == "Timed out after 0.05s"
+
+
+# ---------------------------------------------------------------------------
+# fleet_execute tool
+# ---------------------------------------------------------------------------
+
+def _fleet_inventory(monkeypatch):
+    from mcp_mikrotik.scope import fleet as scope
+
+    inv = Inventory([
+        DeviceConfig(title="core-1", host="10.0.0.1", tags=["core"]),
+        DeviceConfig(title="core-2", host="10.0.0.2", tags=["core"]),
+        DeviceConfig(title="edge-1", host="10.0.0.3", tags=["edge"]),
+    ])
+    monkeypatch.setattr(scope, "get_inventory", lambda: inv)
+    return scope
+
+
+def test_fleet_execute_runs_a_command_on_the_selection(ctx, monkeypatch):
+    import mcp_mikrotik.fleet as fleet_mod
+
+    scope = _fleet_inventory(monkeypatch)
+    seen = []
+
+    async def fake_exec(command, _ctx, device=None):
+        seen.append((command, device))
+        if device == "core-2":
+            return "Error: Failed to connect to core-2"
+        return f"uptime on {device}"
+
+    monkeypatch.setattr(fleet_mod, "execute_mikrotik_command", fake_exec)
+
+    out = json.loads(asyncio.run(scope.mikrotik_fleet_execute(
+        ctx, command="/system resource print", tags=["core"],
+    )))
+
+    assert sorted(d for _, d in seen) == ["core-1", "core-2"]
+    assert (out["selected"], out["succeeded"], out["failed"]) == (2, 1, 1)
+    assert out["results"]["core-1"]["output"] == "uptime on core-1"
+    assert out["results"]["core-2"]["error"].startswith("Error: Failed to connect")
+
+
+def test_fleet_execute_accepts_a_selector_expression(ctx, monkeypatch):
+    import mcp_mikrotik.fleet as fleet_mod
+
+    scope = _fleet_inventory(monkeypatch)
+
+    async def fake_exec(command, _ctx, device=None):
+        return "ok"
+
+    monkeypatch.setattr(fleet_mod, "execute_mikrotik_command", fake_exec)
+
+    out = json.loads(asyncio.run(scope.mikrotik_fleet_execute(
+        ctx, command="/ip route print", selector="tag:edge or title:core-2",
+    )))
+    assert list(out["results"]) == ["core-2", "edge-1"]
+
+    out = asyncio.run(scope.mikrotik_fleet_execute(ctx, command="/ip route print", selector="tag:"))
+    assert out.startswith("Error: Expected a term")
+
+
+def test_fleet_execute_refuses_writes(ctx, monkeypatch):
+    scope = _fleet_inventory(monkeypatch)
+
+    out = asyncio.run(scope.mikrotik_fleet_execute(ctx, command="/system reboot"))
+    assert out.startswith("Error: Only a single read command")
+
+    out = asyncio.run(scope.mikrotik_fleet_execute(
+        ctx, tool="create_ip_pool", arguments={"name": "p", "ranges": "10.0.0.1-10.0.0.2"},
+    ))
+    assert out.startswith("Error: Tool 'create_ip_pool' is not a read-only tool")
+
+    out = asyncio.run(scope.mikrotik_fleet_execute(ctx, command="/ip route print", tool="list_routes"))
+    assert out.startswith("Error: pass exactly one")
+
+
+def test_fleet_execute_runs_a_read_only_tool(ctx, monkeypatch):
+    from mcp_mikrotik.scope import ip_pool
+
+    scope = _fleet_inventory(monkeypatch)
+    calls = []
+
+    async def fake_exec(command, _ctx, device=None):
+        calls.append((command, device))
+        return f"pool on {device}"
+
+    monkeypatch.setattr(ip_pool, "execute_mikrotik_command", fake_exec)
+
+    out = json.loads(asyncio.run(scope.mikrotik_fleet_execute(
+        ctx, tool="list_ip_pools", arguments={"name_filter": "dhcp"}, devices=["edge-1", "core-1"],
+    )))
+
+    assert list(out["results"]) == ["edge-1", "core-1"]
+    assert out["results"]["edge-1"]["output"] == "IP POOLS:\n\npool on edge-1"
+    assert sorted(calls) == [
+        ('/ip pool print where name~"dhcp"', "core-1"),
+        ('/ip pool print where name~"dhcp"', "edge-1"),
+    ]
@@ -0,0 +1,150 @@
+"""Tests for the fleet backup job and its content-addressed store."""
+
+import asyncio
+import hashlib
+import json
+
+from mcp_mikrotik import fleet_backup
+from mcp_mikrotik.backup_store import ContentStore
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.connector import Download
+from mcp_mikrotik.inventory import Inventory
+
+EXPORT = "# {stamp} by RouterOS 7.13.2\n# software id = ABCD-1234\n/ip address\nadd address=10.0.0.1/24 interface=ether1\n"
+
+
+def test_canonical_export_ignores_the_header_timestamp(tmp_path):
+    a, b = tmp_path / "a.rsc", tmp_path / "b.rsc"
+    a.write_text(EXPORT.format(stamp="2026-10-01 10:00:00"))
+    b.write_text(EXPORT.format(stamp="oct/02/2026 11:30:00"))
+
+    assert fleet_backup.canonical_export(a) == fleet_backup.canonical_export(b)
+    assert a.read_text() == EXPORT.format(stamp="2026-10-01 10:00:00")     # stored as downloaded
+    canonical = EXPORT.format(stamp="").replace("#  by", "# by").encode()
+    assert fleet_backup.canonical_export(a) == hashlib.sha256(canonical).hexdigest()
+
+
+def test_store_keeps_one_copy_per_content(tmp_path):
+    store = ContentStore(tmp_path / "store")
+    sha = hashlib.sha256(b"config").hexdigest()
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.write_bytes(b"config")
+    second.write_bytes(b"config")
+
+    path, new = store.add(first, sha)
+    again, new_again = store.add(second, sha)
+
+    assert (new, new_again) == (True, False)
+    assert path == again == tmp_path / "store" / "objects" / sha[:2] / sha
+    assert path.read_bytes() == b"config"
+    assert not first.exists() and not second.exists()
+
+    store.record(device="R1", kind="export", sha256=sha, size=6)
+    store.record(device="R2", kind="export", sha256=sha, size=6)
+    assert store.latest("r1", "export")["device"] == "R1"
+    assert store.latest("R1", "backup") is None
+
+
+def test_fleet_backup_stores_files_dedupes_and_reports_per_device(ctx, monkeypatch):
+    from mcp_mikrotik.scope import fleet as scope
+
+    inv = Inventory([
+        DeviceConfig(title="core-1", host="10.0.0.1", tags=["core"]),
+        DeviceConfig(title="core-2", host="10.0.0.2", tags=["core"]),
+        DeviceConfig(title="core-3", host="10.0.0.3", tags=["core"]),
+    ])
+    monkeypatch.setattr(scope, "get_inventory", lambda: inv)
+    batches = []
+
+    async def fake_batch(commands, _ctx, device=None):
+        batches.append((device, list(commands)))
+        if device == "core-3" and commands[0].startswith("/system backup save"):
+            return ["failure: not enough disk space", "Error: not run because an earlier command in the batch failed"]
+        return ["Configuration backup saved", ""] if len(commands) == 2 and "save" in commands[0] else [""] * len(commands)
+
+    async def fake_download(filename, destination, device=None):
+        if filename.endswith(".rsc"):
+            data = EXPORT.format(stamp=f"2026-10-18 10:00:0{device[-1]}").encode()
+        else:
+            data = f"binary backup of {device}".encode()
+        destination.write_bytes(data)
+        return Download(destination, len(data), hashlib.sha256(data).hexdigest())
+
+    monkeypatch.setattr(fleet_backup, "execute_batch", fake_batch)
+    monkeypatch.setattr(fleet_backup, "download_to_file", fake_download)
+
+    out = json.loads(asyncio.run(scope.mikrotik_fleet_backup(ctx, tags=["core"], concurrency=2)))
+
+    assert (out["selected"], out["succeeded"], out["failed"]) == (3, 2, 1)
+    assert out["results"]["core-3"]["error"] == "failure: not enough disk space"
+    # Two binary backups and one export are new; the second export is identical.
+    assert (out["files"], out["stored"], out["deduplicated"]) == (4, 3, 1)
+    assert out["bytes"] == sum(out["results"][t]["output"]["bytes"] for t in ("core-1", "core-2"))
+    assert out["throughput_bytes_per_s"] > 0
+    assert out["results"]["core-1"]["elapsed"] >= 0
+
+    exports = [f for t in ("core-1", "core-2") for f in out["results"][t]["output"]["files"] if f["kind"] == "export"]
+    assert exports[0]["sha256"] == exports[1]["sha256"]
+    assert exports[0]["canonical"] == exports[1]["canonical"] != exports[0]["sha256"]
+
+    # Every stored object hashes to its name, and the catalog names real objects.
+    store = fleet_backup.get_content_store()
+    objects = [p for p in store.objects.rglob("*") if p.is_file()]
+    assert len(objects) == 3
+    assert all(hashlib.sha256(p.read_bytes()).hexdigest() == p.name for p in objects)
+    assert all(store.path_for(e["sha256"]).exists() for e in store.entries())
+
+    # The remote files are removed afterwards, also where the backup failed.
+    removals = {device: cmds for device, cmds in batches if cmds[0].startswith("/file remove")}
+    assert sorted(removals) == ["core-1", "core-2", "core-3"]
+    assert removals["core-1"][1].startswith('/file remove "mcp-fleet-') and removals["core-1"][1].endswith('.rsc"')
+
+
+def test_fleet_backup_needs_something_to_back_up(ctx, monkeypatch):
+    from mcp_mikrotik.scope import fleet as scope
+
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+
+    out = asyncio.run(scope.mikrotik_fleet_backup(ctx, binary=False, export=False))
+    assert out.startswith("Error: Nothing to back up")
+
+
+def test_fleet_backup_timeout_covers_removing_the_files(ctx, monkeypatch):
+    from mcp_mikrotik.scope import fleet as scope
+
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+    removed = []
+
+    async def slow_batch(commands, _ctx, device=None):
+        if commands[0].startswith("/file remove"):
+            await asyncio.sleep(0.3)
+            removed.append(commands)
+            return [""] * len(commands)
+        return ["Configuration backup saved", ""]
+
+    async def hanging_download(filename, destination, device=None):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(fleet_backup, "execute_batch", slow_batch)
+    monkeypatch.setattr(fleet_backup, "download_to_file", hanging_download)
+
+    async def scenario():
+        out = json.loads(await scope.mikrotik_fleet_backup(ctx, timeout=0.1))
+        done_at_return = list(removed)
+        await asyncio.sleep(0.4)
+        return out, done_at_return
+
+    out, done_at_return = asyncio.run(scenario())
+    assert out["results"]["R1"]["error"] == "Timed out after 0.1s"
+    assert out["results"]["R1"]["elapsed"] < 0.25
+    assert done_at_return == [] and len(removed) == 1       # finished in the background
+
+
+def test_backup_password_is_masked_in_logs():
+    from mcp_mikrotik.commands import redact_command
+
+    commands, _ = fleet_backup._remote_files("b", True, False, 'se cr"et')
+    assert redact_command(commands[0]) == "/system backup save name=b password=***"
+    assert redact_command('/interface wifi security set 0 wpa2-pre-shared-key=abc name=x') == (
+        "/interface wifi security set 0 wpa2-pre-shared-key=*** name=x"
+    )
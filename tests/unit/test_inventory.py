@@ -91,11 +91,97 @@ def test_describe_never_exposes_credentials():
     assert "id_ed25519" not in blob
     assert "password" not in blob and "key_filename" not in blob
     assert described[0]["title"] == "RouterA"
-    assert described[0]["tags"] == ["eu"] and described[0]["region"] == "NL"
+    assert described[0]["tags"] == ("eu",) and described[0]["region"] == "NL"
+
+
+def test_describe_is_built_once_and_read_only():
+    inv = Inventory([_dev("RouterA", tags=["eu"])])
+    described = inv.describe()
+
+    assert inv.describe() is described
+    with pytest.raises(TypeError):
+        described[0]["title"] = "hijacked"
+    with pytest.raises(TypeError):
+        described[0].update(password="x")
+    assert copy.deepcopy(described) == described
+
+
+# ---------------------------------------------------------------------------
+# Selection
+# ---------------------------------------------------------------------------
+
+def _fleet():
+    return Inventory([
+        _dev("core-nl", "10.0.0.1", tags=["core", "EU"], region="NL"),
+        _dev("edge-nl", "10.0.0.2", tags=["edge", "eu"], region="nl"),
+        _dev("core-us", "10.0.0.3", tags=["core"], region="US"),
+        _dev("lab", "10.0.0.4"),
+    ])
+
+
+def test_select_without_criteria_is_everything():
+    assert [d.title for d in _fleet().select()] == ["core-nl", "edge-nl", "core-us", "lab"]
+
+
+def test_select_combines_criteria_case_insensitively():
+    inv = _fleet()
+    assert [d.title for d in inv.select(tags=["eu"])] == ["core-nl", "edge-nl"]
+    assert [d.title for d in inv.select(tags=["core", "eu"])] == ["core-nl"]
+    assert [d.title for d in inv.select(region="NL")] == ["core-nl", "edge-nl"]
+    assert [d.title for d in inv.select(tags=["core"], region="us")] == ["core-us"]
+    assert inv.select(region="DE") == []
+
+
+def test_select_by_expression():
+    inv = _fleet()
+    titles = lambda expr: [d.title for d in inv.select(expression=expr)]
+
+    assert titles("tag:core and region:NL") == ["core-nl"]
+    assert titles("tag:core or tag:edge") == ["core-nl", "edge-nl", "core-us"]
+    assert titles("region:nl and not tag:edge") == ["core-nl"]
+    assert titles("not (tag:core or tag:edge)") == ["lab"]
+    assert titles("tag:eu and tag:core or title:lab") == ["core-nl", "lab"]
+    assert titles("title:core-* AND NOT host:10.0.0.3") == ["core-nl"]
+    assert titles("*") == ["core-nl", "edge-nl", "core-us", "lab"]
+    assert titles("tag:missing") == []
+    # criteria still combine with the expression
+    assert [d.title for d in inv.select(region="NL", expression="tag:core or tag:edge")] == [
+        "core-nl", "edge-nl",
+    ]
+
+
+@pytest.mark.parametrize("expr", ["", "tag:", "colour:red", "tag:a and", "(tag:a", "tag:a tag:b"])
+def test_malformed_selectors_are_rejected(expr):
+    from mcp_mikrotik.selector import SelectorError
+
+    with pytest.raises(SelectorError):
+        _fleet().select(expression=expr or " ")
+
+
+def test_describe_filters_by_selector_without_copying():
+    inv = _fleet()
+    core = inv.describe("tag:core")
+    assert [d["title"] for d in core] == ["core-nl", "core-us"]
+    assert core[1] is inv.describe()[2]
+
+
+def test_by_host_uses_the_index():
+    inv = Inventory([_dev("A", "10.0.0.1"), _dev("B", "10.0.0.1", port=2222), _dev("C", "Router.lan")])
+    assert [d.title for d in inv.by_host("10.0.0.1")] == ["A", "B"]
+    assert [d.title for d in inv.by_host("router.LAN")] == ["C"]
+    assert inv.by_host("10.9.9.9") == []
+
+
+def test_select_by_title_dedupes_and_rejects_unknown_titles():
+    inv = _fleet()
+    assert [d.title for d in inv.select(["LAB", "core-us", "lab"])] == ["lab", "core-us"]
+    assert [d.title for d in inv.select(["core-nl", "core-us"], region="NL")] == ["core-nl"]
+    with pytest.raises(DeviceNotFoundError, match="Unknown device"):
+        inv.select(["nope"])
 
 
 # ---------------------------------------------------------------------------
-# Connections — never pooled, always closed
+# Connections — not pooled unless asked, always closed
 # ---------------------------------------------------------------------------
 
 def _recording_ssh(monkeypatch):
@@ -216,6 +302,259 @@ def test_session_propagates_connect_failure(monkeypatch):
             raise AssertionError("body must not run")
 
 
+# ---------------------------------------------------------------------------
+# Connection pool — opt-in, one exclusive lease per command
+# ---------------------------------------------------------------------------
+
+def _pooled_ssh(monkeypatch):
+    """Patch MikroTikSSHClient with a recorder whose health can be toggled."""
+    import mcp_mikrotik.inventory as inv_mod
+
+    built, closed = [], []
+
+    class FakeSSH:
+        def __init__(self, **kw):
+            self.host = kw["host"]
+            self.alive = True
+            built.append(self)
+
+        def connect(self):
+            return True
+
+        def is_alive(self):
+            return self.alive
+
+        def disconnect(self):
+            closed.append(self)
+
+    monkeypatch.setattr(inv_mod, "MikroTikSSHClient", FakeSSH)
+    return built, closed
+
+
+def test_pool_is_off_by_default(monkeypatch):
+    _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA")])
+    assert inv.pool("RouterA") is None
+
+
+def test_pooled_session_reuses_a_warm_connection(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=2)])
+
+    with inv.session("RouterA") as first:
+        pass
+    with inv.session("RouterA") as second:
+        pass
+
+    assert first is second
+    assert len(built) == 1 and closed == []
+
+
+def test_pooled_leases_are_exclusive(monkeypatch):
+    """Two commands in flight at once must never share a connection."""
+    built, _ = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=2)])
+
+    with inv.session("RouterA") as a:
+        with inv.session("RouterA") as b:
+            assert a is not b
+    assert len(built) == 2
+    assert inv.pool("RouterA").idle_count == 2
+
+
+def test_pooled_connection_is_discarded_when_the_command_fails(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=1)])
+
+    with pytest.raises(RuntimeError):
+        with inv.session("RouterA"):
+            raise RuntimeError("command blew up")
+
+    assert closed == built
+    assert inv.pool("RouterA").idle_count == 0
+
+
+def test_dead_pooled_connection_is_replaced_on_checkout(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=1)])
+
+    with inv.session("RouterA") as first:
+        pass
+    first.alive = False
+    with inv.session("RouterA") as second:
+        pass
+
+    assert second is not first
+    assert closed == [first]
+
+
+def test_health_check_runs_outside_the_pool_lock(monkeypatch):
+    """A stalled health check must not block callers returning other connections."""
+    import threading
+
+    built, _ = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=2)])
+    pool = inv.pool("RouterA")
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+
+    checking, resume = threading.Event(), threading.Event()
+
+    def stalled():
+        checking.set()
+        resume.wait(5)
+        return True
+
+    first.is_alive = stalled
+    leased = []
+    worker = threading.Thread(target=lambda: leased.append(pool.acquire()))
+    worker.start()
+    assert checking.wait(5)
+    releaser = threading.Thread(target=pool.release, args=(second,))
+    releaser.start()
+    releaser.join(1)
+    assert not releaser.is_alive() and pool.idle_count == 1
+    resume.set()
+    worker.join(5)
+    assert leased == [first] and pool.leased_count == 1
+
+
+def test_idle_connections_expire(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=1, pool_idle_timeout=0)])
+
+    with inv.session("RouterA") as first:
+        pass
+    with inv.session("RouterA") as second:
+        pass
+
+    assert second is not first and closed == [first]
+
+
+def test_pool_caps_connections_per_device(monkeypatch):
+    _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=1)])
+    pool = inv.pool("RouterA")
+
+    held = pool.acquire()
+    with pytest.raises(ConnectionError, match="busy"):
+        pool.acquire(timeout=0.05)
+    pool.release(held)
+    assert pool.acquire(timeout=0.05) is held
+
+
+def test_failed_connect_frees_the_pool_slot(monkeypatch):
+    import mcp_mikrotik.inventory as inv_mod
+
+    class FailingSSH:
+        def __init__(self, **kw):
+            pass
+
+        def connect(self):
+            return False
+
+    monkeypatch.setattr(inv_mod, "MikroTikSSHClient", FailingSSH)
+    inv = Inventory([_dev("RouterA", pool_size=1)])
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError, match="RouterA"):
+            with inv.session("RouterA"):
+                pass
+    assert inv.pool("RouterA").leased_count == 0
+
+
+def test_pool_settings_inherit_server_defaults(monkeypatch):
+    from mcp_mikrotik import config as cfg_mod
+
+    _pooled_ssh(monkeypatch)
+    monkeypatch.setattr(
+        cfg_mod, "mikrotik_config",
+        MikrotikConfig(pool_size=3, pool_idle_timeout=5),
+    )
+    inv = Inventory([_dev("RouterA"), _dev("RouterB", "10.0.0.2", pool_size=0)])
+
+    assert inv.pool("RouterA").max_size == 3
+    assert inv.pool("RouterA").idle_timeout == 5
+    assert inv.pool("RouterB") is None
+
+
+def test_close_drains_idle_connections(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=1)])
+    with inv.session("RouterA"):
+        pass
+
+    inv.close()
+    assert closed == built
+
+
+# ---------------------------------------------------------------------------
+# Multiplexed channels — one shared transport per device
+# ---------------------------------------------------------------------------
+
+def test_multiplexed_sessions_share_one_transport(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", multiplex_channels=4)])
+
+    with inv.session("RouterA") as a:
+        with inv.session("RouterA") as b:
+            assert a is b                      # concurrent, same transport
+    with inv.session("RouterA") as c:
+        assert c is a
+
+    assert len(built) == 1 and closed == []
+
+
+def test_multiplexing_takes_precedence_over_pooling(monkeypatch):
+    _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", pool_size=2, multiplex_channels=2)])
+    assert inv.shared_transport("RouterA") is not None
+    assert inv.pool("RouterA") is None
+
+
+def test_multiplexed_channels_are_capped(monkeypatch):
+    _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", multiplex_channels=1)])
+    shared = inv.shared_transport("RouterA")
+
+    _, generation = shared.acquire()
+    with pytest.raises(ConnectionError, match="busy"):
+        shared.acquire(timeout=0.05)
+    shared.release(generation)
+    shared.acquire(timeout=0.05)
+
+
+def test_dead_shared_transport_is_replaced_once(monkeypatch):
+    """A drop mid-flight fails the commands on it; the next one reconnects."""
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", multiplex_channels=4)])
+    shared = inv.shared_transport("RouterA")
+
+    first, gen_a = shared.acquire()
+    _, gen_b = shared.acquire()
+    first.alive = False                         # transport dropped mid-flight
+    shared.release(gen_a, failed=True)
+    shared.release(gen_b, failed=True)
+
+    assert closed == [first]                    # torn down once, not twice
+    with inv.session("RouterA") as second:
+        assert second is not first
+    assert len(built) == 2 and shared.generation == 2
+
+
+def test_failed_command_keeps_a_healthy_shared_transport(monkeypatch):
+    built, closed = _pooled_ssh(monkeypatch)
+    inv = Inventory([_dev("RouterA", multiplex_channels=2)])
+
+    with pytest.raises(RuntimeError):
+        with inv.session("RouterA"):
+            raise RuntimeError("bad command")
+    with inv.session("RouterA"):
+        pass
+
+    assert len(built) == 1 and closed == []
+
+
 # ---------------------------------------------------------------------------
 # Loading from configuration
 # ---------------------------------------------------------------------------
@@ -0,0 +1,122 @@
+"""Tests for the local log archive: ingest, FTS search, retention and tools."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from mcp_mikrotik import config, log_cursor
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.log_archive import LogArchive, fts_query, parse_bound
+from mcp_mikrotik.log_entries import LogEntry
+from mcp_mikrotik.scope import logs
+
+
+def _entry(log_id, stamp, topics, message):
+    return LogEntry(log_id, datetime.fromisoformat(stamp), tuple(topics.split(",")), message)
+
+
+@pytest.fixture()
+def archive(tmp_path):
+    archive = LogArchive(tmp_path / "logs.sqlite3")
+    archive.add("core-1", [
+        _entry("*1", "2026-10-16 08:00:00", "system,info", "user admin logged in from 10.0.0.5 via ssh"),
+        _entry("*2", "2026-10-17 12:00:00", "system,error,critical", "login failure for user Admin from 10.9.9.9"),
+        _entry("*3", "2026-10-18 09:00:00", "dhcp,info", "defconf assigned 192.168.88.10"),
+    ])
+    archive.add("edge-1", [
+        _entry("*1", "2026-10-18 09:05:00", "system,error,critical", "LOGIN FAILURE for user guest"),
+    ])
+    yield archive
+    archive.close()
+
+
+def test_add_ignores_entries_already_archived(archive):
+    assert archive.add("core-1", [_entry("*3", "2026-10-18 09:00:00", "dhcp,info", "defconf assigned 192.168.88.10")]) == 0
+    assert archive.stats()["core-1"]["entries"] == 3
+
+
+def test_search_ignores_case_and_spans_devices(archive):
+    rows = archive.search("login failure")
+    assert [(r["device"], r["log_id"]) for r in rows] == [("core-1", "*2"), ("edge-1", "*1")]
+
+    assert [r["device"] for r in archive.search("admin")] == ["core-1", "core-1"]
+    assert [r["log_id"] for r in archive.search("log*", devices=["core-1"])] == ["*1", "*2"]
+    assert archive.search('"failure for user admin"')[0]["log_id"] == "*2"
+    assert len(archive.search("guest OR defconf")) == 2
+
+
+def test_search_filters_by_time_topic_and_limit(archive):
+    rows = archive.search(since="2026-10-17 00:00:00", until="2026-10-18 09:00:00")
+    assert [r["log_id"] for r in rows] == ["*2", "*3"]
+    assert [r["device"] for r in archive.search(topics=["dhcp"])] == ["core-1"]
+    assert [r["device"] for r in archive.search(limit=1)] == ["edge-1"]
+
+
+def test_prune_drops_old_days(archive):
+    assert archive.prune(1, today=datetime(2026, 10, 18)) == 1
+    assert archive.stats()["core-1"] == {
+        "entries": 2, "oldest": "2026-10-17 12:00:00", "newest": "2026-10-18 09:00:00", "days": 2,
+    }
+
+
+def test_fts_query_quotes_terms_and_keeps_prefixes_phrases_and_or():
+    assert fts_query('login fail* "user admin" OR x:y') == '"login" "fail"* "user admin" OR "x:y"'
+    assert fts_query("OR") == ""
+
+
+def test_parse_bound_accepts_dates_and_durations():
+    now = datetime(2026, 10, 18, 9, 30)
+    assert parse_bound("6h", now) == "2026-10-18 03:30:00"
+    assert parse_bound("2026-10-17", now) == "2026-10-17 00:00:00"
+    assert parse_bound("2026-10-17 08:15", now) == "2026-10-17 08:15:00"
+    with pytest.raises(ValueError, match="Invalid time"):
+        parse_bound("yesterday", now)
+
+
+def test_archive_logs_ingests_incrementally_and_search_needs_no_router(ctx, monkeypatch):
+    inv = Inventory([
+        DeviceConfig(title="core-1", host="10.0.0.1", tags=["core"]),
+        DeviceConfig(title="core-2", host="10.0.0.2", tags=["core"]),
+    ])
+    monkeypatch.setattr(logs, "get_inventory", lambda: inv)
+    monkeypatch.setattr(config.mikrotik_config, "log_archive_days", 0)
+    sent = []
+
+    async def fake_exec(command, _ctx, device=None, read_only=False):
+        assert read_only
+        sent.append((device, command))
+        if device == "core-2":
+            return "Error: Failed to connect to core-2"
+        if ".id > *2" in command:
+            return "now\t2026-10-18 09:30:00\t*2\n"
+        return (
+            "now\t2026-10-18 09:30:00\t*2\n"
+            "*1\t09:00:00\tsystem;info\tuser admin logged in\n"
+            "*2\t09:10:00\tsystem;error;critical\tlogin failure for user guest\n"
+        )
+
+    monkeypatch.setattr(log_cursor, "execute_mikrotik_command", fake_exec)
+
+    out = json.loads(asyncio.run(logs.mikrotik_archive_logs(ctx, tags=["core"])))
+    assert (out["succeeded"], out["failed"], out["added"]) == (1, 1, 2)
+    assert out["results"]["core-2"]["error"] == "Failed to connect to core-2"
+
+    out = json.loads(asyncio.run(logs.mikrotik_archive_logs(ctx, devices=["core-1"])))
+    assert out["added"] == 0
+    assert ".id > *2" in sent[-1][1]
+
+    calls = len(sent)
+    result = asyncio.run(logs.mikrotik_search_log_archive(ctx, query="LOGIN", topics="error"))
+    assert result == (
+        "LOG ARCHIVE MATCHES (1):\n\n"
+        "[core-1] 2026-10-18 09:10:00 system,error,critical login failure for user guest"
+    )
+    assert len(sent) == calls
+
+    assert asyncio.run(logs.mikrotik_search_log_archive(ctx, since="soon")).startswith("Error: Invalid time")
+    assert asyncio.run(logs.mikrotik_search_log_archive(ctx, query="nothing")) == (
+        "No archived log entries match the criteria."
+    )
@@ -0,0 +1,121 @@
+"""Tests for incremental log reads by .id and the tools built on them."""
+
+import asyncio
+import re
+
+import pytest
+
+from mcp_mikrotik import log_cursor
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.scope import logs
+
+
+class FakeLog:
+    """A router log that answers log_dump_script() like RouterOS would."""
+
+    def __init__(self):
+        self.entries = []          # (id number, topics, message)
+        self.next_id = 0x10
+        self.scripts = []
+
+    def add(self, topics, message):
+        self.entries.append((self.next_id, topics, message))
+        self.next_id += 1
+
+    def clear(self):
+        self.entries = []
+        self.next_id = 0
+
+    async def __call__(self, command, _ctx, device=None, read_only=False):
+        assert read_only, "log dumps are reads the classifier cannot vouch for"
+        self.scripts.append(command)
+        last = f"*{self.entries[-1][0]:X}" if self.entries else ""
+        lines = [f"now\t2026-10-18 09:30:00\t{last}"]
+        if ":foreach" in command:
+            after = re.search(r"\.id > \*([0-9A-F]+)", command)
+            topics = re.search(r'topics~"\(([^)]*)\)"', command)
+            for number, entry_topics, message in self.entries:
+                if after and number <= int(after.group(1), 16):
+                    continue
+                if topics and not set(entry_topics.split(";")) & set(topics.group(1).split("|")):
+                    continue
+                lines.append(f"*{number:X}\t09:{number % 60:02}:00\t{entry_topics}\t{message}")
+        return "\n".join(lines) + "\n"
+
+
+@pytest.fixture()
+def router(monkeypatch):
+    log = FakeLog()
+    for i in range(5):
+        log.add("system;info", f"message {i}")
+    monkeypatch.setattr(log_cursor, "execute_mikrotik_command", log)
+    monkeypatch.setattr(logs, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+    log_cursor.get_log_cursors().reset("R1")
+    yield log
+    log_cursor.get_log_cursors().reset("R1")
+
+
+def test_tail_logs_returns_only_entries_after_the_cursor(ctx, router):
+    first = asyncio.run(logs.mikrotik_tail_logs(ctx, limit=2))
+    assert first.startswith("NEW LOG ENTRIES (2) (3 older entries skipped)")
+    assert first.rstrip().endswith("system,info message 4")
+    assert ".id >" not in router.scripts[-1]
+
+    assert asyncio.run(logs.mikrotik_tail_logs(ctx)) == "No new log entries."
+    assert ".id > *14" in router.scripts[-1]
+
+    router.add("dhcp;info", "lease granted")
+    router.add("system;info", "config changed")
+    out = asyncio.run(logs.mikrotik_tail_logs(ctx, topics="dhcp"))
+    assert out.startswith("NEW LOG ENTRIES (1):")
+    assert "dhcp,info lease granted" in out
+
+    # The cursor moved past the entry the topic filter left out as well.
+    assert asyncio.run(logs.mikrotik_tail_logs(ctx)) == "No new log entries."
+    assert ".id > *16" in router.scripts[-1]
+
+
+def test_tail_logs_starts_over_when_the_log_restarts(ctx, router):
+    asyncio.run(logs.mikrotik_tail_logs(ctx))
+    router.clear()
+    router.add("system;info", "router rebooted")
+
+    out = asyncio.run(logs.mikrotik_tail_logs(ctx))
+    assert out.startswith("NEW LOG ENTRIES (1) (the log was cleared or the device restarted)")
+    assert asyncio.run(logs.mikrotik_tail_logs(ctx)) == "No new log entries."
+    assert ".id > *0" in router.scripts[-1]
+
+    out = asyncio.run(logs.mikrotik_tail_logs(ctx, reset=True))
+    assert "router rebooted" in out
+
+
+def test_tail_logs_rejects_unsafe_topics(ctx, router):
+    assert asyncio.run(logs.mikrotik_tail_logs(ctx, topics='dhcp")]; /system reboot')).startswith(
+        "Error: Invalid topic"
+    )
+    assert router.scripts == []
+
+
+def test_monitor_logs_fetches_only_what_arrived(ctx, router, monkeypatch):
+    async def sleep(_seconds):
+        router.add("firewall;warning", "dropped input")
+
+    monkeypatch.setattr(logs.asyncio, "sleep", sleep)
+
+    out = asyncio.run(logs.mikrotik_monitor_logs(ctx, duration=5))
+
+    assert out.startswith("LOG MONITOR (1 new entries in 5s):")
+    assert "firewall,warning dropped input" in out
+    assert ":foreach" not in router.scripts[0]
+    assert ".id > *14" in router.scripts[1]
+
+
+@pytest.mark.parametrize("text, limit, expected", [
+    ("a\nb\n\nc\n", 2, "b\nc"),
+    ("a\r\nb\r\n", 5, "a\nb"),
+    ("only", 1, "only"),
+    ("", 3, ""),
+])
+def test_tail_keeps_the_newest_lines(text, limit, expected):
+    assert logs._tail(text, limit) == expected
@@ -0,0 +1,92 @@
+"""Tests for parsing log dumps and computing log statistics locally."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from mcp_mikrotik.log_entries import (
+    LOG_DUMP_SCRIPT, log_statistics, message_prefix, parse_log_dump, parse_log_time,
+)
+
+NOW = datetime(2026, 10, 18, 9, 30, 0)
+
+DUMP = (
+    "now\t2026-10-18 09:30:00\t*1F\r\n"
+    "*1B\t2026-10-17 08:00:01\tsystem;info\tuser admin logged in from 10.0.0.5 via ssh\r\n"
+    "*1C\toct/18 07:12:00\tdhcp;info\tdhcp1 assigned 192.168.88.10 to AA:BB:CC:00:11:22\r\n"
+    "*1D\t09:05:00\tfirewall;warning\tinput: in:ether1 out:(unknown 0)\r\n"
+    "*1E\t09:10:00\tfirewall;warning\tinput: in:ether1 out:(unknown 0)\r\n"
+    "*1F\t09:29:59\tscript;error\tline one\r\n"
+    "continued on line two\r\n"
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-10-17 08:00:01", datetime(2026, 10, 17, 8, 0, 1)),
+    ("oct/17/2026 08:00:01", datetime(2026, 10, 17, 8, 0, 1)),
+    ("oct/17 08:00:01", datetime(2026, 10, 17, 8, 0, 1)),
+    ("dec/31 23:59:59", datetime(2025, 12, 31, 23, 59, 59)),   # no year, would be in the future
+    ("08:00:01", datetime(2026, 10, 18, 8, 0, 1)),
+    ("yesterday", None),
+])
+def test_parse_log_time_resolves_every_format_against_the_device_clock(value, expected):
+    assert parse_log_time(value, NOW) == expected
+
+
+def test_parse_log_dump_reads_entries_topics_and_continuations():
+    dump = parse_log_dump(DUMP)
+    entries = dump.entries
+
+    assert (dump.now, dump.last_id) == (NOW, "*1F")
+    assert len(entries) == 5
+    assert entries[0].id == "*1B"
+    assert entries[1].topics == ("dhcp", "info")
+    assert entries[1].time == datetime(2026, 10, 18, 7, 12)
+    assert entries[2].severity == "warning"
+    assert entries[4].message == "line one\ncontinued on line two"
+
+    with pytest.raises(ValueError, match="unexpected log output"):
+        parse_log_dump("bad command name foreach (line 1 column 80)")
+
+
+def test_log_statistics_counts_windows_buckets_and_prefixes():
+    dump = parse_log_dump(DUMP)
+    stats = log_statistics(dump.entries, dump.now, hours=3, top=2)
+
+    assert stats["total"] == 5
+    assert stats["oldest"] == datetime(2026, 10, 17, 8, 0, 1)
+    assert dict(stats["topics"])["firewall"] == 2
+    assert stats["severities"] == [("info", 2), ("warning", 2), ("error", 1)]
+    assert (stats["last_hour"], stats["last_day"]) == (3, 4)
+    assert stats["per_hour"] == [
+        (datetime(2026, 10, 18, 7), 1),
+        (datetime(2026, 10, 18, 8), 0),
+        (datetime(2026, 10, 18, 9), 3),
+    ]
+    assert stats["top_prefixes"][0] == ("input: in:ether# out:(unknown", 2)
+
+
+def test_message_prefix_groups_messages_that_differ_in_numbers():
+    assert message_prefix("dhcp1 assigned 192.168.88.10 to x") == message_prefix("dhcp1 assigned 10.1.2.3 to y")
+
+
+def test_get_log_statistics_fetches_the_log_once(ctx, monkeypatch):
+    from mcp_mikrotik.scope import logs
+
+    sent = []
+
+    async def fake_exec(command, _ctx, device=None, read_only=False):
+        sent.append((command, read_only))
+        return DUMP
+
+    monkeypatch.setattr(logs, "execute_mikrotik_command", fake_exec)
+
+    result = asyncio.run(logs.mikrotik_get_log_statistics(ctx, hours=2))
+
+    assert sent == [(LOG_DUMP_SCRIPT, True)]
+    assert result.startswith("LOG STATISTICS:\n\nTotal log entries: 5 (2026-10-17 08:00:01 to 2026-10-18 09:29:59)")
+    assert "  firewall: 2" in result
+    assert "Entries in last hour: 3" in result
+    assert "  2026-10-18 09:00      3  ####################" in result
+    assert "      2  input: in:ether# out:(unknown" in result
@@ -0,0 +1,109 @@
+"""Tests for the RouterOS print-output parser."""
+
+from mcp_mikrotik.parsing import (
+    Row,
+    RowParser,
+    iter_rows,
+    parse_as_value,
+    parse_legend,
+    parse_rows,
+    quote,
+    split_attributes,
+    unquote,
+)
+
+
+TERSE_FILTER = """\
+ 0    chain=input action=accept connection-state=established,related comment="defconf: accept established"
+ 1 X  chain=forward action=drop src-address=10.0.0.0/8 log=no log-prefix=""
+ 2 D  chain=forward action=passthrough comment="dynamic \\"fasttrack\\" counter"
+"""
+
+DETAIL_ROUTES = """\
+Flags: D - DYNAMIC; A - ACTIVE; c - CONNECT, s - STATIC
+Columns: DST-ADDRESS, GATEWAY, DISTANCE
+ 0  As ;;; default route
+      dst-address=0.0.0.0/0 gateway=192.0.2.254
+      routing-table=main distance=1
+
+ 1 DAc   dst-address=192.0.2.0/24 gateway=ether1 routing-table=main distance=0
+"""
+
+
+def test_terse_rows_with_flags_and_quoted_values():
+    rows = parse_rows(TERSE_FILTER)
+
+    assert [r.index for r in rows] == [0, 1, 2]
+    assert rows[0]["comment"] == "defconf: accept established"
+    assert rows[0]["connection-state"] == "established,related"
+    assert not rows[0].disabled
+    assert rows[1].flags == "X" and rows[1].disabled
+    assert rows[1]["log-prefix"] == ""
+    assert rows[2].dynamic
+    assert rows[2]["comment"] == 'dynamic "fasttrack" counter'
+
+
+def test_detail_rows_use_the_printed_legend_and_comment_lines():
+    rows = parse_rows(DETAIL_ROUTES)
+
+    assert len(rows) == 2
+    default, connected = rows
+    assert default.flag_names == ("active", "static")
+    assert default["comment"] == "default route"
+    assert default["distance"] == "1"           # continuation lines are merged
+    assert connected.flag_names == ("dynamic", "active", "connect")
+    assert connected.to_dict() == {
+        "dst-address": "192.0.2.0/24", "gateway": "ether1", "routing-table": "main",
+        "distance": "0", "dynamic": "true", "active": "true", "connect": "true",
+    }
+
+
+def test_unnumbered_detail_output_is_one_row():
+    rows = parse_rows('name="pool1" ranges=10.0.0.1-10.0.0.10')
+    assert rows == [Row({"name": "pool1", "ranges": "10.0.0.1-10.0.0.10"})]
+    assert rows[0].index is None
+
+
+def test_iter_rows_is_lazy():
+    """Each row is handed out as soon as the next one starts."""
+    consumed = []
+
+    def lines():
+        for line in TERSE_FILTER.splitlines():
+            consumed.append(line)
+            yield line
+
+    rows = iter_rows(lines())
+    first = next(rows)
+    assert first.index == 0
+    assert len(consumed) == 2
+
+
+def test_row_parser_matches_iter_rows():
+    parser = RowParser()
+    rows = [row for line in DETAIL_ROUTES.splitlines() if (row := parser.feed(line))]
+    rows.append(parser.close())
+    assert rows == parse_rows(DETAIL_ROUTES)
+    assert parser.close() is None
+
+
+def test_as_value_rows_split_on_repeated_keys():
+    text = ".id=*1;name=pool1;ranges=10.0.0.1-10.0.0.10;.id=*2;name=pool2;ranges=;disabled=true"
+    rows = parse_as_value(text)
+
+    assert [r.id for r in rows] == ["*1", "*2"]
+    assert rows[1]["ranges"] == ""
+    assert rows[1].disabled and not rows[0].disabled
+
+
+def test_quoting_round_trips():
+    assert unquote(r'"a \"b\" \\ c\_d\09"') == 'a "b" \\ c d\t'
+    assert unquote("plain") == "plain"
+    value = 'say "hi" $HOME \\'
+    assert dict(split_attributes(f"comment={quote(value)} x=1")) == {"comment": value, "x": "1"}
+
+
+def test_legend_accepts_both_separators():
+    assert parse_legend("Flags: X - disabled, I - invalid; D - dynamic") == {
+        "X": "disabled", "I": "invalid", "D": "dynamic",
+    }
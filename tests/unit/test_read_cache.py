@@ -0,0 +1,199 @@
+"""Tests for the TTL/LRU read cache and its wiring into the connector."""
+
+import asyncio
+
+import pytest
+
+from mcp_mikrotik import read_cache as cache_mod
+from mcp_mikrotik.read_cache import ReadCache
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_ttl_depends_on_the_command_family():
+    cache = ReadCache(max_entries=10, default_ttl=30)
+    assert cache.ttl_for("/ip dns print") == 30
+    assert cache.ttl_for("/log print where topics~\"error\"") == 5
+    assert cache.ttl_for("/interface  ethernet print") == 10
+    assert cache.ttl_for("/ip firewall connection print count-only") == 0
+    assert cache.ttl_for("/interface monitor-traffic ether1 once") == 0
+    assert cache.ttl_for("/log print follow") == 0
+    assert cache.ttl_for("/ip arpeggio print") == 30          # prefix is a whole word
+    assert ReadCache(max_entries=10, default_ttl=2).ttl_for("/ip arp print") == 2
+
+
+def test_hits_ignore_insignificant_whitespace(clock):
+    cache = ReadCache(max_entries=10, default_ttl=30)
+    assert cache.get("RouterA", "/ip dns print") is None
+    cache.put("RouterA", "/ip  dns   print", "servers: 1.1.1.1", cache.generation("RouterA"))
+
+    assert cache.get("routera", " /ip dns print ") == "servers: 1.1.1.1"
+    assert cache.get("RouterB", "/ip dns print") is None
+    # whitespace inside quotes is significant
+    cache.put("RouterA", '/ip pool print where comment="a  b"', "x", 0)
+    assert cache.get("RouterA", '/ip pool print where comment="a b"') is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_entries_expire(clock):
+    cache = ReadCache(max_entries=10, default_ttl=30)
+    cache.put("R", "/log print", "log", 0)
+    clock[0] += 4.9
+    assert cache.get("R", "/log print") == "log"
+    clock[0] += 0.2
+    assert cache.get("R", "/log print") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ReadCache(max_entries=2, default_ttl=30)
+    cache.put("R", "/a print", "a", 0)
+    cache.put("R", "/b print", "b", 0)
+    cache.get("R", "/a print")
+    cache.put("R", "/c print", "c", 0)
+
+    assert cache.get("R", "/b print") is None
+    assert cache.get("R", "/a print") == "a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidation_is_per_device_and_rejects_stale_puts(clock):
+    cache = ReadCache(max_entries=10, default_ttl=30)
+    cache.put("A", "/ip route print", "a-routes", 0)
+    cache.put("B", "/ip route print", "b-routes", 0)
+
+    started = cache.generation("A")          # a read begins...
+    assert cache.invalidate("a") == 1        # ...a write lands meanwhile
+    assert cache.put("A", "/ip address print", "stale", started) is False
+
+    assert cache.get("A", "/ip route print") is None
+    assert cache.get("A", "/ip address print") is None
+    assert cache.get("B", "/ip route print") == "b-routes"
+
+
+# ---------------------------------------------------------------------------
+# Connector wiring
+# ---------------------------------------------------------------------------
+
+def test_connector_serves_repeated_reads_from_cache(ctx, monkeypatch):
+    from mcp_mikrotik import config
+    from tests.unit.test_connector import DummyClient, FakeInventory, _patch_inventory
+
+    monkeypatch.setattr(config.mikrotik_config, "read_cache_size", 100)
+    cache_mod.reset_read_cache()
+    try:
+        client = DummyClient("servers: 1.1.1.1")
+        connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+        run = lambda cmd: asyncio.run(connector.execute_mikrotik_command(cmd, ctx))
+
+        assert run("/ip dns print") == "servers: 1.1.1.1"
+        assert run("/ip dns print") == "servers: 1.1.1.1"
+        assert client.commands == ["/ip dns print"]
+
+        run("/ip dns set servers=9.9.9.9")       # a write drops the device's entries
+        run("/ip dns print")
+        assert client.commands == ["/ip dns print", "/ip dns set servers=9.9.9.9", "/ip dns print"]
+
+        client.raises = ConnectionError("gone")  # failures are not cached
+        run("/ip route print")
+        client.raises = None
+        run("/ip route print")
+        assert client.commands[-2:] == ["/ip route print", "/ip route print"]
+
+        stats = cache_mod.get_read_cache().stats()
+        assert stats["hits"] == 1 and stats["invalidations"] == 1
+    finally:
+        cache_mod.reset_read_cache()
+
+
+def test_generated_read_scripts_keep_the_cache(ctx, monkeypatch):
+    from mcp_mikrotik import config
+    from mcp_mikrotik.log_entries import LOG_DUMP_SCRIPT
+    from tests.unit.test_connector import DummyClient, FakeInventory, _patch_inventory
+
+    monkeypatch.setattr(config.mikrotik_config, "read_cache_size", 100)
+    cache_mod.reset_read_cache()
+    try:
+        client = DummyClient("now\t2026-10-18 09:30:00\t*1")
+        connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+        run = lambda cmd, **kw: asyncio.run(connector.execute_mikrotik_command(cmd, ctx, **kw))
+
+        run("/ip dns print")
+        run(LOG_DUMP_SCRIPT, read_only=True)
+        run(LOG_DUMP_SCRIPT, read_only=True)          # read again, not served stale
+        run("/ip dns print")
+
+        assert client.commands == ["/ip dns print", LOG_DUMP_SCRIPT, LOG_DUMP_SCRIPT]
+        assert cache_mod.get_read_cache().stats()["invalidations"] == 0
+
+        run(LOG_DUMP_SCRIPT)                           # unvouched, it counts as a write
+        assert cache_mod.get_read_cache().stats()["invalidations"] == 1
+    finally:
+        cache_mod.reset_read_cache()
+
+
+def test_read_only_tools_keep_the_cache(ctx, monkeypatch):
+    from mcp_mikrotik import config
+    from mcp_mikrotik.app import READ, WRITE, _Server, annotate
+    from tests.unit.test_connector import DummyClient, FakeInventory, _patch_inventory
+
+    monkeypatch.setattr(config.mikrotik_config, "read_cache_size", 100)
+    cache_mod.reset_read_cache()
+    try:
+        client = DummyClient("RouterA")
+        connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+        server = _Server("test")
+        script = ":put [/system identity get name]"
+
+        @server.tool(name="identity", annotations=annotate(READ, "Identity"))
+        async def identity(ctx):
+            return await connector.execute_mikrotik_command(script, ctx)
+
+        @server.tool(name="rename", annotations=annotate(WRITE, "Rename"))
+        async def rename(ctx):
+            return await connector.execute_mikrotik_command(script, ctx)
+
+        asyncio.run(connector.execute_mikrotik_command("/ip dns print", ctx))
+        asyncio.run(identity(ctx))
+        asyncio.run(connector.execute_mikrotik_command("/ip dns print password=hunter2", ctx))
+        assert cache_mod.get_read_cache().get("RouterA", "/ip dns print") == "RouterA"
+        assert cache_mod.get_read_cache().stats()["invalidations"] == 0
+
+        asyncio.run(connector.execute_mikrotik_command("/ip dns print password=hunter2", ctx))
+        assert not any("hunter2" in str(call) for call in ctx.info.call_args_list)
+
+        asyncio.run(rename(ctx))                     # the same script from a write tool
+        assert cache_mod.get_read_cache().get("RouterA", "/ip dns print") is None
+    finally:
+        cache_mod.reset_read_cache()
+
+
+def test_cache_is_off_by_default():
+    cache_mod.reset_read_cache()
+    assert cache_mod.get_read_cache() is None
+
+
+def test_batches_use_and_fill_the_cache(ctx, monkeypatch):
+    from mcp_mikrotik import config
+    from tests.unit.test_connector import FakeInventory, ScriptClient, _patch_inventory
+
+    monkeypatch.setattr(config.mikrotik_config, "read_cache_size", 100)
+    cache_mod.reset_read_cache()
+    try:
+        client = ScriptClient({"/a print": "A", "/b print": "B", "/c set x=1": ""})
+        connector = _patch_inventory(monkeypatch, FakeInventory({"RouterA": client}))
+        batch = lambda cmds: asyncio.run(connector.execute_batch(cmds, ctx))
+
+        assert batch(["/a print"]) == ["A"]
+        assert batch(["/a print", "/b print"]) == ["A", "B"]
+        assert client.commands[-1] == '/b print; :put "__MCP_BATCH_EOC_0__"'
+
+        batch(["/c set x=1"])
+        assert cache_mod.get_read_cache().get("RouterA", "/b print") is None
+    finally:
+        cache_mod.reset_read_cache()
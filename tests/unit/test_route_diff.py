@@ -0,0 +1,180 @@
+"""Tests for saved route snapshots and the diff between two of them."""
+
+import asyncio
+import ipaddress
+import json
+import random
+
+import pytest
+
+from mcp_mikrotik import config, route_store, route_table
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.route_diff import diff_stores
+from mcp_mikrotik.route_store import RouteStore
+from mcp_mikrotik.route_table import RouteSnapshot
+
+
+def _store(routes, active_only=True):
+    """``routes``: (dst, gateway, distance[, table]) tuples, all active."""
+    store = RouteStore(active_only)
+    for dst, gateway, distance, *table in routes:
+        store.add(dst, gateway, distance, table[0] if table else "main", True)
+    return store
+
+
+def test_diff_reports_only_the_delta():
+    old = _store([
+        ("0.0.0.0/0", "192.0.2.1", 1),
+        ("10.0.0.0/8", "198.51.100.7", 20),
+        ("10.1.0.0/16", "198.51.100.7", 20),
+        ("10.2.0.0/16", "198.51.100.7", 20),
+        ("2001:db8::/32", "fe80::1", 1),
+    ])
+    new = _store([
+        ("10.2.0.0/16", "198.51.100.9", 20),            # changed gateway
+        ("10.0.0.0/8", "198.51.100.7", 20),
+        ("0.0.0.0/0", "192.0.2.1", 1),
+        ("10.3.0.0/16", "198.51.100.7", 20),             # added
+        ("2001:db8::/32", "fe80::1", 1),
+        ("2001:db8::/32", "fe80::2", 1),                 # second ECMP path
+        ("10.9.0.0/16", "192.0.2.9", 1, "vrf-a"),        # added, other table
+    ])
+
+    diff = diff_stores(old, new)
+
+    assert diff["counts"] == {"added": 2, "removed": 1, "changed": 2, "unchanged": 2}
+    assert diff["truncated"] is False
+    assert [(e["routing-table"], e["dst-address"]) for e in diff["added"]] == [
+        ("main", "10.3.0.0/16"), ("vrf-a", "10.9.0.0/16"),
+    ]
+    assert diff["removed"] == [{
+        "dst-address": "10.1.0.0/16", "routing-table": "main",
+        "routes": [{"gateway": "198.51.100.7", "distance": 20, "active": True}],
+    }]
+    assert [e["dst-address"] for e in diff["changed"]] == ["10.2.0.0/16", "2001:db8::/32"]
+    assert diff["changed"][0]["after"][0]["gateway"] == "198.51.100.9"
+    assert len(diff["changed"][1]["after"]) == 2
+
+    only_main = diff_stores(old, new, table="main", limit=1)
+    assert only_main["counts"]["added"] == 1
+    assert only_main["truncated"] is True and len(only_main["changed"]) == 1
+
+
+def test_diff_agrees_with_set_differences():
+    rng = random.Random(11)
+
+    def random_routes():
+        routes = {}
+        for _ in range(3000):
+            length = rng.choice([16, 20, 24])
+            network = ipaddress.ip_network((rng.getrandbits(12) << 20, length), strict=False)
+            routes[str(network)] = f"198.51.100.{rng.randint(1, 3)}"
+        return routes
+
+    a, b = random_routes(), random_routes()
+    diff = diff_stores(
+        _store((dst, gw, 20) for dst, gw in a.items()),
+        _store((dst, gw, 20) for dst, gw in b.items()),
+        limit=10 ** 6,
+    )
+
+    assert {e["dst-address"] for e in diff["added"]} == b.keys() - a.keys()
+    assert {e["dst-address"] for e in diff["removed"]} == a.keys() - b.keys()
+    assert {e["dst-address"] for e in diff["changed"]} == {k for k in a.keys() & b.keys() if a[k] != b[k]}
+
+
+def test_snapshots_are_saved_pruned_and_reloaded(monkeypatch):
+    monkeypatch.setattr(config.mikrotik_config, "route_snapshot_keep", 2)
+    snapshots = route_table.RouteSnapshots()
+    first = RouteSnapshot("R1", _store([("10.0.0.0/8", "192.0.2.1", 1)]), "2026-10-18T09:00:00Z")
+    second = RouteSnapshot("R1", _store([("10.0.0.0/8", "192.0.2.2", 1)]), "2026-10-18T09:00:00Z")
+    third = RouteSnapshot("R1", _store([("10.0.0.0/8", "192.0.2.3", 1)]), "2026-10-18T10:00:00Z")
+    for snapshot in (first, second, third):
+        snapshots.put(snapshot)
+
+    assert (first.id, second.id, third.id) == ("20261018T090000Z", "20261018T090000Z-2", "20261018T100000Z")
+    assert snapshots.ids("r1") == ["20261018T090000Z-2", "20261018T100000Z"]
+    assert [d["routes"] for d in snapshots.describe("R1")] == [1, 1]
+
+    fresh = route_table.RouteSnapshots()               # as after a restart
+    latest = fresh.get("R1")
+    assert latest.id == third.id and latest.taken_at == "2026-10-18T10:00:00Z"
+    assert latest.lookup("10.1.2.3")[0].gateway == "192.0.2.3"
+    with pytest.raises(ValueError, match="no route snapshot"):
+        fresh.load("R1", first.id)
+
+
+@pytest.fixture()
+def network(monkeypatch):
+    """Two devices whose routes come from a dict the test can edit."""
+    tables = {
+        "R1": [{"dst-address": "10.0.0.0/8", "gateway": "192.0.2.1", "active": "true"},
+               {"dst-address": "10.1.0.0/16", "gateway": "192.0.2.1", "active": "true"}],
+        "R2": [{"dst-address": "10.0.0.0/8", "gateway": "192.0.2.1", "active": "true"}],
+    }
+
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        for row in tables[device] if menu == "ip route" else ():
+            consumer(row)
+        return 0
+
+    from mcp_mikrotik.scope import routes as scope
+
+    monkeypatch.setattr(route_store, "consume_rows", fake_consume)
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([
+        DeviceConfig(title="R1", host="10.0.0.1"), DeviceConfig(title="R2", host="10.0.0.2"),
+    ]))
+    route_table.get_route_snapshots().clear()
+    yield tables
+    route_table.get_route_snapshots().clear()
+
+
+def test_diff_routes_over_time_and_between_devices(ctx, network):
+    from mcp_mikrotik.scope import routes as scope
+
+    first = asyncio.run(scope.mikrotik_diff_routes(ctx, device="R1"))
+    assert first.startswith("Error: no earlier route snapshot of 'R1'")
+    assert asyncio.run(scope.mikrotik_diff_routes(ctx, refresh=True, device="R1")) == first
+
+    asyncio.run(scope.mikrotik_snapshot_routes(ctx, device="R1"))
+    network["R1"][1]["gateway"] = "192.0.2.9"
+    network["R1"].append({"dst-address": "10.2.0.0/16", "gateway": "192.0.2.1", "active": "true"})
+    out = json.loads(asyncio.run(scope.mikrotik_diff_routes(ctx, refresh=True, device="R1")))
+    assert out["counts"] == {"added": 1, "removed": 0, "changed": 1, "unchanged": 1}
+    assert out["to"]["id"] != out["from"]["id"]
+
+    listed = json.loads(asyncio.run(scope.mikrotik_list_route_snapshots(ctx, device="R1")))
+    assert [s["id"] for s in listed["snapshots"]] == [out["from"]["id"], out["to"]["id"]]
+
+    again = json.loads(asyncio.run(scope.mikrotik_diff_routes(ctx, baseline=out["from"]["id"], device="R1")))
+    assert again["counts"] == out["counts"]
+    latest = json.loads(asyncio.run(scope.mikrotik_diff_routes(ctx, device="R1")))   # nothing new taken
+    assert (latest["from"]["id"], latest["to"]["id"]) == (out["from"]["id"], out["to"]["id"])
+
+    pair = json.loads(asyncio.run(scope.mikrotik_diff_routes(ctx, other_device="R2", device="R1")))
+    assert pair["from"]["device"] == "R1" and pair["to"]["device"] == "R2"
+    assert pair["counts"] == {"added": 0, "removed": 2, "changed": 0, "unchanged": 1}
+
+    assert asyncio.run(scope.mikrotik_diff_routes(
+        ctx, other_device="R2", baseline="x", device="R1",
+    )).startswith("Error:")
+    assert asyncio.run(scope.mikrotik_diff_routes(ctx, baseline="nosuch", device="R1")).startswith(
+        "Error: no route snapshot"
+    )
+
+
+def test_diff_routes_keeps_its_baseline_and_compares_like_with_like(ctx, network, monkeypatch):
+    from mcp_mikrotik.scope import routes as scope
+
+    monkeypatch.setattr(config.mikrotik_config, "route_snapshot_keep", 1)
+    baseline = json.loads(asyncio.run(scope.mikrotik_snapshot_routes(ctx, device="R1")))["id"]
+    for n in range(3):
+        network["R1"].append({"dst-address": f"10.{n + 2}.0.0/16", "gateway": "192.0.2.1", "active": "true"})
+        out = json.loads(asyncio.run(scope.mikrotik_diff_routes(ctx, baseline=baseline, refresh=True, device="R1")))
+        assert out["from"]["id"] == baseline and out["counts"]["added"] == n + 1
+
+    monkeypatch.setattr(config.mikrotik_config, "route_snapshot_keep", 0)
+    asyncio.run(scope.mikrotik_snapshot_routes(ctx, active_only=False, device="R1"))
+    mixed = asyncio.run(scope.mikrotik_diff_routes(ctx, baseline=baseline, device="R1"))
+    assert mixed.startswith(f"Error: 'R1' snapshot {baseline} holds active routes only but")
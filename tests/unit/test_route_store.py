@@ -0,0 +1,140 @@
+"""Tests for the column store that route snapshots are streamed into."""
+
+import asyncio
+import io
+import json
+
+import pytest
+
+from mcp_mikrotik import route_store, route_table
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.route_store import RouteStore, summarise
+from mcp_mikrotik.routeros_api import RouterOSApiError
+
+# Rows shaped as the RouterOS API (or fetch_rows over SSH) reports them.
+ROWS = [
+    {"dst-address": "0.0.0.0/0", "gateway": "192.0.2.1", "distance": "1",
+     "routing-table": "main", "active": "true", "static": "true"},
+    {"dst-address": "10.0.0.0/8", "gateway": "198.51.100.7", "distance": "20",
+     "routing-table": "main", "active": "true", "bgp": "true"},
+    {"dst-address": "10.1.0.0/16", "gateway": "198.51.100.7", "distance": "20",
+     "routing-table": "main", "active": "true", "bgp": "true"},
+    {"dst-address": "10.2.0.0/16", "gateway": "198.51.100.9", "distance": "200",
+     "routing-table": "main", "bgp": "true"},
+    {"dst-address": "172.16.0.0/12", "gateway": "", "type": "blackhole",
+     "routing-mark": "vrf-a", "active": "true"},
+    {"dst-address": "192.168.0.0/16", "gateway": "192.0.2.1", "disabled": "true"},
+    {"dst-address": "2001:db8::/32", "gateway": "fe80::1%ether1", "distance": "1",
+     "routing-table": "main", "active": "true"},
+    {"comment": "no destination"},
+]
+
+
+def _store(active_only=True):
+    store = RouteStore(active_only)
+    for row in ROWS:
+        store.add_row(row)
+    return store
+
+
+def test_rows_are_packed_into_columns():
+    store = _store(active_only=False)
+
+    assert len(store) == 6                      # disabled and destination-less rows skipped
+    assert store.gateways == ["192.0.2.1", "198.51.100.7", "198.51.100.9", "blackhole", "fe80::1%ether1"]
+    assert store.tables == ["main", "vrf-a"]
+    assert list(store.gateway) == [0, 1, 1, 2, 3, 4]
+    assert store.nbytes() == 6 * 26
+
+    assert store.route(5).to_dict() == {
+        "dst-address": "2001:db8::/32", "gateway": "fe80::1%ether1", "distance": 1,
+        "routing-table": "main", "active": True,
+    }
+    assert store.route(4).table == "vrf-a" and store.route(4).gateway == "blackhole"
+    assert store.prefix(0) == "0.0.0.0/0"
+
+    assert len(_store()) == 5                   # the inactive BGP route is left out
+
+
+def test_summarise_counts_from_the_columns():
+    summary = summarise(_store(active_only=False), top=2)
+
+    assert summary["routes"] == 6 and summary["active"] == 5
+    assert summary["families"] == {"ipv4": 5, "ipv6": 1}
+    assert summary["tables"] == {"main": 5, "vrf-a": 1}
+    assert summary["prefix_lengths"] == {
+        "ipv4": {"/0": 1, "/8": 1, "/12": 1, "/16": 2},
+        "ipv6": {"/32": 1},
+    }
+    assert summary["gateways"] == 5
+    assert summary["top_gateways"] == [
+        {"gateway": "198.51.100.7", "routes": 2},
+        {"gateway": "192.0.2.1", "routes": 1},
+    ]
+
+    only = summarise(_store(active_only=False), table="vrf-a")
+    assert only["routes"] == 1 and only["top_gateways"] == [{"gateway": "blackhole", "routes": 1}]
+    assert summarise(_store(), table="nosuch")["routes"] == 0
+
+
+def test_load_routes_tolerates_a_device_without_ipv6(monkeypatch):
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        if menu == "ipv6 route":
+            raise RouterOSApiError("no such command prefix")
+        for row in ROWS:
+            consumer(row)
+        return len(ROWS)
+
+    monkeypatch.setattr(route_store, "consume_rows", fake_consume)
+    store = asyncio.run(route_store.load_routes("R1"))
+    assert len(store) == 5
+
+
+def test_summarize_routes_tool_uses_the_snapshot(ctx, monkeypatch):
+    from mcp_mikrotik.scope import routes as scope
+
+    calls = []
+
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        calls.append(menu)
+        for row in ROWS if menu == "ip route" else ():
+            consumer(row)
+        return 0
+
+    monkeypatch.setattr(route_store, "consume_rows", fake_consume)
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+    route_table.get_route_snapshots().clear()
+    try:
+        out = json.loads(asyncio.run(scope.mikrotik_summarize_routes(ctx, top=1)))
+        again = json.loads(asyncio.run(scope.mikrotik_summarize_routes(ctx, routing_table="main")))
+    finally:
+        route_table.get_route_snapshots().clear()
+
+    assert calls == ["ip route", "ipv6 route"]
+    assert out["device"] == "R1" and out["active_only"] is True
+    assert out["routes"] == 5
+    assert out["top_gateways"] == [{"gateway": "198.51.100.7", "routes": 2}]
+    assert again["routes"] == 4
+
+
+def test_store_round_trips_through_a_file():
+    store = _store(active_only=False)
+    buffer = io.BytesIO()
+    store.save(buffer, {"device": "R1"})
+    buffer.seek(0)
+
+    loaded, header = RouteStore.load(buffer)
+
+    assert header["device"] == "R1" and header["count"] == 6
+    assert loaded.active_only is False
+    assert [loaded.route(i).to_dict() for i in range(len(loaded))] == [
+        store.route(i).to_dict() for i in range(len(store))
+    ]
+    loaded.add_row(ROWS[0])
+    assert list(loaded.gateway)[-1] == 0            # interned names are restored too
+
+    with pytest.raises(ValueError, match="truncated"):
+        RouteStore.load(io.BytesIO(buffer.getvalue()[:-3]))
+    with pytest.raises(ValueError, match="not a route store"):
+        RouteStore.load(io.BytesIO(b"hello\n"))
@@ -0,0 +1,173 @@
+"""Tests for route snapshots and the longest-prefix-match index."""
+
+import asyncio
+import ipaddress
+import json
+import random
+
+import pytest
+
+from mcp_mikrotik import route_store, route_table
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.parsing import parse_rows
+from mcp_mikrotik.route_table import PrefixIndex, parse_prefix
+
+IPV4_ROUTES = """\
+ 0 As  dst-address=0.0.0.0/0 routing-table=main gateway=192.0.2.1 immediate-gw=192.0.2.1%ether1 distance=1 scope=30 target-scope=10
+ 1 Ab  dst-address=10.0.0.0/8 routing-table=main gateway=198.51.100.7 distance=20 scope=40 target-scope=10
+ 2  b  dst-address=10.0.0.0/8 routing-table=main gateway=198.51.100.9 distance=200 scope=40 target-scope=10
+ 3 As  dst-address=10.20.0.0/16 routing-table=main gateway=192.0.2.2 distance=1 scope=30 target-scope=10
+ 4 Ac  dst-address=192.0.2.0/24 routing-table=main gateway=ether1 distance=0 scope=10 target-scope=5
+ 5 XS  dst-address=10.20.30.0/24 routing-table=main gateway=192.0.2.3 distance=1 scope=30 target-scope=10
+ 6 As  dst-address=10.20.0.0/16 routing-table=vrf-cust gateway=203.0.113.1 distance=1 scope=30 target-scope=10
+"""
+
+IPV6_ROUTES = """\
+ 0 As  dst-address=::/0 routing-table=main gateway=fe80::1%ether1 distance=1 scope=30 target-scope=10
+ 1 Ac  dst-address=2001:db8:1::/48 routing-table=main gateway=ether2 distance=0 scope=10 target-scope=5
+"""
+
+
+def test_parse_prefix_accepts_addresses_and_prefixes():
+    assert parse_prefix("10.1.2.3") == (4, int(ipaddress.ip_address("10.1.2.3")), 32)
+    assert parse_prefix("10.1.2.3/16") == (4, int(ipaddress.ip_address("10.1.0.0")), 16)
+    assert parse_prefix("2001:db8::/32")[::2] == (6, 32)
+    with pytest.raises(ValueError):
+        parse_prefix("not-an-address")
+
+
+def test_index_matches_a_linear_scan():
+    rng = random.Random(7)
+    index = PrefixIndex(32)
+    prefixes = {}
+    for _ in range(2000):
+        length = rng.choice([0, 8, 12, 16, 20, 24, 25, 28, 32])
+        network = ipaddress.ip_network((rng.getrandbits(32), length), strict=False)
+        if network not in prefixes:
+            prefixes[network] = len(prefixes)
+            index.add(int(network.network_address), length, prefixes[network])
+    index.freeze()
+    assert len(index) == len(prefixes)
+
+    for _ in range(2000):
+        address = ipaddress.ip_address(rng.getrandbits(32))
+        covering = [n for n in prefixes if address in n]
+        best = max(covering, key=lambda n: n.prefixlen) if covering else None
+        found = index.lookup(int(address))
+        assert (found[2] if found else None) == ([prefixes[best]] if best else None)
+
+
+def test_index_prefix_lookup_stops_at_the_query_length():
+    index = PrefixIndex(128)
+    for value, text in enumerate(("2001:db8::/32", "2001:db8:1::/48", "2001:db8:1::/96", "2001:db8::/32")):
+        _, key, length = parse_prefix(text)
+        index.add(key, length, value)
+    index.freeze()
+
+    _, key, length = parse_prefix("2001:db8:1::/64")
+    assert index.lookup(key, length) == (parse_prefix("2001:db8:1::/48")[1], 48, [1])
+    assert index.lookup(*parse_prefix("2001:db8:1::5")[1:])[1:] == (96, [2])
+    assert index.lookup(*parse_prefix("2001:db8:2::/48")[1:])[2] == [0, 3]
+    assert index.lookup(*parse_prefix("2001:db9::/32")[1:]) is None
+
+
+def test_large_tables_index_in_compact_arrays():
+    store = route_store.RouteStore()
+    for n in range(1 << 18):
+        store.add(f"{(n >> 16) + 1}.{(n >> 8) & 255}.{n & 255}.0/24", "192.0.2.1", 20, "main", True)
+    snapshot = route_table.RouteSnapshot("R1", store)
+
+    index = snapshot._index("main", 4)
+
+    assert len(index) == 1 << 18
+    assert index._keys[24].itemsize * len(index._keys[24]) + index._values[24].itemsize * len(index) == 12 << 18
+    assert snapshot.lookup("4.255.255.77")[0].dst == "4.255.255.0/24"
+    assert snapshot.lookup("5.0.0.1") is None
+
+
+@pytest.fixture()
+def routes(monkeypatch):
+    """A device whose /ip route and /ipv6 route rows stream from the texts above."""
+    sent = []
+    tables = {"ip route": IPV4_ROUTES, "ipv6 route": IPV6_ROUTES}
+
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        sent.append((menu, device))
+        rows = parse_rows(tables[menu])
+        for row in rows:
+            consumer(row.to_dict())
+        return len(rows)
+
+    monkeypatch.setattr(route_store, "consume_rows", fake_consume)
+    route_table.get_route_snapshots().clear()
+    yield sent
+    route_table.get_route_snapshots().clear()
+
+
+def test_snapshot_keeps_active_routes_per_table(ctx, routes):
+    snapshot = asyncio.run(route_table.take_route_snapshot("R1"))
+
+    assert routes == [("ip route", "R1"), ("ipv6 route", "R1")]
+    assert snapshot.counts() == {"main": {"ipv4": 4, "ipv6": 2}, "vrf-cust": {"ipv4": 1}}
+    assert snapshot.lookup("10.20.30.40")[0].gateway == "192.0.2.2"     # the /24 is disabled
+    assert snapshot.lookup("10.20.30.40", "vrf-cust")[0].gateway == "203.0.113.1"
+    assert snapshot.lookup("10.9.9.9")[0].gateway == "198.51.100.7"
+    assert snapshot.lookup("8.8.8.8")[0].dst == "0.0.0.0/0"
+    assert snapshot.lookup("2001:db8:1:2::5")[0].gateway == "ether2"
+    assert snapshot.lookup("8.8.8.8", "nosuch") is None
+
+
+def test_snapshot_of_all_routes_prefers_active_then_distance(ctx, routes):
+    snapshot = asyncio.run(route_table.take_route_snapshot("R1", active_only=False))
+
+    found = snapshot.lookup("10.1.1.1")
+    assert [r.gateway for r in found] == ["198.51.100.7", "198.51.100.9"]
+    assert [r.active for r in found] == [True, False]
+
+
+def test_snapshot_of_all_routes_skips_prefixes_with_no_active_route():
+    store = route_store.RouteStore(active_only=False)
+    store.add("10.20.0.0/16", "192.0.2.2", 1, "main", True)
+    store.add("10.20.30.0/24", "192.0.2.3", 1, "main", False)
+    store.add("10.20.30.0/24", "192.0.2.4", 5, "main", False)
+    store.add("10.20.40.0/24", "192.0.2.5", 1, "main", False)
+    snapshot = route_table.RouteSnapshot("R1", store)
+
+    assert [r.gateway for r in snapshot.lookup("10.20.30.40")] == ["192.0.2.2"]
+    assert snapshot.lookup("10.20.40.0/24")[0].dst == "10.20.0.0/16"
+    assert snapshot.lookup("10.21.0.1") is None
+
+
+def test_snapshot_fails_when_ipv4_routes_cannot_be_read(ctx, monkeypatch):
+    async def fake_consume(menu, consumer, device=None, proplist=None, where=None):
+        raise ValueError("RouterOS rejected the command: bad command name route")
+
+    monkeypatch.setattr(route_store, "consume_rows", fake_consume)
+    with pytest.raises(ValueError, match="rejected"):
+        asyncio.run(route_table.take_route_snapshot("R1"))
+
+
+def test_lookup_routes_answers_from_one_snapshot(ctx, routes, monkeypatch):
+    from mcp_mikrotik.scope import routes as scope
+
+    monkeypatch.setattr(scope, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+
+    out = json.loads(asyncio.run(scope.mikrotik_lookup_routes(
+        ctx, destinations=["10.20.1.1", "10.0.0.0/12", "2001:db8:1::1", "bogus"],
+    )))
+    out2 = json.loads(asyncio.run(scope.mikrotik_lookup_routes(ctx, destinations=["8.8.8.8"])))
+
+    assert len(routes) == 2
+    assert out["matched"] == 3 and out["unmatched"] == 1
+    assert out["results"][0]["route"]["dst-address"] == "10.20.0.0/16"
+    assert out["results"][1]["route"]["gateway"] == "198.51.100.7"
+    assert out["results"][3]["error"] == "not an address or prefix"
+    assert out2["results"][0]["route"]["dst-address"] == "0.0.0.0/0"
+
+    asyncio.run(scope.mikrotik_lookup_routes(ctx, destinations=["8.8.8.8"], refresh=True))
+    assert len(routes) == 4
+
+    snap = json.loads(asyncio.run(scope.mikrotik_snapshot_routes(ctx, active_only=False)))
+    assert snap["routes"]["main"] == {"ipv4": 5, "ipv6": 2}
+    assert asyncio.run(scope.mikrotik_lookup_routes(ctx, destinations=["1.1.1.1"], device="R9")).startswith("Error:")
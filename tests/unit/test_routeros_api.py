@@ -0,0 +1,229 @@
+"""Tests for the native RouterOS API client (wire format and tagged replies)."""
+
+import asyncio
+
+import pytest
+
+from mcp_mikrotik.routeros_api import (
+    RouterOSApiClient,
+    RouterOSApiError,
+    command_path,
+    encode_length,
+    encode_sentence,
+    parse_attributes,
+    read_length,
+    read_sentence,
+)
+
+
+def _reader(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+# ---------------------------------------------------------------------------
+# Wire encoding
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize(
+    "length, prefix_len",
+    [(0, 1), (0x7F, 1), (0x80, 2), (0x3FFF, 2), (0x4000, 3),
+     (0x1FFFFF, 3), (0x200000, 4), (0xFFFFFFF, 4), (0x10000000, 5)],
+)
+def test_length_encoding_round_trips(length, prefix_len):
+    encoded = encode_length(length)
+    assert len(encoded) == prefix_len
+
+    async def decode():
+        return await read_length(_reader(encoded))
+
+    assert asyncio.run(decode()) == length
+
+
+def test_sentence_round_trips_including_non_ascii():
+    words = ["/ip/address/print", "?interface=ether1", "=comment=från"]
+
+    async def decode():
+        return await read_sentence(_reader(encode_sentence(words)))
+
+    assert asyncio.run(decode()) == words
+
+
+def test_parse_attributes_keeps_equals_inside_values():
+    attrs = parse_attributes(["!re", "=.id=*1", "=comment=a=b", ".tag=3"])
+    assert attrs == {".id": "*1", "comment": "a=b"}
+
+
+def test_command_path_accepts_console_and_api_spelling():
+    assert command_path("ip firewall filter") == "/ip/firewall/filter/print"
+    assert command_path("/ip/pool") == "/ip/pool/print"
+    assert command_path("/ip pool", "add") == "/ip/pool/add"
+
+
+# ---------------------------------------------------------------------------
+# Client against a scripted API server
+# ---------------------------------------------------------------------------
+
+class FakeApiServer:
+    """Answers /login and /ip/pool/print; replies to the *second* request first."""
+
+    POOLS = [
+        {".id": "*1", "name": "pool1", "ranges": "10.0.0.1-10.0.0.10"},
+        {".id": "*2", "name": "pool2", "ranges": "10.0.1.1-10.0.1.10"},
+    ]
+
+    def __init__(self, password="secret"):
+        self.password = password
+        self.requests = []
+
+    async def handle(self, reader, writer):
+        held = []
+        try:
+            while True:
+                words = await read_sentence(reader)
+                self.requests.append(words)
+                tag = next(w for w in words if w.startswith(".tag="))
+                if words[0] == "/login":
+                    if f"=password={self.password}" in words:
+                        writer.write(encode_sentence(["!done", tag]))
+                    else:
+                        writer.write(encode_sentence(
+                            ["!trap", "=message=invalid user name or password (6)", tag]))
+                        writer.write(encode_sentence(["!done", tag]))
+                elif words[0] == "/ip/pool/print":
+                    held.append((words, tag))
+                    if len(held) == 2:
+                        for req, req_tag in reversed(held):
+                            self._answer_pools(writer, req, req_tag)
+                        held.clear()
+                else:
+                    writer.write(encode_sentence(["!trap", "=message=no such command", tag]))
+                    writer.write(encode_sentence(["!done", tag]))
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    def _answer_pools(self, writer, words, tag):
+        wanted = {w[1:].split("=", 1)[0]: w.split("=", 1)[1] for w in words if w.startswith("?")}
+        props = next((w.split("=", 2)[2].split(",") for w in words
+                      if w.startswith("=.proplist=")), None)
+        for pool in self.POOLS:
+            if all(pool.get(k) == v for k, v in wanted.items()):
+                row = {k: v for k, v in pool.items() if props is None or k in props}
+                writer.write(encode_sentence(
+                    ["!re", *(f"={k}={v}" for k, v in row.items()), tag]))
+        writer.write(encode_sentence(["!done", tag]))
+
+
+async def _serve(server_impl):
+    server = await asyncio.start_server(server_impl.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, port
+
+
+def test_concurrent_requests_are_matched_by_tag():
+    fake = FakeApiServer()
+
+    async def scenario():
+        server, port = await _serve(fake)
+        client = RouterOSApiClient("127.0.0.1", "admin", "secret", port=port)
+        await client.connect()
+        try:
+            everything, just_one = await asyncio.gather(
+                client.print_rows("ip pool", proplist=["name", "ranges"]),
+                client.print_rows("/ip/pool", queries=["?name=pool2"]),
+            )
+        finally:
+            await client.close()
+            server.close()
+        return everything, just_one
+
+    everything, just_one = asyncio.run(scenario())
+    assert everything == [
+        {"name": "pool1", "ranges": "10.0.0.1-10.0.0.10"},
+        {"name": "pool2", "ranges": "10.0.1.1-10.0.1.10"},
+    ]
+    assert [row["name"] for row in just_one] == ["pool2"]
+    assert just_one[0][".id"] == "*2"
+
+
+def test_stream_rows_hands_rows_over_as_they_arrive():
+    fake = FakeApiServer()
+
+    async def scenario():
+        server, port = await _serve(fake)
+        client = RouterOSApiClient("127.0.0.1", "admin", "secret", port=port)
+        await client.connect()
+        seen = []
+
+        def fail(row):
+            raise RuntimeError("consumer broke")
+
+        try:
+            counts = await asyncio.gather(
+                client.stream_rows("ip pool", seen.append, proplist=["name"]),
+                client.stream_rows("ip pool", fail),
+                return_exceptions=True,
+            )
+            # The connection survives a failing consumer.
+            again = await asyncio.gather(
+                client.print_rows("ip pool", queries=["?name=pool1"]),
+                client.print_rows("ip pool", queries=["?name=pool2"]),
+            )
+        finally:
+            await client.close()
+            server.close()
+        return counts, seen, again
+
+    counts, seen, again = asyncio.run(scenario())
+    assert counts[0] == 2
+    assert isinstance(counts[1], RuntimeError)
+    assert seen == [{"name": "pool1"}, {"name": "pool2"}]
+    assert [rows[0]["name"] for rows in again] == ["pool1", "pool2"]
+
+
+def test_login_trap_raises_and_closes():
+    fake = FakeApiServer(password="other")
+
+    async def scenario():
+        server, port = await _serve(fake)
+        client = RouterOSApiClient("127.0.0.1", "admin", "secret", port=port)
+        try:
+            with pytest.raises(RouterOSApiError, match="invalid user name"):
+                await client.connect()
+            return client.closed
+        finally:
+            server.close()
+
+    assert asyncio.run(scenario()) is True
+
+
+def test_trap_fails_only_its_own_request():
+    fake = FakeApiServer()
+
+    async def scenario():
+        server, port = await _serve(fake)
+        client = RouterOSApiClient("127.0.0.1", "admin", "secret", port=port)
+        await client.connect()
+        try:
+            with pytest.raises(RouterOSApiError, match="no such command"):
+                await client.talk(["/nope"])
+            # the connection is still usable afterwards
+            assert not client.closed
+        finally:
+            await client.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_talk_on_closed_client_raises_connection_error():
+    client = RouterOSApiClient("127.0.0.1", "admin", "secret")
+
+    async def scenario():
+        await client.talk(["/system/identity/print"])
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(scenario())
@@ -326,3 +326,149 @@ def test_enable_accepts_ros721_success_message_without_safe_prompt(
 
     assert "ENABLED" in result, result
     assert mgr.is_active
+
+
+class BatchConsole:
+    """Plays batch input the way the console does: echo, then run each line."""
+
+    PROMPT = "[admin@RouterA-NL] <SAFE> > "
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.flag = None
+        self.run = None
+        self.ran = []
+
+    def run_line(self, line):
+        out = [f"\x1b[m{self.PROMPT}{line}"]
+        if line.startswith(":global mcpBatchOk true"):
+            self.flag = True
+            return out
+        if line == ":set mcpBatchOk; :set mcpBatchRun":
+            self.flag = self.run = None
+            return out
+        if line.startswith(":global mcpBatchOk; :global mcpBatchRun $mcpBatchOk"):
+            self.run, self.flag = self.flag, False
+            return out
+        if line.startswith(':put "'):
+            return out + [line[len(':put "'):-1]]
+        if line.startswith(":global mcpBatchOk; :global mcpBatchRun; :if"):
+            body = line.split("do={ ", 1)[1].rsplit(" }", 1)[0]
+            parts = [p for p in body.split("; ") if not p.startswith(":set mcpBatchOk")]
+            unparsable = [self.answers[p] for p in parts if self.answers.get(p, "").startswith("syntax error")]
+            if unparsable:
+                return out + unparsable          # the whole line is rejected before it runs
+            if not self.run:
+                return out
+            out += self._run(parts)
+            if out[-1].startswith("__MCP"):
+                self.flag = True
+            return out
+        return out + self._run(line.split("; "))
+
+    def _run(self, parts):
+        out = []
+        for part in parts:
+            if part.startswith(':put "'):
+                out.append(part[len(':put "'):-1])
+                continue
+            self.ran.append(part)
+            answer = self.answers.get(part, "")
+            if answer:
+                out.append(answer)
+            if answer.startswith("failure"):
+                break
+        return out
+
+
+def _batch_manager(monkeypatch, answers):
+    channel = ScriptedChannel(license_prompt=False, password_nag=False)
+    console = BatchConsole(answers)
+    original_send = channel.send
+
+    def send(data):
+        if "\n" in data and "__MCP_SAFE_MODE_END_" in data:
+            channel.sent.append(data)
+            lines = data.rstrip("\n").split("\n")
+            # type-ahead: the console echoes a few lines before running any
+            out = [f"{BatchConsole.PROMPT}{lines[0]}"]
+            for line in lines:
+                out += console.run_line(line)
+            channel._pending += "\r\n".join(out) + "\r\n" + BatchConsole.PROMPT
+        else:
+            original_send(data)
+
+    channel.send = send
+    mgr = _patched_manager(monkeypatch, channel)
+    assert "ENABLED" in mgr.enable()
+    return mgr, channel, console
+
+
+def test_batch_is_sent_in_one_write_and_demultiplexed(monkeypatch, single_device_inventory):
+    mgr, channel, console = _batch_manager(monkeypatch, {
+        "/system identity print": "  name: RouterA-NL",
+        "/ip address add address=10.9.9.1/24 interface=ether2": "",
+        "/ip address add address=bad interface=ether2": "failure: invalid value for argument address",
+        "/ip route print count-only": "7",
+    })
+    commands = [
+        "/system identity print",
+        "/ip address add address=10.9.9.1/24 interface=ether2",
+        "/ip address add address=bad interface=ether2",
+        "/ip route print count-only",
+    ]
+
+    results = mgr.execute_batch(commands)
+
+    batch_writes = [s for s in channel.sent if "__MCP_SAFE_MODE_END_" in s]
+    assert len(batch_writes) == 1
+    assert [(r.status, r.output) for r in results] == [
+        ("ok", "name: RouterA-NL"),
+        ("ok", ""),
+        ("failed", "failure: invalid value for argument address"),
+        ("ok", "7"),                      # without stop_on_error the rest still runs
+    ]
+
+
+def test_batch_output_quoting_a_command_is_kept(monkeypatch, single_device_inventory):
+    mgr, channel, console = _batch_manager(monkeypatch, {
+        "/system script print": "  0 name=\"check\" source=/system script print",
+        "/log print": "09:30:00 system,info /log print run by admin",
+    })
+
+    results = mgr.execute_batch(["/system script print", "/log print"])
+
+    assert [r.output for r in results] == [
+        '0 name="check" source=/system script print',
+        "09:30:00 system,info /log print run by admin",
+    ]
+
+
+def test_batch_stop_on_error_skips_the_rest(monkeypatch, single_device_inventory):
+    mgr, channel, console = _batch_manager(monkeypatch, {
+        "/b add": "failure: already have such entry",
+    })
+
+    results = mgr.execute_batch(["/a add", "/b add", "/c add", "/d print"], stop_on_error=True)
+
+    assert [r.status for r in results] == ["ok", "failed", "skipped", "skipped"]
+    assert results[1].output == "failure: already have such entry"
+    assert console.ran == ["/a add", "/b add"]
+    assert console.flag is None               # the console global is cleared again
+
+
+def test_batch_stop_on_error_skips_the_rest_after_a_syntax_error(monkeypatch, single_device_inventory):
+    mgr, channel, console = _batch_manager(monkeypatch, {
+        "/b add x=(": "syntax error (line 1 column 84)",
+    })
+
+    results = mgr.execute_batch(["/a add", "/b add x=(", "/c add"], stop_on_error=True)
+
+    assert [r.status for r in results] == ["ok", "failed", "skipped"]
+    assert results[1].output == "syntax error (line 1 column 84)"
+    assert console.ran == ["/a add"]
+
+
+def test_batch_requires_an_active_session():
+    with pytest.raises(RuntimeError):
+        SafeModeManager("RouterA").execute_batch(["/x print"])
@@ -0,0 +1,63 @@
+"""Tests for the download_file tool's streamed paths."""
+
+import asyncio
+import base64
+import hashlib
+
+import pytest
+
+from mcp_mikrotik.connector import Download, DownloadTooLarge
+from mcp_mikrotik.scope import backup
+from tests.conftest import FakeExecutor
+
+
+@pytest.fixture()
+def fake_download(monkeypatch):
+    from types import SimpleNamespace
+
+    payload = bytes(range(256)) * 3000          # not a multiple of the base64 block
+    calls = []
+
+    async def download_to_file(filename, destination, device=None, max_size=None):
+        calls.append((filename, destination, device))
+        if max_size is not None and len(payload) > max_size:
+            raise DownloadTooLarge(f"'{filename}' is {len(payload)} bytes")
+        destination.write_bytes(payload)
+        return Download(destination, len(payload), hashlib.sha256(payload).hexdigest())
+
+    inventory = SimpleNamespace(resolve=lambda device=None: SimpleNamespace(title="RouterA"))
+    monkeypatch.setattr(backup, "get_inventory", lambda: inventory)
+    monkeypatch.setattr(backup, "execute_mikrotik_command", FakeExecutor())
+    monkeypatch.setattr(backup, "download_to_file", download_to_file)
+    return payload, calls
+
+
+def test_download_file_returns_base64_and_cleans_its_spool(ctx, fake_download):
+    payload, calls = fake_download
+
+    result = asyncio.run(backup.mikrotik_download_file(ctx, "big.backup"))
+
+    assert result.startswith("FILE_CONTENT_BASE64:")
+    assert base64.b64decode(result.split(":", 1)[1]) == payload
+    assert not calls[0][1].exists()
+
+
+def test_download_file_sends_large_files_to_disk(ctx, fake_download, monkeypatch):
+    monkeypatch.setattr(backup, "INLINE_DOWNLOAD_LIMIT", 1000)
+
+    result = asyncio.run(backup.mikrotik_download_file(ctx, "big.backup"))
+
+    assert result.startswith("Failed to download file 'big.backup'")
+    assert "save_to_disk" in result
+
+
+def test_download_file_can_save_to_disk(ctx, fake_download):
+    payload, calls = fake_download
+
+    result = asyncio.run(backup.mikrotik_download_file(ctx, "big.backup", save_to_disk=True))
+
+    destination = calls[0][1]
+    assert destination.read_bytes() == payload
+    assert destination.parent.name == "routera"
+    assert f"saved to {destination}" in result
+    assert hashlib.sha256(payload).hexdigest() in result
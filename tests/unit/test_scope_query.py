@@ -0,0 +1,37 @@
+"""Unit tests for the structured query_rows tool."""
+
+import asyncio
+import json
+
+
+def test_query_rows_returns_json_and_truncates(ctx, monkeypatch):
+    from mcp_mikrotik.scope import query
+
+    calls = []
+
+    async def fake_fetch(menu, device=None, proplist=None, where=None):
+        calls.append((menu, device, proplist, where))
+        return [{"name": f"pool{i}"} for i in range(3)]
+
+    monkeypatch.setattr(query, "fetch_rows", fake_fetch, raising=True)
+    out = asyncio.run(query.mikrotik_query_rows(
+        ctx, menu="ip pool", properties=["name"], where={"disabled": "false"},
+        limit=2, device="RouterA",
+    ))
+
+    assert calls == [("ip pool", "RouterA", ["name"], {"disabled": "false"})]
+    payload = json.loads(out)
+    assert payload["count"] == 3
+    assert payload["truncated"] is True
+    assert payload["rows"] == [{"name": "pool0"}, {"name": "pool1"}]
+
+
+def test_query_rows_reports_rejected_menus(ctx, monkeypatch):
+    from mcp_mikrotik.scope import query
+
+    async def fake_fetch(menu, device=None, proplist=None, where=None):
+        raise ValueError("Invalid menu or property name: 'pool;'")
+
+    monkeypatch.setattr(query, "fetch_rows", fake_fetch, raising=True)
+    out = asyncio.run(query.mikrotik_query_rows(ctx, menu="ip pool;"))
+    assert out.startswith("Error: Invalid menu")
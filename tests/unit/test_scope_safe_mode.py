@@ -86,3 +86,40 @@ def test_rollback_safe_mode_when_not_active(ctx, mock_manager):
     with patch("mcp_mikrotik.scope.safe_mode.get_safe_mode_manager", return_value=mock_manager):
         result = asyncio.run(mikrotik_rollback_safe_mode(ctx))
     assert "not active" in result.lower()
+
+
+def _resolving_inventory():
+    from types import SimpleNamespace
+    return SimpleNamespace(resolve=lambda device=None: SimpleNamespace(title="RouterA"))
+
+
+def test_safe_mode_batch_requires_active_session(ctx, mock_manager):
+    from mcp_mikrotik.scope.safe_mode import mikrotik_safe_mode_batch
+
+    with patch("mcp_mikrotik.scope.safe_mode.get_safe_mode_manager", return_value=mock_manager), \
+            patch("mcp_mikrotik.scope.safe_mode.get_inventory", _resolving_inventory):
+        result = asyncio.run(mikrotik_safe_mode_batch(ctx, ["/ip address print"]))
+    assert result.startswith("Error:")
+    mock_manager.execute_batch.assert_not_called()
+
+
+def test_safe_mode_batch_reports_each_command(ctx, mock_manager):
+    import json
+
+    from mcp_mikrotik.safe_mode import BatchResult
+    from mcp_mikrotik.scope.safe_mode import mikrotik_safe_mode_batch
+
+    mock_manager.is_active = True
+    mock_manager.execute_batch.return_value = [
+        BatchResult("/a add", BatchResult.OK),
+        BatchResult("/b add", BatchResult.FAILED, "failure: already have such entry"),
+        BatchResult("/c add", BatchResult.SKIPPED),
+    ]
+    with patch("mcp_mikrotik.scope.safe_mode.get_safe_mode_manager", return_value=mock_manager), \
+            patch("mcp_mikrotik.scope.safe_mode.get_inventory", _resolving_inventory):
+        result = json.loads(asyncio.run(
+            mikrotik_safe_mode_batch(ctx, ["/a add", "/b add", "/c add"])))
+
+    mock_manager.execute_batch.assert_called_once_with(["/a add", "/b add", "/c add"], True)
+    assert (result["succeeded"], result["failed"], result["skipped"]) == (1, 1, 1)
+    assert result["results"][1]["output"] == "failure: already have such entry"
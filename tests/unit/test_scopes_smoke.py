@@ -25,6 +25,13 @@ SCOPE_MODULES = [
     "wireguard",
 ]
 
+# Helper modules a scope reaches the router through, patched alongside it.
+HELPER_MODULES = {
+    "firewall_filter": ["mcp_mikrotik.firewall_analysis", "mcp_mikrotik.address_list"],
+    "logs": ["mcp_mikrotik.log_cursor"],
+    "routes": ["mcp_mikrotik.route_store"],
+}
+
 BROKEN_WRAPPER_FUNCS = {
     # These wrappers call update_* with a positional argument where `ctx` is first.
     # They currently raise TypeError ("multiple values for argument 'ctx'").
@@ -48,6 +55,18 @@ def test_scope_module_functions_return_string(module_name, ctx, monkeypatch):
     # Patch module-level executor (each scope imports it directly)
     fake = FakeExecutor()
     monkeypatch.setattr(module, "execute_mikrotik_command", fake, raising=True)
+    if hasattr(module, "execute_batch"):
+        monkeypatch.setattr(module, "execute_batch", fake.batch)
+    for helper in HELPER_MODULES.get(module_name, []):
+        helper_module = __import__(helper, fromlist=["*"])
+        if hasattr(helper_module, "execute_mikrotik_command"):
+            monkeypatch.setattr(helper_module, "execute_mikrotik_command", fake)
+        if hasattr(helper_module, "execute_batch"):
+            monkeypatch.setattr(helper_module, "execute_batch", fake.batch)
+        if hasattr(helper_module, "consume_rows"):
+            monkeypatch.setattr(helper_module, "consume_rows", fake.rows)
+        if hasattr(helper_module, "upload_file_sync"):
+            monkeypatch.setattr(helper_module, "upload_file_sync", lambda *args, **kwargs: None)
 
     # Run every coroutine function once with dummy args.
     for name, fn in inspect.getmembers(module, inspect.iscoroutinefunction):
@@ -23,6 +23,11 @@ def test_server_main_runs_mcp_stdio(monkeypatch):
         key_filename=None,
         inventory=[],
         inventory_file=None,
+        pool_size=0,
+        pool_idle_timeout=60.0,
+        multiplex_channels=0,
+        ssh_engine="paramiko",
+        syslog_port=0,
         mcp=types.SimpleNamespace(host="127.0.0.1", port=8123, transport="stdio",
                                   allowed_hosts="", allowed_origins=""),
     )
@@ -55,6 +60,11 @@ def test_server_main_passes_http_options_to_run(monkeypatch):
         key_filename=None,
         inventory=[],
         inventory_file=None,
+        pool_size=0,
+        pool_idle_timeout=60.0,
+        multiplex_channels=0,
+        ssh_engine="paramiko",
+        syslog_port=0,
         mcp=types.SimpleNamespace(host="0.0.0.0", port=8123, transport="streamable-http",
                                   allowed_hosts="mcp.example.com", allowed_origins=""),
     )
@@ -89,6 +99,11 @@ def test_server_main_exits_on_exception(monkeypatch):
         key_filename=None,
         inventory=[],
         inventory_file=None,
+        pool_size=0,
+        pool_idle_timeout=60.0,
+        multiplex_channels=0,
+        ssh_engine="paramiko",
+        syslog_port=0,
         mcp=types.SimpleNamespace(host="127.0.0.1", port=8123, transport="stdio"),
     )
 
@@ -304,6 +319,11 @@ def test_server_main_handles_keyboard_interrupt(monkeypatch):
         key_filename=None,
         inventory=[],
         inventory_file=None,
+        pool_size=0,
+        pool_idle_timeout=60.0,
+        multiplex_channels=0,
+        ssh_engine="paramiko",
+        syslog_port=0,
         mcp=types.SimpleNamespace(host="127.0.0.1", port=8123, transport="stdio"),
     )
 
@@ -0,0 +1,108 @@
+"""Tests for the shared selector loop behind safe-mode shell reads."""
+
+import select
+import socket
+import threading
+import time
+
+from mcp_mikrotik.shell_reactor import ShellReactor
+
+
+class SocketChannel:
+    """Channel double backed by a real socket, so it can be selected on."""
+
+    def __init__(self):
+        self._sock, self.peer = socket.socketpair()
+        self.closed = False
+        self.eof_received = False
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    def recv_ready(self):
+        return bool(select.select([self._sock], [], [], 0)[0])
+
+    def recv(self, n):
+        data = self._sock.recv(n)
+        if not data:
+            self.eof_received = True
+        return data
+
+    def close(self):
+        self.closed = True
+        self._sock.close()
+        self.peer.close()
+
+
+class PollOnlyChannel:
+    """A channel without fileno(): served by polling."""
+
+    def __init__(self, data=b""):
+        self.pending = data
+
+    def recv_ready(self):
+        return bool(self.pending)
+
+    def recv(self, n):
+        out, self.pending = self.pending[:n], self.pending[n:]
+        return out
+
+
+def test_reader_wakes_as_soon_as_data_arrives():
+    reactor = ShellReactor()
+    a, b = SocketChannel(), SocketChannel()
+    try:
+        assert reactor.register(a) and reactor.register(b)
+        threading.Timer(0.05, lambda: b.peer.send(b"from b")).start()
+
+        started = time.monotonic()
+        assert reactor.recv(b, timeout=5) == b"from b"
+        assert time.monotonic() - started < 1
+        assert reactor.recv(a, timeout=0.05) is None       # nothing for a
+    finally:
+        a.close(), b.close()
+
+
+def test_many_channels_are_served_concurrently():
+    reactor = ShellReactor()
+    channels = [SocketChannel() for _ in range(8)]
+    results = {}
+    try:
+        for channel in channels:
+            reactor.register(channel)
+
+        def read(i):
+            results[i] = reactor.recv(channels[i], timeout=5)
+
+        readers = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+        for t in readers:
+            t.start()
+        for i, channel in enumerate(reversed(channels)):
+            channel.peer.send(f"out{7 - i}".encode())
+        for t in readers:
+            t.join(5)
+
+        assert results == {i: f"out{i}".encode() for i in range(8)}
+    finally:
+        for channel in channels:
+            channel.close()
+
+
+def test_closed_channel_ends_the_read():
+    reactor = ShellReactor()
+    channel = SocketChannel()
+    reactor.register(channel)
+    channel.peer.send(b"last words")
+    channel.peer.close()
+
+    assert reactor.recv(channel, timeout=5) == b"last words"
+    assert reactor.recv(channel, timeout=5) is None
+
+
+def test_channel_without_fileno_is_polled():
+    reactor = ShellReactor()
+    channel = PollOnlyChannel(b"polled")
+
+    assert reactor.register(channel) is False
+    assert reactor.recv(channel, timeout=1) == b"polled"
+    assert reactor.recv(channel, timeout=0.02) is None
@@ -106,6 +106,74 @@ def test_execute_command_handles_cp1252_stderr(monkeypatch):
     assert "failure" in result
 
 
+def test_iter_command_lines_reassembles_lines_across_chunks(monkeypatch):
+    from mcp_mikrotik.mikrotik_ssh_client import MikroTikSSHClient
+    import mcp_mikrotik.mikrotik_ssh_client as mod
+
+    chunks = [b" 0 name=p", b"ool1\r\n 1 comment=\"fr", "\xe5n\"\r\n 2 x=".encode("cp1252"), b"y", b""]
+
+    class Channel:
+        closed = False
+
+        def recv(self, _size):
+            return chunks.pop(0)
+
+        def close(self):
+            Channel.closed = True
+
+    class Stdout(io.BytesIO):
+        channel = Channel()
+
+    class DummySSH:
+        def set_missing_host_key_policy(self, _): pass
+        def connect(self, **kwargs): pass
+        def exec_command(self, command):
+            return (None, Stdout(), io.BytesIO(b""))
+        def close(self): pass
+
+    monkeypatch.setattr(mod.paramiko, "SSHClient", lambda: DummySSH())
+
+    client = MikroTikSSHClient(host="h", username="u", password="p", key_filename=None)
+    assert client.connect() is True
+    lines = client.iter_command_lines("/ip pool print terse")
+    assert next(lines) == " 0 name=pool1"       # yielded before the output ends
+    assert list(lines) == [' 1 comment="fr\xe5n"', " 2 x=y"]
+    assert Channel.closed
+
+
+def test_iter_command_lines_closes_the_channel_when_abandoned(monkeypatch):
+    from mcp_mikrotik.mikrotik_ssh_client import MikroTikSSHClient
+    import mcp_mikrotik.mikrotik_ssh_client as mod
+
+    closed = []
+
+    class Channel:
+        def recv(self, _size):
+            return b" 0 name=pool1\n"            # never ends on its own
+
+        def close(self):
+            closed.append(True)
+
+    class Stdout(io.BytesIO):
+        channel = Channel()
+
+    class DummySSH:
+        def set_missing_host_key_policy(self, _): pass
+        def connect(self, **kwargs): pass
+        def exec_command(self, command):
+            return (None, Stdout(), io.BytesIO(b""))
+        def close(self): pass
+
+    monkeypatch.setattr(mod.paramiko, "SSHClient", lambda: DummySSH())
+
+    client = MikroTikSSHClient(host="h", username="u", password="p", key_filename=None)
+    assert client.connect() is True
+    lines = client.iter_command_lines("/ip pool print terse")
+    assert next(lines) == " 0 name=pool1"
+    lines.close()                               # the consumer gives up early
+    assert closed == [True]
+
+
 def test_ssh_client_requires_connect_for_execute():
     from mcp_mikrotik.mikrotik_ssh_client import MikroTikSSHClient
 
@@ -252,6 +320,60 @@ def test_ssh_client_download_file_via_sftp(monkeypatch):
     assert sftp.closed is True
 
 
+class _RemoteFile:
+    """paramiko SFTPFile double: stat/seek/prefetch/read over a byte string."""
+
+    def __init__(self, payload, log):
+        self.payload = payload
+        self.position = 0
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.log.append("closed-file")
+
+    def stat(self):
+        from types import SimpleNamespace
+        return SimpleNamespace(st_size=len(self.payload))
+
+    def seek(self, offset):
+        self.position = offset
+
+    def prefetch(self, file_size=None):
+        self.log.append(("prefetch", self.position, file_size))
+
+    def read(self, n):
+        data = self.payload[self.position:self.position + n]
+        self.position += len(data)
+        return data
+
+
+def test_ssh_client_iter_file_streams_a_byte_range(monkeypatch):
+    log = []
+
+    class DummySFTP:
+        def open(self, path, mode):
+            log.append(("open", path, mode))
+            return _RemoteFile(bytes(range(256)) * 4, log)
+
+        def close(self):
+            log.append("closed-sftp")
+
+    client = _connect_client_with_sftp(monkeypatch, DummySFTP())
+
+    chunks = list(client.iter_file("log.0.txt", offset=100, length=700, chunk_size=256))
+    assert [len(c) for c in chunks] == [256, 256, 188]
+    assert b"".join(chunks) == (bytes(range(256)) * 4)[100:800]
+    assert ("prefetch", 100, 800) in log
+    assert log[-2:] == ["closed-file", "closed-sftp"]
+
+    assert b"".join(client.iter_file("log.0.txt")) == bytes(range(256)) * 4
+    with pytest.raises(ValueError):
+        list(client.iter_file("log.0.txt", offset=5000))
+
+
 def test_ssh_client_upload_file_via_sftp(monkeypatch):
     captured = {}
 
@@ -275,6 +397,25 @@ def test_ssh_client_upload_file_via_sftp(monkeypatch):
     assert sftp.closed is True
 
 
+def test_ssh_client_stat_file_via_sftp(monkeypatch):
+    from types import SimpleNamespace
+
+    class DummySFTP:
+        closed = False
+
+        def stat(self, path):
+            return SimpleNamespace(st_size=4096, st_mtime=1760781600.5)
+
+        def close(self):
+            self.closed = True
+
+    sftp = DummySFTP()
+    client = _connect_client_with_sftp(monkeypatch, sftp)
+
+    assert client.stat_file("export.rsc") == (4096, 1760781600)
+    assert sftp.closed is True
+
+
 def test_ssh_client_download_requires_connect():
     from mcp_mikrotik.mikrotik_ssh_client import MikroTikSSHClient
 
@@ -290,3 +431,38 @@ def test_ssh_client_upload_requires_connect():
     with pytest.raises(Exception, match="Not connected"):
         client.upload_file("x.rsc", b"data")
 
+
+
+# ---------------------------------------------------------------------------
+# is_alive: pooled-connection health check
+# ---------------------------------------------------------------------------
+
+def test_is_alive_reflects_transport_health():
+    from types import SimpleNamespace
+
+    from mcp_mikrotik.mikrotik_ssh_client import MikroTikSSHClient
+
+    class Transport:
+        def __init__(self, active=True, ignore_fails=False):
+            self.active = active
+            self.ignore_fails = ignore_fails
+
+        def is_active(self):
+            return self.active
+
+        def send_ignore(self):
+            if self.ignore_fails:
+                raise EOFError("socket closed")
+
+    client = MikroTikSSHClient(host="h", username="u", password="p", key_filename=None)
+    assert client.is_alive() is False          # never connected
+
+    transport = Transport()
+    client.client = SimpleNamespace(get_transport=lambda: transport)
+    assert client.is_alive() is True
+
+    transport.ignore_fails = True              # silently dropped by the router
+    assert client.is_alive() is False
+
+    transport.ignore_fails, transport.active = False, False
+    assert client.is_alive() is False
@@ -0,0 +1,165 @@
+"""Tests for the syslog receiver: parsing, per-device rings, sockets and log tools."""
+
+import asyncio
+import socket
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from mcp_mikrotik.config import DeviceConfig
+from mcp_mikrotik.inventory import Inventory
+from mcp_mikrotik.scope import logs
+from mcp_mikrotik.syslog_receiver import (
+    MAX_FRAME, SyslogBuffer, SyslogReceiver, inventory_resolver, parse_syslog,
+)
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("<30>system,info,account user admin logged in via ssh",
+     (None, ("system", "info", "account"), "user admin logged in via ssh")),
+    ("<134>Oct 18 09:15:02 core-1 firewall,info input: in:ether1 out:(unknown 0)",
+     ("core-1", ("firewall", "info"), "input: in:ether1 out:(unknown 0)")),
+    ("<14>1 2026-10-18T09:15:02Z core-1 - - - - dhcp,info lease granted\n",
+     ("core-1", ("dhcp", "info"), "lease granted")),
+    ("<27>no topics here", (None, ("error",), "no topics here")),
+    ("<28>interface link down", (None, ("warning",), "interface link down")),
+])
+def test_parse_syslog_understands_routeros_formats(message, expected):
+    assert parse_syslog(message) == expected
+
+
+def test_buffer_keeps_the_newest_entries_per_device():
+    buffer = SyslogBuffer(3)
+    for i in range(5):
+        buffer.add("R1", ("info",), f"m{i}")
+    buffer.add("R2", ("info",), "other")
+
+    assert [e.message for e in buffer.entries("R1")] == ["m2", "m3", "m4"]
+    assert [e.id for e in buffer.entries("R1")] == ["*3", "*4", "*5"]
+    assert buffer.stats()["R1"]["buffered"] == 3
+    assert buffer.stats()["R1"]["received"] == 5
+    assert buffer.entries("R3") == []
+
+
+def test_resolver_matches_source_address_and_opted_in_hostnames():
+    device_for = inventory_resolver([
+        DeviceConfig(title="core-1", host="127.0.0.1"),
+        DeviceConfig(title="edge-1", host="edge.invalid", syslog_hostname=True),
+    ])
+    assert device_for("127.0.0.1", "whatever") == "core-1"
+    assert device_for("127.0.0.1", "edge-1") == "core-1"       # the address decides
+    assert device_for("10.9.9.9", "EDGE-1") == "edge-1"
+    assert device_for("10.9.9.9", None) is None
+    assert device_for("10.9.9.9", "core-9") is None
+
+
+def test_spoofed_hostname_from_a_foreign_address_is_dropped():
+    buffer = SyslogBuffer(100)
+    receiver = SyslogReceiver("127.0.0.1", 0, buffer, inventory_resolver([
+        DeviceConfig(title="core-1", host="192.0.2.1"),
+    ]))
+    receiver.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+            udp.sendto(b"<30>Oct 18 09:15:02 core-1 system,info injected", ("127.0.0.1", receiver.port))
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and buffer.dropped < 1:
+            time.sleep(0.01)
+    finally:
+        receiver.stop()
+
+    assert buffer.dropped == 1 and buffer.entries("core-1") == []
+
+
+def test_receiver_accepts_udp_and_tcp():
+    buffer = SyslogBuffer(100)
+    receiver = SyslogReceiver("127.0.0.1", 0, buffer, lambda source, host: host)
+    receiver.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+            udp.sendto(b"<30>Oct 18 09:15:02 core-1 system,info over udp", ("127.0.0.1", receiver.port))
+        framed = b"<30>Oct 18 09:15:02 core-2 system,info counted"
+        with socket.create_connection(("127.0.0.1", receiver.port)) as tcp:
+            tcp.sendall(b"%d %s" % (len(framed), framed) + b"<28>Oct 18 09:15:03 core-2 system,warning by line\n")
+            tcp.sendall(b"<30>no hostname\n")
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and (
+            len(buffer.entries("core-1")) < 1 or len(buffer.entries("core-2")) < 2
+        ):
+            time.sleep(0.01)
+    finally:
+        receiver.stop()
+
+    assert [e.message for e in buffer.entries("core-1")] == ["over udp"]
+    assert [e.message for e in buffer.entries("core-2")] == ["counted", "by line"]
+    assert buffer.dropped == 1 and set(buffer.stats()) == {"core-1", "core-2"}
+
+
+def test_receiver_disconnects_an_oversized_frame():
+    buffer = SyslogBuffer(100)
+    receiver = SyslogReceiver("127.0.0.1", 0, buffer, lambda source, host: host)
+    receiver.start()
+    try:
+        with socket.create_connection(("127.0.0.1", receiver.port)) as tcp:
+            tcp.settimeout(5)
+            tcp.sendall(b"%d <30>Oct 18 09:15:02 core-1 system,info " % (MAX_FRAME + 1))
+            assert tcp.recv(1) == b""                   # closed without waiting for the frame
+        with socket.create_connection(("127.0.0.1", receiver.port)) as tcp:
+            tcp.settimeout(5)
+            tcp.sendall(b"<30>Oct 18 09:15:02 core-1 system,info " + b"x" * (MAX_FRAME + 1))
+            assert tcp.recv(1) == b""
+    finally:
+        receiver.stop()
+
+    assert buffer.entries("core-1") == []
+
+
+@pytest.fixture()
+def buffered(monkeypatch):
+    buffer = SyslogBuffer(100)
+    old = datetime.now() - timedelta(hours=2)
+    buffer.add("R1", ("system", "info"), "user admin logged in", received=old)
+    buffer.add("R1", ("dhcp", "info"), "lease granted to 10.0.0.7")
+    buffer.add("R1", ("system", "error", "critical"), "login failure for user Admin")
+    monkeypatch.setattr(logs, "get_syslog_buffer", lambda: buffer)
+    monkeypatch.setattr(logs, "get_inventory", lambda: Inventory([DeviceConfig(title="R1", host="10.0.0.1")]))
+
+    async def no_router(*_args, **_kwargs):
+        raise AssertionError("the router must not be contacted")
+
+    monkeypatch.setattr(logs, "execute_mikrotik_command", no_router)
+    return buffer
+
+
+def test_get_logs_and_search_logs_answer_from_the_syslog_buffer(ctx, buffered):
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, topics="system", time_filter="1h", source="syslog"))
+    assert out.startswith("LOG ENTRIES:\n\n")
+    assert out.splitlines()[-1].endswith("system,error,critical login failure for user Admin")
+    assert "logged in" not in out
+
+    out = asyncio.run(logs.mikrotik_search_logs(ctx, "ADMIN", source="syslog"))
+    assert len(out.splitlines()) == 4
+
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, prefix_filter="lease", limit=1, source="syslog"))
+    assert out.endswith("dhcp,info lease granted to 10.0.0.7")
+
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, time_filter="soon", source="syslog"))
+    assert out.startswith("Error: Invalid time_filter")
+
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, topics="critical, dhcp", source="syslog"))
+    assert "lease granted" in out and "login failure" in out and "logged in" not in out
+    for bad in ("a|", "system|", "(sys"):
+        out = asyncio.run(logs.mikrotik_get_logs(ctx, topics=bad, source="syslog"))
+        assert out.startswith("Error: Invalid topic")
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, topics="sys", source="syslog"))
+    assert "logged in" not in out and "login failure" not in out      # whole names only
+
+
+def test_syslog_source_requires_the_receiver(ctx, monkeypatch):
+    monkeypatch.setattr(logs, "get_syslog_buffer", lambda: None)
+
+    out = asyncio.run(logs.mikrotik_get_logs(ctx, source="syslog"))
+    assert out.startswith("Error: the syslog receiver is not running")
+    assert asyncio.run(logs.mikrotik_syslog_status(ctx)).startswith("The syslog receiver is not running")
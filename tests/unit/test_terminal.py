@@ -0,0 +1,51 @@
+"""Tests for the incremental console decoder used by the safe-mode shell."""
+
+from mcp_mikrotik.terminal import TerminalDecoder
+
+STREAM = (
+    "\x1b[9999B\x1b[6n  MikroTik RouterOS 7.21\r\n"
+    "\x1b[m\x1b[32mname\x1b[m: Routeré-NL\r\n"
+    "\x1b[c[admin@RouterA-NL] <SAFE> > "
+).encode("utf-8")
+
+
+def feed_in_pieces(data: bytes, size: int) -> TerminalDecoder:
+    decoder = TerminalDecoder()
+    for i in range(0, len(data), size):
+        decoder.feed(data[i:i + size])
+    return decoder
+
+
+def test_whole_stream_is_cleaned_and_split_into_lines():
+    decoder = TerminalDecoder()
+    lines = decoder.feed(STREAM)
+
+    assert lines == ["  MikroTik RouterOS 7.21", "name: Routeré-NL"]
+    assert decoder.line == "[admin@RouterA-NL] <SAFE> > "
+    assert decoder.take_replies() == ["\x1b[50;220R", "\x1b[?6c"]
+    assert decoder.take_replies() == []
+
+
+def test_byte_at_a_time_gives_the_same_result():
+    """Escapes, UTF-8 characters and CRLF split across reads are held back."""
+    whole = TerminalDecoder()
+    whole.feed(STREAM)
+    trickled = feed_in_pieces(STREAM, 1)
+
+    assert trickled.text == whole.text
+    assert "\n\n" not in trickled.text            # a split \r\n is one line end
+    assert trickled.replies == ["\x1b[50;220R", "\x1b[?6c"]
+
+
+def test_lines_are_reported_once_as_they_complete():
+    decoder = TerminalDecoder()
+    assert decoder.feed(b"first li") == []
+    assert decoder.line == "first li"
+    assert decoder.feed(b"ne\r\nsecond\rthird\n") == ["first line", "second", "third"]
+    assert decoder.line == ""
+
+
+def test_unknown_escape_is_released_as_text():
+    decoder = TerminalDecoder()
+    decoder.feed(b"a\x1b]0;title\x07b\n")
+    assert decoder.text == "a\x1b]0;title\x07b\n"